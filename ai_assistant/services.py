@@ -7,6 +7,7 @@ import uuid
 from typing import Dict, List, Optional, Any
 from django.conf import settings
 from django.core.cache import cache
+from performance_monitoring.prometheus_metrics import AI_REQUEST_DURATION
 from .models import AISession, AIInteraction
 
 try:
@@ -48,6 +49,17 @@ class AIAssistantService:
             logger.error(f"Failed to initialize Gemini AI client: {str(e)}")
             self._model = None
     
+    def _generate_content(self, operation: str, prompt: str):
+        """Call the Gemini model, observing the latency of the call"""
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            response = self._model.generate_content(prompt)
+            outcome = 'success'
+            return response
+        finally:
+            AI_REQUEST_DURATION.labels(operation=operation, outcome=outcome).observe(time.perf_counter() - start)
+    
     def is_available(self) -> bool:
         """Check if AI service is available"""
         return GEMINI_AVAILABLE and self._model is not None and bool(self.api_key)
@@ -247,7 +259,7 @@ class AIAssistantService:
         """
         
         try:
-            response = self._model.generate_content(prompt)
+            response = self._generate_content('suggestions', prompt)
             suggestions = [s.strip() for s in response.text.split('\n') if s.strip()]
             return suggestions[:4]
         except Exception as e:
@@ -379,7 +391,7 @@ class AIAssistantService:
         """
         
         try:
-            response = self._model.generate_content(prompt)
+            response = self._generate_content('questions', prompt)
             questions = [q.strip() for q in response.text.split('\n') if q.strip()]
             return questions[:5]  # Limit to 5 questions
         except Exception as e:
@@ -865,7 +877,7 @@ class AIAssistantService:
         """
         
         try:
-            response = self._model.generate_content(prompt)
+            response = self._generate_content('action_items', prompt)
             # Parse JSON response
             import json
             action_items = json.loads(response.text)
@@ -951,7 +963,7 @@ class AIAssistantService:
         """
         
         try:
-            response = self._model.generate_content(prompt)
+            response = self._generate_content('action_items', prompt)
             # Parse JSON response
             import json
             action_items = json.loads(response.text)
@@ -1047,7 +1059,7 @@ class AIAssistantService:
         """
         
         try:
-            response = self._model.generate_content(prompt)
+            response = self._generate_content('summary', prompt)
             return response.text.strip()
         except Exception as e:
             logger.error(f"Gemini API error in summary generation: {str(e)}")
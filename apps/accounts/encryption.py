@@ -1,21 +1,55 @@
 """
 Data encryption utilities for sensitive information
+
+Keys are derived with PBKDF2 once per process and secret, and the Fernet
+instance built from them is reused, so encrypting or decrypting costs only
+the AES and HMAC work itself. The *_many methods handle whole lists of
+values in one call.
+
+Transcripts use EnvelopeEncryption instead: a plaintext header, a body
+encrypted with a per-record data key, and that key wrapped with a versioned
+key-encryption key, so metadata reads need no decryption and key rotation
+only re-wraps the data key.
 """
 import base64
+import codecs
 import hashlib
+import io
+import json
+import os
 import secrets
-from cryptography.fernet import Fernet
+import struct
+from functools import lru_cache
+from cryptography.fernet import Fernet, MultiFernet
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from django.conf import settings
 from django.core.cache import cache
 
+from .redaction import default_engine
+
 
 class DataEncryption:
     """
     Utility class for encrypting and decrypting sensitive data
     """
     
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _derive_key(secret_key):
+        """
+        Derive a Fernet key from a secret; cached, as PBKDF2 is deliberately slow
+        """
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=b'meeting_intelligence_salt',  # In production, use random salt per data
+            iterations=100000,
+        )
+        return base64.urlsafe_b64encode(kdf.derive(secret_key.encode()))
+    
     @staticmethod
     def _get_encryption_key():
         """
@@ -23,16 +57,61 @@ class DataEncryption:
         """
         # In production, this should come from environment variables or key management service
         secret_key = getattr(settings, 'DATA_ENCRYPTION_KEY', settings.SECRET_KEY)
+        return DataEncryption._derive_key(secret_key)
+    
+    @staticmethod
+    def _get_fernet():
+        """
+        Fernet for the current key, also accepting tokens from previous keys
         
-        # Derive a proper encryption key from the secret
-        kdf = PBKDF2HMAC(
+        Previous secrets listed in DATA_ENCRYPTION_PREVIOUS_KEYS stay readable
+        while data is re-encrypted under the current one.
+        """
+        previous_keys = tuple(getattr(settings, 'DATA_ENCRYPTION_PREVIOUS_KEYS', ()))
+        return DataEncryption._build_fernet(DataEncryption._get_encryption_key(), previous_keys)
+    
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def _build_fernet(key, previous_keys):
+        if not previous_keys:
+            return Fernet(key)
+        return MultiFernet([Fernet(key)] + [Fernet(DataEncryption._derive_key(secret)) for secret in previous_keys])
+    
+    @staticmethod
+    def _get_key_versions():
+        """
+        Current key version, and every readable secret by version
+        
+        The current secret has DATA_ENCRYPTION_KEY_VERSION; secrets in
+        DATA_ENCRYPTION_PREVIOUS_KEYS, newest first, have the versions
+        before it.
+        """
+        current_version = getattr(settings, 'DATA_ENCRYPTION_KEY_VERSION', 1)
+        secret_keys = {current_version: getattr(settings, 'DATA_ENCRYPTION_KEY', settings.SECRET_KEY)}
+        for offset, secret_key in enumerate(getattr(settings, 'DATA_ENCRYPTION_PREVIOUS_KEYS', ()), start=1):
+            secret_keys[current_version - offset] = secret_key
+        return current_version, secret_keys
+    
+    @staticmethod
+    def _get_wrapping_key(key_version):
+        """
+        AES-256 key-encryption key for a key version
+        """
+        _, secret_keys = DataEncryption._get_key_versions()
+        if key_version not in secret_keys:
+            raise ValueError(f"Unknown encryption key version: {key_version}")
+        return DataEncryption._derive_wrapping_key(secret_keys[key_version])
+    
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _derive_wrapping_key(secret_key):
+        # Separate from the Fernet key, so neither key can be used in place of the other
+        return HKDF(
             algorithm=hashes.SHA256(),
             length=32,
-            salt=b'meeting_intelligence_salt',  # In production, use random salt per data
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(secret_key.encode()))
-        return key
+            salt=None,
+            info=b'meeting_intelligence_key_wrapping',
+        ).derive(base64.urlsafe_b64decode(DataEncryption._derive_key(secret_key)))
     
     @staticmethod
     def encrypt_text(plaintext):
@@ -42,14 +121,7 @@ class DataEncryption:
         if not plaintext:
             return None
         
-        try:
-            key = DataEncryption._get_encryption_key()
-            f = Fernet(key)
-            encrypted_data = f.encrypt(plaintext.encode())
-            return base64.urlsafe_b64encode(encrypted_data).decode()
-        except Exception as e:
-            # Log error in production
-            raise Exception(f"Encryption failed: {str(e)}")
+        return DataEncryption.encrypt_many([plaintext])[0]
     
     @staticmethod
     def decrypt_text(encrypted_text):
@@ -59,39 +131,94 @@ class DataEncryption:
         if not encrypted_text:
             return None
         
+        return DataEncryption.decrypt_many([encrypted_text])[0]
+    
+    @staticmethod
+    def encrypt_many(plaintexts):
+        """
+        Encrypt a list of strings; empty values come back as None
+        """
+        try:
+            f = DataEncryption._get_fernet()
+            return [
+                base64.urlsafe_b64encode(f.encrypt(plaintext.encode())).decode() if plaintext else None
+                for plaintext in plaintexts
+            ]
+        except Exception as e:
+            # Log error in production
+            raise Exception(f"Encryption failed: {str(e)}")
+    
+    @staticmethod
+    def decrypt_many(encrypted_texts):
+        """
+        Decrypt a list of encrypted strings; empty values come back as None
+        """
         try:
-            key = DataEncryption._get_encryption_key()
-            f = Fernet(key)
-            encrypted_data = base64.urlsafe_b64decode(encrypted_text.encode())
-            decrypted_data = f.decrypt(encrypted_data)
-            return decrypted_data.decode()
+            f = DataEncryption._get_fernet()
+            return [
+                f.decrypt(base64.urlsafe_b64decode(encrypted_text.encode())).decode() if encrypted_text else None
+                for encrypted_text in encrypted_texts
+            ]
         except Exception as e:
             # Log error in production
             raise Exception(f"Decryption failed: {str(e)}")
     
+    @staticmethod
+    def rotate_many(encrypted_texts):
+        """
+        Re-encrypt a list of encrypted strings under the current key
+        
+        Values written under a key in DATA_ENCRYPTION_PREVIOUS_KEYS are
+        decrypted and encrypted again; empty values come back as None.
+        """
+        try:
+            f = DataEncryption._get_fernet()
+            rotate = f.rotate if isinstance(f, MultiFernet) else lambda token: f.encrypt(f.decrypt(token))
+            return [
+                base64.urlsafe_b64encode(rotate(base64.urlsafe_b64decode(encrypted_text.encode()))).decode()
+                if encrypted_text else None
+                for encrypted_text in encrypted_texts
+            ]
+        except Exception as e:
+            # Log error in production
+            raise Exception(f"Key rotation failed: {str(e)}")
+    
     @staticmethod
     def encrypt_json(data):
         """
         Encrypt JSON-serializable data
         """
-        import json
         if not data:
             return None
         
-        json_string = json.dumps(data)
-        return DataEncryption.encrypt_text(json_string)
+        return DataEncryption.encrypt_json_many([data])[0]
     
     @staticmethod
     def decrypt_json(encrypted_data):
         """
         Decrypt JSON data
         """
-        import json
         if not encrypted_data:
             return None
         
-        json_string = DataEncryption.decrypt_text(encrypted_data)
-        return json.loads(json_string) if json_string else None
+        return DataEncryption.decrypt_json_many([encrypted_data])[0]
+    
+    @staticmethod
+    def encrypt_json_many(items):
+        """
+        Encrypt a list of JSON-serializable values; empty values come back as None
+        """
+        return DataEncryption.encrypt_many([json.dumps(data) if data else None for data in items])
+    
+    @staticmethod
+    def decrypt_json_many(encrypted_items):
+        """
+        Decrypt a list of JSON values; empty values come back as None
+        """
+        return [
+            json.loads(json_string) if json_string else None
+            for json_string in DataEncryption.decrypt_many(encrypted_items)
+        ]
     
     @staticmethod
     def hash_sensitive_data(data):
@@ -137,13 +264,212 @@ class FieldEncryption:
             return None
         
         return DataEncryption.decrypt_text(encrypted_value)
+    
+    @staticmethod
+    def decrypt_fields(encrypted_values):
+        """
+        Decrypt a list of model field values
+        """
+        return DataEncryption.decrypt_many(encrypted_values)
+
+
+class EnvelopeEncryption:
+    """
+    Binary envelope for large records such as transcripts
+    
+    MAGIC | header length | header JSON | key version | wrapped data key | body
+    
+    The header is plaintext, so metadata is read without decrypting. Every
+    envelope has its own random AES-256-GCM data key, wrapped with the
+    key-encryption key of its key version. The body is encrypted in
+    CHUNK_SIZE pieces that can be decrypted one at a time. The header is
+    authenticated with the data key and with every chunk, and the last chunk
+    is marked, so edited metadata, reordered chunks and truncation are all
+    detected.
+    """
+    
+    MAGIC = b'MIE\x01'
+    CHUNK_SIZE = 64 * 1024
+    NONCE_SIZE = 12
+    TAG_SIZE = 16
+    WRAPPED_KEY_SIZE = NONCE_SIZE + 32 + TAG_SIZE
+    
+    @staticmethod
+    def seal(plaintext, metadata, chunk_size=None):
+        """
+        Encrypt bytes under the current key version
+        """
+        chunk_size = chunk_size or EnvelopeEncryption.CHUNK_SIZE
+        nonce_prefix = os.urandom(EnvelopeEncryption.NONCE_SIZE - 4)
+        header = json.dumps({
+            **metadata,
+            'length': len(plaintext),
+            'chunk_size': chunk_size,
+            'nonce': base64.urlsafe_b64encode(nonce_prefix).decode()
+        }, separators=(',', ':')).encode()
+        
+        key_version, _ = DataEncryption._get_key_versions()
+        data_key = AESGCM.generate_key(bit_length=256)
+        
+        body = AESGCM(data_key)
+        chunk_count = EnvelopeEncryption._chunk_count(len(plaintext), chunk_size)
+        chunks = [
+            body.encrypt(
+                nonce_prefix + struct.pack('>I', index),
+                plaintext[index * chunk_size:(index + 1) * chunk_size],
+                header + struct.pack('>I?', index, index == chunk_count - 1)
+            )
+            for index in range(chunk_count)
+        ]
+        
+        return b''.join([EnvelopeEncryption._preamble(header, key_version, data_key)] + chunks)
+    
+    @staticmethod
+    def read_header(source):
+        """
+        Plaintext header of an envelope, with its key version; nothing is decrypted
+        """
+        header, _, key_version, _ = EnvelopeEncryption._read_preamble(EnvelopeEncryption._reader(source))
+        return {**header, 'key_version': key_version}
+    
+    @staticmethod
+    def iter_open(source):
+        """
+        Decrypt an envelope chunk by chunk
+        
+        source is the envelope as bytes or a binary file object; only one
+        chunk is held in memory at a time.
+        """
+        read = EnvelopeEncryption._reader(source)
+        header, raw_header, key_version, wrapped_key = EnvelopeEncryption._read_preamble(read)
+        body = AESGCM(EnvelopeEncryption._unwrap(raw_header, key_version, wrapped_key))
+        nonce_prefix = base64.urlsafe_b64decode(header['nonce'])
+        
+        remaining = header['length']
+        chunk_count = EnvelopeEncryption._chunk_count(remaining, header['chunk_size'])
+        for index in range(chunk_count):
+            size = min(remaining, header['chunk_size']) + EnvelopeEncryption.TAG_SIZE
+            remaining -= size - EnvelopeEncryption.TAG_SIZE
+            ciphertext = read(size)
+            if len(ciphertext) != size:
+                raise ValueError("Envelope is truncated")
+            yield body.decrypt(
+                nonce_prefix + struct.pack('>I', index),
+                ciphertext,
+                raw_header + struct.pack('>I?', index, index == chunk_count - 1)
+            )
+    
+    @staticmethod
+    def open(source):
+        """
+        Decrypt a whole envelope
+        """
+        return b''.join(EnvelopeEncryption.iter_open(source))
+    
+    @staticmethod
+    def rewrap(envelope, key_version=None):
+        """
+        Re-wrap an envelope's data key under another key version, by default the current one
+        
+        Only the wrapped key changes; the encrypted body is copied as is.
+        """
+        target_version = key_version or DataEncryption._get_key_versions()[0]
+        read = EnvelopeEncryption._reader(envelope)
+        _, raw_header, current_version, wrapped_key = EnvelopeEncryption._read_preamble(read)
+        if current_version == target_version:
+            return envelope
+        
+        data_key = EnvelopeEncryption._unwrap(raw_header, current_version, wrapped_key)
+        preamble = EnvelopeEncryption._preamble(raw_header, target_version, data_key)
+        return preamble + memoryview(envelope)[len(preamble):].tobytes()
+    
+    @staticmethod
+    def is_envelope(data):
+        """
+        Whether bytes start like an envelope
+        """
+        return bytes(data[:len(EnvelopeEncryption.MAGIC)]) == EnvelopeEncryption.MAGIC
+    
+    @staticmethod
+    def _preamble(raw_header, key_version, data_key):
+        wrap_nonce = os.urandom(EnvelopeEncryption.NONCE_SIZE)
+        wrapped_key = wrap_nonce + AESGCM(DataEncryption._get_wrapping_key(key_version)).encrypt(
+            wrap_nonce, data_key, raw_header
+        )
+        return b''.join([
+            EnvelopeEncryption.MAGIC,
+            struct.pack('>I', len(raw_header)),
+            raw_header,
+            struct.pack('>I', key_version),
+            wrapped_key
+        ])
+    
+    @staticmethod
+    def _read_preamble(read):
+        magic = read(len(EnvelopeEncryption.MAGIC))
+        if magic != EnvelopeEncryption.MAGIC:
+            raise ValueError("Not an encryption envelope")
+        
+        (header_length,) = struct.unpack('>I', read(4))
+        raw_header = read(header_length)
+        (key_version,) = struct.unpack('>I', read(4))
+        wrapped_key = read(EnvelopeEncryption.WRAPPED_KEY_SIZE)
+        if len(raw_header) != header_length or len(wrapped_key) != EnvelopeEncryption.WRAPPED_KEY_SIZE:
+            raise ValueError("Envelope is truncated")
+        return json.loads(raw_header), raw_header, key_version, wrapped_key
+    
+    @staticmethod
+    def _unwrap(raw_header, key_version, wrapped_key):
+        nonce = wrapped_key[:EnvelopeEncryption.NONCE_SIZE]
+        return AESGCM(DataEncryption._get_wrapping_key(key_version)).decrypt(
+            nonce, wrapped_key[EnvelopeEncryption.NONCE_SIZE:], raw_header
+        )
+    
+    @staticmethod
+    def _chunk_count(length, chunk_size):
+        # An empty body is still one (empty) chunk, so truncation is detectable
+        return max(1, -(-length // chunk_size))
+    
+    @staticmethod
+    def _reader(source):
+        if isinstance(source, str):
+            return _Base64Reader(source).read
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return io.BytesIO(source).read
+        return source.read
+
+
+class _Base64Reader:
+    """
+    Read bytes from base64 text, decoding only as much as is read
+    """
+    
+    def __init__(self, text):
+        self.text = text
+        self.position = 0
+        self.buffer = b''
+    
+    def read(self, size):
+        while len(self.buffer) < size and self.position < len(self.text):
+            # Whole 4-character groups, so every slice decodes on its own
+            end = self.position + max(4, -(-(size - len(self.buffer)) // 3) * 4)
+            self.buffer += base64.urlsafe_b64decode(self.text[self.position:end])
+            self.position = end
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
 
 
 class TranscriptEncryption:
     """
     Specialized encryption for meeting transcripts
+    
+    Transcripts are stored as base64 text of an EnvelopeEncryption envelope.
+    Transcripts encrypted before envelopes existed (Fernet tokens wrapping a
+    JSON document) are still read.
     """
     
+    VERSION = '2.0'
+    
     @staticmethod
     def encrypt_transcript(transcript_text, meeting_id):
         """
@@ -152,15 +478,27 @@ class TranscriptEncryption:
         if not transcript_text:
             return None
         
-        # Add metadata for audit trail
-        transcript_data = {
-            'content': transcript_text,
-            'meeting_id': str(meeting_id),
-            'encrypted_at': DataEncryption._get_current_timestamp(),
-            'version': '1.0'
-        }
+        return TranscriptEncryption.encrypt_transcripts([(transcript_text, meeting_id)])[0]
+    
+    @staticmethod
+    def encrypt_transcripts(transcripts):
+        """
+        Encrypt a list of (transcript_text, meeting_id) pairs
+        """
+        encrypted_at = TranscriptEncryption._get_current_timestamp()
         
-        return DataEncryption.encrypt_json(transcript_data)
+        try:
+            # Add metadata for audit trail, readable without decrypting
+            return [
+                base64.urlsafe_b64encode(EnvelopeEncryption.seal(transcript_text.encode(), {
+                    'meeting_id': str(meeting_id),
+                    'encrypted_at': encrypted_at,
+                    'version': TranscriptEncryption.VERSION
+                })).decode() if transcript_text else None
+                for transcript_text, meeting_id in transcripts
+            ]
+        except Exception as e:
+            raise Exception(f"Encryption failed: {str(e)}")
     
     @staticmethod
     def decrypt_transcript(encrypted_transcript):
@@ -170,8 +508,42 @@ class TranscriptEncryption:
         if not encrypted_transcript:
             return None
         
-        transcript_data = DataEncryption.decrypt_json(encrypted_transcript)
-        return transcript_data.get('content') if transcript_data else None
+        return TranscriptEncryption.decrypt_transcripts([encrypted_transcript])[0]
+    
+    @staticmethod
+    def decrypt_transcripts(encrypted_transcripts):
+        """
+        Decrypt a list of meeting transcripts and return their content
+        """
+        return [
+            ''.join(TranscriptEncryption.iter_decrypt_transcript(encrypted_transcript))
+            if encrypted_transcript else None
+            for encrypted_transcript in encrypted_transcripts
+        ]
+    
+    @staticmethod
+    def iter_decrypt_transcript(encrypted_transcript):
+        """
+        Decrypt a meeting transcript piece by piece
+        
+        Accepts the stored base64 text, raw envelope bytes or a binary file
+        object holding the envelope, and yields the text one chunk at a time.
+        """
+        try:
+            if isinstance(encrypted_transcript, str) and not TranscriptEncryption._is_envelope_text(encrypted_transcript):
+                transcript_data = DataEncryption.decrypt_json(encrypted_transcript)
+                yield (transcript_data.get('content') or '') if transcript_data else ''
+                return
+            
+            # Chunks can end inside a multi-byte character
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            for chunk in EnvelopeEncryption.iter_open(encrypted_transcript):
+                text = decoder.decode(chunk)
+                if text:
+                    yield text
+            decoder.decode(b'', final=True)
+        except Exception as e:
+            raise Exception(f"Decryption failed: {str(e)}")
     
     @staticmethod
     def get_transcript_metadata(encrypted_transcript):
@@ -182,6 +554,17 @@ class TranscriptEncryption:
             return None
         
         try:
+            if TranscriptEncryption._is_envelope_text(encrypted_transcript):
+                header = EnvelopeEncryption.read_header(encrypted_transcript)
+                return {
+                    'meeting_id': header.get('meeting_id'),
+                    'encrypted_at': header.get('encrypted_at'),
+                    'version': header.get('version'),
+                    'key_version': header['key_version'],
+                    'length': header['length'],
+                    'has_content': header['length'] > 0
+                }
+            
             transcript_data = DataEncryption.decrypt_json(encrypted_transcript)
             if transcript_data:
                 return {
@@ -195,6 +578,13 @@ class TranscriptEncryption:
         
         return None
     
+    @staticmethod
+    def _is_envelope_text(encrypted_transcript):
+        try:
+            return EnvelopeEncryption.is_envelope(_Base64Reader(encrypted_transcript).read(len(EnvelopeEncryption.MAGIC)))
+        except Exception:
+            return False
+    
     @staticmethod
     def _get_current_timestamp():
         """Get current timestamp"""
@@ -220,15 +610,25 @@ class PIIEncryption:
         if not pii_data:
             return None
         
-        # Add PII-specific metadata
-        pii_container = {
-            'data': pii_data,
-            'type': 'pii',
-            'encrypted_at': TranscriptEncryption._get_current_timestamp(),
-            'retention_policy': 'gdpr_compliant'
-        }
+        return PIIEncryption.encrypt_pii_many([pii_data])[0]
+    
+    @staticmethod
+    def encrypt_pii_many(pii_items):
+        """
+        Encrypt a list of PII data
+        """
+        encrypted_at = TranscriptEncryption._get_current_timestamp()
         
-        return DataEncryption.encrypt_json(pii_container)
+        # Add PII-specific metadata
+        return DataEncryption.encrypt_json_many([
+            {
+                'data': pii_data,
+                'type': 'pii',
+                'encrypted_at': encrypted_at,
+                'retention_policy': 'gdpr_compliant'
+            } if pii_data else None
+            for pii_data in pii_items
+        ])
     
     @staticmethod
     def decrypt_pii_data(encrypted_pii):
@@ -238,17 +638,32 @@ class PIIEncryption:
         if not encrypted_pii:
             return None
         
-        try:
-            pii_container = DataEncryption.decrypt_json(encrypted_pii)
+        return PIIEncryption.decrypt_pii_many([encrypted_pii])[0]
+    
+    @staticmethod
+    def decrypt_pii_many(encrypted_items):
+        """
+        Decrypt a list of PII data with audit logging
+        
+        A record that cannot be decrypted is logged and comes back as None
+        without affecting the others.
+        """
+        decrypted = []
+        for encrypted_pii in encrypted_items:
+            try:
+                pii_container = DataEncryption.decrypt_json(encrypted_pii)
+            except Exception as e:
+                # Log decryption failure
+                PIIEncryption._log_pii_access_failure(str(e))
+                decrypted.append(None)
+                continue
             
             # Log PII access (in production, send to audit system)
-            PIIEncryption._log_pii_access(pii_container)
-            
-            return pii_container.get('data') if pii_container else None
-        except Exception as e:
-            # Log decryption failure
-            PIIEncryption._log_pii_access_failure(str(e))
-            return None
+            if pii_container:
+                PIIEncryption._log_pii_access(pii_container)
+            decrypted.append(pii_container.get('data') if pii_container else None)
+        
+        return decrypted
     
     @staticmethod
     def _log_pii_access(pii_container):
@@ -316,16 +731,43 @@ class EncryptionKeyManager:
         return Fernet.generate_key()
     
     @staticmethod
-    def rotate_encryption_key():
+    def rotate_encryption_key(encrypted_transcripts):
+        """
+        Move encrypted transcripts to the current key version
+        
+        Envelopes only have their data key re-wrapped, whatever the size of
+        the transcript. Transcripts from before envelopes are decrypted and
+        sealed into an envelope once. Returns the new values in order; the
+        previous secret can be retired once every stored value is rotated.
+        """
+        rotated = []
+        for encrypted_transcript in encrypted_transcripts:
+            if not encrypted_transcript:
+                rotated.append(encrypted_transcript)
+            elif TranscriptEncryption._is_envelope_text(encrypted_transcript):
+                rotated.append(EncryptionKeyManager.rotate_stored_value(encrypted_transcript))
+            else:
+                transcript_data = DataEncryption.decrypt_json(encrypted_transcript)
+                rotated.append(TranscriptEncryption.encrypt_transcript(
+                    transcript_data.get('content'), transcript_data.get('meeting_id')
+                ))
+        return rotated
+    
+    @staticmethod
+    def rotate_stored_value(encrypted_value):
         """
-        Rotate encryption keys (for production use)
+        Move one stored encrypted value to the current key, keeping its format
+        
+        Envelopes have their data key re-wrapped; Fernet values are
+        re-encrypted. Either way existing readers still decrypt the result.
         """
-        # This would implement key rotation logic
-        # 1. Generate new key
-        # 2. Re-encrypt data with new key
-        # 3. Update key in secure storage
-        # 4. Remove old key after grace period
-        pass
+        if not encrypted_value:
+            return encrypted_value
+        
+        if TranscriptEncryption._is_envelope_text(encrypted_value):
+            envelope = base64.urlsafe_b64decode(encrypted_value)
+            return base64.urlsafe_b64encode(EnvelopeEncryption.rewrap(envelope)).decode()
+        return DataEncryption.rotate_many([encrypted_value])[0]
     
     @staticmethod
     def backup_encryption_key():
@@ -356,44 +798,21 @@ class DataAnonymization:
     """
     
     @staticmethod
-    def anonymize_transcript(transcript_text):
+    def anonymize_transcript(transcript_text, return_spans=False):
         """
         Anonymize transcript by removing/replacing PII
-        """
-        import re
-        
-        if not transcript_text:
-            return transcript_text
-        
-        # Replace email addresses
-        transcript_text = re.sub(
-            r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            '[EMAIL_REDACTED]',
-            transcript_text
-        )
         
-        # Replace phone numbers
-        transcript_text = re.sub(
-            r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',
-            '[PHONE_REDACTED]',
-            transcript_text
-        )
-        
-        # Replace potential SSNs
-        transcript_text = re.sub(
-            r'\b\d{3}-\d{2}-\d{4}\b',
-            '[SSN_REDACTED]',
-            transcript_text
-        )
-        
-        # Replace credit card numbers
-        transcript_text = re.sub(
-            r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b',
-            '[CARD_REDACTED]',
-            transcript_text
-        )
-        
-        return transcript_text
+        With return_spans, also returns where each value was found in the
+        original text.
+        """
+        return default_engine.redact(transcript_text, return_spans=return_spans)
+    
+    @staticmethod
+    def anonymize_transcript_stream(chunks, spans=None):
+        """
+        Anonymize a transcript arriving in chunks, yielding redacted text
+        """
+        return default_engine.redact_stream(chunks, spans)
     
     @staticmethod
     def pseudonymize_user_data(user_data):
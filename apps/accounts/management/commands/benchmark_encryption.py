@@ -0,0 +1,79 @@
+"""
+Management command to benchmark transcript encryption throughput
+"""
+import base64
+import random
+import time
+from cryptography.fernet import Fernet
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.accounts.encryption import DataEncryption, TranscriptEncryption
+
+
+class Command(BaseCommand):
+    help = 'Benchmark encryption ops/sec with a per-call key derivation, the cached key, and the batch API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--records',
+            type=int,
+            default=500,
+            help='Transcripts to encrypt and decrypt with the cached key (default: 500)'
+        )
+
+        parser.add_argument(
+            '--uncached-records',
+            type=int,
+            default=20,
+            help='Transcripts to run with a key derivation per call, 0 to skip (default: 20)'
+        )
+
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=4000,
+            help='Characters per transcript (default: 4000)'
+        )
+
+    def handle(self, *args, **options):
+        random.seed(42)
+        words = ['pricing', 'renewal', 'integration', 'timeline', 'budget', 'the', 'we', 'and', 'next', 'step']
+        transcripts = [
+            (' '.join(random.choice(words) for _ in range(options['size'] // 6))[:options['size']], meeting_id)
+            for meeting_id in range(options['records'])
+        ]
+
+        if options['uncached_records']:
+            sample = [text for text, _ in transcripts[:options['uncached_records']]]
+            encrypted = self._time('uncached encrypt', sample, lambda: [self._uncached_encrypt(text) for text in sample])
+            self._time('uncached decrypt', sample, lambda: [self._uncached_decrypt(token) for token in encrypted])
+
+        texts = [text for text, _ in transcripts]
+        encrypted = self._time('cached encrypt_text', texts, lambda: [DataEncryption.encrypt_text(text) for text in texts])
+        self._time('cached decrypt_text', texts, lambda: [DataEncryption.decrypt_text(token) for token in encrypted])
+
+        encrypted = self._time('encrypt_transcripts', texts, lambda: TranscriptEncryption.encrypt_transcripts(transcripts))
+        decrypted = self._time('decrypt_transcripts', texts, lambda: TranscriptEncryption.decrypt_transcripts(encrypted))
+
+        if decrypted != texts:
+            self.stdout.write(self.style.ERROR('Round trip mismatch'))
+
+    def _uncached_encrypt(self, plaintext):
+        """Encrypt the way every call did before keys were cached"""
+        f = Fernet(self._uncached_key())
+        return base64.urlsafe_b64encode(f.encrypt(plaintext.encode())).decode()
+
+    def _uncached_decrypt(self, encrypted_text):
+        f = Fernet(self._uncached_key())
+        return f.decrypt(base64.urlsafe_b64decode(encrypted_text.encode())).decode()
+
+    def _uncached_key(self):
+        secret_key = getattr(settings, 'DATA_ENCRYPTION_KEY', settings.SECRET_KEY)
+        return DataEncryption._derive_key.__wrapped__(secret_key)
+
+    def _time(self, label, items, run):
+        start = time.perf_counter()
+        result = run()
+        seconds = time.perf_counter() - start
+        self.stdout.write(f'{label:<22} n={len(items):<5} {len(items) / seconds:12.1f} ops/sec')
+        return result
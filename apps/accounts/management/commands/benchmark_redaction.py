@@ -0,0 +1,91 @@
+"""
+Management command to benchmark PII redaction throughput on large transcripts
+"""
+import random
+import re
+import time
+from django.core.management.base import BaseCommand
+from apps.accounts.redaction import RedactionEngine
+
+WORDS = ['we', 'can', 'move', 'the', 'renewal', 'to', 'next', 'quarter', 'pricing', 'integration', 'team', 'call']
+PII = ['jane.doe@example.com', '555-123-4567', '123-45-6789', '4111 1111 1111 1111', '555.987.6543']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark single-pass PII redaction against sequential re.sub passes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size-mb',
+            type=float,
+            default=1.0,
+            help='Transcript size in megabytes (default: 1)'
+        )
+
+        parser.add_argument(
+            '--pii-rate',
+            type=float,
+            default=0.01,
+            help='Share of tokens that are PII (default: 0.01)'
+        )
+
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Runs per method; the best is reported (default: 5)'
+        )
+
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=64 * 1024,
+            help='Characters per chunk for streamed redaction (default: 65536)'
+        )
+
+    def handle(self, *args, **options):
+        random.seed(42)
+        transcript = self._generate(int(options['size_mb'] * 1024 * 1024), options['pii_rate'])
+        engine = RedactionEngine()
+        chunk_size = options['chunk_size']
+
+        methods = [
+            ('sequential re.sub', lambda: self._sequential(transcript)),
+            ('single pass', lambda: engine.redact(transcript)),
+            ('single pass + spans', lambda: engine.redact(transcript, return_spans=True)[0]),
+            ('streamed', lambda: ''.join(engine.redact_stream(
+                transcript[start:start + chunk_size] for start in range(0, len(transcript), chunk_size)
+            ))),
+        ]
+
+        size_mb = len(transcript) / 1024 / 1024
+        self.stdout.write(f'Transcript: {size_mb:.2f} MB, {options["pii_rate"]:.1%} PII tokens')
+        results = {}
+        for label, run in methods:
+            seconds = min(self._time(run) for _ in range(options['repeat']))
+            results[label] = run()
+            self.stdout.write(f'{label:<22} {seconds * 1000:9.1f} ms  {size_mb / seconds:8.1f} MB/s')
+
+        if len({results[label] for label in results if label != 'sequential re.sub'}) != 1:
+            self.stdout.write(self.style.ERROR('Single-pass methods disagree'))
+
+    def _generate(self, size, pii_rate):
+        tokens = []
+        length = 0
+        while length < size:
+            token = random.choice(PII) if random.random() < pii_rate else random.choice(WORDS)
+            tokens.append(token)
+            length += len(token) + 1
+        return ' '.join(tokens)[:size]
+
+    def _sequential(self, text):
+        """Redaction as it was done before, one pass per pattern compiled on each call"""
+        text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL_REDACTED]', text)
+        text = re.sub(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', '[PHONE_REDACTED]', text)
+        text = re.sub(r'\b\d{3}-\d{2}-\d{4}\b', '[SSN_REDACTED]', text)
+        return re.sub(r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b', '[CARD_REDACTED]', text)
+
+    def _time(self, run):
+        start = time.perf_counter()
+        run()
+        return time.perf_counter() - start
@@ -0,0 +1,132 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('accounts', '0002_twofactorauth_loginattempt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrivacySettings',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('allow_ai_analysis', models.BooleanField(default=True)),
+                ('allow_transcript_storage', models.BooleanField(default=True)),
+                ('allow_analytics_processing', models.BooleanField(default=True)),
+                ('allow_third_party_integrations', models.BooleanField(default=True)),
+                ('share_anonymized_data', models.BooleanField(default=False)),
+                ('share_with_team_members', models.BooleanField(default=True)),
+                ('share_with_managers', models.BooleanField(default=True)),
+                ('auto_delete_transcripts', models.BooleanField(default=False)),
+                ('transcript_retention_days', models.IntegerField(default=2555, help_text='Days to keep transcripts')),
+                ('privacy_policy_updates', models.BooleanField(default=True)),
+                ('data_breach_notifications', models.BooleanField(default=True)),
+                ('consent_renewal_reminders', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='privacy_settings', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'privacy_settings',
+            },
+        ),
+        migrations.CreateModel(
+            name='EncryptedDataField',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('field_type', models.CharField(choices=[('transcript', 'Meeting Transcript'), ('pii', 'Personally Identifiable Information'), ('financial', 'Financial Information'), ('health', 'Health Information'), ('biometric', 'Biometric Data'), ('other', 'Other Sensitive Data')], max_length=20)),
+                ('sensitivity_level', models.IntegerField(default=1, help_text='1=Low, 2=Medium, 3=High, 4=Critical')),
+                ('encrypted_data', models.TextField()),
+                ('data_hash', models.CharField(blank=True, help_text='Hash for searching', max_length=64, null=True)),
+                ('encryption_algorithm', models.CharField(default='Fernet', max_length=50)),
+                ('key_version', models.CharField(default='1.0', max_length=10)),
+                ('encrypted_at', models.DateTimeField(auto_now_add=True)),
+                ('access_level', models.CharField(default='owner_only', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_accessed', models.DateTimeField(blank=True, null=True)),
+                ('access_count', models.IntegerField(default=0)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='encrypted_data', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'encrypted_data_fields',
+                'indexes': [models.Index(fields=['owner', 'field_type'], name='encrypted_d_owner_i_193cd5_idx'), models.Index(fields=['sensitivity_level'], name='encrypted_d_sensiti_7a025f_idx'), models.Index(fields=['data_hash'], name='encrypted_d_data_ha_aa5bc0_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DataRetentionPolicy',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('data_type', models.CharField(choices=[('meeting_transcripts', 'Meeting Transcripts'), ('call_recordings', 'Call Recordings'), ('user_profiles', 'User Profiles'), ('login_attempts', 'Login Attempts'), ('activity_logs', 'Activity Logs'), ('consent_records', 'Consent Records'), ('crm_sync_data', 'CRM Sync Data')], max_length=50, unique=True)),
+                ('retention_period_days', models.IntegerField(help_text='Number of days to retain data')),
+                ('auto_delete_enabled', models.BooleanField(default=True)),
+                ('archive_before_delete', models.BooleanField(default=True)),
+                ('require_user_consent', models.BooleanField(default=False)),
+                ('legal_basis', models.CharField(blank=True, max_length=200, null=True)),
+                ('regulatory_requirement', models.CharField(blank=True, max_length=200, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'data_retention_policies',
+                'indexes': [models.Index(fields=['data_type'], name='data_retent_data_ty_de1780_idx'), models.Index(fields=['auto_delete_enabled'], name='data_retent_auto_de_178ad3_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DataDeletionRequest',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('request_type', models.CharField(choices=[('user_initiated', 'User Initiated'), ('admin_initiated', 'Admin Initiated'), ('automated', 'Automated Retention Policy'), ('legal_request', 'Legal Request')], max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('completed', 'Completed'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='pending', max_length=20)),
+                ('data_types', models.JSONField(default=list, help_text='List of data types to delete')),
+                ('include_backups', models.BooleanField(default=True)),
+                ('include_logs', models.BooleanField(default=False)),
+                ('requested_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('deleted_records_count', models.JSONField(default=dict, help_text='Count of deleted records by type')),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('legal_basis', models.CharField(blank=True, max_length=200, null=True)),
+                ('retention_override', models.BooleanField(default=False, help_text='Override retention policies')),
+                ('processed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='processed_deletions', to=settings.AUTH_USER_MODEL)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='initiated_deletions', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deletion_requests', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'data_deletion_requests',
+                'indexes': [models.Index(fields=['user', 'status'], name='data_deleti_user_id_6b99b1_idx'), models.Index(fields=['request_type', 'status'], name='data_deleti_request_d7d004_idx'), models.Index(fields=['requested_at'], name='data_deleti_request_1675bc_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ConsentRecord',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('consent_type', models.CharField(choices=[('call_recording', 'Call Recording'), ('transcription', 'Transcription Processing'), ('ai_analysis', 'AI Analysis'), ('data_storage', 'Data Storage'), ('analytics', 'Analytics Processing'), ('marketing', 'Marketing Communications'), ('third_party_sharing', 'Third Party Data Sharing')], max_length=50)),
+                ('status', models.CharField(choices=[('granted', 'Granted'), ('denied', 'Denied'), ('withdrawn', 'Withdrawn'), ('expired', 'Expired')], default='granted', max_length=20)),
+                ('legal_basis', models.CharField(blank=True, max_length=100, null=True)),
+                ('purpose', models.TextField(help_text='Purpose for which consent is granted')),
+                ('granted_at', models.DateTimeField(auto_now_add=True)),
+                ('withdrawn_at', models.DateTimeField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('user_agent', models.TextField(blank=True, null=True)),
+                ('consent_method', models.CharField(default='web_form', max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='consent_records', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'consent_records',
+                'indexes': [models.Index(fields=['user', 'consent_type'], name='consent_rec_user_id_5843c5_idx'), models.Index(fields=['status', 'expires_at'], name='consent_rec_status_a7c3d9_idx')],
+                'unique_together': {('user', 'consent_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:13
+
+from django.db import migrations, models
+
+
+def normalize_key_versions(apps, schema_editor):
+    """Rewrite versions such as '1.0' as '1', the form rotate_encryption_keys compares against"""
+    EncryptedDataField = apps.get_model('accounts', 'EncryptedDataField')
+    for version in EncryptedDataField.objects.values_list('key_version', flat=True).distinct():
+        try:
+            canonical = str(int(float(version)))
+        except (TypeError, ValueError):
+            continue
+        if canonical != version:
+            EncryptedDataField.objects.filter(key_version=version).update(key_version=canonical)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_privacysettings_encrypteddatafield_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='encrypteddatafield',
+            name='key_version',
+            field=models.CharField(default='1', max_length=10),
+        ),
+        migrations.RunPython(normalize_key_versions, migrations.RunPython.noop),
+    ]
@@ -647,7 +647,7 @@ class EncryptedDataField(models.Model):
     
     # Encryption Metadata
     encryption_algorithm = models.CharField(max_length=50, default='Fernet')
-    key_version = models.CharField(max_length=10, default='1.0')
+    key_version = models.CharField(max_length=10, default='1')
     encrypted_at = models.DateTimeField(auto_now_add=True)
     
     # Access Control
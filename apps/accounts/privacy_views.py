@@ -321,7 +321,7 @@ class DataExportView(APIView):
         for activity in recent_activities:
             data['activity_logs'].append({
                 'activity_type': activity.activity_type,
-                'description': activity.description,
+                'description': activity.description if not anonymize else DataAnonymization.anonymize_transcript(activity.description),
                 'created_at': activity.created_at.isoformat(),
                 'ip_address': activity.ip_address if not anonymize else '***'
             })
@@ -1,9 +1,14 @@
 """
 Privacy and GDPR compliance tests
 """
+import base64
+import io
 import json
 from datetime import datetime, timedelta
-from django.test import TestCase
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils import timezone
@@ -14,7 +19,11 @@ from .models import (
     UserProfile, ConsentRecord, PrivacySettings, DataRetentionPolicy,
     DataDeletionRequest, EncryptedDataField
 )
-from .encryption import DataEncryption, PIIEncryption, TranscriptEncryption
+from .encryption import (
+    DataEncryption, PIIEncryption, TranscriptEncryption, EnvelopeEncryption, EncryptionKeyManager,
+    DataAnonymization
+)
+from .redaction import PIIDetector, RedactionEngine, DEFAULT_DETECTORS
 
 
 class ConsentManagementTest(APITestCase):
@@ -401,8 +410,165 @@ class DataEncryptionTest(TestCase):
         masked_phone = PIIEncryption.mask_pii_for_display('555-123-4567', 'phone')
         self.assertIn('***', masked_phone)
         self.assertTrue(masked_phone.endswith('4567'))
+    
+    def test_key_derived_once(self):
+        """Test the slow key derivation runs once, not on every call"""
+        DataEncryption._derive_key.cache_clear()
+        
+        encrypted = DataEncryption.encrypt_many(['first', 'second'])
+        DataEncryption.decrypt_text(encrypted[0])
+        DataEncryption.encrypt_text('third')
+        
+        self.assertEqual(DataEncryption._derive_key.cache_info().misses, 1)
+    
+    def test_batch_encryption_round_trip(self):
+        """Test batch APIs keep order and pass empty values through as None"""
+        encrypted = TranscriptEncryption.encrypt_transcripts([('First call', 1), ('', 2), ('Second call', 3)])
+        self.assertIsNone(encrypted[1])
+        
+        self.assertEqual(TranscriptEncryption.decrypt_transcripts(encrypted), ['First call', None, 'Second call'])
+        self.assertEqual(TranscriptEncryption.decrypt_transcript(encrypted[2]), 'Second call')
+    
+    def test_previous_key_still_decrypts(self):
+        """Test data encrypted under a previous key stays readable after the key changes"""
+        with override_settings(DATA_ENCRYPTION_KEY='old-secret'):
+            encrypted = DataEncryption.encrypt_text('Sensitive')
+        
+        with override_settings(DATA_ENCRYPTION_KEY='new-secret', DATA_ENCRYPTION_PREVIOUS_KEYS=['old-secret']):
+            self.assertEqual(DataEncryption.decrypt_text(encrypted), 'Sensitive')
+        
+        with override_settings(DATA_ENCRYPTION_KEY='new-secret'):
+            with self.assertRaises(Exception):
+                DataEncryption.decrypt_text(encrypted)
+    
+    def test_pii_batch_isolates_bad_records(self):
+        """Test one undecryptable record does not hide the others"""
+        encrypted = PIIEncryption.encrypt_pii_many([{'email': 'a@example.com'}, {'email': 'b@example.com'}])
+        
+        decrypted = PIIEncryption.decrypt_pii_many([encrypted[0], 'not-a-token', encrypted[1]])
+        
+        self.assertEqual(decrypted, [{'email': 'a@example.com'}, None, {'email': 'b@example.com'}])
+    
+    def test_transcript_metadata_without_decrypting(self):
+        """Test transcript metadata is read from the plaintext envelope header"""
+        encrypted = TranscriptEncryption.encrypt_transcript('Quarterly pricing review', 'meeting-7')
+        
+        with patch.object(EnvelopeEncryption, '_unwrap', side_effect=AssertionError('decrypted')):
+            metadata = TranscriptEncryption.get_transcript_metadata(encrypted)
+        
+        self.assertEqual(metadata['meeting_id'], 'meeting-7')
+        self.assertEqual(metadata['version'], TranscriptEncryption.VERSION)
+        self.assertEqual(metadata['key_version'], 1)
+        self.assertEqual(metadata['length'], len('Quarterly pricing review'))
+    
+    def test_envelope_streams_chunks_and_detects_tampering(self):
+        """Test envelopes decrypt chunk by chunk and reject edited or truncated data"""
+        plaintext = 'Überblick über die Preise. '.encode() * 100
+        envelope = EnvelopeEncryption.seal(plaintext, {'meeting_id': '1'}, chunk_size=64)
+        
+        chunks = list(EnvelopeEncryption.iter_open(io.BytesIO(envelope)))
+        self.assertEqual(len(chunks), -(-len(plaintext) // 64))
+        self.assertEqual(b''.join(chunks), plaintext)
+        
+        streamed = ''.join(TranscriptEncryption.iter_decrypt_transcript(envelope))
+        self.assertEqual(streamed, plaintext.decode())
+        
+        tampered = bytearray(envelope)
+        tampered[-100] ^= 1
+        with self.assertRaises(Exception):
+            EnvelopeEncryption.open(bytes(tampered))
+        with self.assertRaises(ValueError):
+            EnvelopeEncryption.open(envelope[:-64])
+    
+    def test_rotation_rewraps_key_without_reencrypting(self):
+        """Test rotation moves transcripts to the new key version and leaves the body untouched"""
+        encrypted = TranscriptEncryption.encrypt_transcript('Renewal discussion ' * 1000, 'meeting-1')
+        legacy = DataEncryption.encrypt_json({'content': 'Old transcript', 'meeting_id': 'meeting-2'})
+        
+        with override_settings(
+            DATA_ENCRYPTION_KEY='rotated-secret', DATA_ENCRYPTION_KEY_VERSION=2,
+            DATA_ENCRYPTION_PREVIOUS_KEYS=[DataEncryption._get_key_versions()[1][1]]
+        ):
+            rotated, migrated = EncryptionKeyManager.rotate_encryption_key([encrypted, legacy])
+        
+        original_envelope = base64.urlsafe_b64decode(encrypted)
+        rotated_envelope = base64.urlsafe_b64decode(rotated)
+        self.assertEqual(len(rotated_envelope), len(original_envelope))
+        self.assertEqual(rotated_envelope[-1000:], original_envelope[-1000:])
+        
+        with override_settings(DATA_ENCRYPTION_KEY='rotated-secret', DATA_ENCRYPTION_KEY_VERSION=2):
+            self.assertEqual(TranscriptEncryption.get_transcript_metadata(rotated)['key_version'], 2)
+            self.assertEqual(TranscriptEncryption.decrypt_transcript(rotated), 'Renewal discussion ' * 1000)
+            self.assertEqual(TranscriptEncryption.decrypt_transcript(migrated), 'Old transcript')
+
 
 
+class KeyRotationCommandTest(TestCase):
+    """
+    Test re-encrypting stored data under a new key version
+    """
+    
+    OLD_KEY = override_settings(DATA_ENCRYPTION_KEY='old-secret', DATA_ENCRYPTION_KEY_VERSION=1)
+    NEW_KEY = override_settings(
+        DATA_ENCRYPTION_KEY='new-secret', DATA_ENCRYPTION_KEY_VERSION=2,
+        DATA_ENCRYPTION_PREVIOUS_KEYS=['old-secret']
+    )
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner', email='owner@example.com', password='TestPassword123!')
+        with self.OLD_KEY:
+            self.transcript = self._field('transcript', TranscriptEncryption.encrypt_transcript('Pricing call', 'm1'))
+            self.pii = self._field('pii', PIIEncryption.encrypt_pii_data({'email': 'lead@example.com'}))
+        self.corrupt = self._field('other', 'not-encrypted')
+    
+    def _field(self, field_type, encrypted_data):
+        return EncryptedDataField.objects.create(
+            owner=self.user, field_type=field_type, encrypted_data=encrypted_data, key_version='1'
+        )
+    
+    def test_rotates_rows_in_batches(self):
+        """Test every readable row moves to the new key and bad rows are left as they were"""
+        output = StringIO()
+        with self.NEW_KEY:
+            call_command('rotate_encryption_keys', '--workers', '1', '--batch-size', '2', stdout=output)
+        
+        self.assertIn('Rotated 2 rows to key version 2, 1 failed', output.getvalue())
+        for field in (self.transcript, self.pii, self.corrupt):
+            field.refresh_from_db()
+        self.assertEqual(self.transcript.key_version, '2')
+        self.assertEqual(self.pii.key_version, '2')
+        self.assertEqual(self.corrupt.key_version, '1')
+        self.assertEqual(self.corrupt.encrypted_data, 'not-encrypted')
+        
+        # Readable with the new key alone, so the old secret can be retired
+        with override_settings(DATA_ENCRYPTION_KEY='new-secret', DATA_ENCRYPTION_KEY_VERSION=2):
+            self.assertEqual(TranscriptEncryption.decrypt_transcript(self.transcript.encrypted_data), 'Pricing call')
+            self.assertEqual(PIIEncryption.decrypt_pii_data(self.pii.encrypted_data), {'email': 'lead@example.com'})
+    
+    def test_rerun_resumes_with_unrotated_rows(self):
+        """Test a second run only picks up rows that are not on the current key yet"""
+        with self.NEW_KEY:
+            call_command('rotate_encryption_keys', '--workers', '1', '--field-type', 'transcript', stdout=StringIO())
+            output = StringIO()
+            call_command('rotate_encryption_keys', '--dry-run', stdout=output)
+        
+        self.assertIn('2 rows to rotate to key version 2', output.getvalue())
+    
+    def test_default_version_counts_as_current(self):
+        """Test rows with the model's default version are not rotated again on the first run"""
+        default = EncryptedDataField.objects.create(
+            owner=self.user, field_type='other', encrypted_data='not-encrypted'
+        )
+        legacy = self._field('other', 'not-encrypted')
+        EncryptedDataField.objects.filter(pk=legacy.pk).update(key_version='1.0')
+        
+        output = StringIO()
+        with self.OLD_KEY:
+            call_command('rotate_encryption_keys', '--dry-run', stdout=output)
+        
+        self.assertEqual(default.key_version, '1')
+        self.assertIn('0 rows to rotate to key version 1', output.getvalue())
+
 class DataRetentionTest(TestCase):
     """
     Test data retention policies
@@ -532,4 +698,49 @@ class ComplianceTest(TestCase):
         pseudonymized = DataAnonymization.pseudonymize_user_data(user_data)
         
         self.assertTrue(pseudonymized['anonymized'])
-        self.assertIn('user_', pseudonymized['user_id'])
\ No newline at end of file
+        self.assertIn('user_', pseudonymized['user_id'])
+
+
+class RedactionEngineTest(TestCase):
+    """
+    Test single-pass PII redaction
+    """
+    
+    TRANSCRIPT = (
+        "Email jane.doe@example.com, call 555-123-4567, SSN 123-45-6789, "
+        "card 4111 1111 1111 1111, order 1234 5678 9012 3456."
+    )
+    
+    def test_redacts_every_type_in_one_pass(self):
+        """Test every PII type is redacted and card numbers failing Luhn are kept"""
+        redacted, spans = DataAnonymization.anonymize_transcript(self.TRANSCRIPT, return_spans=True)
+        
+        self.assertEqual(redacted, (
+            "Email [EMAIL_REDACTED], call [PHONE_REDACTED], SSN [SSN_REDACTED], "
+            "card [CARD_REDACTED], order 1234 5678 9012 3456."
+        ))
+        self.assertEqual([span.detector for span in spans], ['email', 'phone', 'ssn', 'credit_card'])
+        self.assertEqual(self.TRANSCRIPT[spans[0].start:spans[0].end], 'jane.doe@example.com')
+    
+    def test_stream_matches_whole_text(self):
+        """Test PII split across chunk boundaries is still redacted, with spans in whole-text positions"""
+        transcript = ('Filler words before the details. ' * 20 + self.TRANSCRIPT) * 5
+        expected, expected_spans = DataAnonymization.anonymize_transcript(transcript, return_spans=True)
+        
+        for chunk_size in (1, 13, 300):
+            spans = []
+            chunks = (transcript[start:start + chunk_size] for start in range(0, len(transcript), chunk_size))
+            
+            self.assertEqual(''.join(DataAnonymization.anonymize_transcript_stream(chunks, spans)), expected)
+            self.assertEqual(spans, expected_spans)
+    
+    def test_pluggable_detectors(self):
+        """Test custom detectors join the same pass"""
+        engine = RedactionEngine(DEFAULT_DETECTORS + [
+            PIIDetector('employee_id', r'\bEMP-\d{6}\b', '[EMPLOYEE_REDACTED]')
+        ])
+        
+        self.assertEqual(
+            engine.redact('EMP-004211 wrote to jane@example.com'),
+            '[EMPLOYEE_REDACTED] wrote to [EMAIL_REDACTED]'
+        )
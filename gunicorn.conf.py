@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration
+
+With PROMETHEUS_MULTIPROC_DIR set, workers share Prometheus samples through
+files in that directory; it is emptied on start and each exited worker's
+live gauges are dropped.
+"""
+import glob
+import os
+
+
+def on_starting(server):
+    multiproc_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(multiproc_dir, '*.db')):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    from performance_monitoring.prometheus_metrics import mark_process_dead
+    mark_process_dead(worker.pid)
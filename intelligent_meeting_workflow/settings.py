@@ -58,6 +58,7 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'performance_monitoring.middleware.PrometheusMetricsMiddleware',  # first, so it times the whole stack
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -214,6 +215,17 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_IMPORTS = ['meetings.crm_outbox', 'performance_monitoring.downsampling']  # Tasks living outside a tasks module
+CELERY_BEAT_SCHEDULE = {
+    'drain-crm-sync-outbox': {
+        'task': 'meetings.crm_outbox.drain_crm_outbox',
+        'schedule': 60.0,  # Dispatch retries and entries whose worker died
+    },
+    'downsample-performance-metrics': {
+        'task': 'performance_monitoring.downsampling.downsample_performance_metrics',
+        'schedule': 60.0,  # Roll raw metrics into minute, hour and day buckets and prune expired data
+    },
+}
 
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
@@ -290,11 +302,36 @@ LOG_RETENTION_DAYS = config('LOG_RETENTION_DAYS', default=90, cast=int)
 GEMINI_API_KEY = config('GEMINI_API_KEY', default='')
 GEMINI_MODEL = config('GEMINI_MODEL', default='gemini-pro')
 
+# Transcription Sharding
+TRANSCRIPTION_SHARDS = config('TRANSCRIPTION_SHARDS', default=0, cast=int)  # worker processes sessions are hashed onto; 0 transcribes in-process
+TRANSCRIPTION_ENGINE = config('TRANSCRIPTION_ENGINE', default='mock')  # engine used by the shard workers
+
 # Creatio CRM Configuration
 CREATIO_API_URL = config('CREATIO_API_URL', default='')
 CREATIO_USERNAME = config('CREATIO_USERNAME', default='')
 CREATIO_PASSWORD = config('CREATIO_PASSWORD', default='')
 
+# CRM API Rate Limiting
+CRM_RATE_LIMITER_SHARED = config('CRM_RATE_LIMITER_SHARED', default=True, cast=bool)  # one budget per CRM org across processes
+
+# CRM Sync Outbox
+CRM_OUTBOX_MAX_CONCURRENCY = config('CRM_OUTBOX_MAX_CONCURRENCY', default=4, cast=int)  # workers syncing to one CRM at a time
+CRM_OUTBOX_MAX_ATTEMPTS = config('CRM_OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+
+# Performance Metric Ingestion
+PERFORMANCE_METRICS_BUFFERED = config('PERFORMANCE_METRICS_BUFFERED', default='test' not in sys.argv, cast=bool)  # queue metrics and bulk insert them in the background
+PERFORMANCE_METRICS_FLUSH_SIZE = config('PERFORMANCE_METRICS_FLUSH_SIZE', default=500, cast=int)  # queued metrics that trigger a flush
+PERFORMANCE_METRICS_FLUSH_INTERVAL = config('PERFORMANCE_METRICS_FLUSH_INTERVAL', default=5.0, cast=float)  # seconds
+PERFORMANCE_METRICS_BUFFER_CAPACITY = config('PERFORMANCE_METRICS_BUFFER_CAPACITY', default=10000, cast=int)  # oldest dropped beyond this
+PERFORMANCE_THRESHOLD_CACHE_TTL = config('PERFORMANCE_THRESHOLD_CACHE_TTL', default=60, cast=int)  # seconds
+PERFORMANCE_METRICS_RAW_RETENTION_DAYS = config('PERFORMANCE_METRICS_RAW_RETENTION_DAYS', default=7, cast=int)  # raw samples kept once downsampled
+PROMETHEUS_METRICS_TOKEN = config('PROMETHEUS_METRICS_TOKEN', default='')  # bearer token required by /metrics when set
+
+# Lead Matching Configuration
+LEAD_SNAPSHOT_MAX_AGE = config('LEAD_SNAPSHOT_MAX_AGE', default=30, cast=int)  # seconds
+LEAD_MATCHING_WORKERS = config('LEAD_MATCHING_WORKERS', default=1, cast=int)  # bulk matching processes
+LEAD_SYNC_BATCH_SIZE = config('LEAD_SYNC_BATCH_SIZE', default=1000, cast=int)  # leads per streamed sync commit
+
 # Logging Configuration
 LOGGING = {
     'version': 1,
@@ -16,6 +16,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from performance_monitoring.views import metrics_view
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -29,4 +30,5 @@ urlpatterns = [
     path('api/leads/', include('leads.urls')),
     path('api/meetings/', include('meetings.urls')),
     path('api/ai/', include('ai_assistant.urls')),
+    path('metrics', metrics_view, name='prometheus-metrics'),
 ]
\ No newline at end of file
@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class LeadsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'leads'
\ No newline at end of file
+    name = 'leads'
+    
+    def ready(self):
+        """Connect lead snapshot invalidation signals"""
+        from . import signals
@@ -0,0 +1,148 @@
+"""
+Management command to benchmark meeting-to-lead matching latency
+"""
+import gc
+import random
+import time
+import psutil
+from django.core.management.base import BaseCommand
+from faker import Faker
+from leads.services import LeadMatchingService
+
+
+class Command(BaseCommand):
+    help = 'Benchmark indexed lead matching against a linear scan on synthetic leads'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[10000, 100000, 1000000],
+            help='Lead counts to benchmark (default: 10000 100000 1000000)'
+        )
+        
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=200,
+            help='Meetings to match with the index per size (default: 200)'
+        )
+        
+        parser.add_argument(
+            '--linear-queries',
+            type=int,
+            default=10,
+            help='Meetings to match with the linear scan per size, 0 to skip (default: 10)'
+        )
+        
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for the synthetic data (default: 42)'
+        )
+    
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        Faker.seed(options['seed'])
+        self.faker = Faker()
+        self.pools = {
+            'first_names': [self.faker.first_name() for _ in range(2000)],
+            'last_names': [self.faker.last_name() for _ in range(5000)],
+            'companies': [self.faker.company() for _ in range(20000)],
+            'domains': [self.faker.domain_name() for _ in range(20000)],
+            'sentences': [self.faker.sentence() for _ in range(500)],
+        }
+        
+        for size in options['sizes']:
+            leads = self._generate_leads(size)
+            meetings = [self._generate_meeting(leads) for _ in range(options['queries'])]
+            
+            gc.collect()
+            rss_before = psutil.Process().memory_info().rss
+            start = time.perf_counter()
+            service = LeadMatchingService(leads=leads)
+            build_seconds = time.perf_counter() - start
+            gc.collect()
+            snapshot_mb = (psutil.Process().memory_info().rss - rss_before) / 1024 / 1024
+            
+            indexed = self._measure(service, meetings)
+            self._report(size, 'index', indexed, build_seconds, snapshot_mb)
+            
+            if options['linear_queries']:
+                linear_service = LeadMatchingService(leads=leads, use_index=False)
+                linear = self._measure(linear_service, meetings[:options['linear_queries']])
+                self._report(size, 'linear', linear)
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'  speedup p50: {self._percentile(linear, 50) / self._percentile(indexed, 50):.0f}x'
+                    )
+                )
+    
+    def _generate_leads(self, size):
+        """Generate synthetic lead rows shaped like Lead.objects.values()"""
+        leads = []
+        for lead_id in range(size):
+            first_name = random.choice(self.pools['first_names'])
+            last_name = random.choice(self.pools['last_names'])
+            leads.append({
+                'id': lead_id,
+                'crm_id': f'CRM_{lead_id}',
+                'name': f'{first_name} {last_name}',
+                'email': f'{first_name.lower()}.{last_name.lower()}{lead_id}@{random.choice(self.pools["domains"])}',
+                'company': random.choice(self.pools['companies']),
+                'phone': f'555-{random.randint(100, 999)}-{random.randint(1000, 9999)}',
+            })
+        return leads
+    
+    def _generate_meeting(self, leads):
+        """Generate a calendar event loosely related to a random lead"""
+        lead = random.choice(leads)
+        first_name, last_name = lead['name'].split(' ', 1)
+        attendees = random.choice([
+            [lead['email']],
+            [f'someone@{lead["email"].split("@")[1]}'],
+            ['contact@example.com'],
+        ])
+        title = random.choice([
+            f'Meeting with {first_name} {last_name}',
+            f'{lead["company"]} partnership discussion',
+            f'Intro call with {last_name}',
+            'Quarterly review',
+        ])
+        description = random.choice([
+            '',
+            random.choice(self.pools['sentences']),
+            f'Call {first_name} at {lead["phone"]}',
+        ])
+        return {
+            'attendees': attendees,
+            'title': title,
+            'organizer': 'sales@ourcompany.com',
+            'description': description,
+        }
+    
+    def _measure(self, service, meetings):
+        """Time the same calls the match-meeting endpoint makes, in milliseconds"""
+        latencies = []
+        for meeting_data in meetings:
+            start = time.perf_counter()
+            if not service.match_meeting_to_lead(meeting_data):
+                service.find_potential_matches(meeting_data, limit=5)
+            latencies.append((time.perf_counter() - start) * 1000)
+        return latencies
+    
+    def _percentile(self, values, percentile):
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+    
+    def _report(self, size, mode, latencies, build_seconds=None, snapshot_mb=None):
+        line = (
+            f'{size:>9} leads  {mode:<6}  n={len(latencies):<4} '
+            f'p50={self._percentile(latencies, 50):9.2f}ms  '
+            f'p99={self._percentile(latencies, 99):9.2f}ms'
+        )
+        if build_seconds is not None:
+            line += f'  build={build_seconds:.2f}s  snapshot_rss=+{snapshot_mb:.0f}MB'
+        self.stdout.write(line)
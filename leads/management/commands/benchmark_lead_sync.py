@@ -0,0 +1,88 @@
+"""
+Management command to benchmark the lead-sync webhook serializer
+"""
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from faker import Faker
+from leads.serializers import LeadSyncSerializer
+
+
+class Command(BaseCommand):
+    help = 'Benchmark bulk and per-lead LeadSyncSerializer throughput on synthetic leads (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[1000, 10000, 100000],
+            help='Lead counts to benchmark (default: 1000 10000 100000)'
+        )
+
+        parser.add_argument(
+            '--per-lead-max',
+            type=int,
+            default=10000,
+            help='Largest size to also run through the per-lead path, 0 to skip (default: 10000)'
+        )
+
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for the synthetic data (default: 42)'
+        )
+
+    def handle(self, *args, **options):
+        Faker.seed(options['seed'])
+        self.faker = Faker()
+
+        for size in options['sizes']:
+            leads = self._generate_leads(size)
+            modes = [True]
+            if size <= options['per_lead_max']:
+                modes.append(False)
+
+            for bulk in modes:
+                # First sync creates every lead, the second one updates them all
+                with transaction.atomic():
+                    self._run(size, bulk, 'create', leads)
+                    self._run(size, bulk, 'update', leads)
+                    transaction.set_rollback(True)
+
+    def _generate_leads(self, size):
+        """Generate lead rows shaped like transform_creatio_data output"""
+        return [
+            {
+                'crm_id': f'BENCH_{lead_id}',
+                'name': self.faker.name(),
+                'email': f'lead{lead_id}@{self.faker.domain_name()}',
+                'company': self.faker.company(),
+                'phone': self.faker.numerify('555-###-####'),
+                'status': 'new',
+                'source': 'Website',
+            }
+            for lead_id in range(size)
+        ]
+
+    def _run(self, size, bulk, operation, leads):
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(1)
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(count_query):
+            serializer = LeadSyncSerializer(data={'leads': leads, 'bulk': bulk})
+            serializer.is_valid(raise_exception=True)
+            result = serializer.save()
+        seconds = time.perf_counter() - start
+
+        mode = 'bulk' if bulk else 'per-lead'
+        self.stdout.write(
+            f'{size:>7} leads  {mode:<8} {operation:<6} '
+            f'{seconds:8.2f}s  {size / seconds:9.0f} leads/s  '
+            f'queries={len(queries):<7} errors={len(result["errors"])}'
+        )
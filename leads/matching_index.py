@@ -0,0 +1,336 @@
+"""
+In-memory candidate index for lead matching
+
+LeadMatchingService scores a lead against a meeting on email, name, company
+and phone. Almost every lead scores zero for a given meeting, so instead of
+scoring the whole lead table this index returns the small set of leads that
+can score above zero, together with the signals each one matched on so the
+service can bound its score before running the full scoring.
+"""
+import re
+from bisect import insort
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+from fuzzywuzzy import fuzz
+
+
+COMPANY_SUFFIX_PATTERN = re.compile(r'\b(inc|llc|corp|ltd|co|company)\b\.?')
+PHONE_PATTERN = re.compile(r'[\+]?[1-9]?[\d\s\-\(\)]{10,}')
+PHONE_EXTENSION_PATTERN = re.compile(r'(x|ext)', re.IGNORECASE)
+NON_DIGIT_PATTERN = re.compile(r'\D')
+
+# Signals a candidate matched on, combined as a bit mask
+SIGNAL_EMAIL = 1
+SIGNAL_DOMAIN = 2
+SIGNAL_NAME = 4
+SIGNAL_COMPANY = 8
+SIGNAL_PHONE = 16
+
+
+class LeadRecord:
+    """Compact lead row, the subset of Lead fields used for matching"""
+
+    __slots__ = ('id', 'crm_id', 'name', 'email', 'company', 'phone')
+
+    def __init__(self, id, crm_id, name, email, company, phone):
+        self.id = id
+        self.crm_id = crm_id
+        self.name = name
+        self.email = email
+        self.company = company
+        self.phone = phone
+
+    @classmethod
+    def from_row(cls, row: Dict) -> 'LeadRecord':
+        """Build a record from a Lead.objects.values() row"""
+        return cls(*(row.get(field) for field in cls.__slots__))
+
+    def __eq__(self, other):
+        if not isinstance(other, LeadRecord):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+
+def clean_company(company: str) -> str:
+    """Normalize a company name the same way LeadMatchingService does"""
+    return COMPANY_SUFFIX_PATTERN.sub('', company.lower()).strip()
+
+
+def trigrams(text: str) -> Set[str]:
+    """Return the set of character trigrams of a string"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class LeadCandidateIndex:
+    """
+    Inverted index over lead rows used to pre-filter matching candidates
+
+    Leads are stored as LeadRecord rows and referred to by their position in
+    ``leads``. Structures kept per position:
+        - exact email hash map and email domain map
+        - phone map keyed by the subscriber part of the number
+        - a vocabulary of name parts and cleaned company names, with
+          trigram postings used for substring and fuzzy lookups
+
+    Fuzzy name/company matches are found through shared trigrams, so a weak
+    similarity between strings with no trigram in common (e.g. "green" and
+    "recent") is not returned.
+    """
+
+    # Must mirror the thresholds used by LeadMatchingService._match_name and
+    # LeadMatchingService._match_company
+    NAME_FUZZY_THRESHOLD = 80
+    COMPANY_FUZZY_THRESHOLD = 70
+
+    # Leads that only share an email domain with a meeting all score the same,
+    # so only the first few of a very common domain (gmail.com) are returned
+    MAX_DOMAIN_CANDIDATES = 200
+
+    # Number of trailing digits used as the phone lookup key
+    PHONE_KEY_DIGITS = 7
+
+    # Number of meeting words whose fuzzy vocabulary matches are remembered
+    MAX_CACHED_WORDS = 10000
+
+    def __init__(self, leads: Iterable[LeadRecord] = ()):
+        self.leads: List[LeadRecord] = []
+        self._email_index = defaultdict(list)
+        self._domain_index = defaultdict(list)
+        self._phone_index = defaultdict(list)
+        self._short_company_positions = []
+
+        # Vocabulary of name parts and cleaned company names
+        self._key_ids: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._key_trigram_counts: List[int] = []
+        self._name_postings: List[List[int]] = []
+        self._company_postings: List[List[int]] = []
+
+        # Trigram -> key ids, for substring containment and fuzzy lookups
+        self._substring_index = defaultdict(list)
+        self._fuzzy_index = defaultdict(list)
+        self._fuzzy_word_cache: Dict[str, List[Tuple[int, int]]] = {}
+
+        for lead in leads:
+            self.add(lead)
+
+    def __len__(self):
+        return len(self.leads)
+
+    def add(self, lead: LeadRecord) -> int:
+        """Add a lead to the index and return its position"""
+        position = len(self.leads)
+        self.leads.append(lead)
+        self._index(position, lead)
+        return position
+
+    def update(self, position: int, lead: LeadRecord):
+        """Replace the lead stored at a position, keeping the position"""
+        self._unindex(position, self.leads[position])
+        self.leads[position] = lead
+        self._index(position, lead)
+
+    def _postings(self, lead: LeadRecord):
+        """Yield the posting lists a lead belongs to"""
+        email = (lead.email or '').lower()
+        if email:
+            yield self._email_index[email]
+            domain = self._domain(email)
+            if domain:
+                yield self._domain_index[domain]
+
+        phone_key = self._phone_key(lead.phone or '')
+        if phone_key:
+            yield self._phone_index[phone_key]
+
+        for part in set((lead.name or '').lower().split()):
+            if len(part) > 2:
+                yield self._name_postings[self._key_id(part)]
+
+        if lead.company:
+            company = clean_company(lead.company)
+            if len(company) < 3:
+                # Too short to index by trigram, checked directly on lookup
+                yield self._short_company_positions
+            else:
+                yield self._company_postings[self._key_id(company)]
+
+    def _index(self, position: int, lead: LeadRecord):
+        # Posting lists stay sorted by position, candidates() relies on it
+        for postings in self._postings(lead):
+            if not postings or postings[-1] < position:
+                postings.append(position)
+            else:
+                insort(postings, position)
+
+    def _unindex(self, position: int, lead: LeadRecord):
+        for postings in self._postings(lead):
+            postings.remove(position)
+
+    def candidates(self, emails: Iterable[str], meeting_title: str,
+                   description: str, limit: int = 1) -> Dict[int, int]:
+        """
+        Return the leads that can score above zero for a meeting
+
+        Args:
+            emails: Attendee and organizer emails
+            meeting_title: Meeting title
+            description: Meeting description
+            limit: Number of results the caller needs, used to bound the
+                number of domain-only candidates
+
+        Returns:
+            Dictionary of lead position to the SIGNAL_* bits it matched on
+        """
+        signals = defaultdict(int)
+        emails = {email.lower() for email in emails if email}
+        domains = {self._domain(email) for email in emails} - {''}
+
+        for email in emails:
+            for position in self._email_index.get(email, ()):
+                signals[position] |= SIGNAL_EMAIL
+
+        if description:
+            for position in self._phone_candidates(description):
+                signals[position] |= SIGNAL_PHONE
+
+        text = f"{meeting_title} {description}".lower()
+        for postings, signal in self._text_matches(text):
+            for position in postings:
+                signals[position] |= signal
+
+        for position in self._short_company_positions:
+            if clean_company(self.leads[position].company) in text:
+                signals[position] |= SIGNAL_COMPANY
+
+        if domains:
+            for position in signals:
+                email = (self.leads[position].email or '').lower()
+                if self._domain(email) in domains:
+                    signals[position] |= SIGNAL_DOMAIN
+
+            # Domain-only candidates tie on score, so earlier positions win and
+            # the rest of a large posting list can be skipped
+            domain_limit = max(limit, self.MAX_DOMAIN_CANDIDATES)
+            for domain in domains:
+                for position in self._domain_index.get(domain, ())[:domain_limit]:
+                    signals[position] |= SIGNAL_DOMAIN
+
+        return signals
+
+    def _domain(self, email: str) -> str:
+        return email.split('@')[-1] if '@' in email else ''
+
+    def _key_id(self, key: str) -> int:
+        """Return the vocabulary id for a key, registering it if needed"""
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            key_id = len(self._keys)
+            self._key_ids[key] = key_id
+            self._keys.append(key)
+            self._name_postings.append([])
+            self._company_postings.append([])
+
+            core = trigrams(key)
+            self._key_trigram_counts.append(len(core))
+            for trigram in core:
+                self._substring_index[trigram].append(key_id)
+            for trigram in trigrams(f" {key} "):
+                self._fuzzy_index[trigram].append(key_id)
+
+            # Cached word lookups do not know about the new key
+            self._fuzzy_word_cache.clear()
+        return key_id
+
+    def _phone_key(self, phone: str) -> str:
+        """Return the lookup key for a phone number, ignoring extensions"""
+        digits = NON_DIGIT_PATTERN.sub('', PHONE_EXTENSION_PATTERN.split(phone)[0])
+        if len(digits) < self.PHONE_KEY_DIGITS:
+            return digits
+        return digits[-self.PHONE_KEY_DIGITS:]
+
+    def _phone_candidates(self, description: str) -> Set[int]:
+        """Return positions of leads whose phone may appear in the description"""
+        positions = set()
+        for phone in PHONE_PATTERN.findall(description):
+            digits = NON_DIGIT_PATTERN.sub('', phone)
+            if not digits:
+                continue
+            if len(digits) < self.PHONE_KEY_DIGITS:
+                positions.update(self._phone_index.get(digits, ()))
+                continue
+            for start in range(len(digits) - self.PHONE_KEY_DIGITS + 1):
+                window = digits[start:start + self.PHONE_KEY_DIGITS]
+                positions.update(self._phone_index.get(window, ()))
+        return positions
+
+    def _text_matches(self, text: str) -> List[Tuple[List[int], int]]:
+        """Return (postings, signal) pairs for names and companies matching the text"""
+        matches = []
+        if not text.strip():
+            return matches
+
+        # Substring matches: every trigram of the key must occur in the text
+        hits = defaultdict(int)
+        for trigram in trigrams(text):
+            for key_id in self._substring_index.get(trigram, ()):
+                hits[key_id] += 1
+        for key_id, count in hits.items():
+            if count == self._key_trigram_counts[key_id] and self._keys[key_id] in text:
+                matches.append((self._name_postings[key_id], SIGNAL_NAME))
+                matches.append((self._company_postings[key_id], SIGNAL_COMPANY))
+
+        for word in set(text.split()):
+            if len(word) > 2:
+                for key_id, signal in self._fuzzy_word_matches(word):
+                    if signal & SIGNAL_NAME:
+                        matches.append((self._name_postings[key_id], SIGNAL_NAME))
+                    if signal & SIGNAL_COMPANY:
+                        matches.append((self._company_postings[key_id], SIGNAL_COMPANY))
+        return matches
+
+    def _fuzzy_word_matches(self, word: str) -> List[Tuple[int, int]]:
+        """
+        Return (key id, signal) pairs for keys fuzzily matching a word
+
+        Keys sharing a trigram with the word are verified with the same ratio
+        and thresholds LeadMatchingService uses.
+        """
+        cached = self._fuzzy_word_cache.get(word)
+        if cached is not None:
+            return cached
+
+        matches = []
+        seen = set()
+        for trigram in trigrams(f" {word} "):
+            for key_id in self._fuzzy_index.get(trigram, ()):
+                if key_id in seen:
+                    continue
+                seen.add(key_id)
+
+                key = self._keys[key_id]
+                # ratio = 2 * matches / (len(a) + len(b)), so very different
+                # lengths can never reach the threshold
+                shorter, longer = sorted((len(key), len(word)))
+                if 2 * shorter * 100 <= self.COMPANY_FUZZY_THRESHOLD * (shorter + longer):
+                    continue
+
+                check_name = bool(self._name_postings[key_id])
+                check_company = bool(self._company_postings[key_id]) and len(word) > 3
+                if not check_name and not check_company:
+                    continue
+
+                similarity = fuzz.ratio(key, word)
+                signal = 0
+                if check_name and similarity > self.NAME_FUZZY_THRESHOLD:
+                    signal |= SIGNAL_NAME
+                if check_company and similarity > self.COMPANY_FUZZY_THRESHOLD:
+                    signal |= SIGNAL_COMPANY
+                if signal:
+                    matches.append((key_id, signal))
+
+        if len(self._fuzzy_word_cache) >= self.MAX_CACHED_WORDS:
+            self._fuzzy_word_cache.clear()
+        self._fuzzy_word_cache[word] = matches
+        return matches
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['updated_at'], name='leads_lead_updated_88249a_idx'),
+        ),
+    ]
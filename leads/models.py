@@ -35,6 +35,7 @@ class Lead(models.Model):
             models.Index(fields=['company']),
             models.Index(fields=['status']),
             models.Index(fields=['last_sync']),
+            models.Index(fields=['updated_at']),
         ]
     
     def __str__(self):
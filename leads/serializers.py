@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import Lead
 
@@ -35,15 +36,104 @@ class LeadSerializer(serializers.ModelSerializer):
         return value.strip() if value else value
 
 
+class LeadUpsertSerializer(LeadSerializer):
+    """
+    LeadSerializer for bulk upserts
+    
+    Existing crm_ids are expected and resolved by the upsert itself, so the
+    per-row uniqueness query is dropped.
+    """
+    
+    class Meta(LeadSerializer.Meta):
+        extra_kwargs = {'crm_id': {'validators': []}}
+
+
 class LeadSyncSerializer(serializers.Serializer):
     """
     Serializer for bulk lead sync operations from n8n
     """
     leads = serializers.ListField(child=serializers.DictField())
+    bulk = serializers.BooleanField(default=True)
+    
+    # Rows per existing-lead lookup and per INSERT ... ON CONFLICT statement
+    BULK_BATCH_SIZE = 1000
     
     def create(self, validated_data):
         """Create or update leads in bulk"""
-        leads_data = validated_data['leads']
+        if validated_data['bulk']:
+            return self._bulk_upsert(validated_data['leads'])
+        return self._upsert_each(validated_data['leads'])
+    
+    def _bulk_upsert(self, leads_data):
+        """
+        Create or update leads with chunked INSERT ... ON CONFLICT statements
+        
+        Rows are validated in one pass without queries. Existing leads only
+        get the fields present in their row updated, as in the per-lead path.
+        A crm_id given more than once keeps its last row.
+        """
+        # One serializer instance validates every row, so its fields are
+        # only built once
+        lead_serializer = LeadUpsertSerializer()
+        rows = {}
+        errors = []
+        for lead_data in leads_data:
+            try:
+                data = lead_serializer.run_validation(lead_data)
+            except serializers.ValidationError as e:
+                errors.append({
+                    'crm_id': lead_data.get('crm_id'),
+                    'errors': e.detail
+                })
+            else:
+                rows[data['crm_id']] = data
+        
+        crm_ids = list(rows)
+        existing_ids = set()
+        for start in range(0, len(crm_ids), self.BULK_BATCH_SIZE):
+            existing_ids.update(
+                Lead.objects.filter(
+                    crm_id__in=crm_ids[start:start + self.BULK_BATCH_SIZE]
+                ).values_list('crm_id', flat=True)
+            )
+        
+        # ON CONFLICT updates the same columns for every row of a statement,
+        # so rows are grouped by the fields they provide
+        groups = {}
+        for crm_id, data in rows.items():
+            groups.setdefault(frozenset(data), []).append(Lead(**data))
+        
+        with transaction.atomic():
+            for fields, leads in groups.items():
+                update_fields = sorted(fields - {'crm_id'}) + ['updated_at']
+                Lead.objects.bulk_create(
+                    leads,
+                    batch_size=self.BULK_BATCH_SIZE,
+                    update_conflicts=True,
+                    unique_fields=['crm_id'],
+                    update_fields=update_fields
+                )
+        
+        created_leads = []
+        updated_leads = []
+        for start in range(0, len(crm_ids), self.BULK_BATCH_SIZE):
+            chunk = crm_ids[start:start + self.BULK_BATCH_SIZE]
+            leads = Lead.objects.in_bulk(chunk, field_name='crm_id')
+            for crm_id in chunk:
+                if crm_id in existing_ids:
+                    updated_leads.append(leads[crm_id])
+                else:
+                    created_leads.append(leads[crm_id])
+        
+        return {
+            'created': created_leads,
+            'updated': updated_leads,
+            'total_processed': len(leads_data),
+            'errors': errors
+        }
+    
+    def _upsert_each(self, leads_data):
+        """Create or update leads one at a time"""
         created_leads = []
         updated_leads = []
         errors = []
@@ -90,4 +180,14 @@ class LeadSyncSerializer(serializers.Serializer):
             'errors': errors
         }
         
-        return result
\ No newline at end of file
+        return result
+
+
+class BulkMeetingMatchSerializer(serializers.Serializer):
+    """
+    Serializer for bulk meeting-to-lead matching (calendar backfills)
+    """
+    meetings = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False, max_length=10000
+    )
+    include_potential_matches = serializers.BooleanField(default=False)
@@ -2,9 +2,17 @@
 Lead matching services for intelligent meeting workflow
 """
 from typing import List, Dict, Optional, Tuple
+from functools import partial
+import heapq
+import multiprocessing
 from django.db.models import Q
 from fuzzywuzzy import fuzz
 from .models import Lead
+from .matching_index import (
+    LeadCandidateIndex, LeadRecord, SIGNAL_COMPANY, SIGNAL_DOMAIN,
+    SIGNAL_EMAIL, SIGNAL_NAME, SIGNAL_PHONE
+)
+from .snapshot import LeadSnapshot, lead_snapshot
 import re
 
 
@@ -24,15 +32,105 @@ class LeadMatchingService:
         'phone': 0.05
     }
     
-    def __init__(self):
-        self.leads_cache = None
-        self._refresh_cache()
+    def __init__(self, leads: Optional[List[Dict]] = None, use_index: bool = True):
+        """
+        Args:
+            leads: Fixed lead rows to match against instead of the shared
+                lead snapshot (benchmarks)
+            use_index: Score only the candidates returned by the lead index
+                instead of every cached lead
+        """
+        self.use_index = use_index
+        if leads is not None:
+            self.snapshot = LeadSnapshot(rows=leads)
+        else:
+            self.snapshot = lead_snapshot
+            self.snapshot.refresh()
+    
+    @property
+    def leads_cache(self) -> List[LeadRecord]:
+        return self.snapshot.records
+    
+    @property
+    def lead_index(self) -> LeadCandidateIndex:
+        return self.snapshot.index
     
     def _refresh_cache(self):
-        """Refresh the leads cache for better performance"""
-        self.leads_cache = list(Lead.objects.all().values(
-            'id', 'crm_id', 'name', 'email', 'company', 'phone'
-        ))
+        """Bring the shared lead snapshot up to date with the database"""
+        self.snapshot.refresh(force=True)
+    
+    def _rank_leads(self, emails: set, meeting_title: str,
+                    description: str, limit: int) -> List[Tuple[float, LeadRecord]]:
+        """
+        Return the top (confidence, lead) pairs for a meeting
+        
+        Ties keep cache order, as a scan over every cached lead would. With
+        the index enabled only candidates are scored, highest possible score
+        first, stopping once no remaining candidate can enter the top results.
+        """
+        ranked = []
+        if limit <= 0:
+            return ranked
+        
+        if not self.use_index:
+            for position, lead in enumerate(self.leads_cache):
+                confidence = self._calculate_match_confidence(
+                    lead, emails, meeting_title, description
+                )
+                if confidence > 0:
+                    ranked.append((confidence, position, lead))
+            ranked.sort(key=lambda item: (-item[0], item[1]))
+            return [(confidence, lead) for confidence, _, lead in ranked[:limit]]
+        
+        candidates = self.lead_index.candidates(emails, meeting_title, description, limit)
+        bounds = [
+            (self._confidence_bound(signals), position)
+            for position, signals in candidates.items()
+        ]
+        bounds.sort(key=lambda item: (-item[0], item[1]))
+        
+        # Min-heap of the current top results, worst (lowest confidence, then
+        # latest position) first
+        top = []
+        for bound, position in bounds:
+            if len(top) == limit:
+                worst_confidence, worst_position = top[0][0], -top[0][1]
+                if bound < worst_confidence or (
+                    bound == worst_confidence and position > worst_position
+                ):
+                    break
+            
+            lead = self.leads_cache[position]
+            confidence = self._calculate_match_confidence(
+                lead, emails, meeting_title, description
+            )
+            if confidence <= 0:
+                continue
+            
+            item = (confidence, -position, lead)
+            if len(top) < limit:
+                heapq.heappush(top, item)
+            elif item[:2] > top[0][:2]:
+                heapq.heapreplace(top, item)
+        
+        top.sort(key=lambda item: (-item[0], -item[1]))
+        return [(confidence, lead) for confidence, _, lead in top]
+    
+    def _confidence_bound(self, signals: int) -> float:
+        """Highest confidence a lead matching on the given index signals can get"""
+        email_score = 0
+        if signals & SIGNAL_EMAIL:
+            email_score = 1.0
+        elif signals & SIGNAL_DOMAIN:
+            email_score = 0.7
+        
+        # Same arithmetic as _calculate_match_confidence so the bound is exact
+        total_score = 0
+        total_score += email_score * self.WEIGHTS['email']
+        total_score += (1.0 if signals & SIGNAL_NAME else 0) * self.WEIGHTS['name']
+        total_score += (1.0 if signals & SIGNAL_COMPANY else 0) * self.WEIGHTS['company']
+        total_score += (1.0 if signals & SIGNAL_PHONE else 0) * self.WEIGHTS['phone']
+        return min(total_score * 100, 100)
     
     def match_meeting_to_lead(self, meeting_data: Dict) -> Optional[Dict]:
         """
@@ -51,41 +149,7 @@ class LeadMatchingService:
         if not self.leads_cache:
             self._refresh_cache()
         
-        best_match = None
-        best_confidence = 0
-        
-        # Extract potential matching data from meeting
-        attendee_emails = meeting_data.get('attendees', [])
-        meeting_title = meeting_data.get('title', '')
-        organizer_email = meeting_data.get('organizer', '')
-        description = meeting_data.get('description', '')
-        
-        # Combine all emails for matching
-        all_emails = set(attendee_emails)
-        if organizer_email:
-            all_emails.add(organizer_email)
-        
-        for lead in self.leads_cache:
-            confidence = self._calculate_match_confidence(
-                lead, all_emails, meeting_title, description
-            )
-            
-            if confidence > best_confidence:
-                best_confidence = confidence
-                best_match = {
-                    'lead_id': lead['id'],
-                    'crm_id': lead['crm_id'],
-                    'confidence': confidence,
-                    'match_reasons': self._get_match_reasons(
-                        lead, all_emails, meeting_title, description
-                    )
-                }
-        
-        # Only return match if confidence meets threshold
-        if best_match and best_confidence >= self.MIN_CONFIDENCE_THRESHOLD:
-            return best_match
-        
-        return None
+        return self._best_match(*self._meeting_fields(meeting_data))
     
     def find_potential_matches(self, meeting_data: Dict, limit: int = 5) -> List[Dict]:
         """
@@ -101,45 +165,132 @@ class LeadMatchingService:
         if not self.leads_cache:
             self._refresh_cache()
         
-        matches = []
+        return self._potential_matches(*self._meeting_fields(meeting_data), limit)
+    
+    def match_meetings(self, meetings: List[Dict], include_potential_matches: bool = False,
+                       limit: int = 5, workers: int = 1) -> List[Dict]:
+        """
+        Match many meetings to leads in one pass (calendar backfills)
+        
+        Identical meetings, such as the occurrences of a recurring event, are
+        scored once. With workers > 1 the distinct meetings are split across
+        forked processes that share this process's lead snapshot.
+        
+        Args:
+            meetings: List of meeting data dictionaries, as for match_meeting_to_lead
+            include_potential_matches: Add potential matches for meetings
+                without an automatic match
+            limit: Maximum number of potential matches per meeting
+            workers: Number of processes to score meetings in
+        
+        Returns:
+            One result per meeting, in input order, with 'match_found', 'match'
+            and, when requested, 'potential_matches'
+        """
+        if not self.leads_cache:
+            self._refresh_cache()
+        
+        keys = [self._meeting_fields(meeting_data) for meeting_data in meetings]
+        unique_keys = list(dict.fromkeys(keys))
+        
+        can_fork = 'fork' in multiprocessing.get_all_start_methods()
+        if workers > 1 and can_fork and len(unique_keys) > 1 and self.leads_cache:
+            results = self._match_in_processes(unique_keys, include_potential_matches, limit, workers)
+        else:
+            results = [
+                self._match_meeting_key(key, include_potential_matches, limit)
+                for key in unique_keys
+            ]
+        
+        results_by_key = dict(zip(unique_keys, results))
+        return [results_by_key[key] for key in keys]
+    
+    def _meeting_fields(self, meeting_data: Dict) -> Tuple[frozenset, str, str]:
+        """Extract (emails, title, description) used for matching from meeting data"""
         attendee_emails = meeting_data.get('attendees', [])
         meeting_title = meeting_data.get('title', '')
         organizer_email = meeting_data.get('organizer', '')
         description = meeting_data.get('description', '')
         
+        # Combine all emails for matching
         all_emails = set(attendee_emails)
         if organizer_email:
             all_emails.add(organizer_email)
         
-        for lead in self.leads_cache:
-            confidence = self._calculate_match_confidence(
-                lead, all_emails, meeting_title, description
-            )
-            
-            if confidence > 0:  # Include any potential match
-                matches.append({
-                    'lead_id': lead['id'],
-                    'crm_id': lead['crm_id'],
-                    'name': lead['name'],
-                    'email': lead['email'],
-                    'company': lead['company'],
-                    'confidence': confidence,
-                    'match_reasons': self._get_match_reasons(
-                        lead, all_emails, meeting_title, description
-                    )
-                })
-        
-        # Sort by confidence and return top matches
-        matches.sort(key=lambda x: x['confidence'], reverse=True)
-        return matches[:limit]
+        return frozenset(all_emails), meeting_title, description
+    
+    def _best_match(self, all_emails: frozenset, meeting_title: str,
+                    description: str) -> Optional[Dict]:
+        ranked = self._rank_leads(all_emails, meeting_title, description, limit=1)
+        
+        # Only return match if confidence meets threshold
+        if ranked and ranked[0][0] >= self.MIN_CONFIDENCE_THRESHOLD:
+            confidence, lead = ranked[0]
+            return {
+                'lead_id': lead.id,
+                'crm_id': lead.crm_id,
+                'confidence': confidence,
+                'match_reasons': self._get_match_reasons(
+                    lead, all_emails, meeting_title, description
+                )
+            }
+        
+        return None
     
-    def _calculate_match_confidence(self, lead: Dict, emails: set, 
+    def _potential_matches(self, all_emails: frozenset, meeting_title: str,
+                           description: str, limit: int) -> List[Dict]:
+        # Include any potential match, sorted by confidence
+        return [
+            {
+                'lead_id': lead.id,
+                'crm_id': lead.crm_id,
+                'name': lead.name,
+                'email': lead.email,
+                'company': lead.company,
+                'confidence': confidence,
+                'match_reasons': self._get_match_reasons(
+                    lead, all_emails, meeting_title, description
+                )
+            }
+            for confidence, lead in self._rank_leads(all_emails, meeting_title, description, limit)
+        ]
+    
+    def _match_meeting_key(self, key: Tuple[frozenset, str, str],
+                           include_potential_matches: bool, limit: int) -> Dict:
+        """Build the match_meetings result for one distinct meeting"""
+        match = self._best_match(*key)
+        result = {'match_found': match is not None, 'match': match}
+        if include_potential_matches:
+            result['potential_matches'] = [] if match else self._potential_matches(*key, limit)
+        return result
+    
+    def _match_in_processes(self, keys: List[Tuple[frozenset, str, str]],
+                            include_potential_matches: bool, limit: int,
+                            workers: int) -> List[Dict]:
+        """Score distinct meetings in forked worker processes"""
+        global _forked_service
+        _forked_service = self
+        try:
+            # Forked workers inherit the loaded snapshot instead of reloading it
+            context = multiprocessing.get_context('fork')
+            with context.Pool(workers) as pool:
+                return pool.map(
+                    partial(_match_meeting_in_fork,
+                            include_potential_matches=include_potential_matches,
+                            limit=limit),
+                    keys,
+                    chunksize=max(1, len(keys) // (workers * 4))
+                )
+        finally:
+            _forked_service = None
+    
+    def _calculate_match_confidence(self, lead: LeadRecord, emails: set, 
                                   meeting_title: str, description: str) -> float:
         """
         Calculate confidence score for a lead match
         
         Args:
-            lead: Lead data dictionary
+            lead: Lead record
             emails: Set of email addresses from meeting
             meeting_title: Meeting title
             description: Meeting description
@@ -150,19 +301,19 @@ class LeadMatchingService:
         total_score = 0
         
         # Email matching (highest weight)
-        email_score = self._match_email(lead['email'], emails)
+        email_score = self._match_email(lead.email, emails)
         total_score += email_score * self.WEIGHTS['email']
         
         # Name matching
-        name_score = self._match_name(lead['name'], meeting_title, description)
+        name_score = self._match_name(lead.name, meeting_title, description)
         total_score += name_score * self.WEIGHTS['name']
         
         # Company matching
-        company_score = self._match_company(lead['company'], meeting_title, description)
+        company_score = self._match_company(lead.company, meeting_title, description)
         total_score += company_score * self.WEIGHTS['company']
         
         # Phone matching (if available)
-        phone_score = self._match_phone(lead['phone'], description)
+        phone_score = self._match_phone(lead.phone, description)
         total_score += phone_score * self.WEIGHTS['phone']
         
         return min(total_score * 100, 100)  # Convert to percentage and cap at 100
@@ -253,23 +404,28 @@ class LeadMatchingService:
         
         # Clean phone numbers for comparison
         lead_phone_clean = re.sub(r'[\s\-\(\)]', '', lead_phone)
+        if not re.search(r'\d', lead_phone_clean):
+            return 0
         
         for phone in phones_in_desc:
             phone_clean = re.sub(r'[\s\-\(\)]', '', phone)
+            # Runs of separators ("----------") match the pattern but are not phones
+            if not re.search(r'\d', phone_clean):
+                continue
             if lead_phone_clean in phone_clean or phone_clean in lead_phone_clean:
                 return 1.0
         
         return 0
     
-    def _get_match_reasons(self, lead: Dict, emails: set, 
+    def _get_match_reasons(self, lead: LeadRecord, emails: set, 
                           meeting_title: str, description: str) -> List[str]:
         """Get human-readable reasons for the match"""
         reasons = []
         
         # Email reasons
-        lead_email = lead['email'].lower() if lead['email'] else ''
+        lead_email = lead.email.lower() if lead.email else ''
         if lead_email in {email.lower() for email in emails}:
-            reasons.append(f"Email match: {lead['email']}")
+            reasons.append(f"Email match: {lead.email}")
         else:
             lead_domain = lead_email.split('@')[-1] if '@' in lead_email else ''
             if lead_domain:
@@ -280,19 +436,28 @@ class LeadMatchingService:
                         break
         
         # Name reasons
-        if lead['name']:
+        if lead.name:
             text_to_search = f"{meeting_title} {description}".lower()
-            name_parts = lead['name'].lower().split()
+            name_parts = lead.name.lower().split()
             for part in name_parts:
                 if len(part) > 2 and part in text_to_search:
                     reasons.append(f"Name match: {part}")
         
         # Company reasons
-        if lead['company']:
+        if lead.company:
             text_to_search = f"{meeting_title} {description}".lower()
             company_clean = re.sub(r'\b(inc|llc|corp|ltd|co|company)\b\.?', '', 
-                                 lead['company'].lower()).strip()
+                                 lead.company.lower()).strip()
             if company_clean in text_to_search:
-                reasons.append(f"Company match: {lead['company']}")
+                reasons.append(f"Company match: {lead.company}")
         
-        return reasons
\ No newline at end of file
+        return reasons
+
+
+# Service shared with forked match_meetings workers
+_forked_service = None
+
+
+def _match_meeting_in_fork(key: Tuple[frozenset, str, str],
+                           include_potential_matches: bool, limit: int) -> Dict:
+    return _forked_service._match_meeting_key(key, include_potential_matches, limit)
@@ -0,0 +1,17 @@
+"""
+Signal handlers keeping the lead matching snapshot fresh
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Lead
+from .snapshot import lead_snapshot
+
+
+@receiver(post_save, sender=Lead)
+@receiver(post_delete, sender=Lead)
+def invalidate_lead_snapshot(sender, instance, **kwargs):
+    """Mark this process's lead snapshot stale when a lead changes"""
+    # Local only: bumping the shared version per row would cost a cache
+    # round trip for every lead in a sync, sync_leads bumps it once instead
+    lead_snapshot.invalidate(shared=False)
@@ -0,0 +1,199 @@
+"""
+Process-wide lead snapshot for lead matching
+
+Every LeadMatchingService used to load the whole Lead table on construction.
+The snapshot is loaded once per process, kept as compact LeadRecord rows with
+a candidate index, and refreshed incrementally from Lead.updated_at.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+
+import psutil
+from django.conf import settings
+from django.core.cache import cache
+
+from .matching_index import LeadCandidateIndex, LeadRecord
+from .models import Lead
+
+logger = logging.getLogger(__name__)
+
+
+class LeadSnapshot:
+    """
+    Shared, incrementally refreshed copy of the lead rows used for matching
+
+    A refresh only hits the database when the snapshot may be stale:
+        - a lead was saved or deleted in this process
+        - another process bumped the shared version (after a lead sync)
+        - LEAD_SNAPSHOT_MAX_AGE seconds passed since the last check
+
+    Changed rows are read by Lead.updated_at and patched in place, new rows
+    are appended. Deleted rows are detected by count and trigger a full reload.
+    """
+
+    VERSION_CACHE_KEY = 'leads:snapshot:version'
+
+    # Re-read rows updated slightly before the last one seen, so rows from
+    # transactions that committed out of order are not missed
+    DELTA_OVERLAP = timedelta(seconds=60)
+
+    def __init__(self, rows: Optional[Iterable[Dict]] = None):
+        """
+        Args:
+            rows: Fixed lead rows; the snapshot is then never read from or
+                refreshed against the database (benchmarks, tests)
+        """
+        self._lock = threading.RLock()
+        self.index = LeadCandidateIndex()
+        self._positions: Dict[int, int] = {}
+        self._high_water = None
+        self._version = None
+        self._dirty = True
+        self._checked_at = 0.0
+        self.loaded = False
+        self.static = rows is not None
+        self.stats = {
+            'full_loads': 0,
+            'delta_refreshes': 0,
+            'delta_rows': 0,
+            'load_seconds': None,
+            'loaded_at': None,
+        }
+
+        if self.static:
+            self._load(rows)
+
+    @property
+    def records(self) -> List[LeadRecord]:
+        return self.index.leads
+
+    @property
+    def max_age(self) -> int:
+        return getattr(settings, 'LEAD_SNAPSHOT_MAX_AGE', 30)
+
+    def refresh(self, force: bool = False):
+        """
+        Bring the snapshot up to date with the Lead table
+
+        Args:
+            force: Check the database even if nothing suggests a change
+        """
+        if self.static:
+            return
+
+        with self._lock:
+            if not self.loaded:
+                self._full_load()
+                return
+
+            version_changed = self._version_changed()
+            is_expired = time.monotonic() - self._checked_at >= self.max_age
+            if force or self._dirty or version_changed or is_expired:
+                self._apply_delta()
+
+    def invalidate(self, shared: bool = True):
+        """
+        Mark the snapshot stale
+
+        Args:
+            shared: Also bump the shared version so other processes refresh
+        """
+        self._dirty = True
+        if not shared:
+            return
+
+        try:
+            try:
+                cache.incr(self.VERSION_CACHE_KEY)
+            except ValueError:
+                cache.set(self.VERSION_CACHE_KEY, 1, timeout=None)
+        except Exception as e:
+            logger.warning(f"Could not bump lead snapshot version: {str(e)}")
+
+    def get_stats(self) -> Dict:
+        """Return load statistics and the current process RSS"""
+        return {
+            **self.stats,
+            'rows': len(self.records),
+            'vocabulary': len(self.index._keys),
+            'rss_bytes': psutil.Process().memory_info().rss,
+        }
+
+    def _version_changed(self) -> bool:
+        try:
+            version = cache.get(self.VERSION_CACHE_KEY)
+        except Exception as e:
+            # Without the shared version, fall back to checking the database
+            logger.warning(f"Could not read lead snapshot version: {str(e)}")
+            return True
+
+        if version != self._version:
+            self._version = version
+            return True
+        return False
+
+    def _queryset(self):
+        return Lead.objects.values(*LeadRecord.__slots__, 'updated_at')
+
+    def _full_load(self):
+        started = time.perf_counter()
+        self._version_changed()
+        self._checked_at = time.monotonic()
+        self._dirty = False
+        self._load(self._queryset().iterator(chunk_size=5000))
+
+        self.stats['full_loads'] += 1
+        self.stats['load_seconds'] = time.perf_counter() - started
+        self.stats['loaded_at'] = time.time()
+        logger.info(
+            f"Loaded lead snapshot: {len(self.records)} leads in "
+            f"{self.stats['load_seconds']:.2f}s"
+        )
+
+    def _load(self, rows: Iterable[Dict]):
+        index = LeadCandidateIndex()
+        positions = {}
+        high_water = None
+        for row in rows:
+            positions[row['id']] = index.add(LeadRecord.from_row(row))
+            updated_at = row.get('updated_at')
+            if updated_at and (high_water is None or updated_at > high_water):
+                high_water = updated_at
+
+        # Swap in the new index in one step so concurrent readers never see
+        # a half-built one
+        self.index, self._positions, self._high_water = index, positions, high_water
+        self.loaded = True
+
+    def _apply_delta(self):
+        self._checked_at = time.monotonic()
+        self._dirty = False
+
+        changed = self._queryset()
+        if self._high_water is not None:
+            changed = changed.filter(updated_at__gte=self._high_water - self.DELTA_OVERLAP)
+
+        delta_rows = 0
+        for row in changed.iterator(chunk_size=5000):
+            record = LeadRecord.from_row(row)
+            position = self._positions.get(row['id'])
+            if position is None:
+                self._positions[row['id']] = self.index.add(record)
+            elif self.records[position] != record:
+                self.index.update(position, record)
+            if self._high_water is None or row['updated_at'] > self._high_water:
+                self._high_water = row['updated_at']
+            delta_rows += 1
+
+        self.stats['delta_refreshes'] += 1
+        self.stats['delta_rows'] += delta_rows
+
+        if Lead.objects.count() != len(self._positions):
+            # Leads were deleted, positions can only be rebuilt from scratch
+            self._full_load()
+
+
+lead_snapshot = LeadSnapshot()
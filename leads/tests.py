@@ -130,6 +130,50 @@ class LeadSerializerTest(TestCase):
         }
         serializer = LeadSyncSerializer(data=data)
         self.assertTrue(serializer.is_valid())
+    
+    def test_lead_sync_bulk_upsert(self):
+        """Test bulk sync creates and updates leads and reports invalid rows"""
+        existing = LeadFactory(crm_id='CRM_1', name='Old Name', phone='555-123-4567')
+        data = {
+            'leads': [
+                {'crm_id': 'CRM_1', 'name': 'New Name', 'email': existing.email, 'company': existing.company},
+                {'crm_id': 'CRM_2', 'name': 'Jane Smith', 'email': 'jane@example.com', 'company': 'Another Corp'},
+                {'crm_id': 'CRM_3', 'name': '', 'email': 'bad@example.com', 'company': 'Test Corp'},
+            ]
+        }
+        serializer = LeadSyncSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+        result = serializer.save()
+        
+        self.assertEqual([lead.crm_id for lead in result['created']], ['CRM_2'])
+        self.assertEqual([lead.crm_id for lead in result['updated']], ['CRM_1'])
+        self.assertEqual(result['total_processed'], 3)
+        self.assertEqual(result['errors'][0]['crm_id'], 'CRM_3')
+        
+        existing.refresh_from_db()
+        self.assertEqual(existing.name, 'New Name')
+        self.assertEqual(existing.phone, '555-123-4567')  # Not in the row, kept
+        self.assertGreater(existing.updated_at, existing.created_at)
+        self.assertEqual(Lead.objects.count(), 2)
+    
+    def test_lead_sync_bulk_query_count(self):
+        """Test bulk sync query count does not grow with the number of leads"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        LeadFactory(crm_id='CRM_0')
+        leads = [
+            {'crm_id': f'CRM_{i}', 'name': f'Lead {i}', 'email': f'lead{i}@example.com', 'company': 'Test Corp'}
+            for i in range(50)
+        ]
+        serializer = LeadSyncSerializer(data={'leads': leads})
+        self.assertTrue(serializer.is_valid())
+        with CaptureQueriesContext(connection) as queries:
+            result = serializer.save()
+        
+        self.assertEqual(len(result['created']), 49)
+        self.assertEqual(len(result['updated']), 1)
+        self.assertLessEqual(len(queries), 5)
 
 
 class LeadAPITest(APITestCase):
@@ -261,6 +305,45 @@ class LeadAPITest(APITestCase):
         lead.refresh_from_db()
         self.assertEqual(lead.name, 'Updated Name')
     
+    def test_lead_sync_ndjson_stream(self):
+        """Test POST /api/leads/sync/ with a gzipped NDJSON body commits in batches"""
+        import gzip
+        import json
+        
+        lines = [
+            json.dumps({'Id': f'CREATIO_{i}', 'Name': f'Lead {i}', 'Email': f'lead{i}@example.com',
+                        'Company': 'Creatio Corp', 'Status': 'Qualified'})
+            for i in range(5)
+        ]
+        lines.insert(2, '')  # Blank lines are skipped
+        body = gzip.compress('\n'.join(lines).encode())
+        
+        with self.settings(LEAD_SYNC_BATCH_SIZE=2):
+            response = self.client.post(
+                '/api/leads/sync/', body, content_type='application/x-ndjson',
+                HTTP_CONTENT_ENCODING='gzip'
+            )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 5)
+        self.assertEqual([batch['processed'] for batch in response.data['batches']], [2, 2, 1])
+        self.assertEqual(Lead.objects.filter(status='qualified').count(), 5)
+    
+    def test_lead_sync_ndjson_invalid_line(self):
+        """Test a malformed NDJSON line stops the sync and keeps committed batches"""
+        body = '\n'.join([
+            '{"crm_id": "CRM_1", "name": "John Doe", "email": "john@example.com", "company": "Test Corp"}',
+            '{"crm_id": "CRM_2", "name": "Jane Doe"',
+        ])
+        
+        with self.settings(LEAD_SYNC_BATCH_SIZE=1):
+            response = self.client.post('/api/leads/sync/', body, content_type='application/x-ndjson')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['line'], 2)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(Lead.objects.count(), 1)
+    
     def test_lead_status_update_endpoint(self):
         """Test PUT /api/leads/{id}/status/"""
         lead = LeadFactory()
@@ -406,6 +489,32 @@ class LeadMatchingServiceTest(TestCase):
                 potential_matches[1]['confidence']
             )
     
+    def test_match_meetings_in_bulk(self):
+        """Test matching a batch of meetings in one call"""
+        recurring = {
+            'attendees': ['john.doe@techcorp.com'],
+            'title': 'Weekly Sync',
+            'organizer': 'sales@ourcompany.com'
+        }
+        meetings = [
+            recurring,
+            {'attendees': ['random@nowhere.com'], 'title': 'Random Meeting'},
+            dict(recurring),
+            {'attendees': ['jane.smith@innovate.com'], 'title': 'Demo'},
+        ]
+        
+        results = self.matching_service.match_meetings(meetings, include_potential_matches=True)
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[0]['match']['crm_id'], 'CRM_001')
+        self.assertEqual(results[0], results[2])
+        self.assertFalse(results[1]['match_found'])
+        self.assertIsInstance(results[1]['potential_matches'], list)
+        self.assertEqual(results[3]['match']['crm_id'], 'CRM_002')
+        
+        # Same answers as the single meeting API
+        for meeting_data, result in zip(meetings, results):
+            self.assertEqual(result['match'], self.matching_service.match_meeting_to_lead(meeting_data))
+    
     def test_confidence_calculation(self):
         """Test confidence score calculation"""
         # High confidence match (email + name + company)
@@ -519,6 +628,29 @@ class LeadMatchingAPITest(APITestCase):
         self.assertFalse(response.data['match_found'])
         self.assertIn('potential_matches', response.data)
     
+    def test_bulk_match_meetings_endpoint(self):
+        """Test POST /api/leads/match-meetings/"""
+        data = {
+            'meetings': [
+                {'attendees': ['john.doe@techcorp.com'], 'title': 'Product Demo'},
+                {'attendees': ['unknown@nowhere.com'], 'title': 'Random Meeting'},
+            ],
+            'include_potential_matches': True
+        }
+        
+        response = self.client.post('/api/leads/match-meetings/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['success'])
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual(response.data['matched'], 1)
+        self.assertEqual(response.data['results'][0]['match']['crm_id'], 'CRM_001')
+        self.assertIn('potential_matches', response.data['results'][1])
+    
+    def test_bulk_match_meetings_requires_meetings(self):
+        """Test bulk matching rejects an empty batch"""
+        response = self.client.post('/api/leads/match-meetings/', {'meetings': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
     def test_get_potential_matches_endpoint(self):
         """Test GET /api/leads/potential-matches/"""
         self.client.force_authenticate(user=self.user)
@@ -581,4 +713,156 @@ class LeadMatchingAPITest(APITestCase):
         self.matching_service._refresh_cache()
         match = self.matching_service.match_meeting_to_lead(meeting_data)
         self.assertIsNotNone(match)
-        self.assertEqual(match['crm_id'], 'CRM_NEW')
\ No newline at end of file
+        self.assertEqual(match['crm_id'], 'CRM_NEW')
+
+class LeadCandidateIndexTest(TestCase):
+    """Test cases for the lead matching candidate index"""
+    
+    def setUp(self):
+        """Set up in-memory lead rows"""
+        self.leads = [
+            {'id': 1, 'crm_id': 'CRM_001', 'name': 'John Doe', 'email': 'john.doe@techcorp.com',
+             'company': 'TechCorp Inc', 'phone': '+1 555-123-4567'},
+            {'id': 2, 'crm_id': 'CRM_002', 'name': 'Jane Smith', 'email': 'jane.smith@innovate.com',
+             'company': 'Innovate LLC', 'phone': '555-987-6543'},
+            {'id': 3, 'crm_id': 'CRM_003', 'name': 'Bob Johnson', 'email': 'bob@startup.io',
+             'company': 'Startup Solutions', 'phone': '555-555-5555'},
+            {'id': 4, 'crm_id': 'CRM_004', 'name': 'Ann Lee', 'email': 'ann@techcorp.com',
+             'company': 'HP', 'phone': ''},
+        ]
+        from .matching_index import LeadCandidateIndex, LeadRecord
+        self.index = LeadCandidateIndex(LeadRecord.from_row(row) for row in self.leads)
+    
+    def test_email_and_domain_candidates(self):
+        """Test exact email and same-domain leads are returned"""
+        from .matching_index import SIGNAL_DOMAIN, SIGNAL_EMAIL
+        
+        candidates = self.index.candidates({'john.doe@techcorp.com'}, 'Product Demo', '')
+        self.assertEqual(candidates[0], SIGNAL_EMAIL | SIGNAL_DOMAIN)
+        self.assertEqual(candidates[3], SIGNAL_DOMAIN)
+        self.assertNotIn(1, candidates)
+    
+    def test_domain_candidates_are_bounded(self):
+        """Test a very common domain only contributes the first leads"""
+        from .matching_index import LeadCandidateIndex, LeadRecord
+        
+        index = LeadCandidateIndex(
+            LeadRecord(n, f'CRM_{n}', f'Person {n}', f'person{n}@gmail.com', 'Acme', '')
+            for n in range(LeadCandidateIndex.MAX_DOMAIN_CANDIDATES + 50)
+        )
+        candidates = index.candidates({'someone@gmail.com'}, 'Intro', '', limit=5)
+        self.assertEqual(sorted(candidates), list(range(LeadCandidateIndex.MAX_DOMAIN_CANDIDATES)))
+    
+    def test_name_and_company_candidates(self):
+        """Test substring and fuzzy name/company lookups"""
+        from .matching_index import SIGNAL_COMPANY, SIGNAL_NAME
+        
+        candidates = self.index.candidates(set(), 'Meeting with Jon Doe', '')
+        self.assertTrue(candidates[0] & SIGNAL_NAME)
+        
+        candidates = self.index.candidates(set(), 'Innovate roadmap', '')
+        self.assertTrue(candidates[1] & SIGNAL_COMPANY)
+        
+        # Short company names are checked directly
+        candidates = self.index.candidates(set(), 'Quarterly review', 'HP printers')
+        self.assertTrue(candidates[3] & SIGNAL_COMPANY)
+    
+    def test_phone_candidates(self):
+        """Test phone lookups ignore formatting and country codes"""
+        from .matching_index import SIGNAL_PHONE
+        
+        candidates = self.index.candidates(set(), 'Follow-up', 'Call (555) 123 4567 tomorrow')
+        self.assertEqual(candidates[0], SIGNAL_PHONE)
+        
+        # Runs of separators are not phone numbers
+        candidates = self.index.candidates(set(), 'Follow-up', 'Notes\n---------------')
+        self.assertEqual(candidates, {})
+    
+    def test_index_matches_linear_scan(self):
+        """Test indexed matching returns the same results as scoring every lead"""
+        from .services import LeadMatchingService
+        
+        indexed = LeadMatchingService(leads=self.leads)
+        linear = LeadMatchingService(leads=self.leads, use_index=False)
+        meetings = [
+            {'attendees': ['john.doe@techcorp.com'], 'title': 'Product Demo'},
+            {'attendees': ['someone@techcorp.com'], 'title': 'Meeting with TechCorp'},
+            {'attendees': ['contact@example.com'], 'title': 'Meeting with Jon Doe'},
+            {'attendees': ['contact@example.com'], 'title': 'Follow-up call',
+             'description': 'Call John at 555-123-4567 to discuss the proposal'},
+            {'attendees': ['random@nowhere.com'], 'title': 'Random Meeting'},
+            {},
+        ]
+        
+        for meeting_data in meetings:
+            self.assertEqual(
+                indexed.match_meeting_to_lead(meeting_data),
+                linear.match_meeting_to_lead(meeting_data)
+            )
+            self.assertEqual(
+                indexed.find_potential_matches(meeting_data),
+                linear.find_potential_matches(meeting_data)
+            )
+    
+    def test_update_reindexes_lead(self):
+        """Test updating a lead replaces its index entries in place"""
+        from .matching_index import LeadRecord
+        
+        self.index.update(0, LeadRecord(1, 'CRM_001', 'John Doe', 'john@newco.com', 'NewCo', ''))
+        self.assertEqual(self.index.candidates({'john.doe@techcorp.com'}, 'Intro', ''), {3: 2})
+        self.assertIn(0, self.index.candidates({'john@newco.com'}, 'Intro', ''))
+
+
+class LeadSnapshotTest(TestCase):
+    """Test cases for the shared lead snapshot"""
+    
+    def setUp(self):
+        """Set up a snapshot that is not shared with other tests"""
+        from .snapshot import LeadSnapshot
+        self.lead = LeadFactory(crm_id='CRM_001', name='John Doe', email='john.doe@techcorp.com')
+        self.snapshot = LeadSnapshot()
+        self.snapshot.refresh()
+    
+    def test_initial_load(self):
+        """Test the first refresh loads every lead"""
+        self.assertEqual([record.crm_id for record in self.snapshot.records], ['CRM_001'])
+        self.assertEqual(self.snapshot.stats['full_loads'], 1)
+        self.assertIn('rss_bytes', self.snapshot.get_stats())
+    
+    def test_refresh_applies_changes_incrementally(self):
+        """Test new and updated leads are patched in without a full reload"""
+        LeadFactory(crm_id='CRM_002')
+        self.lead.name = 'Johnny Doe'
+        self.lead.save()
+        
+        self.snapshot.refresh(force=True)
+        
+        self.assertEqual(self.snapshot.stats['full_loads'], 1)
+        self.assertEqual(len(self.snapshot.records), 2)
+        self.assertEqual(self.snapshot.records[0].name, 'Johnny Doe')
+        self.assertIn(0, self.snapshot.index.candidates(set(), 'Call with Johnny', ''))
+    
+    def test_refresh_skips_database_when_fresh(self):
+        """Test a refresh without changes or expiry does not query the database"""
+        self.snapshot._version_changed = lambda: False
+        self.snapshot._dirty = False
+        
+        with self.assertNumQueries(0):
+            self.snapshot.refresh()
+    
+    def test_deleted_lead_triggers_full_reload(self):
+        """Test deleting a lead rebuilds the snapshot"""
+        self.lead.delete()
+        
+        self.snapshot.refresh(force=True)
+        
+        self.assertEqual(self.snapshot.stats['full_loads'], 2)
+        self.assertEqual(self.snapshot.records, [])
+    
+    def test_services_share_snapshot(self):
+        """Test matching services built per request reuse the process snapshot"""
+        from .services import LeadMatchingService
+        
+        first = LeadMatchingService()
+        second = LeadMatchingService()
+        self.assertIs(first.snapshot, second.snapshot)
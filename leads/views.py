@@ -1,12 +1,17 @@
+import gzip
+import json
+from itertools import islice
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from .models import Lead
-from .serializers import LeadSerializer, LeadSyncSerializer
+from .serializers import BulkMeetingMatchSerializer, LeadSerializer, LeadSyncSerializer
 from .services import LeadMatchingService
+from .snapshot import lead_snapshot
 
 
 class LeadListCreateView(generics.ListCreateAPIView):
@@ -46,7 +51,13 @@ def sync_leads(request):
     """
     Webhook endpoint for n8n to sync leads from Creatio CRM
     Handles data transformation from Creatio format and error handling
+    
+    Large exports can be sent as NDJSON (one lead per line, optionally
+    gzip-encoded), which is streamed and committed in batches.
     """
+    if request.content_type in NDJSON_CONTENT_TYPES:
+        return sync_leads_stream(request)
+    
     try:
         # Transform Creatio format to Django format if needed
         transformed_data = transform_creatio_data(request.data)
@@ -56,6 +67,10 @@ def sync_leads(request):
         if serializer.is_valid():
             result = serializer.save()
             
+            # Let every worker's matching snapshot pick up the synced leads
+            if result['created'] or result['updated']:
+                lead_snapshot.invalidate()
+            
             # Check if there were any errors during processing
             if result['errors']:
                 return Response({
@@ -94,38 +109,183 @@ def sync_leads(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+# Row errors kept in a streamed sync response; the rest are only counted
+MAX_REPORTED_SYNC_ERRORS = 100
+
+
+def sync_leads_stream(request):
+    """
+    Sync an NDJSON lead export without loading it into memory
+    
+    Lines are read, transformed and upserted in batches of
+    LEAD_SYNC_BATCH_SIZE leads, each committed on its own, so memory use
+    does not depend on the size of the export. The response reports the
+    progress of every batch. A malformed line stops the sync; batches
+    before it stay committed.
+    """
+    batch_size = getattr(settings, 'LEAD_SYNC_BATCH_SIZE', 1000)
+    batches = []
+    errors = []
+    totals = {'processed': 0, 'created': 0, 'updated': 0, 'errors': 0}
+    
+    def progress_response(success, message, response_status, **extra):
+        return Response({
+            'success': success,
+            'message': message,
+            'total_processed': totals['processed'],
+            'created': totals['created'],
+            'updated': totals['updated'],
+            'error_count': totals['errors'],
+            'errors': errors,
+            'batches': batches,
+            **extra,
+            'timestamp': timezone.now().isoformat()
+        }, status=response_status)
+    
+    # The raw HttpRequest is read line by line; request.data would buffer
+    # the whole body
+    stream = request._request
+    if request.META.get('HTTP_CONTENT_ENCODING', '').lower() == 'gzip':
+        stream = gzip.GzipFile(fileobj=stream, mode='rb')
+    
+    try:
+        leads = iter_creatio_leads(iter_ndjson_records(stream))
+        for batch_number, batch in enumerate(iter_batches(leads, batch_size), 1):
+            serializer = LeadSyncSerializer(data={'leads': batch})
+            serializer.is_valid(raise_exception=True)
+            result = serializer.save()
+            
+            batches.append({
+                'batch': batch_number,
+                'processed': result['total_processed'],
+                'created': len(result['created']),
+                'updated': len(result['updated']),
+                'errors': len(result['errors'])
+            })
+            totals['processed'] += result['total_processed']
+            totals['created'] += len(result['created'])
+            totals['updated'] += len(result['updated'])
+            totals['errors'] += len(result['errors'])
+            errors.extend(result['errors'][:MAX_REPORTED_SYNC_ERRORS - len(errors)])
+    
+    except NDJSONError as e:
+        return progress_response(
+            False, str(e), status.HTTP_400_BAD_REQUEST,
+            line=e.line_number
+        )
+    
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f"Streamed lead sync error after {len(batches)} batches: {str(e)}", exc_info=True)
+        
+        return progress_response(
+            False, 'Internal server error during lead sync',
+            status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    finally:
+        # Let every worker's matching snapshot pick up the synced leads
+        if totals['created'] or totals['updated']:
+            lead_snapshot.invalidate()
+    
+    if totals['errors']:
+        return progress_response(
+            False, f"Processed {totals['processed']} leads with errors",
+            status.HTTP_400_BAD_REQUEST
+        )
+    
+    return progress_response(
+        True, f"Processed {totals['processed']} leads", status.HTTP_200_OK
+    )
+
+
+class NDJSONError(ValueError):
+    """Raised for an NDJSON line that is not a JSON object"""
+    
+    def __init__(self, message, line_number):
+        super().__init__(f"{message} (line {line_number})")
+        self.line_number = line_number
+
+
+def iter_ndjson_records(stream):
+    """
+    Yield the JSON object on each non-blank line of an NDJSON stream
+    """
+    line_number = 0
+    try:
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise NDJSONError(f"Invalid JSON: {e}", line_number)
+            if not isinstance(record, dict):
+                raise NDJSONError("Expected a JSON object", line_number)
+            yield record
+    except (OSError, EOFError) as e:
+        # Corrupt or truncated gzip body
+        raise NDJSONError(f"Could not decompress request body: {e}", line_number + 1)
+
+
+def iter_batches(iterable, size):
+    """
+    Yield lists of up to size items from an iterable
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
 def transform_creatio_data(data):
     """
     Transform data from Creatio CRM format to Django format
     """
-    from django.utils import timezone
-    
     # If data is already in the correct format, return as-is
     if 'leads' in data:
         return data
     
     # Handle single lead or list of leads from Creatio
     leads_data = data if isinstance(data, list) else [data]
-    transformed_leads = []
+    return {'leads': list(iter_creatio_leads(leads_data))}
+
+
+def iter_creatio_leads(records):
+    """
+    Lazily transform Creatio lead records to Django format
     
-    for lead_data in leads_data:
-        # Map Creatio fields to Django fields
-        transformed_lead = {
-            'crm_id': lead_data.get('Id') or lead_data.get('id') or lead_data.get('crm_id'),
-            'name': lead_data.get('Name') or lead_data.get('name') or lead_data.get('ContactName', ''),
-            'email': lead_data.get('Email') or lead_data.get('email') or lead_data.get('ContactEmail', ''),
-            'company': lead_data.get('Company') or lead_data.get('company') or lead_data.get('AccountName', ''),
-            'phone': lead_data.get('Phone') or lead_data.get('phone') or lead_data.get('ContactPhone', ''),
-            'status': map_creatio_status(lead_data.get('Status') or lead_data.get('status', 'new')),
-            'source': lead_data.get('Source') or lead_data.get('source') or lead_data.get('LeadSource', ''),
-            'last_sync': timezone.now().isoformat()
-        }
-        
-        # Remove empty values
-        transformed_lead = {k: v for k, v in transformed_lead.items() if v}
-        transformed_leads.append(transformed_lead)
+    Records already wrapped as {'leads': [...]} are passed through as-is.
+    """
+    for record in records:
+        if 'leads' in record:
+            yield from record['leads']
+        else:
+            yield transform_creatio_lead(record)
+
+
+def transform_creatio_lead(lead_data):
+    """
+    Map a single Creatio lead to Django lead fields
+    """
+    transformed_lead = {
+        'crm_id': lead_data.get('Id') or lead_data.get('id') or lead_data.get('crm_id'),
+        'name': lead_data.get('Name') or lead_data.get('name') or lead_data.get('ContactName', ''),
+        'email': lead_data.get('Email') or lead_data.get('email') or lead_data.get('ContactEmail', ''),
+        'company': lead_data.get('Company') or lead_data.get('company') or lead_data.get('AccountName', ''),
+        'phone': lead_data.get('Phone') or lead_data.get('phone') or lead_data.get('ContactPhone', ''),
+        'status': map_creatio_status(lead_data.get('Status') or lead_data.get('status', 'new')),
+        'source': lead_data.get('Source') or lead_data.get('source') or lead_data.get('LeadSource', ''),
+        'last_sync': timezone.now().isoformat()
+    }
     
-    return {'leads': transformed_leads}
+    # Remove empty values
+    return {k: v for k, v in transformed_lead.items() if v}
 
 
 def map_creatio_status(creatio_status):
@@ -232,6 +392,48 @@ def match_meeting_to_lead(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['POST'])
+@permission_classes([AllowAny])  # n8n webhook endpoint
+def bulk_match_meetings(request):
+    """
+    Match a batch of meetings to leads in one call
+    Used by n8n workflow for calendar backfills
+    """
+    serializer = BulkMeetingMatchSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response({
+            'success': False,
+            'errors': serializer.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        matching_service = LeadMatchingService()
+        results = matching_service.match_meetings(
+            serializer.validated_data['meetings'],
+            include_potential_matches=serializer.validated_data['include_potential_matches'],
+            workers=settings.LEAD_MATCHING_WORKERS
+        )
+        
+        return Response({
+            'success': True,
+            'results': results,
+            'total': len(results),
+            'matched': sum(1 for result in results if result['match_found']),
+            'timestamp': timezone.now().isoformat()
+        }, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f"Bulk meeting matching error: {str(e)}", exc_info=True)
+        
+        return Response({
+            'success': False,
+            'error': 'Internal server error during meeting matching',
+            'timestamp': timezone.now().isoformat()
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_potential_matches(request):
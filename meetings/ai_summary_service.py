@@ -9,6 +9,7 @@ from django.conf import settings
 from django.utils import timezone
 from .models import CallBotSession, DraftSummary, ActionItem, MeetingSession
 from .transcription_service import TranscriptionService, MeetingSummary, ActionItem as TranscriptActionItem
+from .transcription_shards import create_transcription_service
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +20,9 @@ class AISummaryService:
     """
     
     def __init__(self, transcription_service: Optional[TranscriptionService] = None):
-        self.transcription_service = transcription_service or TranscriptionService()
+        self.transcription_service = transcription_service or create_transcription_service(
+            getattr(settings, 'TRANSCRIPTION_ENGINE', 'mock')
+        )
         self.logger = logging.getLogger(__name__)
     
     async def initialize(self, config: Optional[Dict[str, Any]] = None) -> bool:
@@ -0,0 +1,277 @@
+"""
+Asynchronous CRM clients sharing a pooled HTTP/2 connection
+Awaitable counterparts of the Salesforce, SAP C4C, Creatio and HubSpot clients
+"""
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional, Union
+
+import httpx
+from django.utils import timezone
+
+from .crm_rate_limiter import parse_retry_after
+from .crm_token_store import token_store
+from .crm_service import (
+    BaseCRMClient, SalesforceClient, SAPC4CClient, CreatioClient, HubSpotClient,
+    CRMSystem, CRMRequest, OAuth2Token,
+    CRMAuthenticationError, CRMAPIError
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCRMClientMixin:
+    """
+    Sends a CRM client's requests through a shared httpx.AsyncClient
+
+    Request building and data formatting come from the synchronous client it
+    is mixed into; waits for backoff and rate limits use asyncio.sleep, so a
+    slow CRM never blocks the event loop. Rate limiter and token store calls
+    go to Redis and run in a thread; token expiry checks are local.
+    """
+
+    def __init__(self, http: httpx.AsyncClient):
+        super().__init__()
+        self.http = http
+        self._auth_lock = asyncio.Lock()
+
+    async def _aensure_authenticated(self) -> bool:
+        """Ensure we have a valid authentication token"""
+        if not token_store.needs_refresh(self.token):
+            return True
+
+        # Concurrent requests share a single token fetch, and every client
+        # with the same credentials shares its token
+        async with self._auth_lock:
+            if not token_store.needs_refresh(self.token):
+                return True
+            self.token = await token_store.aget_token(
+                self.crm_system.value, self.get_oauth_config(), self._afetch_token
+            )
+            return True
+
+    async def _afetch_token(self) -> OAuth2Token:
+        """Fetch a new token from the CRM's token endpoint"""
+        await self._aauthenticate()
+        return self.token
+
+    async def _aauthenticate(self) -> bool:
+        """Authenticate with CRM using the OAuth2 client credentials flow"""
+        try:
+            config = self.get_oauth_config()
+
+            if not config['token_url'] or not config['client_id'] or not config['client_secret']:
+                raise CRMAuthenticationError(f"Missing {self.crm_system.value} OAuth2 credentials")
+
+            auth_data = {
+                'grant_type': 'client_credentials',
+                'client_id': config['client_id'],
+                'client_secret': config['client_secret']
+            }
+
+            # Add scope if specified
+            if config.get('scope'):
+                auth_data['scope'] = config['scope']
+
+            response = await self.http.post(config['token_url'], data=auth_data)
+            response.raise_for_status()
+
+            token_data = response.json()
+
+            # Calculate expiry time
+            expires_in = token_data.get('expires_in', 3600)
+            expires_at = timezone.now() + timedelta(seconds=expires_in - 60)  # 60s buffer
+
+            self.token = OAuth2Token(
+                access_token=token_data['access_token'],
+                refresh_token=token_data.get('refresh_token'),
+                expires_at=expires_at,
+                token_type=token_data.get('token_type', 'Bearer'),
+                scope=token_data.get('scope')
+            )
+
+            logger.info(f"Successfully authenticated with {self.crm_system.value}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Authentication failed for {self.crm_system.value}: {str(e)}")
+            raise CRMAuthenticationError(f"Authentication failed: {str(e)}")
+
+    async def _arequest(self, method: str, url: str, data: Optional[Dict] = None,
+                        params: Optional[Dict] = None, headers: Optional[Dict] = None) -> httpx.Response:
+        """Make authenticated request to CRM API with retry logic"""
+        await self._aensure_authenticated()
+
+        # Check rate limiting; the shared bucket is a blocking Redis call, so run it off the loop
+        delay = await asyncio.to_thread(self._reserve_request_slot)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        for attempt in range(self.max_retries + 1):
+            request_headers = {
+                'Authorization': f'{self.token.token_type} {self.token.access_token}',
+                'Content-Type': 'application/json',
+                'Accept': 'application/json',
+                **self.default_headers
+            }
+            if headers:
+                request_headers.update(headers)
+
+            try:
+                response = await self.http.request(
+                    method, url, json=data, params=params, headers=request_headers
+                )
+
+                await asyncio.to_thread(
+                    self.rate_limiter.observe_response, response.status_code, response.headers
+                )
+
+                # Handle rate limiting
+                if response.status_code == 429:
+                    retry_after = self._retry_after(response)
+                    logger.warning(f"Rate limited by {self.crm_system.value}, waiting {retry_after}s")
+                    await asyncio.sleep(retry_after)
+                    # The retry takes its turn behind requests from other processes
+                    delay = await asyncio.to_thread(self._reserve_request_slot)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    continue
+
+                # Handle authentication expiry
+                if response.status_code == 401:
+                    logger.warning(f"Token expired for {self.crm_system.value}, re-authenticating")
+                    await asyncio.to_thread(
+                        token_store.invalidate, self.crm_system.value, self.get_oauth_config(), self.token
+                    )
+                    self.token = None
+                    await self._aensure_authenticated()
+                    continue
+
+                response.raise_for_status()
+                return response
+
+            except httpx.HTTPError as e:
+                if attempt == self.max_retries:
+                    logger.error(f"API request failed after {self.max_retries} retries: {str(e)}")
+                    raise CRMAPIError(f"API request failed: {str(e)}")
+
+                # Exponential backoff
+                delay = min(self.base_delay * (2 ** attempt), self.max_delay)
+                logger.warning(f"API request failed (attempt {attempt + 1}), retrying in {delay}s: {str(e)}")
+                await asyncio.sleep(delay)
+
+        raise CRMAPIError("Maximum retries exceeded")
+
+    def _retry_after(self, response: httpx.Response) -> float:
+        """Seconds to wait after a 429, capped at max_delay"""
+        retry_after = parse_retry_after(response.headers)
+        if retry_after is None:
+            retry_after = self.max_delay
+        return min(retry_after, self.max_delay)
+
+    async def _aexecute(self, request: CRMRequest) -> Dict:
+        """Send a CRM request and return its result"""
+        response = await self._arequest(request.method, request.url, data=request.data)
+        if request.result is not None:
+            return request.result
+        return response.json()
+
+    async def aupdate_meeting_outcome(self, crm_record_id: str, meeting_data: Dict) -> Dict:
+        """Update CRM record with meeting outcome"""
+        formatted_data = self.format_meeting_data(meeting_data)
+        return await self._aexecute(self._update_record_request(crm_record_id, formatted_data))
+
+    async def acreate_follow_up_task(self, crm_record_id: str, task_data: Dict) -> Dict:
+        """Create follow-up task in CRM"""
+        formatted_task = self.format_task_data(task_data)
+        return await self._aexecute(self._create_task_request(crm_record_id, formatted_task))
+
+    async def aupdate_opportunity_stage(self, opportunity_id: str, stage_data: Dict) -> Dict:
+        """Update opportunity/deal stage in the CRM system"""
+        return await self._aexecute(self._opportunity_stage_request(opportunity_id, stage_data))
+
+
+class AsyncSalesforceClient(AsyncCRMClientMixin, SalesforceClient):
+    """Asynchronous Salesforce CRM API client"""
+
+
+class AsyncSAPC4CClient(AsyncCRMClientMixin, SAPC4CClient):
+    """Asynchronous SAP C4C CRM API client"""
+
+
+class AsyncCreatioClient(AsyncCRMClientMixin, CreatioClient):
+    """Asynchronous Creatio CRM API client"""
+
+
+class AsyncHubSpotClient(AsyncCRMClientMixin, HubSpotClient):
+    """Asynchronous HubSpot CRM API client"""
+
+
+class AsyncCRMService:
+    """
+    Asynchronous CRM clients for every supported system over one HTTP/2 connection pool
+
+    The pool belongs to the event loop it is used on: use it as an async
+    context manager, or keep one instance for the lifetime of a long-running
+    loop and call aclose() when done.
+    """
+
+    CLIENT_CLASSES = {
+        CRMSystem.SALESFORCE: AsyncSalesforceClient,
+        CRMSystem.SAP_C4C: AsyncSAPC4CClient,
+        CRMSystem.CREATIO: AsyncCreatioClient,
+        CRMSystem.HUBSPOT: AsyncHubSpotClient
+    }
+    MAX_CONNECTIONS = 20
+    MAX_KEEPALIVE_CONNECTIONS = 10
+    REQUEST_TIMEOUT = 30  # seconds
+
+    def __init__(self, **http_options):
+        http_options.setdefault('http2', True)
+        http_options.setdefault('timeout', self.REQUEST_TIMEOUT)
+        http_options.setdefault('limits', httpx.Limits(
+            max_connections=self.MAX_CONNECTIONS,
+            max_keepalive_connections=self.MAX_KEEPALIVE_CONNECTIONS
+        ))
+        self.http = httpx.AsyncClient(**http_options)
+        self.clients = {
+            crm_system: client_class(self.http)
+            for crm_system, client_class in self.CLIENT_CLASSES.items()
+        }
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the pooled HTTP connections"""
+        await self.http.aclose()
+
+    def get_client(self, crm_system: Union[str, CRMSystem]) -> BaseCRMClient:
+        """Get CRM client for specified system"""
+        if isinstance(crm_system, str):
+            crm_system = CRMSystem(crm_system)
+
+        if crm_system not in self.clients:
+            raise ValueError(f"Unsupported CRM system: {crm_system}")
+
+        return self.clients[crm_system]
+
+    async def update_meeting_outcomes(self, crm_systems: List[Union[str, CRMSystem]],
+                                      crm_record_id: str, meeting_data: Dict) -> List[Union[Dict, Exception]]:
+        """
+        Update the meeting outcome in several CRM systems concurrently
+
+        Returns one entry per system, in order: the client's result, or the
+        exception it raised.
+        """
+        return await asyncio.gather(
+            *(
+                self.get_client(crm_system).aupdate_meeting_outcome(crm_record_id, meeting_data)
+                for crm_system in crm_systems
+            ),
+            return_exceptions=True
+        )
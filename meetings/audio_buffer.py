@@ -0,0 +1,102 @@
+"""
+Preallocated ring buffer for queued audio
+
+Audio arriving for transcription is copied once into a per-session
+bytearray, and queued AudioChunks hold memoryview slices of it instead of
+their own bytes objects. Callers can reuse their receive buffer for the
+next frame, and queuing a chunk allocates no payload memory.
+"""
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+def int16_samples(data):
+    """
+    16-bit PCM samples of a bytes-like object as a NumPy array sharing its memory
+
+    Returns None when NumPy is not installed. A trailing odd byte is ignored.
+    """
+    if not NUMPY_AVAILABLE:
+        return None
+    return np.frombuffer(data, dtype=np.int16, count=len(data) // 2)
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size store of audio payloads, freed in any order
+
+    Each payload is stored contiguously: when it does not fit before the end
+    of the buffer, writing wraps to the start. Space is reclaimed from the
+    oldest payload once it and everything written before it are released.
+    When no space is left, write() returns None and the caller keeps a copy
+    of its own.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+        self._regions = deque()  # [start, end, released], oldest first
+        self._live: Dict[int, list] = {}  # start -> region
+        self._head = 0  # Start of the oldest unreleased payload
+        self._tail = 0  # Where the next payload goes
+        self.overflows = 0
+
+    def __len__(self) -> int:
+        """Payloads written and not yet released"""
+        return len(self._live)
+
+    def write(self, data) -> Optional[Tuple[int, memoryview]]:
+        """Copy data into the buffer, returning (offset, view of the copy), or None if full or empty"""
+        length = len(data)
+        if not length:
+            # Nothing to hold; recording an empty region would share the next payload's offset
+            return None
+        start = self._allocate(length)
+        if start is None:
+            self.overflows += 1
+            return None
+
+        end = start + length
+        self._buffer[start:end] = data
+        region = [start, end, False]
+        self._regions.append(region)
+        self._live[start] = region
+        self._tail = end
+        return start, self._view[start:end]
+
+    def release(self, offset: int):
+        """Free the payload written at offset"""
+        region = self._live.pop(offset, None)
+        if region is None:
+            return
+        region[2] = True
+
+        while self._regions and self._regions[0][2]:
+            self._regions.popleft()
+        if self._regions:
+            self._head = self._regions[0][0]
+        else:
+            self._head = self._tail = 0
+
+    def _allocate(self, length: int) -> Optional[int]:
+        if not self._live:
+            return 0 if length <= self.size else None
+        if self._tail >= self._head:
+            # Free space is after the tail and before the head
+            if self._tail + length <= self.size:
+                return self._tail
+            if length < self._head:
+                return 0
+            return None
+        # Wrapped: free space lies between the tail and the head
+        if self._tail + length < self._head:
+            return self._tail
+        return None
+
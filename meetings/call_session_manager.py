@@ -429,13 +429,14 @@ class CallSessionManager:
                     session_state.transcription_session_id
                 )
                 
+                # An unchanged transcript is the same cached string, so this is constant time
                 if transcript != session_state.partial_transcript:
                     session_state.partial_transcript = transcript
                     await self._save_session_data(session_state, final=False)
                 
                 # Update audio quality
                 transcription_status = await self.transcription_service.get_session_status(
-                    session_state.transcription_session_id
+                    session_state.transcription_session_id, include_chunks=False
                 )
                 
                 if transcription_status:
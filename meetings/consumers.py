@@ -5,6 +5,7 @@ from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import AnonymousUser
 from django.core.exceptions import ValidationError
+from performance_monitoring.prometheus_metrics import WEBSOCKET_MESSAGES
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +58,14 @@ class MeetingConsumer(AsyncWebsocketConsumer):
         
         logger.info(f"User {getattr(self.user, 'id', 'unknown')} disconnected from meeting {self.meeting_id} WebSocket (code: {close_code})")
     
+    async def websocket_receive(self, message):
+        WEBSOCKET_MESSAGES.labels(consumer='meeting', direction='received').inc()
+        await super().websocket_receive(message)
+    
+    async def send(self, text_data=None, bytes_data=None, close=False):
+        WEBSOCKET_MESSAGES.labels(consumer='meeting', direction='sent').inc()
+        await super().send(text_data=text_data, bytes_data=bytes_data, close=close)
+    
     async def receive(self, text_data):
         """
         Receive message from WebSocket with enhanced error handling
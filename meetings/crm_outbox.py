@@ -0,0 +1,481 @@
+"""
+Durable outbox for CRM synchronization operations
+
+Sync endpoints used to call the CRM inline, so every request waited on the
+CRM's latency and failed with it. They now write a CRMSyncOutboxEntry, in the
+same transaction as any CRMSyncRecord they create, and return its tracking
+ID; Celery workers drain the outbox with a concurrency limit per CRM system
+and exponential backoff between attempts. Approved sync records due for the
+same CRM are sent together through its batch API.
+"""
+import logging
+import time
+import uuid
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple, Union
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import CRMSyncOutboxEntry, CRMSyncRecord
+from .crm_service import CRMService, CRMSyncService, CRMSyncResult, CRMSyncStatus
+from .sync_rollups import SyncRollupService
+
+logger = logging.getLogger(__name__)
+
+# Failures worth another attempt; anything else (missing lead, unknown session) is final
+RETRYABLE_ERRORS = {'CRMAuthenticationError', 'CRMAPIError', 'CRMRateLimitError'}
+
+
+class CRMSyncOutbox:
+    """
+    Queue CRM sync operations and run them from Celery workers
+
+    Entries are claimed with a conditional update and a lease, so a task
+    delivered twice, or an entry found again by drain(), only runs once; an
+    entry whose worker died is picked up again when its lease runs out.
+    """
+
+    CACHE_PREFIX = "crm_outbox"
+    LEASE_TIMEOUT = 300  # Seconds a worker may hold an entry
+    BASE_RETRY_DELAY = 30  # Seconds before the first retry, doubled per attempt
+    MAX_RETRY_DELAY = 3600
+    BUSY_RETRY_DELAY = 5  # Seconds to wait when the CRM has no free worker slot
+    DRAIN_BATCH_SIZE = 100
+    SYNC_RECORD_BATCH_SIZE = 50  # sync_record entries for one CRM sent in one batch sync
+
+    def __init__(self):
+        self.max_concurrency = getattr(settings, 'CRM_OUTBOX_MAX_CONCURRENCY', 4)
+        self.max_attempts = getattr(settings, 'CRM_OUTBOX_MAX_ATTEMPTS', 5)
+
+    def enqueue(self, operation: str, crm_system: str, payload: Dict,
+                idempotency_key: Optional[str] = None) -> Tuple[CRMSyncOutboxEntry, bool]:
+        """
+        Queue an operation; returns the entry and whether it was created
+
+        An operation queued again with the same idempotency key returns the
+        existing entry instead of syncing twice. Workers are only notified
+        once the surrounding transaction commits.
+        """
+        defaults = {
+            'operation': operation,
+            'crm_system': crm_system,
+            'payload': payload,
+            'max_attempts': self.max_attempts
+        }
+        entry, created = CRMSyncOutboxEntry.objects.get_or_create(
+            idempotency_key=idempotency_key or uuid.uuid4().hex,
+            defaults=defaults
+        )
+
+        if created:
+            transaction.on_commit(lambda: self.dispatch(entry.tracking_id))
+            logger.info(f"Queued CRM {operation} to {crm_system} as {entry.tracking_id}")
+        return entry, created
+
+    def dispatch(self, tracking_id: Union[str, uuid.UUID], countdown: Optional[float] = None):
+        """Hand an entry to a worker; drain() catches entries whose message is lost"""
+        try:
+            process_crm_outbox_entry.apply_async(args=[str(tracking_id)], countdown=countdown)
+        except Exception as e:
+            logger.warning(f"Could not dispatch CRM outbox entry {tracking_id}, leaving it for the drain task: {e}")
+
+    def drain(self) -> int:
+        """
+        Dispatch every entry that is due, including those whose worker died
+
+        Returns the number of entries dispatched.
+        """
+        tracking_ids = list(
+            CRMSyncOutboxEntry.objects.filter(self._due(timezone.now())).order_by('next_attempt_at').values_list('tracking_id', flat=True)[:self.DRAIN_BATCH_SIZE]
+        )
+
+        for tracking_id in tracking_ids:
+            self.dispatch(tracking_id)
+        return len(tracking_ids)
+
+    def process(self, tracking_id: Union[str, uuid.UUID]) -> Optional[str]:
+        """
+        Run one entry if it is due and its CRM has a free slot
+
+        Returns the entry's status afterwards, or None if it does not exist.
+        """
+        try:
+            entry = CRMSyncOutboxEntry.objects.get(tracking_id=tracking_id)
+        except CRMSyncOutboxEntry.DoesNotExist:
+            logger.error(f"CRM outbox entry {tracking_id} not found")
+            return None
+
+        if not self._is_due(entry, timezone.now()):
+            # Already done, backing off, or running in another worker; its own message will come
+            return entry.status
+
+        slot = self._acquire_slot(entry.crm_system, entry.tracking_id)
+        if slot is None:
+            # The CRM is busy with other entries; try again shortly without using an attempt.
+            # Only the message that moves the entry's next attempt re-dispatches it, so
+            # duplicate messages die out instead of each polling the busy CRM.
+            if self._defer(entry, self.BUSY_RETRY_DELAY):
+                self.dispatch(entry.tracking_id, countdown=self.BUSY_RETRY_DELAY)
+            return entry.status
+
+        try:
+            if not self._claim(entry):
+                # Already done, not due yet, or running in another worker
+                return entry.status
+
+            entries = [entry]
+            if entry.operation == 'sync_record':
+                # Other approved records waiting for this CRM go out in the same batch;
+                # their own messages find them done and are ignored
+                entries += self._claim_sync_records(entry)
+
+            started = time.monotonic()
+            try:
+                results = self._execute_entries(entries)
+            except Exception as e:
+                logger.error(f"Unexpected error running CRM outbox entry {entry.tracking_id}: {str(e)}")
+                results = [{claimed.operation: CRMSyncResult(
+                    status=CRMSyncStatus.FAILED,
+                    message=f"Unexpected error: {str(e)}",
+                    error_details={'error_type': type(e).__name__}
+                )} for claimed in entries]
+
+            duration_ms = (time.monotonic() - started) * 1000
+            for claimed, claimed_results in zip(entries, results):
+                self._record_outcome(claimed, claimed_results, duration_ms)
+            return entry.status
+        finally:
+            self._release_slot(entry.crm_system, slot)
+
+    def get_status(self, tracking_id: Union[str, uuid.UUID]) -> Optional[Dict]:
+        """Status of a queued operation, for polling by tracking ID"""
+        try:
+            entry = CRMSyncOutboxEntry.objects.get(tracking_id=tracking_id)
+        except CRMSyncOutboxEntry.DoesNotExist:
+            return None
+
+        return {
+            'tracking_id': str(entry.tracking_id),
+            'operation': entry.operation,
+            'crm_system': entry.crm_system,
+            'status': entry.status,
+            'attempts': entry.attempts,
+            'max_attempts': entry.max_attempts,
+            'next_attempt_at': entry.next_attempt_at.isoformat() if entry.status == 'pending' else None,
+            'error_message': entry.error_message,
+            'results': entry.result,
+            'created_at': entry.created_at.isoformat(),
+            'completed_at': entry.completed_at.isoformat() if entry.completed_at else None
+        }
+
+    def retry_delay(self, attempts: int) -> int:
+        """Seconds to wait after a failed attempt"""
+        return min(self.BASE_RETRY_DELAY * (2 ** (attempts - 1)), self.MAX_RETRY_DELAY)
+
+    def _due(self, now) -> Q:
+        """Entries a worker may take: pending and due, or abandoned by their worker"""
+        return Q(status='pending', next_attempt_at__lte=now) | Q(status='in_progress', locked_until__lt=now)
+
+    def _is_due(self, entry: CRMSyncOutboxEntry, now) -> bool:
+        if entry.status == 'pending':
+            return entry.next_attempt_at <= now
+        return entry.status == 'in_progress' and entry.locked_until is not None and entry.locked_until < now
+
+    def _defer(self, entry: CRMSyncOutboxEntry, delay: float) -> bool:
+        """Move a due entry's next attempt back by delay seconds; False if another worker got there first"""
+        now = timezone.now()
+        deferred = CRMSyncOutboxEntry.objects.filter(self._due(now), pk=entry.pk).update(
+            status='pending',
+            next_attempt_at=now + timedelta(seconds=delay),
+            locked_until=None,
+            updated_at=now
+        )
+        entry.refresh_from_db()
+        return bool(deferred)
+
+    def _claim(self, entry: CRMSyncOutboxEntry) -> bool:
+        """Take the entry for this worker, counting an attempt"""
+        now = timezone.now()
+        claimed = CRMSyncOutboxEntry.objects.filter(self._due(now), pk=entry.pk).update(
+            status='in_progress',
+            attempts=F('attempts') + 1,
+            locked_until=now + timedelta(seconds=self.LEASE_TIMEOUT),
+            updated_at=now
+        )
+        entry.refresh_from_db()
+        return bool(claimed)
+
+    def _claim_sync_records(self, entry: CRMSyncOutboxEntry) -> List[CRMSyncOutboxEntry]:
+        """Take other due sync_record entries for the entry's CRM, up to a batch"""
+        now = timezone.now()
+        candidates = list(
+            CRMSyncOutboxEntry.objects.filter(
+                self._due(now), operation='sync_record', crm_system=entry.crm_system
+            ).exclude(pk=entry.pk).order_by('next_attempt_at').values_list('pk', flat=True)[
+                :self.SYNC_RECORD_BATCH_SIZE - 1
+            ]
+        )
+        if not candidates:
+            return []
+
+        # One conditional update claims them all; entries another worker took
+        # in the meantime keep that worker's lease and are left out
+        lease = now + timedelta(seconds=self.LEASE_TIMEOUT)
+        CRMSyncOutboxEntry.objects.filter(self._due(now), pk__in=candidates).update(
+            status='in_progress',
+            attempts=F('attempts') + 1,
+            locked_until=lease,
+            updated_at=now
+        )
+        return list(
+            CRMSyncOutboxEntry.objects.filter(pk__in=candidates, status='in_progress', locked_until=lease)
+            .order_by('next_attempt_at')
+        )
+
+    def _execute_entries(self, entries: List[CRMSyncOutboxEntry]) -> List[Dict[str, Union[CRMSyncResult, List[CRMSyncResult]]]]:
+        """Run claimed entries, returning each one's results per step"""
+        if entries[0].operation == 'sync_record':
+            sync_record_ids = [entry.payload['sync_record_id'] for entry in entries]
+            results = self._execute_sync_records(sync_record_ids)
+            return [{'sync_record': results[sync_record_id]} for sync_record_id in sync_record_ids]
+
+        return [self._execute(entry) for entry in entries]
+
+    def _execute(self, entry: CRMSyncOutboxEntry) -> Dict[str, Union[CRMSyncResult, List[CRMSyncResult]]]:
+        """Run the entry's operation, returning its results per step"""
+        payload = entry.payload
+
+        if entry.operation == 'meeting_outcome':
+            return {'meeting_sync': CRMSyncService().sync_meeting_outcome(payload['meeting_id'])}
+
+        if entry.operation == 'bulk_sync':
+            return self._execute_bulk_sync(entry)
+
+        if entry.operation == 'sync_record':
+            sync_record_id = payload['sync_record_id']
+            return {'sync_record': self._execute_sync_records([sync_record_id])[sync_record_id]}
+
+        raise ValueError(f"Unknown CRM outbox operation: {entry.operation}")
+
+    def _execute_bulk_sync(self, entry: CRMSyncOutboxEntry) -> Dict[str, Union[CRMSyncResult, List[CRMSyncResult]]]:
+        """
+        Sync meeting outcome, tasks and optionally the opportunity
+
+        Steps that already wrote to the CRM in an earlier attempt are kept as
+        they were rather than repeated, so a retry never creates tasks twice.
+        """
+        payload = entry.payload
+        crm_service = CRMService()
+        validation_session_id = payload['validation_session_id']
+        results = {}
+
+        for step, previous in entry.result.items():
+            previous_results = [
+                self._result_from_data(data) for data in (previous if isinstance(previous, list) else [previous])
+            ]
+            if any(result.status == CRMSyncStatus.SUCCESS for result in previous_results):
+                results[step] = previous_results if isinstance(previous, list) else previous_results[0]
+
+        if 'meeting_sync' not in results:
+            results['meeting_sync'] = crm_service.sync_meeting_outcome(validation_session_id, entry.crm_system)
+
+        if 'task_sync' not in results:
+            results['task_sync'] = crm_service.create_follow_up_tasks(validation_session_id, entry.crm_system)
+
+        opportunity_data = payload.get('opportunity_data') or {}
+        if payload.get('include_opportunity_update') and opportunity_data.get('opportunity_id') \
+                and 'opportunity_sync' not in results:
+            results['opportunity_sync'] = crm_service.update_opportunity_from_meeting(
+                validation_session_id, entry.crm_system,
+                opportunity_data['opportunity_id'], opportunity_data.get('stage_updates', {})
+            )
+
+        return results
+
+    def _execute_sync_records(self, sync_record_ids: List[int]) -> Dict[int, CRMSyncResult]:
+        """
+        Push approved CRM sync records to their CRMs
+
+        Records for the same CRM are synced in one sync_meeting_outcomes call,
+        so they share as few batch requests as the CRM allows.
+        """
+        sync_records = CRMSyncRecord.objects.in_bulk(sync_record_ids)
+        results = {}
+        pending = {}
+
+        for sync_record_id in sync_record_ids:
+            sync_record = sync_records.get(sync_record_id)
+            if sync_record is None:
+                results[sync_record_id] = CRMSyncResult(
+                    status=CRMSyncStatus.FAILED,
+                    message=f"CRM sync record {sync_record_id} not found"
+                )
+            elif sync_record.sync_status == 'completed':
+                results[sync_record_id] = CRMSyncResult(
+                    status=CRMSyncStatus.SUCCESS,
+                    message="Already synced",
+                    crm_record_id=sync_record.crm_record_id
+                )
+            else:
+                pending.setdefault(sync_record.crm_system, []).append(sync_record)
+
+        crm_service = CRMService() if pending else None
+        for crm_system, crm_sync_records in pending.items():
+            session_results = crm_service.sync_meeting_outcomes(
+                [sync_record.validation_session_id for sync_record in crm_sync_records], crm_system
+            )
+
+            for sync_record in crm_sync_records:
+                result = session_results[sync_record.validation_session_id]
+                results[sync_record.id] = result
+
+                # A sync served from the cache leaves the record untouched
+                if result.status == CRMSyncStatus.SUCCESS:
+                    CRMSyncRecord.objects.filter(id=sync_record.id).exclude(sync_status='completed').update(
+                        sync_status='completed',
+                        crm_record_id=result.crm_record_id or '',
+                        error_message='',
+                        synced_at=timezone.now()
+                    )
+
+        return results
+
+    def _record_outcome(self, entry: CRMSyncOutboxEntry,
+                        results: Dict[str, Union[CRMSyncResult, List[CRMSyncResult]]],
+                        duration_ms: Optional[float] = None):
+        """Complete, reschedule or fail the entry according to its results"""
+        now = timezone.now()
+        failures = [
+            result
+            for step_results in results.values()
+            for result in (step_results if isinstance(step_results, list) else [step_results])
+            if result.status != CRMSyncStatus.SUCCESS
+        ]
+
+        entry.result = {
+            step: [self._result_data(result) for result in step_results]
+            if isinstance(step_results, list) else self._result_data(step_results)
+            for step, step_results in results.items()
+        }
+        entry.locked_until = None
+        entry.error_message = '; '.join(result.message for result in failures)
+
+        if not failures:
+            entry.status = 'completed'
+            entry.completed_at = now
+        elif self._is_retryable(results) and entry.attempts < entry.max_attempts:
+            delay = self.retry_delay(entry.attempts)
+            entry.status = 'pending'
+            entry.next_attempt_at = now + timedelta(seconds=delay)
+            logger.warning(
+                f"CRM outbox entry {entry.tracking_id} failed (attempt {entry.attempts}), "
+                f"retrying in {delay}s: {entry.error_message}"
+            )
+        else:
+            entry.status = 'failed'
+            entry.completed_at = now
+            logger.error(f"CRM outbox entry {entry.tracking_id} failed after {entry.attempts} attempts: {entry.error_message}")
+
+        entry.save(update_fields=[
+            'result', 'status', 'error_message', 'next_attempt_at', 'locked_until', 'completed_at', 'updated_at'
+        ])
+
+        # Every attempt counts towards the sync health rollups
+        try:
+            SyncRollupService().record(
+                entry.crm_system, entry.operation, 'failed' if failures else 'success', now, duration_ms
+            )
+        except Exception as e:
+            logger.warning(f"Could not update sync rollups for {entry.tracking_id}: {e}")
+
+        if entry.status == 'pending':
+            self.dispatch(entry.tracking_id, countdown=(entry.next_attempt_at - now).total_seconds())
+
+    def _is_retryable(self, results: Dict[str, Union[CRMSyncResult, List[CRMSyncResult]]]) -> bool:
+        """
+        Whether another attempt could help: some step failed entirely with a
+        transient CRM error, and no step is partly written
+        """
+        retryable = False
+        for step_results in results.values():
+            step_results = step_results if isinstance(step_results, list) else [step_results]
+            failed = [result for result in step_results if result.status != CRMSyncStatus.SUCCESS]
+            if not failed:
+                continue
+            if len(failed) < len(step_results):
+                return False
+            if all((result.error_details or {}).get('error_type') in RETRYABLE_ERRORS for result in failed):
+                retryable = True
+            else:
+                return False
+        return retryable
+
+    def _acquire_slot(self, crm_system: str, tracking_id: uuid.UUID) -> Optional[int]:
+        """
+        Take one of the CRM's worker slots; None if all are taken
+
+        Slots expire with the lease, so a crashed worker cannot hold one
+        forever. Without a working cache the limit is not enforced.
+        """
+        for slot in range(self.max_concurrency):
+            try:
+                if cache.add(f"{self.CACHE_PREFIX}:slot:{crm_system}:{slot}", str(tracking_id), self.LEASE_TIMEOUT):
+                    return slot
+            except Exception as e:
+                logger.warning(f"CRM outbox concurrency limit unavailable: {e}")
+                return -1
+        return None
+
+    def _release_slot(self, crm_system: str, slot: Optional[int]):
+        if slot is None or slot < 0:
+            return
+        try:
+            cache.delete(f"{self.CACHE_PREFIX}:slot:{crm_system}:{slot}")
+        except Exception as e:
+            logger.warning(f"Could not release CRM outbox slot {crm_system}:{slot}: {e}")
+
+    def _result_data(self, result: CRMSyncResult) -> Dict:
+        return {
+            'status': result.status.value,
+            'message': result.message,
+            'crm_record_id': result.crm_record_id,
+            'error_details': result.error_details
+        }
+
+    def _result_from_data(self, data: Dict) -> CRMSyncResult:
+        return CRMSyncResult(
+            status=CRMSyncStatus(data['status']),
+            message=data['message'],
+            crm_record_id=data.get('crm_record_id'),
+            error_details=data.get('error_details')
+        )
+
+
+# Celery tasks draining the outbox
+
+@shared_task
+def process_crm_outbox_entry(tracking_id: str):
+    """
+    Celery task to run one queued CRM sync operation
+    """
+    return CRMSyncOutbox().process(tracking_id)
+
+
+@shared_task
+def drain_crm_outbox():
+    """
+    Periodic task to dispatch due and abandoned CRM outbox entries
+    """
+    try:
+        dispatched = CRMSyncOutbox().drain()
+        if dispatched:
+            logger.info(f"Dispatched {dispatched} CRM outbox entries")
+        return dispatched
+    except Exception as e:
+        logger.error(f"Error draining CRM outbox: {str(e)}")
+        return 0
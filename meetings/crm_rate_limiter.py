@@ -0,0 +1,255 @@
+"""
+Token-bucket rate limiting for CRM API clients, shared across processes
+
+Every gunicorn and Celery process used to keep its own list of request
+timestamps, so each one spent the full requests_per_minute budget and
+together they were throttled by the CRM. The bucket now lives in Redis and
+is updated atomically by a Lua script, keyed by CRM system and tenant
+credentials, so all processes calling the same CRM org share one budget.
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Refills the bucket for the time since its last update, takes one token and
+# returns how long the caller must wait for it. The balance may go negative:
+# the caller reserves a future token, so concurrent callers are spaced out at
+# the sustained rate instead of polling. A Retry-After pause (blocked_until)
+# and the rate factor from usage headers apply to every caller of the bucket.
+ACQUIRE_SCRIPT = """
+local key = KEYS[1]
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local state = redis.call('HMGET', key, 'tokens', 'updated_at', 'blocked_until', 'rate_factor')
+local rate_factor = tonumber(state[4]) or 1
+rate = rate * rate_factor
+
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate) - 1
+
+local wait = 0
+if tokens < 0 then
+    wait = -tokens / rate
+end
+local blocked_until = tonumber(state[3]) or 0
+wait = math.max(wait, blocked_until - now)
+
+redis.call('HSET', key, 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', key, ttl)
+return tostring(wait)
+"""
+
+# Pauses the bucket for ARGV[1] seconds, unless it is already paused longer
+BLOCK_SCRIPT = """
+local key = KEYS[1]
+local time = redis.call('TIME')
+local blocked_until = tonumber(time[1]) + tonumber(time[2]) / 1000000 + tonumber(ARGV[1])
+local current = tonumber(redis.call('HGET', key, 'blocked_until')) or 0
+if blocked_until > current then
+    redis.call('HSET', key, 'blocked_until', tostring(blocked_until))
+end
+redis.call('EXPIRE', key, tonumber(ARGV[2]))
+return 1
+"""
+
+SFORCE_LIMIT_INFO_PATTERN = re.compile(r'api-usage=(\d+)/(\d+)')
+
+
+class LocalTokenBucket:
+    """
+    In-process token bucket with the same semantics as ACQUIRE_SCRIPT
+
+    Used when Redis is not configured or cannot be reached, so the limit
+    still holds within one process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tokens: Optional[float] = None
+        self.updated_at = 0.0
+        self.blocked_until = 0.0
+        self.rate_factor = 1.0
+
+    def acquire(self, rate: float, capacity: float) -> float:
+        with self._lock:
+            now = time.time()
+            rate = rate * self.rate_factor
+            tokens = capacity if self.tokens is None else self.tokens
+            tokens = min(capacity, tokens + max(0.0, now - self.updated_at) * rate) - 1
+            self.tokens, self.updated_at = tokens, now
+
+            wait = -tokens / rate if tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def block(self, seconds: float):
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.time() + seconds)
+
+
+# Fallback buckets, one per limiter key
+local_buckets: Dict[str, LocalTokenBucket] = {}
+_local_buckets_lock = threading.Lock()
+
+
+def get_local_bucket(key: str) -> LocalTokenBucket:
+    with _local_buckets_lock:
+        return local_buckets.setdefault(key, LocalTokenBucket())
+
+
+class CRMRateLimiter:
+    """
+    Token bucket for one CRM system and tenant
+
+    Sustained rate and burst size are passed on each acquire, so changes to a
+    client's limits apply immediately. 429/503 responses with Retry-After
+    pause the bucket for everyone, and Salesforce's Sforce-Limit-Info usage
+    slows the sustained rate as the daily API allowance runs out.
+    """
+
+    KEY_PREFIX = 'crm_rate_limit'
+    KEY_TTL = 3600  # Idle buckets expire after an hour
+
+    # Below this share of the daily API allowance, the sustained rate is
+    # scaled down in proportion to what remains, to no less than MIN_RATE_FACTOR
+    LOW_ALLOWANCE_RATIO = 0.1
+    MIN_RATE_FACTOR = 0.1
+
+    _redis_scripts = None
+
+    def __init__(self, crm_system: str, tenant: str):
+        self.crm_system = crm_system
+        self.key = f"{self.KEY_PREFIX}:{crm_system}:{tenant}"
+        self._rate_factor = 1.0
+
+    @classmethod
+    def for_credentials(cls, crm_system: str, oauth_config: Dict[str, str]) -> 'CRMRateLimiter':
+        """Limiter keyed by the CRM org the credentials belong to, without exposing them"""
+        identity = f"{oauth_config.get('token_url', '')}|{oauth_config.get('client_id', '')}"
+        tenant = hashlib.sha256(identity.encode()).hexdigest()[:16]
+        return cls(crm_system, tenant)
+
+    def acquire(self, requests_per_minute: float, burst: int) -> float:
+        """
+        Take a token and return how many seconds to wait before sending
+        """
+        rate = requests_per_minute / 60
+        capacity = max(1, min(burst, requests_per_minute))
+
+        scripts = self._get_redis_scripts()
+        if scripts:
+            try:
+                return float(scripts[0](keys=[self.key], args=[rate, capacity, self.KEY_TTL]))
+            except Exception as e:
+                logger.warning(f"Shared rate limiter unavailable for {self.crm_system}, limiting per process: {e}")
+
+        return get_local_bucket(self.key).acquire(rate, capacity)
+
+    def block(self, seconds: float):
+        """Pause the bucket for every process, e.g. after a 429 with Retry-After"""
+        if seconds <= 0:
+            return
+
+        scripts = self._get_redis_scripts()
+        if scripts:
+            try:
+                scripts[1](keys=[self.key], args=[seconds, self.KEY_TTL])
+                return
+            except Exception as e:
+                logger.warning(f"Shared rate limiter unavailable for {self.crm_system}, limiting per process: {e}")
+
+        get_local_bucket(self.key).block(seconds)
+
+    def observe_response(self, status_code, headers):
+        """Adjust the bucket from a CRM response's rate-limit headers"""
+        if status_code in (429, 503):
+            retry_after = parse_retry_after(headers)
+            if retry_after is not None:
+                self.block(retry_after)
+
+        usage = parse_sforce_limit_info(headers)
+        if usage:
+            used, limit = usage
+            remaining_ratio = max(0.0, 1 - used / limit) if limit else 1.0
+            if remaining_ratio < self.LOW_ALLOWANCE_RATIO:
+                rate_factor = max(remaining_ratio / self.LOW_ALLOWANCE_RATIO, self.MIN_RATE_FACTOR)
+            else:
+                rate_factor = 1.0
+            self._set_rate_factor(round(rate_factor, 2))
+
+    def _set_rate_factor(self, rate_factor: float):
+        # Only write when it changes; every Salesforce response carries the header
+        if rate_factor == self._rate_factor:
+            return
+        self._rate_factor = rate_factor
+
+        if rate_factor < 1:
+            logger.warning(f"{self.crm_system} API allowance running low, sustained rate scaled to {rate_factor:.0%}")
+
+        if self._get_redis_scripts():
+            try:
+                from django_redis import get_redis_connection
+                redis = get_redis_connection('default')
+                redis.hset(self.key, 'rate_factor', rate_factor)
+                redis.expire(self.key, self.KEY_TTL)
+                return
+            except Exception as e:
+                logger.warning(f"Shared rate limiter unavailable for {self.crm_system}, limiting per process: {e}")
+
+        get_local_bucket(self.key).rate_factor = rate_factor
+
+    @classmethod
+    def _get_redis_scripts(cls) -> Optional[Tuple]:
+        """The registered (acquire, block) scripts, or None without a shared Redis"""
+        if not getattr(settings, 'CRM_RATE_LIMITER_SHARED', True):
+            return None
+
+        if cls._redis_scripts is None:
+            try:
+                from django_redis import get_redis_connection
+                redis = get_redis_connection('default')
+            except (ImportError, NotImplementedError):
+                # The cache backend is not Redis
+                cls._redis_scripts = ()
+            else:
+                cls._redis_scripts = (
+                    redis.register_script(ACQUIRE_SCRIPT),
+                    redis.register_script(BLOCK_SCRIPT)
+                )
+
+        return cls._redis_scripts or None
+
+
+def parse_retry_after(headers) -> Optional[float]:
+    """Seconds from a Retry-After header, or None if absent or an HTTP date"""
+    value = headers.get('Retry-After')
+    if not isinstance(value, str):
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def parse_sforce_limit_info(headers) -> Optional[Tuple[int, int]]:
+    """(used, limit) from a Salesforce Sforce-Limit-Info header"""
+    value = headers.get('Sforce-Limit-Info')
+    if not isinstance(value, str):
+        return None
+    match = SFORCE_LIMIT_INFO_PATTERN.search(value)
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2))
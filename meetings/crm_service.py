@@ -4,11 +4,12 @@ Supports Salesforce, SAP C4C, and Creatio CRM systems
 """
 import json
 import logging
+import re
 import time
 import base64
 import hashlib
 import secrets
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
@@ -16,15 +17,22 @@ from abc import ABC, abstractmethod
 from urllib.parse import urlencode, parse_qs, urlparse
 
 import requests
+from asgiref.sync import async_to_sync
 from django.conf import settings
 from django.core.cache import cache
 from django.utils import timezone
 from django.db import models
 
+from performance_monitoring.prometheus_metrics import CRM_REQUEST_DURATION
+from .crm_rate_limiter import CRMRateLimiter
+from .crm_token_store import token_store
 from .models import Meeting, MeetingSession, ActionItem, ValidationSession, CRMSyncRecord
 
 logger = logging.getLogger(__name__)
 
+MULTIPART_BOUNDARY_PATTERN = re.compile(r'boundary="?([^";]+)"?')
+HTTP_STATUS_LINE_PATTERN = re.compile(r'^HTTP/1\.1 (\d{3})[^\n]*$', re.MULTILINE)
+
 
 class CRMSystem(Enum):
     """Supported CRM systems"""
@@ -61,6 +69,20 @@ class OAuth2Token:
     expires_at: Optional[datetime] = None
     token_type: str = "Bearer"
     scope: Optional[str] = None
+    refresh_at: Optional[datetime] = None  # When the token store starts refreshing it
+
+
+@dataclass
+class CRMRequest:
+    """CRM API call built by a client, independent of the HTTP transport that sends it"""
+    method: str
+    url: str
+    data: Optional[Dict] = None
+    result: Optional[Dict] = None  # Returned instead of the response body when set
+    object_type: Optional[str] = None  # CRM object the request writes, for batch APIs
+    record_id: Optional[str] = None  # Record it updates; None when it creates one
+    content: Optional[bytes] = None  # Raw body sent instead of data, e.g. multipart batches
+    headers: Optional[Dict[str, str]] = None
 
 
 class CRMAuthenticationError(Exception):
@@ -83,6 +105,12 @@ class BaseCRMClient(ABC):
     Abstract base class for CRM API clients with OAuth2 authentication
     """
     
+    # Extra headers sent with every API request
+    default_headers: Dict[str, str] = {}
+    
+    # Records per call to the CRM's batch API; 1 sends every request on its own
+    max_batch_size = 1
+    
     def __init__(self, crm_system: CRMSystem):
         self.crm_system = crm_system
         self.session = requests.Session()
@@ -93,11 +121,10 @@ class BaseCRMClient(ABC):
         self.base_delay = 1  # Base delay in seconds
         self.max_delay = 60  # Maximum delay in seconds
         
-        # Rate limiting
-        self.rate_limit_delay = 0.1  # Minimum delay between requests
-        self.last_request_time = 0
-        self.requests_per_minute = 100  # Default rate limit
-        self.request_timestamps = []
+        # Rate limiting, shared by every process using the same CRM credentials
+        self.requests_per_minute = 100  # Default sustained rate limit
+        self.burst_limit = 10  # Requests that may be sent back to back
+        self._rate_limiter: Optional[CRMRateLimiter] = None
     
     @abstractmethod
     def get_oauth_config(self) -> Dict[str, str]:
@@ -116,38 +143,45 @@ class BaseCRMClient(ABC):
     
     def _check_rate_limit(self):
         """Check and enforce rate limiting"""
-        current_time = time.time()
-        
-        # Remove timestamps older than 1 minute
-        self.request_timestamps = [
-            ts for ts in self.request_timestamps 
-            if current_time - ts < 60
-        ]
-        
-        # Check if we're at the rate limit
-        if len(self.request_timestamps) >= self.requests_per_minute:
-            sleep_time = 60 - (current_time - self.request_timestamps[0])
-            if sleep_time > 0:
-                logger.warning(f"Rate limit reached for {self.crm_system.value}, sleeping for {sleep_time:.2f}s")
-                time.sleep(sleep_time)
-        
-        # Add current request timestamp
-        self.request_timestamps.append(current_time)
-        
-        # Basic delay between requests
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - time_since_last)
+        delay = self._reserve_request_slot()
+        if delay > 0:
+            time.sleep(delay)
+    
+    def _reserve_request_slot(self) -> float:
+        """
+        Reserve the next request slot under the rate limit
         
-        self.last_request_time = time.time()
+        Returns how many seconds to wait before sending. The slot is taken
+        from the token bucket shared with every other process using these
+        credentials, so callers that wait concurrently get later slots.
+        """
+        delay = self.rate_limiter.acquire(self.requests_per_minute, self.burst_limit)
+        if delay > 1:
+            logger.warning(f"Rate limit reached for {self.crm_system.value}, sleeping for {delay:.2f}s")
+        return delay
+    
+    @property
+    def rate_limiter(self) -> CRMRateLimiter:
+        """Token bucket for this CRM system and tenant"""
+        if self._rate_limiter is None:
+            self._rate_limiter = CRMRateLimiter.for_credentials(
+                self.crm_system.value, self.get_oauth_config()
+            )
+        return self._rate_limiter
     
     def _ensure_authenticated(self) -> bool:
         """Ensure we have a valid authentication token"""
-        if self.token and self.token.expires_at:
-            if timezone.now() < self.token.expires_at:
-                return True
+        if not token_store.needs_refresh(self.token):
+            return True
         
-        return self._authenticate()
+        # Reuse the token of any client with the same credentials
+        self.token = token_store.get_token(self.crm_system.value, self.get_oauth_config(), self._fetch_token)
+        return True
+    
+    def _fetch_token(self) -> OAuth2Token:
+        """Fetch a new token from the CRM's token endpoint"""
+        self._authenticate()
+        return self.token
     
     def _authenticate(self) -> bool:
         """Authenticate with CRM using OAuth2"""
@@ -198,8 +232,22 @@ class BaseCRMClient(ABC):
             logger.error(f"Authentication failed for {self.crm_system.value}: {str(e)}")
             raise CRMAuthenticationError(f"Authentication failed: {str(e)}")
     
+    def _send_request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send one HTTP request to the CRM, observing its latency"""
+        start = time.perf_counter()
+        status = 'error'
+        try:
+            response = self.session.request(method=method, url=url, **kwargs)
+            status = response.status_code
+            return response
+        finally:
+            CRM_REQUEST_DURATION.labels(
+                crm_system=self.crm_system.value, method=method, status=status
+            ).observe(time.perf_counter() - start)
+    
     def _make_request(self, method: str, url: str, data: Optional[Dict] = None, 
-                     params: Optional[Dict] = None, headers: Optional[Dict] = None) -> requests.Response:
+                     params: Optional[Dict] = None, headers: Optional[Dict] = None,
+                     content: Optional[bytes] = None) -> requests.Response:
         """Make authenticated request to CRM API with retry logic"""
         if not self._ensure_authenticated():
             raise CRMAuthenticationError(f"Failed to authenticate with {self.crm_system.value}")
@@ -218,27 +266,33 @@ class BaseCRMClient(ABC):
         
         for attempt in range(self.max_retries + 1):
             try:
-                response = self.session.request(
+                response = self._send_request(
                     method=method,
                     url=url,
                     json=data,
+                    data=content,
                     params=params,
                     headers=request_headers,
                     timeout=30
                 )
                 
+                self.rate_limiter.observe_response(response.status_code, response.headers)
+                
                 # Handle rate limiting
                 if response.status_code == 429:
                     retry_after = int(response.headers.get('Retry-After', 60))
                     logger.warning(f"Rate limited by {self.crm_system.value}, waiting {retry_after}s")
                     time.sleep(retry_after)
+                    # The retry takes its turn behind requests from other processes
+                    self._check_rate_limit()
                     continue
                 
                 # Handle authentication expiry
                 if response.status_code == 401:
                     logger.warning(f"Token expired for {self.crm_system.value}, re-authenticating")
+                    token_store.invalidate(self.crm_system.value, self.get_oauth_config(), self.token)
                     self.token = None
-                    if self._authenticate():
+                    if self._ensure_authenticated():
                         request_headers['Authorization'] = f'{self.token.token_type} {self.token.access_token}'
                         continue
                     else:
@@ -269,19 +323,121 @@ class BaseCRMClient(ABC):
         formatted_task = self.format_task_data(task_data)
         return self._create_task(crm_record_id, formatted_task)
     
-    @abstractmethod
     def _update_record(self, record_id: str, data: Dict) -> Dict:
         """Update a record in the CRM system"""
-        pass
+        return self._execute(self._update_record_request(record_id, data))
     
-    @abstractmethod
     def _create_task(self, record_id: str, task_data: Dict) -> Dict:
         """Create a task in the CRM system"""
-        pass
+        return self._execute(self._create_task_request(record_id, task_data))
     
-    @abstractmethod
     def update_opportunity_stage(self, opportunity_id: str, stage_data: Dict) -> Dict:
         """Update opportunity/deal stage in the CRM system"""
+        return self._execute(self._opportunity_stage_request(opportunity_id, stage_data))
+    
+    def _execute(self, request: CRMRequest) -> Dict:
+        """Send a CRM request and return its result"""
+        response = self._make_request(request.method, request.url, data=request.data)
+        if request.result is not None:
+            return request.result
+        return response.json()
+    
+    def update_meeting_outcomes(self, updates: List[Tuple[str, Dict]]) -> List[Union[Dict, Exception]]:
+        """
+        Update several CRM records with meeting outcomes using the CRM's batch API
+        
+        Takes (crm_record_id, meeting_data) pairs and returns one entry per
+        pair, in order: what update_meeting_outcome would have returned, or
+        the error for a record that could not be updated.
+        """
+        return self._execute_batch([
+            self._update_record_request(crm_record_id, self.format_meeting_data(meeting_data))
+            for crm_record_id, meeting_data in updates
+        ])
+    
+    def create_follow_up_tasks(self, crm_record_id: str, tasks: List[Dict]) -> List[Union[Dict, Exception]]:
+        """
+        Create several follow-up tasks in CRM using the CRM's batch API
+        
+        Returns one entry per task, in order: what create_follow_up_task
+        would have returned, or the error for a task that was not created.
+        """
+        if len(tasks) == 1:
+            # Nothing to batch; use the plain endpoint
+            try:
+                return [self.create_follow_up_task(crm_record_id, tasks[0])]
+            except (CRMAuthenticationError, CRMAPIError, CRMRateLimitError) as e:
+                return [e]
+        
+        return self._execute_batch([
+            self._create_task_request(crm_record_id, self.format_task_data(task_data))
+            for task_data in tasks
+        ])
+    
+    def _execute_batch(self, crm_requests: List[CRMRequest]) -> List[Union[Dict, Exception]]:
+        """
+        Send requests of one kind in batches of up to max_batch_size
+        
+        A record is never written twice in one batch, since batch APIs reject
+        duplicate ids. A batch the CRM rejects as a whole fails every record
+        in it; the other batches are still sent.
+        """
+        chunks = []
+        for request in crm_requests:
+            chunk = chunks[-1] if chunks else None
+            if (chunk is None or len(chunk) >= self.max_batch_size or
+                    (request.record_id and request.record_id in {r.record_id for r in chunk})):
+                chunk = []
+                chunks.append(chunk)
+            chunk.append(request)
+        
+        results = []
+        
+        for chunk in chunks:
+            try:
+                if len(chunk) == 1:
+                    results.append(self._execute(chunk[0]))
+                    continue
+                
+                batch = self._batch_request(chunk)
+                response = self._make_request(
+                    batch.method, batch.url, data=batch.data,
+                    headers=batch.headers, content=batch.content
+                )
+                chunk_results = self._parse_batch_response(chunk, response)
+                chunk_results += [
+                    CRMAPIError("No result returned in batch response")
+                ] * (len(chunk) - len(chunk_results))
+                results.extend(chunk_results)
+                
+            except (CRMAuthenticationError, CRMAPIError, CRMRateLimitError) as e:
+                logger.error(f"Batch of {len(chunk)} {self.crm_system.value} requests failed: {str(e)}")
+                results.extend([e] * len(chunk))
+        
+        return results
+    
+    def _batch_request(self, crm_requests: List[CRMRequest]) -> CRMRequest:
+        """Build the request that sends several requests through the CRM's batch API"""
+        raise NotImplementedError(f"{self.crm_system.value} has no batch API")
+    
+    def _parse_batch_response(self, crm_requests: List[CRMRequest],
+                              response: requests.Response) -> List[Union[Dict, Exception]]:
+        """Split a batch API response into one result or CRMAPIError per request"""
+        raise NotImplementedError(f"{self.crm_system.value} has no batch API")
+    
+    @abstractmethod
+    def _update_record_request(self, record_id: str, data: Dict) -> CRMRequest:
+        """Build the request that updates a record in the CRM system"""
+        pass
+    
+    @abstractmethod
+    def _create_task_request(self, record_id: str, task_data: Dict) -> CRMRequest:
+        """Build the request that creates a task in the CRM system"""
+        pass
+    
+    @abstractmethod
+    def _opportunity_stage_request(self, opportunity_id: str, stage_data: Dict) -> CRMRequest:
+        """Build the request that updates an opportunity/deal stage in the CRM system"""
         pass
     
     @abstractmethod
@@ -293,6 +449,8 @@ class BaseCRMClient(ABC):
 class SalesforceClient(BaseCRMClient):
     """Salesforce CRM API client with OAuth2 authentication"""
     
+    max_batch_size = 200  # sObject Collections limit
+    
     def __init__(self):
         super().__init__(CRMSystem.SALESFORCE)
         self.requests_per_minute = 100  # Salesforce rate limit
@@ -333,15 +491,17 @@ class SalesforceClient(BaseCRMClient):
             'OwnerId': task_data.get('owner_id')
         }
     
-    def _update_record(self, record_id: str, data: Dict) -> Dict:
+    def _update_record_request(self, record_id: str, data: Dict) -> CRMRequest:
         """Update Salesforce record"""
         instance_url = getattr(settings, 'SALESFORCE_INSTANCE_URL', '')
         url = f"{instance_url}/services/data/v58.0/sobjects/Activity/{record_id}"
         
-        response = self._make_request('PATCH', url, data=data)
-        return {'Id': record_id, 'success': True}
+        return CRMRequest(
+            'PATCH', url, data=data, result={'Id': record_id, 'success': True},
+            object_type='Activity', record_id=record_id
+        )
     
-    def _create_task(self, record_id: str, task_data: Dict) -> Dict:
+    def _create_task_request(self, record_id: str, task_data: Dict) -> CRMRequest:
         """Create Salesforce Task"""
         instance_url = getattr(settings, 'SALESFORCE_INSTANCE_URL', '')
         url = f"{instance_url}/services/data/v58.0/sobjects/Task"
@@ -349,10 +509,9 @@ class SalesforceClient(BaseCRMClient):
         # Link task to the record (could be Lead, Contact, or Opportunity)
         task_data['WhatId'] = record_id
         
-        response = self._make_request('POST', url, data=task_data)
-        return response.json()
+        return CRMRequest('POST', url, data=task_data, object_type='Task')
     
-    def update_opportunity_stage(self, opportunity_id: str, stage_data: Dict) -> Dict:
+    def _opportunity_stage_request(self, opportunity_id: str, stage_data: Dict) -> CRMRequest:
         """Update Salesforce Opportunity stage"""
         instance_url = getattr(settings, 'SALESFORCE_INSTANCE_URL', '')
         url = f"{instance_url}/services/data/v58.0/sobjects/Opportunity/{opportunity_id}"
@@ -370,8 +529,38 @@ class SalesforceClient(BaseCRMClient):
         # Remove None values
         salesforce_data = {k: v for k, v in salesforce_data.items() if v is not None}
         
-        response = self._make_request('PATCH', url, data=salesforce_data)
-        return {'Id': opportunity_id, 'success': True}
+        return CRMRequest(
+            'PATCH', url, data=salesforce_data, result={'Id': opportunity_id, 'success': True},
+            object_type='Opportunity', record_id=opportunity_id
+        )
+    
+    def _batch_request(self, crm_requests: List[CRMRequest]) -> CRMRequest:
+        """Salesforce sObject Collections request; each record succeeds or fails on its own"""
+        instance_url = getattr(settings, 'SALESFORCE_INSTANCE_URL', '')
+        url = f"{instance_url}/services/data/v58.0/composite/sobjects"
+        
+        records = []
+        for request in crm_requests:
+            record = {'attributes': {'type': request.object_type}, **request.data}
+            if request.record_id:
+                record['id'] = request.record_id
+            records.append(record)
+        
+        return CRMRequest(crm_requests[0].method, url, data={'allOrNone': False, 'records': records})
+    
+    def _parse_batch_response(self, crm_requests: List[CRMRequest],
+                              response: requests.Response) -> List[Union[Dict, Exception]]:
+        """Map sObject Collections results, which follow the request order, back to the requests"""
+        results = []
+        for request, item in zip(crm_requests, response.json()):
+            if item.get('success'):
+                results.append(request.result if request.result is not None else item)
+            else:
+                errors = '; '.join(
+                    f"{error.get('statusCode')}: {error.get('message')}" for error in item.get('errors', [])
+                )
+                results.append(CRMAPIError(f"Salesforce rejected record: {errors}"))
+        return results
     
     def get_opportunity_details(self, opportunity_id: str) -> Dict:
         """Get Salesforce Opportunity details"""
@@ -385,6 +574,8 @@ class SalesforceClient(BaseCRMClient):
 class SAPC4CClient(BaseCRMClient):
     """SAP C4C CRM API client with OAuth2 authentication"""
     
+    max_batch_size = 100  # Changesets per $batch request
+    
     def __init__(self):
         super().__init__(CRMSystem.SAP_C4C)
         self.requests_per_minute = 60  # SAP C4C rate limit
@@ -422,15 +613,17 @@ class SAPC4CClient(BaseCRMClient):
             'ActivityType': 'TASK'
         }
     
-    def _update_record(self, record_id: str, data: Dict) -> Dict:
+    def _update_record_request(self, record_id: str, data: Dict) -> CRMRequest:
         """Update SAP C4C record"""
         base_url = getattr(settings, 'SAP_C4C_BASE_URL', '')
         url = f"{base_url}/sap/c4c/odata/v1/c4codataapi/ActivityCollection('{record_id}')"
         
-        response = self._make_request('PATCH', url, data=data)
-        return {'Id': record_id, 'success': True}
+        return CRMRequest(
+            'PATCH', url, data=data, result={'Id': record_id, 'success': True},
+            object_type='ActivityCollection', record_id=record_id
+        )
     
-    def _create_task(self, record_id: str, task_data: Dict) -> Dict:
+    def _create_task_request(self, record_id: str, task_data: Dict) -> CRMRequest:
         """Create SAP C4C Task"""
         base_url = getattr(settings, 'SAP_C4C_BASE_URL', '')
         url = f"{base_url}/sap/c4c/odata/v1/c4codataapi/ActivityCollection"
@@ -438,10 +631,9 @@ class SAPC4CClient(BaseCRMClient):
         # Link task to the record
         task_data['AccountID'] = record_id
         
-        response = self._make_request('POST', url, data=task_data)
-        return response.json()
+        return CRMRequest('POST', url, data=task_data, object_type='ActivityCollection')
     
-    def update_opportunity_stage(self, opportunity_id: str, stage_data: Dict) -> Dict:
+    def _opportunity_stage_request(self, opportunity_id: str, stage_data: Dict) -> CRMRequest:
         """Update SAP C4C Opportunity stage"""
         base_url = getattr(settings, 'SAP_C4C_BASE_URL', '')
         url = f"{base_url}/sap/c4c/odata/v1/c4codataapi/OpportunityCollection('{opportunity_id}')"
@@ -459,8 +651,80 @@ class SAPC4CClient(BaseCRMClient):
         # Remove None values
         c4c_data = {k: v for k, v in c4c_data.items() if v is not None}
         
-        response = self._make_request('PATCH', url, data=c4c_data)
-        return {'Id': opportunity_id, 'success': True}
+        return CRMRequest(
+            'PATCH', url, data=c4c_data, result={'Id': opportunity_id, 'success': True},
+            object_type='OpportunityCollection', record_id=opportunity_id
+        )
+    
+    def _batch_request(self, crm_requests: List[CRMRequest]) -> CRMRequest:
+        """
+        SAP C4C OData $batch request
+        
+        Every write gets its own changeset, so a rejected record does not
+        roll back the others.
+        """
+        base_url = getattr(settings, 'SAP_C4C_BASE_URL', '')
+        service_url = f"{base_url}/sap/c4c/odata/v1/c4codataapi/"
+        batch_boundary = f"batch_{secrets.token_hex(16)}"
+        
+        lines = []
+        for request in crm_requests:
+            changeset_boundary = f"changeset_{secrets.token_hex(16)}"
+            lines += [
+                f"--{batch_boundary}",
+                f"Content-Type: multipart/mixed; boundary={changeset_boundary}",
+                "",
+                f"--{changeset_boundary}",
+                "Content-Type: application/http",
+                "Content-Transfer-Encoding: binary",
+                "",
+                f"{request.method} {request.url.replace(service_url, '', 1)} HTTP/1.1",
+                "Content-Type: application/json",
+                "Accept: application/json",
+                "",
+                json.dumps(request.data),
+                f"--{changeset_boundary}--",
+            ]
+        lines += [f"--{batch_boundary}--", ""]
+        
+        return CRMRequest(
+            'POST', f"{service_url}$batch",
+            content='\r\n'.join(lines).encode(),
+            headers={'Content-Type': f'multipart/mixed; boundary={batch_boundary}'}
+        )
+    
+    def _parse_batch_response(self, crm_requests: List[CRMRequest],
+                              response: requests.Response) -> List[Union[Dict, Exception]]:
+        """Map $batch changeset responses, which follow the request order, back to the requests"""
+        boundary = MULTIPART_BOUNDARY_PATTERN.search(response.headers.get('Content-Type', ''))
+        if not boundary:
+            raise CRMAPIError("SAP C4C $batch response is not multipart")
+        
+        # The parts between the opening and closing batch boundaries
+        text = response.text.replace('\r\n', '\n')
+        parts = text.split(f"--{boundary.group(1)}")[1:-1]
+        
+        results = []
+        for request, part in zip(crm_requests, parts):
+            status = HTTP_STATUS_LINE_PATTERN.search(part)
+            if not status:
+                results.append(CRMAPIError("Malformed SAP C4C $batch response part"))
+                continue
+            
+            # The body follows the HTTP headers and ends at the changeset boundary, if any
+            body = part[status.end():].partition('\n\n')[2].split('\n--', 1)[0].strip()
+            status_code = int(status.group(1))
+            
+            if status_code >= 400:
+                results.append(CRMAPIError(f"SAP C4C rejected record: HTTP {status_code} {body[:200]}"))
+            elif request.result is not None:
+                results.append(request.result)
+            else:
+                try:
+                    results.append(json.loads(body) if body else {})
+                except ValueError:
+                    results.append({})
+        return results
     
     def get_opportunity_details(self, opportunity_id: str) -> Dict:
         """Get SAP C4C Opportunity details"""
@@ -474,6 +738,10 @@ class SAPC4CClient(BaseCRMClient):
 class CreatioClient(BaseCRMClient):
     """Creatio CRM API client with OAuth2 authentication"""
     
+    max_batch_size = 100  # Requests per $batch request
+    
+    default_headers = {'ForceUseSession': 'true'}
+    
     def __init__(self):
         super().__init__(CRMSystem.CREATIO)
         self.requests_per_minute = 120  # Creatio rate limit
@@ -536,7 +804,8 @@ class CreatioClient(BaseCRMClient):
             raise CRMAuthenticationError(f"Authentication failed: {str(e)}")
     
     def _make_request(self, method: str, url: str, data: Optional[Dict] = None, 
-                     params: Optional[Dict] = None, headers: Optional[Dict] = None) -> requests.Response:
+                     params: Optional[Dict] = None, headers: Optional[Dict] = None,
+                     content: Optional[bytes] = None) -> requests.Response:
         """Make authenticated request to Creatio API with Bearer token"""
         if not self._ensure_authenticated():
             raise CRMAuthenticationError("Failed to authenticate with Creatio")
@@ -554,27 +823,33 @@ class CreatioClient(BaseCRMClient):
         
         for attempt in range(self.max_retries + 1):
             try:
-                response = self.session.request(
+                response = self._send_request(
                     method=method,
                     url=url,
                     json=data,
+                    data=content,
                     params=params,
                     headers=request_headers,
                     timeout=30
                 )
                 
+                self.rate_limiter.observe_response(response.status_code, response.headers)
+                
                 # Handle rate limiting
                 if response.status_code == 429:
                     retry_after = int(response.headers.get('Retry-After', 60))
                     logger.warning(f"Rate limited by {self.crm_system.value}, waiting {retry_after}s")
                     time.sleep(retry_after)
+                    # The retry takes its turn behind requests from other processes
+                    self._check_rate_limit()
                     continue
                 
                 # Handle authentication expiry
                 if response.status_code == 401:
                     logger.warning("Creatio token expired, re-authenticating")
+                    token_store.invalidate(self.crm_system.value, self.get_oauth_config(), self.token)
                     self.token = None
-                    if self._authenticate():
+                    if self._ensure_authenticated():
                         request_headers['Authorization'] = f'{self.token.token_type} {self.token.access_token}'
                         continue
                     else:
@@ -617,25 +892,26 @@ class CreatioClient(BaseCRMClient):
             'Type': {'Name': 'Task'}
         }
     
-    def _update_record(self, record_id: str, data: Dict) -> Dict:
+    def _update_record_request(self, record_id: str, data: Dict) -> CRMRequest:
         """Update Creatio record using OData"""
         base_url = getattr(settings, 'CREATIO_BASE_URL', '')
         url = f"{base_url}/0/odata/Lead({record_id})"
         
-        response = self._make_request('PATCH', url, data=data)
-        return {'Id': record_id, 'success': True}
+        return CRMRequest(
+            'PATCH', url, data=data, result={'Id': record_id, 'success': True},
+            object_type='Lead', record_id=record_id
+        )
     
-    def _create_task(self, record_id: str, task_data: Dict) -> Dict:
+    def _create_task_request(self, record_id: str, task_data: Dict) -> CRMRequest:
         """Create Creatio Activity using OData"""
         base_url = getattr(settings, 'CREATIO_BASE_URL', '')
         url = f"{base_url}/0/odata/Activity"
         
         # Link task to the account/contact
         task_data['AccountId'] = record_id
-        response = self._make_request('POST', url, data=task_data)
-        return response.json()
+        return CRMRequest('POST', url, data=task_data, object_type='Activity')
     
-    def update_opportunity_stage(self, opportunity_id: str, stage_data: Dict) -> Dict:
+    def _opportunity_stage_request(self, opportunity_id: str, stage_data: Dict) -> CRMRequest:
         """Update Creatio Opportunity stage using OData"""
         base_url = getattr(settings, 'CREATIO_BASE_URL', '')
         url = f"{base_url}/0/odata/Opportunity({opportunity_id})"
@@ -654,8 +930,59 @@ class CreatioClient(BaseCRMClient):
         # Remove None values
         creatio_data = {k: v for k, v in creatio_data.items() if v is not None}
         
-        response = self._make_request('PATCH', url, data=creatio_data)
-        return {'Id': opportunity_id, 'success': True}
+        return CRMRequest(
+            'PATCH', url, data=creatio_data, result={'Id': opportunity_id, 'success': True},
+            object_type='Opportunity', record_id=opportunity_id
+        )
+    
+    def _batch_request(self, crm_requests: List[CRMRequest]) -> CRMRequest:
+        """
+        Creatio OData 4 JSON $batch request
+        
+        Sent with continue-on-error, so a rejected record does not stop the
+        ones after it.
+        """
+        base_url = getattr(settings, 'CREATIO_BASE_URL', '')
+        odata_url = f"{base_url}/0/odata/"
+        
+        batch_data = {
+            'requests': [
+                {
+                    'id': str(index),
+                    'method': request.method,
+                    'url': request.url.replace(odata_url, '', 1),
+                    'headers': {'Content-Type': 'application/json;odata.metadata=minimal'},
+                    'body': request.data
+                }
+                for index, request in enumerate(crm_requests)
+            ]
+        }
+        
+        return CRMRequest(
+            'POST', f"{odata_url}$batch", data=batch_data,
+            headers={'Prefer': 'odata.continue-on-error'}
+        )
+    
+    def _parse_batch_response(self, crm_requests: List[CRMRequest],
+                              response: requests.Response) -> List[Union[Dict, Exception]]:
+        """Map $batch responses back to the requests by id"""
+        responses = {item.get('id'): item for item in response.json().get('responses', [])}
+        
+        results = []
+        for index, request in enumerate(crm_requests):
+            item = responses.get(str(index))
+            if item is None:
+                results.append(CRMAPIError("No result returned in batch response"))
+            elif item.get('status', 500) >= 400:
+                error = (item.get('body') or {}).get('error', {})
+                results.append(CRMAPIError(
+                    f"Creatio rejected record: HTTP {item.get('status')} {error.get('message', '')}".rstrip()
+                ))
+            elif request.result is not None:
+                results.append(request.result)
+            else:
+                results.append(item.get('body') or {})
+        return results
     
     def get_opportunity_details(self, opportunity_id: str) -> Dict:
         """Get Creatio Opportunity details using OData"""
@@ -669,6 +996,8 @@ class CreatioClient(BaseCRMClient):
 class HubSpotClient(BaseCRMClient):
     """HubSpot CRM API client with OAuth2 authentication"""
     
+    max_batch_size = 100  # Batch endpoint limit
+    
     def __init__(self):
         super().__init__(CRMSystem.HUBSPOT)
         self.requests_per_minute = 100  # HubSpot rate limit
@@ -708,7 +1037,7 @@ class HubSpotClient(BaseCRMClient):
             'hubspot_owner_id': task_data.get('owner_id')
         }
     
-    def _update_record(self, record_id: str, data: Dict) -> Dict:
+    def _update_record_request(self, record_id: str, data: Dict) -> CRMRequest:
         """Update HubSpot record"""
         # HubSpot uses different endpoints for different object types
         # Assuming this is a contact/deal record
@@ -719,10 +1048,12 @@ class HubSpotClient(BaseCRMClient):
             'properties': data
         }
         
-        response = self._make_request('PATCH', url, data=hubspot_data)
-        return response.json()
+        return CRMRequest(
+            'PATCH', url, data=hubspot_data,
+            object_type='contacts', record_id=record_id
+        )
     
-    def _create_task(self, record_id: str, task_data: Dict) -> Dict:
+    def _create_task_request(self, record_id: str, task_data: Dict) -> CRMRequest:
         """Create HubSpot Task"""
         url = "https://api.hubapi.com/crm/v3/objects/tasks"
         
@@ -737,10 +1068,9 @@ class HubSpotClient(BaseCRMClient):
             ]
         }
         
-        response = self._make_request('POST', url, data=hubspot_data)
-        return response.json()
+        return CRMRequest('POST', url, data=hubspot_data, object_type='tasks')
     
-    def update_opportunity_stage(self, opportunity_id: str, stage_data: Dict) -> Dict:
+    def _opportunity_stage_request(self, opportunity_id: str, stage_data: Dict) -> CRMRequest:
         """Update HubSpot Deal stage"""
         url = f"https://api.hubapi.com/crm/v3/objects/deals/{opportunity_id}"
         
@@ -759,8 +1089,52 @@ class HubSpotClient(BaseCRMClient):
         # Remove None values from properties
         hubspot_data['properties'] = {k: v for k, v in hubspot_data['properties'].items() if v is not None}
         
-        response = self._make_request('PATCH', url, data=hubspot_data)
-        return response.json()
+        return CRMRequest(
+            'PATCH', url, data=hubspot_data,
+            object_type='deals', record_id=opportunity_id
+        )
+    
+    def _batch_request(self, crm_requests: List[CRMRequest]) -> CRMRequest:
+        """HubSpot batch create or update request for one object type"""
+        updating = crm_requests[0].record_id is not None
+        action = 'update' if updating else 'create'
+        url = f"https://api.hubapi.com/crm/v3/objects/{crm_requests[0].object_type}/batch/{action}"
+        
+        inputs = []
+        for index, request in enumerate(crm_requests):
+            hubspot_input = dict(request.data)
+            if updating:
+                hubspot_input['id'] = request.record_id
+            else:
+                # Echoed back with the result, which is not in input order
+                hubspot_input['objectWriteTraceId'] = str(index)
+            inputs.append(hubspot_input)
+        
+        return CRMRequest('POST', url, data={'inputs': inputs})
+    
+    def _parse_batch_response(self, crm_requests: List[CRMRequest],
+                              response: requests.Response) -> List[Union[Dict, Exception]]:
+        """
+        Map HubSpot batch results back to the requests
+        
+        Updates are matched by record id and creates by objectWriteTraceId.
+        A 207 response lists the records that failed under errors.
+        """
+        updating = crm_requests[0].record_id is not None
+        body = response.json()
+        
+        outcomes = {}
+        for position, result in enumerate(body.get('results', [])):
+            key = result.get('id') if updating else result.get('objectWriteTraceId', str(position))
+            outcomes[key] = result
+        
+        for error in body.get('errors', []):
+            context = error.get('context', {})
+            for key in context.get('ids', []) + context.get('objectWriteTraceId', []):
+                outcomes[key] = CRMAPIError(f"HubSpot rejected record: {error.get('message', '')}")
+        
+        keys = [request.record_id if updating else str(index) for index, request in enumerate(crm_requests)]
+        return [outcomes.get(key, CRMAPIError("No result returned in batch response")) for key in keys]
     
     def get_opportunity_details(self, opportunity_id: str) -> Dict:
         """Get HubSpot Deal details"""
@@ -834,42 +1208,7 @@ class CRMService:
             # Update CRM
             result = client.update_meeting_outcome(meeting.lead.crm_id, meeting_data)
             
-            # Create or update CRM sync record
-            sync_record, created = CRMSyncRecord.objects.get_or_create(
-                validation_session=validation_session,
-                crm_system=crm_system.value if isinstance(crm_system, CRMSystem) else crm_system,
-                defaults={
-                    'sync_status': 'completed',
-                    'crm_record_id': result.get('Id', ''),
-                    'sync_payload': meeting_data,
-                    'synced_at': timezone.now()
-                }
-            )
-            
-            if not created:
-                sync_record.sync_status = 'completed'
-                sync_record.crm_record_id = result.get('Id', '')
-                sync_record.sync_payload = meeting_data
-                sync_record.synced_at = timezone.now()
-                sync_record.error_message = ''
-                sync_record.save()
-            
-            # Cache successful result
-            sync_result = CRMSyncResult(
-                status=CRMSyncStatus.SUCCESS,
-                message="Meeting outcome synced successfully",
-                crm_record_id=result.get('Id')
-            )
-            
-            self.cache.set(cache_key, {
-                'status': sync_result.status.value,
-                'message': sync_result.message,
-                'crm_record_id': sync_result.crm_record_id,
-                'synced_at': timezone.now().isoformat()
-            }, self.CACHE_TIMEOUT)
-            
-            logger.info(f"Successfully synced validation session {validation_session_id} to {crm_system}")
-            return sync_result
+            return self._record_meeting_sync_success(validation_session, crm_system, meeting_data, result)
             
         except ValidationSession.DoesNotExist:
             return CRMSyncResult(
@@ -877,26 +1216,7 @@ class CRMService:
                 message=f"Validation session {validation_session_id} not found"
             )
         except (CRMAuthenticationError, CRMAPIError, CRMRateLimitError) as e:
-            logger.error(f"CRM sync failed for validation session {validation_session_id}: {str(e)}")
-            
-            # Update sync record with error
-            try:
-                sync_record = CRMSyncRecord.objects.get(
-                    validation_session_id=validation_session_id,
-                    crm_system=crm_system.value if isinstance(crm_system, CRMSystem) else crm_system
-                )
-                sync_record.sync_status = 'failed'
-                sync_record.error_message = str(e)
-                sync_record.retry_count += 1
-                sync_record.save()
-            except CRMSyncRecord.DoesNotExist:
-                pass
-            
-            return CRMSyncResult(
-                status=CRMSyncStatus.FAILED,
-                message=str(e),
-                error_details={'error_type': type(e).__name__}
-            )
+            return self._record_meeting_sync_failure(validation_session_id, crm_system, e)
         except Exception as e:
             logger.error(f"Unexpected error syncing validation session {validation_session_id}: {str(e)}")
             return CRMSyncResult(
@@ -905,6 +1225,75 @@ class CRMService:
                 error_details={'error_type': type(e).__name__}
             )
     
+    def _record_meeting_sync_success(self, validation_session: ValidationSession, crm_system: Union[str, CRMSystem],
+                                     meeting_data: Dict, result: Dict) -> CRMSyncResult:
+        """
+        Store a successful meeting outcome sync in its CRM sync record and the cache
+        """
+        # Create or update CRM sync record
+        sync_record, created = CRMSyncRecord.objects.get_or_create(
+            validation_session=validation_session,
+            crm_system=crm_system.value if isinstance(crm_system, CRMSystem) else crm_system,
+            defaults={
+                'sync_status': 'completed',
+                'crm_record_id': result.get('Id', ''),
+                'sync_payload': meeting_data,
+                'synced_at': timezone.now()
+            }
+        )
+        
+        if not created:
+            sync_record.sync_status = 'completed'
+            sync_record.crm_record_id = result.get('Id', '')
+            sync_record.sync_payload = meeting_data
+            sync_record.synced_at = timezone.now()
+            sync_record.error_message = ''
+            sync_record.save()
+        
+        # Cache successful result
+        sync_result = CRMSyncResult(
+            status=CRMSyncStatus.SUCCESS,
+            message="Meeting outcome synced successfully",
+            crm_record_id=result.get('Id')
+        )
+        
+        cache_key = f"{self.CACHE_PREFIX}:validation:{validation_session.id}:{crm_system}"
+        self.cache.set(cache_key, {
+            'status': sync_result.status.value,
+            'message': sync_result.message,
+            'crm_record_id': sync_result.crm_record_id,
+            'synced_at': timezone.now().isoformat()
+        }, self.CACHE_TIMEOUT)
+        
+        logger.info(f"Successfully synced validation session {validation_session.id} to {crm_system}")
+        return sync_result
+    
+    def _record_meeting_sync_failure(self, validation_session_id: int, crm_system: Union[str, CRMSystem],
+                                     error: Exception) -> CRMSyncResult:
+        """
+        Store a failed meeting outcome sync in its CRM sync record, if one exists
+        """
+        logger.error(f"CRM sync failed for validation session {validation_session_id}: {str(error)}")
+        
+        # Update sync record with error
+        try:
+            sync_record = CRMSyncRecord.objects.get(
+                validation_session_id=validation_session_id,
+                crm_system=crm_system.value if isinstance(crm_system, CRMSystem) else crm_system
+            )
+            sync_record.sync_status = 'failed'
+            sync_record.error_message = str(error)
+            sync_record.retry_count += 1
+            sync_record.save()
+        except CRMSyncRecord.DoesNotExist:
+            pass
+        
+        return CRMSyncResult(
+            status=CRMSyncStatus.FAILED,
+            message=str(error),
+            error_details={'error_type': type(error).__name__}
+        )
+    
     def create_follow_up_tasks(self, validation_session_id: int, crm_system: Union[str, CRMSystem]) -> List[CRMSyncResult]:
         """
         Create follow-up tasks in CRM from validated action items
@@ -929,36 +1318,41 @@ class CRMService:
             
             # Get action items from validated responses
             action_items = validation_session.approved_crm_updates.get('action_items', [])
+            if not action_items:
+                return results
             
-            for action_item in action_items:
-                try:
-                    task_data = self._prepare_task_data_from_validation(action_item)
-                    
-                    result = client.create_follow_up_task(meeting.lead.crm_id, task_data)
-                    
+            # Create every task in as few batch calls as the CRM allows
+            task_data_list = [self._prepare_task_data_from_validation(item) for item in action_items]
+            try:
+                outcomes = client.create_follow_up_tasks(meeting.lead.crm_id, task_data_list)
+            except Exception as e:
+                outcomes = [e] * len(action_items)
+            
+            for action_item, outcome in zip(action_items, outcomes):
+                if isinstance(outcome, (CRMAuthenticationError, CRMAPIError, CRMRateLimitError)):
+                    logger.error(f"Failed to create follow-up task: {str(outcome)}")
                     results.append(CRMSyncResult(
-                        status=CRMSyncStatus.SUCCESS,
-                        message="Follow-up task created successfully",
-                        crm_record_id=result.get('Id')
+                        status=CRMSyncStatus.FAILED,
+                        message=str(outcome),
+                        error_details={'action_item': action_item, 'error_type': type(outcome).__name__}
                     ))
-                    
-                    logger.info(f"Created follow-up task for validation session {validation_session_id}")
-                    
-                except (CRMAuthenticationError, CRMAPIError, CRMRateLimitError) as e:
-                    logger.error(f"Failed to create follow-up task: {str(e)}")
+                elif isinstance(outcome, Exception):
+                    logger.error(f"Unexpected error creating follow-up task: {str(outcome)}")
                     results.append(CRMSyncResult(
                         status=CRMSyncStatus.FAILED,
-                        message=str(e),
+                        message=f"Unexpected error: {str(outcome)}",
                         error_details={'action_item': action_item}
                     ))
-                except Exception as e:
-                    logger.error(f"Unexpected error creating follow-up task: {str(e)}")
+                else:
                     results.append(CRMSyncResult(
-                        status=CRMSyncStatus.FAILED,
-                        message=f"Unexpected error: {str(e)}",
-                        error_details={'action_item': action_item}
+                        status=CRMSyncStatus.SUCCESS,
+                        message="Follow-up task created successfully",
+                        crm_record_id=outcome.get('Id')
                     ))
             
+            created = sum(result.status == CRMSyncStatus.SUCCESS for result in results)
+            logger.info(f"Created {created}/{len(action_items)} follow-up tasks for validation session {validation_session_id}")
+            
             return results
             
         except ValidationSession.DoesNotExist:
@@ -973,22 +1367,187 @@ class CRMService:
                 message=f"Unexpected error: {str(e)}"
             )]
     
-    def sync_to_multiple_crms(self, validation_session_id: int, crm_systems: List[Union[str, CRMSystem]]) -> Dict[str, CRMSyncResult]:
+    def sync_meeting_outcomes(self, validation_session_ids: List[int],
+                              crm_system: Union[str, CRMSystem]) -> Dict[int, CRMSyncResult]:
         """
-        Sync to multiple CRM systems simultaneously
+        Sync the validated outcomes of several meetings to one CRM system
+        
+        Outcomes not already synced go out through the CRM's batch API in as
+        few calls as it allows; results are recorded per validation session
+        as sync_meeting_outcome does.
         """
         results = {}
         
+        try:
+            client = self.get_client(crm_system)
+        except ValueError as e:
+            return {
+                validation_session_id: CRMSyncResult(status=CRMSyncStatus.FAILED, message=str(e))
+                for validation_session_id in validation_session_ids
+            }
+        
+        validation_sessions = ValidationSession.objects.select_related(
+            'draft_summary__bot_session__meeting__lead'
+        ).in_bulk(validation_session_ids)
+        
+        cache_keys = {
+            validation_session_id: f"{self.CACHE_PREFIX}:validation:{validation_session_id}:{crm_system}"
+            for validation_session_id in validation_session_ids
+        }
+        cached_results = self.cache.get_many(list(cache_keys.values()))
+        
+        pending = []
+        for validation_session_id in validation_session_ids:
+            validation_session = validation_sessions.get(validation_session_id)
+            if validation_session is None:
+                results[validation_session_id] = CRMSyncResult(
+                    status=CRMSyncStatus.FAILED,
+                    message=f"Validation session {validation_session_id} not found"
+                )
+                continue
+            
+            meeting = validation_session.draft_summary.bot_session.meeting
+            if not meeting.lead or not meeting.lead.crm_id:
+                results[validation_session_id] = CRMSyncResult(
+                    status=CRMSyncStatus.FAILED,
+                    message="No associated lead or CRM ID found"
+                )
+                continue
+            
+            # Check if already synced recently
+            cached_result = cached_results.get(cache_keys[validation_session_id])
+            if cached_result and cached_result.get('status') == CRMSyncStatus.SUCCESS.value:
+                results[validation_session_id] = CRMSyncResult(
+                    status=CRMSyncStatus.SUCCESS,
+                    message="Already synced (cached)",
+                    crm_record_id=cached_result.get('crm_record_id')
+                )
+                continue
+            
+            pending.append((validation_session, self._prepare_meeting_data_from_validation(validation_session)))
+        
+        if not pending:
+            return results
+        
+        updates = [
+            (validation_session.draft_summary.bot_session.meeting.lead.crm_id, meeting_data)
+            for validation_session, meeting_data in pending
+        ]
+        try:
+            outcomes = client.update_meeting_outcomes(updates)
+        except Exception as e:
+            outcomes = [e] * len(pending)
+        
+        for (validation_session, meeting_data), outcome in zip(pending, outcomes):
+            if isinstance(outcome, (CRMAuthenticationError, CRMAPIError, CRMRateLimitError)):
+                results[validation_session.id] = self._record_meeting_sync_failure(
+                    validation_session.id, crm_system, outcome
+                )
+            elif isinstance(outcome, Exception):
+                logger.error(f"Unexpected error syncing validation session {validation_session.id}: {str(outcome)}")
+                results[validation_session.id] = CRMSyncResult(
+                    status=CRMSyncStatus.FAILED,
+                    message=f"Unexpected error: {str(outcome)}",
+                    error_details={'error_type': type(outcome).__name__}
+                )
+            else:
+                results[validation_session.id] = self._record_meeting_sync_success(
+                    validation_session, crm_system, meeting_data, outcome
+                )
+        
+        return results
+    
+    def sync_to_multiple_crms(self, validation_session_id: int,
+                              crm_systems: List[Union[str, CRMSystem]]) -> Dict[str, CRMSyncResult]:
+        """
+        Sync to multiple CRM systems with the CRM calls running concurrently
+        
+        Database reads and writes stay synchronous; only the outbound CRM
+        requests are awaited together on AsyncCRMService's pooled client, so
+        the slowest CRM sets the latency instead of the sum of all of them.
+        Must be called from synchronous code.
+        """
+        from .async_crm_service import AsyncCRMService
+        
+        results = {}
+        
+        try:
+            validation_session = ValidationSession.objects.select_related(
+                'draft_summary__bot_session__meeting__lead'
+            ).get(id=validation_session_id)
+        except ValidationSession.DoesNotExist:
+            return {
+                (crm_system.value if isinstance(crm_system, CRMSystem) else crm_system): CRMSyncResult(
+                    status=CRMSyncStatus.FAILED,
+                    message=f"Validation session {validation_session_id} not found"
+                )
+                for crm_system in crm_systems
+            }
+        
+        meeting = validation_session.draft_summary.bot_session.meeting
+        pending_systems = []
+        
         for crm_system in crm_systems:
+            system_key = crm_system.value if isinstance(crm_system, CRMSystem) else crm_system
+            
+            if not meeting.lead or not meeting.lead.crm_id:
+                results[system_key] = CRMSyncResult(
+                    status=CRMSyncStatus.FAILED,
+                    message="No associated lead or CRM ID found"
+                )
+                continue
+            
             try:
-                result = self.sync_meeting_outcome(validation_session_id, crm_system)
-                system_key = crm_system.value if isinstance(crm_system, CRMSystem) else crm_system
-                results[system_key] = result
-            except Exception as e:
-                system_key = crm_system.value if isinstance(crm_system, CRMSystem) else crm_system
+                CRMSystem(system_key)
+            except ValueError:
+                results[system_key] = CRMSyncResult(
+                    status=CRMSyncStatus.FAILED,
+                    message=f"Failed to sync to {system_key}: Unsupported CRM system: {system_key}"
+                )
+                continue
+            
+            # Check if already synced recently
+            cache_key = f"{self.CACHE_PREFIX}:validation:{validation_session_id}:{crm_system}"
+            cached_result = self.cache.get(cache_key)
+            if cached_result and cached_result.get('status') == CRMSyncStatus.SUCCESS.value:
+                results[system_key] = CRMSyncResult(
+                    status=CRMSyncStatus.SUCCESS,
+                    message="Already synced (cached)",
+                    crm_record_id=cached_result.get('crm_record_id')
+                )
+                continue
+            
+            pending_systems.append(crm_system)
+        
+        if not pending_systems:
+            return results
+        
+        meeting_data = self._prepare_meeting_data_from_validation(validation_session)
+        
+        async def update_all():
+            async with AsyncCRMService() as async_service:
+                return await async_service.update_meeting_outcomes(
+                    pending_systems, meeting.lead.crm_id, meeting_data
+                )
+        
+        outcomes = async_to_sync(update_all)()
+        
+        for crm_system, outcome in zip(pending_systems, outcomes):
+            system_key = crm_system.value if isinstance(crm_system, CRMSystem) else crm_system
+            if isinstance(outcome, (CRMAuthenticationError, CRMAPIError, CRMRateLimitError)):
+                results[system_key] = self._record_meeting_sync_failure(
+                    validation_session_id, crm_system, outcome
+                )
+            elif isinstance(outcome, Exception):
+                logger.error(f"Unexpected error syncing validation session {validation_session_id}: {str(outcome)}")
                 results[system_key] = CRMSyncResult(
                     status=CRMSyncStatus.FAILED,
-                    message=f"Failed to sync to {system_key}: {str(e)}"
+                    message=f"Unexpected error: {str(outcome)}",
+                    error_details={'error_type': type(outcome).__name__}
+                )
+            else:
+                results[system_key] = self._record_meeting_sync_success(
+                    validation_session, crm_system, meeting_data, outcome
                 )
         
         return results
@@ -1237,10 +1796,11 @@ class CRMSyncService:
     Delegates to the new CRMService with appropriate conversions
     """
     
+    # Default to Creatio for backward compatibility
+    default_crm_system = CRMSystem.CREATIO
+    
     def __init__(self):
         self.crm_service = CRMService()
-        # Default to Creatio for backward compatibility
-        self.default_crm_system = CRMSystem.CREATIO
     
     def sync_meeting_outcome(self, meeting_id: int) -> CRMSyncResult:
         """
@@ -0,0 +1,267 @@
+"""
+Shared OAuth2 token store for CRM clients
+
+CRMService and CRMSyncService are built per request and per Celery task, and
+every new client used to fetch its own client-credentials token, adding a
+token round trip to almost every sync. Tokens are now kept per process and in
+the cache, keyed by CRM system and credentials, so a token fetched by one
+worker is reused by every worker until shortly before it expires.
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Iterable, Optional
+
+from django.core.cache import cache
+from django.utils import timezone
+
+if TYPE_CHECKING:
+    from .crm_service import OAuth2Token
+
+logger = logging.getLogger(__name__)
+
+
+class CRMTokenStore:
+    """
+    Process-wide and cache-backed OAuth2 tokens, one per CRM system and credentials
+
+    Tokens are refreshed REFRESH_MARGIN seconds before they expire, by a
+    single caller: others keep using the current token meanwhile, or wait
+    for the new one once it has expired, instead of all hitting the token
+    endpoint at once. Without a working cache, tokens are shared within the
+    process only.
+    """
+
+    KEY_PREFIX = 'crm_oauth_token'
+    REFRESH_MARGIN = 300  # Seconds before expiry a token is refreshed
+    LOCK_TIMEOUT = 30  # Seconds one refresh may hold the cross-process lock
+    WAIT_TIMEOUT = 10  # Seconds to wait for a refresh by another process
+    POLL_INTERVAL = 0.1
+    STATS_FLUSH_INTERVAL = 60  # Seconds between writes of the counters to the cache
+
+    def __init__(self):
+        self._tokens = {}
+        self._refresh_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        # Authentications avoided and tokens fetched, per (crm_system, event)
+        self.counts = Counter()
+        self._pending_counts = Counter()
+        self._counts_flushed_at = time.monotonic()
+
+    def key_for(self, crm_system: str, oauth_config: Dict[str, str]) -> str:
+        """Cache key for the credentials, without exposing them"""
+        identity = '|'.join(
+            str(oauth_config.get(field, '')) for field in ('token_url', 'client_id', 'client_secret', 'scope')
+        )
+        return f"{self.KEY_PREFIX}:{crm_system}:{hashlib.sha256(identity.encode()).hexdigest()[:32]}"
+
+    def get_token(self, crm_system: str, oauth_config: Dict[str, str],
+                  fetch: Callable[[], 'OAuth2Token']) -> 'OAuth2Token':
+        """
+        Return a token for the credentials, calling fetch only when none is usable
+        """
+        key = self.key_for(crm_system, oauth_config)
+
+        token = self.lookup(key)
+        if token and not self.needs_refresh(token):
+            self.record(crm_system, 'avoided')
+            return token
+
+        with self._refresh_lock(key):
+            # Another thread may have refreshed while we waited for the lock
+            token = self.lookup(key)
+            if token and not self.needs_refresh(token):
+                self.record(crm_system, 'avoided')
+                return token
+
+            if not self._begin_refresh(key):
+                # Another process is refreshing: keep using the current token
+                # while it is valid, otherwise wait for the new one
+                deadline = time.monotonic() + self.WAIT_TIMEOUT
+                while not self.is_valid(token) and time.monotonic() < deadline:
+                    time.sleep(self.POLL_INTERVAL)
+                    token = self.lookup(key)
+                if self.is_valid(token):
+                    self.record(crm_system, 'avoided')
+                    return token
+
+            try:
+                token = fetch()
+                self.store(key, token)
+                self.record(crm_system, 'fetched')
+                return token
+            finally:
+                self._end_refresh(key)
+
+    async def aget_token(self, crm_system: str, oauth_config: Dict[str, str],
+                         fetch: Callable[[], Awaitable['OAuth2Token']]) -> 'OAuth2Token':
+        """
+        Awaitable get_token for async clients
+
+        Callers on one event loop are expected to serialize their refreshes
+        themselves, e.g. with an asyncio.Lock per client. Cache calls, including
+        the periodic stats flush, run in a thread, so a slow cache does not
+        stall the event loop.
+        """
+        key = self.key_for(crm_system, oauth_config)
+
+        token = await asyncio.to_thread(self.lookup, key)
+        if token and not self.needs_refresh(token):
+            await asyncio.to_thread(self.record, crm_system, 'avoided')
+            return token
+
+        if not await asyncio.to_thread(self._begin_refresh, key):
+            deadline = time.monotonic() + self.WAIT_TIMEOUT
+            while not self.is_valid(token) and time.monotonic() < deadline:
+                await asyncio.sleep(self.POLL_INTERVAL)
+                token = await asyncio.to_thread(self.lookup, key)
+            if self.is_valid(token):
+                await asyncio.to_thread(self.record, crm_system, 'avoided')
+                return token
+
+        try:
+            token = await fetch()
+            await asyncio.to_thread(self.store, key, token)
+            await asyncio.to_thread(self.record, crm_system, 'fetched')
+            return token
+        finally:
+            await asyncio.to_thread(self._end_refresh, key)
+
+    def lookup(self, key: str) -> Optional['OAuth2Token']:
+        """The stored token for a key, from this process or the cache"""
+        token = self._tokens.get(key)
+        if token and not self.needs_refresh(token):
+            return token
+
+        try:
+            shared_token = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Shared token store unavailable, caching tokens per process: {e}")
+            return token
+
+        if shared_token and self.is_valid(shared_token):
+            self._tokens[key] = shared_token
+            return shared_token
+        return token if self.is_valid(token) else None
+
+    def store(self, key: str, token: 'OAuth2Token'):
+        """Keep a token for this process and every other one"""
+        self._tokens[key] = token
+
+        if not token.expires_at:
+            return
+        lifetime = token.expires_at - timezone.now()
+        if lifetime.total_seconds() <= 0:
+            return
+        if token.refresh_at is None:
+            # Short-lived tokens are refreshed halfway through their lifetime instead
+            token.refresh_at = token.expires_at - min(timedelta(seconds=self.REFRESH_MARGIN), lifetime / 2)
+
+        timeout = int(lifetime.total_seconds())
+        try:
+            cache.set(key, token, timeout)
+        except Exception as e:
+            logger.warning(f"Shared token store unavailable, caching tokens per process: {e}")
+
+    def invalidate(self, crm_system: str, oauth_config: Dict[str, str], token: Optional['OAuth2Token']):
+        """Drop a token the CRM rejected, unless it was already replaced"""
+        key = self.key_for(crm_system, oauth_config)
+        if token is None:
+            return
+
+        if getattr(self._tokens.get(key), 'access_token', None) == token.access_token:
+            self._tokens.pop(key, None)
+        try:
+            shared_token = cache.get(key)
+            if getattr(shared_token, 'access_token', None) == token.access_token:
+                cache.delete(key)
+        except Exception as e:
+            logger.warning(f"Shared token store unavailable, caching tokens per process: {e}")
+
+    def clear(self):
+        """Forget this process's tokens"""
+        with self._lock:
+            self._tokens.clear()
+
+    def needs_refresh(self, token: Optional['OAuth2Token']) -> bool:
+        """Whether a token is missing, expired or about to expire"""
+        if not token or not token.expires_at:
+            return True
+        refresh_at = token.refresh_at or token.expires_at - timedelta(seconds=self.REFRESH_MARGIN)
+        return timezone.now() >= refresh_at
+
+    def is_valid(self, token: Optional['OAuth2Token']) -> bool:
+        """Whether a token can still be sent"""
+        return bool(token and token.expires_at and timezone.now() < token.expires_at)
+
+    def _refresh_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._refresh_locks.setdefault(key, threading.Lock())
+
+    def _begin_refresh(self, key: str) -> bool:
+        """Take the cross-process refresh lock; True if this caller should fetch"""
+        try:
+            return cache.add(f"{key}:refreshing", 1, self.LOCK_TIMEOUT)
+        except Exception:
+            return True
+
+    def _end_refresh(self, key: str):
+        try:
+            cache.delete(f"{key}:refreshing")
+        except Exception:
+            pass
+
+    def record(self, crm_system: str, event: str):
+        """Count an authentication avoided or a token fetched"""
+        with self._lock:
+            self.counts[(crm_system, event)] += 1
+            self._pending_counts[(crm_system, event)] += 1
+            if time.monotonic() - self._counts_flushed_at < self.STATS_FLUSH_INTERVAL:
+                return
+            pending = self._take_pending_counts()
+        self._flush_counts(pending)
+
+    def get_stats(self, crm_systems: Iterable[str]) -> Dict[str, Dict[str, int]]:
+        """
+        Authentications avoided and tokens fetched per CRM system, across processes
+        """
+        with self._lock:
+            pending = self._take_pending_counts()
+        self._flush_counts(pending)
+
+        stats = {}
+        for crm_system in crm_systems:
+            keys = {event: f"{self.KEY_PREFIX}:stats:{crm_system}:{event}" for event in ('avoided', 'fetched')}
+            try:
+                totals = cache.get_many(list(keys.values()))
+                counts = {event: totals.get(key, 0) for event, key in keys.items()}
+            except Exception:
+                counts = {event: self.counts[(crm_system, event)] for event in keys}
+            stats[crm_system] = {
+                'authentications_avoided': counts['avoided'],
+                'tokens_fetched': counts['fetched']
+            }
+        return stats
+
+    def _take_pending_counts(self) -> Counter:
+        pending, self._pending_counts = self._pending_counts, Counter()
+        self._counts_flushed_at = time.monotonic()
+        return pending
+
+    def _flush_counts(self, pending: Counter):
+        for (crm_system, event), count in pending.items():
+            key = f"{self.KEY_PREFIX}:stats:{crm_system}:{event}"
+            try:
+                if not cache.add(key, count, None):
+                    cache.incr(key, count)
+            except Exception as e:
+                logger.debug(f"Could not record token store stats: {e}")
+
+
+# Shared by every CRM client in the process
+token_store = CRMTokenStore()
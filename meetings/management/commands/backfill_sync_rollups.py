@@ -0,0 +1,114 @@
+"""
+Management command to build sync health rollups from existing CRM sync records
+
+Live rollups, written by the outbox and SyncTracker as operations finish, are
+the source of truth from the first UTC day they cover. This command only
+fills 'sync_record' counts for the days before that cutoff, since records
+synced after it were already counted live.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Min
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from meetings.models import CRMSyncRecord, SyncRollup
+from meetings.sync_rollups import SyncRollupService, bucket_start
+
+# Sync record statuses that are final outcomes; pending and retrying records are counted once they finish
+OUTCOMES = {'completed': 'success', 'failed': 'failed'}
+
+OPERATION = 'sync_record'
+
+
+class Command(BaseCommand):
+    help = 'Backfill minute/hour/day sync health rollups from CRMSyncRecord history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help="Delete backfilled 'sync_record' rollups before the cutoff first, so running the backfill twice "
+                 "does not double count; live rollups are kept"
+        )
+
+        parser.add_argument(
+            '--until',
+            help='Backfill records before this date or datetime, rounded down to a UTC day '
+                 '(default: the first day with live rollups)'
+        )
+
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Sync records applied per transaction (default: 5000)'
+        )
+
+    def handle(self, *args, **options):
+        service = SyncRollupService()
+        cutoff = self._cutoff(options['until'], options['reset'])
+        before_cutoff = {'bucket_start__lt': cutoff} if cutoff else {}
+
+        backfilled = SyncRollup.objects.filter(operation=OPERATION, **before_cutoff)
+        if not options['reset'] and backfilled.exists():
+            raise CommandError(
+                f"'{OPERATION}' rollups already exist before {cutoff or 'now'}; use --reset to rebuild them"
+            )
+
+        records = CRMSyncRecord.objects.filter(sync_status__in=OUTCOMES).annotate(
+            finished_at=Coalesce('synced_at', 'created_at')
+        )
+        if cutoff:
+            records = records.filter(finished_at__lt=cutoff)
+        records = records.values_list('crm_system', 'sync_status', 'finished_at').order_by('id')
+
+        with transaction.atomic():
+            if options['reset']:
+                deleted, _ = backfilled.delete()
+                self.stdout.write(f"Deleted {deleted} backfilled rollups")
+
+            batch = []
+            counted = 0
+            # Records carry no API latency, so backfilled buckets only hold counts
+            for crm_system, sync_status, finished_at in records.iterator(chunk_size=options['batch_size']):
+                batch.append((crm_system, OPERATION, OUTCOMES[sync_status], finished_at, None))
+                if len(batch) >= options['batch_size']:
+                    service.record_many(batch)
+                    counted += len(batch)
+                    batch = []
+            if batch:
+                service.record_many(batch)
+                counted += len(batch)
+
+        until = f" before {cutoff.isoformat()}" if cutoff else ""
+        self.stdout.write(self.style.SUCCESS(f"Backfilled rollups from {counted} sync records{until}"))
+
+    def _cutoff(self, until, reset):
+        """
+        UTC midnight before which records are backfilled, or None for all of them
+
+        Days are whole so no bucket of any granularity mixes backfilled and
+        live counts. Without --until, this is the first day holding a live
+        rollup. When resetting, existing 'sync_record' rollups may be from an
+        earlier backfill, so only the other operations mark the live period.
+        """
+        if until:
+            parsed = parse_datetime(until)
+            if parsed is None:
+                day = parse_date(until)
+                if day is None:
+                    raise CommandError(f"Invalid --until: {until}")
+                parsed = datetime(day.year, day.month, day.day, tzinfo=dt_timezone.utc)
+            if timezone.is_naive(parsed):
+                parsed = timezone.make_aware(parsed, dt_timezone.utc)
+            return bucket_start(parsed, 'day')
+
+        live = SyncRollup.objects.all()
+        if reset:
+            live = live.exclude(operation=OPERATION)
+        first_live = live.aggregate(first=Min('bucket_start'))['first']
+        return bucket_start(first_live, 'day') if first_live else None
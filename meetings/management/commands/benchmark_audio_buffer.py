@@ -0,0 +1,127 @@
+"""
+Management command to benchmark the transcription audio path with many concurrent streams
+"""
+import asyncio
+import gc
+import os
+import time
+import tracemalloc
+from django.core.management.base import BaseCommand
+from meetings.transcription_service import TranscriptionService
+
+
+class Command(BaseCommand):
+    help = 'Benchmark queuing audio through per-session ring buffers against a bytes copy per frame'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--streams',
+            type=int,
+            default=100,
+            help='Concurrent audio streams (default: 100)'
+        )
+
+        parser.add_argument(
+            '--frame-ms',
+            type=int,
+            default=20,
+            help='Audio per frame in milliseconds, 16 kHz 16-bit mono (default: 20)'
+        )
+
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5.0,
+            help='Seconds per method (default: 5)'
+        )
+
+    def handle(self, *args, **options):
+        frame_seconds = options['frame_ms'] / 1000
+        frame_bytes = int(16000 * frame_seconds) * 2
+        self.stdout.write(
+            f"{options['streams']} streams, {frame_bytes} byte frames, {options['duration']:.0f}s per method"
+        )
+
+        for label, use_ring in (('bytes copy', False), ('ring buffer', True)):
+            result = asyncio.run(self._run(use_ring, options['streams'], frame_bytes, frame_seconds, options['duration']))
+            self.stdout.write(
+                f"{label:<12} {result['frames'] / result['seconds']:10.0f} frames/s  "
+                f"{result['allocated'] / result['seconds'] / 1024 / 1024:8.1f} MB/s payload copies  "
+                f"peak {result['peak'] / 1024 / 1024:6.1f} MB  "
+                f"{result['collections']} GCs, {result['gc_total'] * 1000:.1f} ms total, "
+                f"{result['gc_max'] * 1000:.2f} ms max"
+            )
+
+    async def _run(self, use_ring, streams, frame_bytes, frame_seconds, duration):
+        service = TranscriptionService(engine_type='mock')
+        await service.initialize({})
+        service.engine.transcribe_batch = self._consume
+        # The frames are random noise; measure the audio path, not silence skipping
+        service.voice_activity = None
+        if not use_ring:
+            service.AUDIO_BUFFER_SIZE = 0
+        for index in range(streams):
+            await service.start_transcription(f'bench_{index}', f'stream_{index}')
+
+        frames = 0
+        allocated = 0
+        pauses = []
+        started = {}
+
+        def on_gc(phase, info):
+            if phase == 'start':
+                started['at'] = time.perf_counter()
+            elif 'at' in started:
+                pauses.append(time.perf_counter() - started.pop('at'))
+
+        async def produce(session_id):
+            nonlocal frames, allocated
+            # Reused for every frame, like a socket receive buffer
+            receive_buffer = bytearray(os.urandom(frame_bytes))
+            timestamp = 0.0
+            while time.perf_counter() < stop_at:
+                if use_ring:
+                    payload = receive_buffer
+                else:
+                    # Without the ring, each queued frame needs its own immutable copy
+                    payload = bytes(receive_buffer)
+                    allocated += len(payload)
+                await service.process_audio_chunk(session_id, payload, timestamp, frame_seconds)
+                timestamp += frame_seconds
+                frames += 1
+                await asyncio.sleep(0)
+
+        tracemalloc.start()
+        gc.callbacks.append(on_gc)
+        start = time.perf_counter()
+        stop_at = start + duration
+        try:
+            await asyncio.gather(*(produce(f'bench_{index}') for index in range(streams)))
+        finally:
+            seconds = time.perf_counter() - start
+            gc.callbacks.remove(on_gc)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            # Chunks that overflowed a ring were copied into bytes instead
+            allocated += sum(buffer.overflows for buffer in service.audio_buffers.values()) * frame_bytes
+            await service.cleanup()
+
+        return {
+            'frames': frames,
+            'seconds': seconds,
+            'allocated': allocated,
+            'peak': peak,
+            'collections': len(pauses),
+            'gc_total': sum(pauses),
+            'gc_max': max(pauses, default=0.0),
+        }
+
+    async def _consume(self, audio_chunks):
+        """Stand-in engine reading every chunk's audio, as a level meter would"""
+        for audio_chunk in audio_chunks:
+            samples = audio_chunk.samples()
+            if samples is None:
+                max(audio_chunk.audio_data)
+            else:
+                samples.max()
+        return []
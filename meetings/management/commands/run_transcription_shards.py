@@ -0,0 +1,89 @@
+"""
+Management command to run transcription shard workers
+"""
+import asyncio
+import multiprocessing
+import signal
+
+import redis.asyncio as aioredis
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from meetings.transcription_service import TranscriptionService
+from meetings.transcription_shards import TranscriptionShardWorker
+
+
+class Command(BaseCommand):
+    help = 'Run the worker processes that ShardedTranscriptionService routes transcription sessions to'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--shards',
+            type=int,
+            default=settings.TRANSCRIPTION_SHARDS,
+            help='Number of shards (default: TRANSCRIPTION_SHARDS)'
+        )
+
+        parser.add_argument(
+            '--shard',
+            type=int,
+            help='Run only this shard in the current process, e.g. one per container'
+        )
+
+        parser.add_argument(
+            '--engine',
+            default=settings.TRANSCRIPTION_ENGINE,
+            choices=['mock', 'gemini'],
+            help='Transcription engine (default: TRANSCRIPTION_ENGINE)'
+        )
+
+    def handle(self, *args, **options):
+        shards = options['shards']
+        if shards < 1:
+            raise CommandError('Set --shards or TRANSCRIPTION_SHARDS to at least 1')
+
+        if options['shard'] is not None:
+            if not 0 <= options['shard'] < shards:
+                raise CommandError(f"--shard must be between 0 and {shards - 1}")
+            self._run_shard(options['shard'], options['engine'])
+            return
+
+        # Forked before any event loop or Redis connection exists in the parent
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=self._run_shard, args=(shard, options['engine']), name=f'transcription-shard-{shard}')
+            for shard in range(shards)
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f"Started {shards} transcription shards with the {options['engine']} engine")
+
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
+
+        self.stdout.write(self.style.SUCCESS('Transcription shards stopped'))
+
+    def _run_shard(self, shard, engine):
+        asyncio.run(self._serve(shard, engine))
+
+    async def _serve(self, shard, engine):
+        service = TranscriptionService(engine_type=engine)
+        if not await service.initialize({'gemini_api_key': settings.GEMINI_API_KEY}):
+            raise CommandError(f"Transcription shard {shard} could not initialize the {engine} engine")
+
+        redis_client = aioredis.from_url(settings.REDIS_URL)
+        worker = TranscriptionShardWorker(shard, service, redis_client)
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, worker.stop)
+
+        try:
+            await worker.run()
+        finally:
+            await redis_client.aclose()
@@ -0,0 +1,192 @@
+"""
+Management command to stress-test the shared CRM rate limiter against a local stub CRM
+"""
+import json
+import multiprocessing
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import override_settings
+
+from meetings.crm_rate_limiter import CRMRateLimiter
+from meetings.crm_service import SalesforceClient, CRMAPIError
+
+
+class StubCRM:
+    """
+    Salesforce-like API that enforces its own token bucket
+
+    Requests over the limit get a 429 with Retry-After, and every response
+    carries Sforce-Limit-Info, like the real API.
+    """
+
+    def __init__(self, requests_per_minute, burst, daily_limit):
+        self.rate = requests_per_minute / 60
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.daily_limit = daily_limit
+        self.accepted = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def admit(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self.accepted += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if self.path.endswith('/oauth2/token'):
+                    self._respond(200, {'access_token': 'stub-token', 'expires_in': 3600})
+                else:
+                    self._api()
+
+            def do_PATCH(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                self._api()
+
+            def _api(self):
+                if stub.admit():
+                    self._respond(204)
+                else:
+                    self._respond(429, [{'errorCode': 'REQUEST_LIMIT_EXCEEDED'}], {'Retry-After': '1'})
+
+            def _respond(self, status, body=None, headers=None):
+                payload = json.dumps(body).encode() if body is not None else b''
+                self.send_response(status)
+                self.send_header('Sforce-Limit-Info', f'api-usage={stub.accepted}/{stub.daily_limit}')
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                if payload:
+                    self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def run_worker(worker_settings, requests, requests_per_minute, burst):
+    """Send opportunity updates from one process; returns the number that failed"""
+    # Connections inherited from the parent must not be shared across the fork
+    CRMRateLimiter._redis_scripts = None
+
+    failed = 0
+    with override_settings(**worker_settings):
+        client = SalesforceClient()
+        client.requests_per_minute = requests_per_minute
+        client.burst_limit = burst
+        client.max_retries = 10
+        for i in range(requests):
+            try:
+                client.update_opportunity_stage(f'006STRESS{i}', {'stage_name': 'Negotiation'})
+            except CRMAPIError:
+                failed += 1
+    return failed
+
+
+class Command(BaseCommand):
+    help = 'Stress-test the CRM rate limiter with several worker processes against a local stub CRM'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Worker processes sending requests (default: 4)'
+        )
+
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help='Requests per worker (default: 50)'
+        )
+
+        parser.add_argument(
+            '--rpm',
+            type=int,
+            default=600,
+            help='Sustained requests per minute allowed by the stub CRM and the limiter (default: 600)'
+        )
+
+        parser.add_argument(
+            '--burst',
+            type=int,
+            default=10,
+            help='Burst size allowed by the stub CRM and the limiter (default: 10)'
+        )
+
+        parser.add_argument(
+            '--daily-limit',
+            type=int,
+            default=100000,
+            help='Daily API allowance reported in Sforce-Limit-Info (default: 100000)'
+        )
+
+        parser.add_argument(
+            '--local',
+            action='store_true',
+            help='Limit each process on its own instead of through Redis, for comparison'
+        )
+
+    def handle(self, *args, **options):
+        stub = StubCRM(options['rpm'], options['burst'], options['daily_limit'])
+        server = ThreadingHTTPServer(('127.0.0.1', 0), stub.handler())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        # A fresh client id gives each run its own bucket
+        worker_settings = {
+            'SALESFORCE_INSTANCE_URL': f'http://127.0.0.1:{server.server_port}',
+            'SALESFORCE_CLIENT_ID': f'stress-{uuid.uuid4().hex[:8]}',
+            'SALESFORCE_CLIENT_SECRET': 'stress',
+            'CRM_RATE_LIMITER_SHARED': not options['local'],
+        }
+        mode = 'per process' if options['local'] else 'shared through Redis'
+        self.stdout.write(
+            f"{options['workers']} workers x {options['requests']} requests, "
+            f"limit {options['rpm']}/min burst {options['burst']}, {mode}"
+        )
+
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        start_time = time.time()
+        try:
+            with context.Pool(options['workers']) as pool:
+                failed = pool.starmap(run_worker, [
+                    (worker_settings, options['requests'], options['rpm'], options['burst'])
+                ] * options['workers'])
+        finally:
+            server.shutdown()
+        elapsed = time.time() - start_time
+
+        total = options['workers'] * options['requests']
+        # The first burst is free, the rest is paced at the sustained rate
+        allowed = options['burst'] + elapsed * options['rpm'] / 60
+        self.stdout.write(
+            f"  {stub.accepted}/{total} accepted, {stub.rejected} rate limited (429), "
+            f"{sum(failed)} failed after retries"
+        )
+        self.stdout.write(
+            f"  {elapsed:.2f}s, {stub.accepted / elapsed * 60:.0f}/min achieved, "
+            f"at most {allowed / elapsed * 60:.0f}/min allowed"
+        )
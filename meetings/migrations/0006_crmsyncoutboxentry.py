@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:00
+
+from django.db import migrations, models
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0005_draftemail_alter_crmsyncrecord_crm_system_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CRMSyncOutboxEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tracking_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('idempotency_key', models.CharField(max_length=200, unique=True)),
+                ('operation', models.CharField(choices=[('meeting_outcome', 'Meeting Outcome'), ('bulk_sync', 'Bulk Sync'), ('sync_record', 'Approved CRM Sync Record')], max_length=50)),
+                ('crm_system', models.CharField(choices=[('salesforce', 'Salesforce'), ('hubspot', 'HubSpot'), ('creatio', 'Creatio'), ('sap_c4c', 'SAP C4C')], max_length=50)),
+                ('payload', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=50)),
+                ('result', models.JSONField(default=dict)),
+                ('error_message', models.TextField(blank=True)),
+                ('attempts', models.IntegerField(default=0)),
+                ('max_attempts', models.IntegerField(default=5)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='meetings_cr_status_fee9b3_idx'), models.Index(fields=['crm_system', 'status'], name='meetings_cr_crm_sys_7759b2_idx'), models.Index(fields=['created_at'], name='meetings_cr_created_dce28f_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:06
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0006_crmsyncoutboxentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tracking_id', models.CharField(max_length=200, unique=True)),
+                ('meeting_id', models.IntegerField()),
+                ('operation', models.CharField(choices=[('meeting_outcome', 'Meeting Outcome'), ('follow_up_tasks', 'Follow-up Tasks'), ('lead_update', 'Lead Update')], max_length=50)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('success', 'Success'), ('failed', 'Failed'), ('retry', 'Retry')], max_length=50)),
+                ('details', models.JSONField(default=dict)),
+                ('retry_count', models.IntegerField(default=0)),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('crm_record_ids', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['meeting_id', 'created_at'], name='meetings_sy_meeting_5d871e_idx'), models.Index(fields=['created_at', 'operation', 'status', 'meeting_id'], name='meetings_sy_created_130ed9_idx'), models.Index(fields=['status', 'created_at'], name='meetings_sy_status_b9e5a1_idx')],
+            },
+        ),
+    ]
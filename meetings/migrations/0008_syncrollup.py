@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0007_syncevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='syncevent',
+            name='crm_system',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='syncevent',
+            name='duration_ms',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='SyncRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('minute', 'Minute'), ('hour', 'Hour'), ('day', 'Day')], max_length=10)),
+                ('bucket_start', models.DateTimeField()),
+                ('crm_system', models.CharField(blank=True, max_length=50)),
+                ('operation', models.CharField(max_length=50)),
+                ('total_count', models.IntegerField(default=0)),
+                ('success_count', models.IntegerField(default=0)),
+                ('failure_count', models.IntegerField(default=0)),
+                ('latency_count', models.IntegerField(default=0)),
+                ('latency_total_ms', models.FloatField(default=0)),
+                ('latency_max_ms', models.FloatField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['granularity', 'crm_system', 'bucket_start'], name='meetings_sy_granula_911b98_idx')],
+                'unique_together': {('granularity', 'bucket_start', 'crm_system', 'operation')},
+            },
+        ),
+    ]
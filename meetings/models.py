@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.utils import timezone
 from leads.models import Lead
@@ -358,6 +360,123 @@ class CRMSyncRecord(models.Model):
         return f"CRM sync to {self.crm_system} - {self.sync_status}"
 
 
+class CRMSyncOutboxEntry(models.Model):
+    """
+    Queued CRM sync operation, drained by Celery workers
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('in_progress', 'In Progress'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    OPERATION_CHOICES = [
+        ('meeting_outcome', 'Meeting Outcome'),
+        ('bulk_sync', 'Bulk Sync'),
+        ('sync_record', 'Approved CRM Sync Record'),
+    ]
+    
+    tracking_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    idempotency_key = models.CharField(max_length=200, unique=True)
+    operation = models.CharField(max_length=50, choices=OPERATION_CHOICES)
+    crm_system = models.CharField(max_length=50, choices=CRMSyncRecord.CRM_SYSTEM_CHOICES)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=50, choices=STATUS_CHOICES, default='pending')
+    result = models.JSONField(default=dict)
+    error_message = models.TextField(blank=True)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)  # Lease held by the worker running it
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+            models.Index(fields=['crm_system', 'status']),
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"CRM outbox {self.operation} to {self.crm_system} - {self.status}"
+
+
+class SyncEvent(models.Model):
+    """
+    Append-only log of CRM sync operations tracked by SyncTracker
+    """
+    OPERATION_CHOICES = [
+        ('meeting_outcome', 'Meeting Outcome'),
+        ('follow_up_tasks', 'Follow-up Tasks'),
+        ('lead_update', 'Lead Update'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('in_progress', 'In Progress'),
+        ('success', 'Success'),
+        ('failed', 'Failed'),
+        ('retry', 'Retry'),
+    ]
+    
+    tracking_id = models.CharField(max_length=200, unique=True)
+    meeting_id = models.IntegerField()  # Not a foreign key: events outlive the meetings they describe
+    operation = models.CharField(max_length=50, choices=OPERATION_CHOICES)
+    status = models.CharField(max_length=50, choices=STATUS_CHOICES)
+    crm_system = models.CharField(max_length=50, blank=True)
+    duration_ms = models.FloatField(null=True, blank=True)
+    details = models.JSONField(default=dict)
+    retry_count = models.IntegerField(default=0)
+    error_message = models.TextField(null=True, blank=True)
+    crm_record_ids = models.JSONField(default=list)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['meeting_id', 'created_at']),
+            # Cover the report and health aggregates, which read only these columns
+            models.Index(fields=['created_at', 'operation', 'status', 'meeting_id']),
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"Sync event {self.operation} for meeting {self.meeting_id} - {self.status}"
+
+
+class SyncRollup(models.Model):
+    """
+    Sync outcome and latency counters per time bucket, CRM system and operation
+    """
+    GRANULARITY_CHOICES = [
+        ('minute', 'Minute'),
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+    ]
+    
+    granularity = models.CharField(max_length=10, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField()
+    crm_system = models.CharField(max_length=50, blank=True)
+    operation = models.CharField(max_length=50)
+    total_count = models.IntegerField(default=0)
+    success_count = models.IntegerField(default=0)
+    failure_count = models.IntegerField(default=0)
+    latency_count = models.IntegerField(default=0)  # Operations with a recorded duration
+    latency_total_ms = models.FloatField(default=0)
+    latency_max_ms = models.FloatField(default=0)
+    
+    class Meta:
+        unique_together = ['granularity', 'bucket_start', 'crm_system', 'operation']
+        indexes = [
+            models.Index(fields=['granularity', 'crm_system', 'bucket_start']),
+        ]
+    
+    def __str__(self):
+        return f"{self.granularity} rollup {self.bucket_start} {self.crm_system} {self.operation}"
+
+
 class DraftEmail(models.Model):
     """
     Draft email model for follow-up emails after meetings
@@ -146,6 +146,18 @@ class MeetingMatchSerializer(serializers.Serializer):
         return data
 
 
+class MeetingBulkMatchSerializer(serializers.Serializer):
+    """
+    Serializer for bulk meeting-lead matching (calendar backfills)
+    
+    Items are validated one by one with MeetingMatchSerializer so a single bad
+    event does not reject the whole batch.
+    """
+    meetings = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False, max_length=10000
+    )
+
+
 class ValidationSessionSerializer(serializers.ModelSerializer):
     """
     Serializer for ValidationSession model
@@ -3,11 +3,14 @@ Meeting session management services
 """
 import json
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from django.conf import settings
 from django.core.cache import cache
 from django.utils import timezone
 from django.db import transaction
+from leads.services import LeadMatchingService
 from .models import Meeting, MeetingSession, ActionItem
+from .serializers import MeetingMatchSerializer
 
 logger = logging.getLogger(__name__)
 
@@ -279,4 +282,111 @@ class MeetingSessionService:
         """
         # This would typically be called by a periodic task
         # For now, we rely on Redis TTL to handle cleanup
-        pass
\ No newline at end of file
+        pass
+
+
+class MeetingLeadMatchingService:
+    """
+    Service for matching calendar events to leads in bulk and saving the meetings
+    """
+    
+    BATCH_SIZE = 500
+    
+    UPDATE_FIELDS = [
+        'title', 'start_time', 'end_time', 'attendees',
+        'lead', 'match_confidence', 'updated_at'
+    ]
+    
+    def __init__(self, matching_service: Optional[LeadMatchingService] = None):
+        self.matching_service = matching_service or LeadMatchingService()
+    
+    def match_and_save(self, events: List[Dict]) -> Dict[str, Any]:
+        """
+        Match calendar events to leads and create or update their meetings
+        
+        Events are validated with MeetingMatchSerializer, matched in one
+        LeadMatchingService.match_meetings call and written with bulk_create
+        and bulk_update. An event id given more than once keeps its last entry.
+        
+        Args:
+            events: Calendar event dictionaries as accepted by the single
+                match-lead endpoint
+        
+        Returns:
+            Dictionary with per-event results, counts and validation errors
+        """
+        valid_events = {}
+        errors = []
+        for index, event in enumerate(events):
+            serializer = MeetingMatchSerializer(data=event)
+            if serializer.is_valid():
+                # Organizer and description are not stored but help matching
+                valid_events[serializer.validated_data['calendar_event_id']] = {
+                    **event, **serializer.validated_data
+                }
+            else:
+                errors.append({
+                    'index': index,
+                    'calendar_event_id': event.get('calendar_event_id'),
+                    'errors': serializer.errors
+                })
+        
+        matches = self.matching_service.match_meetings(
+            list(valid_events.values()),
+            workers=getattr(settings, 'LEAD_MATCHING_WORKERS', 1)
+        )
+        
+        now = timezone.now()
+        meetings = []
+        to_create = []
+        to_update = []
+        with transaction.atomic():
+            existing = Meeting.objects.in_bulk(list(valid_events), field_name='calendar_event_id')
+            
+            for (event_id, event), result in zip(valid_events.items(), matches):
+                match = result['match']
+                meeting = existing.get(event_id)
+                created = meeting is None
+                if created:
+                    meeting = Meeting(calendar_event_id=event_id)
+                    to_create.append(meeting)
+                else:
+                    to_update.append(meeting)
+                
+                meeting.title = event['title']
+                meeting.start_time = event['start_time']
+                meeting.end_time = event['end_time']
+                meeting.attendees = event.get('attendees', [])
+                # Stored confidence is 0-1, the matching service scores 0-100
+                meeting.lead_id = match['lead_id'] if match else None
+                meeting.match_confidence = match['confidence'] / 100 if match else None
+                # bulk_update does not apply auto_now
+                meeting.updated_at = now
+                meetings.append((meeting, created))
+            
+            Meeting.objects.bulk_create(to_create, batch_size=self.BATCH_SIZE)
+            Meeting.objects.bulk_update(to_update, self.UPDATE_FIELDS, batch_size=self.BATCH_SIZE)
+        
+        results = [
+            {
+                'calendar_event_id': meeting.calendar_event_id,
+                'meeting_id': meeting.id,
+                'matched_lead_id': meeting.lead_id,
+                'match_confidence': meeting.match_confidence,
+                'created': created
+            }
+            for meeting, created in meetings
+        ]
+        
+        logger.info(
+            f"Bulk matched {len(results)} meetings: {len(to_create)} created, "
+            f"{len(to_update)} updated, {len(errors)} invalid"
+        )
+        
+        return {
+            'results': results,
+            'created': len(to_create),
+            'updated': len(to_update),
+            'matched': sum(1 for result in results if result['matched_lead_id']),
+            'errors': errors
+        }
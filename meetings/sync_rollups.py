@@ -0,0 +1,213 @@
+"""
+Pre-aggregated CRM sync health rollups
+
+Every tracked sync operation increments minute, hour and day counters for
+its CRM system and operation type, so dashboards read a bounded number of
+buckets instead of scanning the full operation history.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import F, Max, Q, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import SyncRollup
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = {
+    'minute': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+}
+
+COUNTER_FIELDS = [
+    'total_count', 'success_count', 'failure_count', 'latency_count', 'latency_total_ms', 'latency_max_ms'
+]
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Start of the bucket a timestamp falls in; buckets are aligned to UTC"""
+    if timezone.is_aware(timestamp):
+        timestamp = timestamp.astimezone(dt_timezone.utc)
+    timestamp = timestamp.replace(second=0, microsecond=0)
+    if granularity in ('hour', 'day'):
+        timestamp = timestamp.replace(minute=0)
+    if granularity == 'day':
+        timestamp = timestamp.replace(hour=0)
+    return timestamp
+
+
+def cover_range(start: datetime, end: datetime, minute_retention: timedelta,
+                hour_retention: timedelta, now: Optional[datetime] = None) -> List[Tuple[str, datetime, datetime]]:
+    """
+    Cover the minute-aligned range [start, end) with the coarsest buckets that fit
+
+    Whole days use day buckets, the hours either side of them hour buckets,
+    and the remaining minutes at the edges minute buckets. Returns
+    (granularity, start, end) segments, oldest first.
+    """
+    now = now or timezone.now()
+
+    # Edges older than a granularity's retention widen to the next coarser one
+    if start < now - minute_retention:
+        start = bucket_start(start, 'hour')
+    if start < now - hour_retention:
+        start = bucket_start(start, 'day')
+    if end < now - minute_retention and bucket_start(end, 'hour') != end:
+        end = bucket_start(end, 'hour') + GRANULARITIES['hour']
+    if end < now - hour_retention and bucket_start(end, 'day') != end:
+        end = bucket_start(end, 'day') + GRANULARITIES['day']
+
+    segments = []
+    cursor = start
+    while cursor < end:
+        for granularity in ('day', 'hour', 'minute'):
+            step = GRANULARITIES[granularity]
+            aligned = bucket_start(cursor, granularity) == cursor
+            if granularity == 'minute' or (aligned and cursor + step <= end):
+                # Extend the previous segment if it has the same granularity
+                if segments and segments[-1][0] == granularity and segments[-1][2] == cursor:
+                    segments[-1] = (granularity, segments[-1][1], cursor + step)
+                else:
+                    segments.append((granularity, cursor, cursor + step))
+                cursor += step
+                break
+    return segments
+
+
+class SyncRollupService:
+    """
+    Maintain and query sync rollups
+
+    Minute buckets are kept for MINUTE_RETENTION and hour buckets for
+    HOUR_RETENTION; day buckets are kept forever. Ranges reaching past
+    those retentions are answered at the next coarser granularity.
+    """
+
+    MINUTE_RETENTION = timedelta(days=2)
+    HOUR_RETENTION = timedelta(days=90)
+
+    def record(self, crm_system: str, operation: str, status: str,
+               timestamp: Optional[datetime] = None, duration_ms: Optional[float] = None):
+        """Count one operation in every granularity's bucket"""
+        self.record_many([(crm_system, operation, status, timestamp or timezone.now(), duration_ms)])
+
+    def record_many(self, operations: Iterable[Tuple[str, str, str, datetime, Optional[float]]]):
+        """
+        Count (crm_system, operation, status, timestamp, duration_ms) tuples
+
+        Operations sharing a bucket are summed first, so each bucket costs
+        one increment however many operations fall in it.
+        """
+        increments = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+        for crm_system, operation, status, timestamp, duration_ms in operations:
+            for granularity in GRANULARITIES:
+                counters = increments[(granularity, bucket_start(timestamp, granularity), crm_system or '', operation)]
+                counters['total_count'] += 1
+                counters['success_count'] += status == 'success'
+                counters['failure_count'] += status == 'failed'
+                if duration_ms is not None:
+                    counters['latency_count'] += 1
+                    counters['latency_total_ms'] += duration_ms
+                    counters['latency_max_ms'] = max(counters['latency_max_ms'], duration_ms)
+
+        with transaction.atomic():
+            for (granularity, start, crm_system, operation), counters in increments.items():
+                rollup, _ = SyncRollup.objects.get_or_create(
+                    granularity=granularity,
+                    bucket_start=start,
+                    crm_system=crm_system,
+                    operation=operation
+                )
+                # Increment in the database so concurrent workers never lose counts
+                SyncRollup.objects.filter(pk=rollup.pk).update(
+                    total_count=F('total_count') + counters['total_count'],
+                    success_count=F('success_count') + counters['success_count'],
+                    failure_count=F('failure_count') + counters['failure_count'],
+                    latency_count=F('latency_count') + counters['latency_count'],
+                    latency_total_ms=F('latency_total_ms') + counters['latency_total_ms'],
+                    latency_max_ms=Greatest(F('latency_max_ms'), counters['latency_max_ms'])
+                )
+
+    def get_totals(self, start: datetime, end: datetime, group_by: Optional[str] = None,
+                   crm_system: Optional[str] = None) -> Dict[Optional[str], Dict]:
+        """
+        Counters between start and end, at minute precision
+
+        Returns {None: totals}, or totals per value of group_by
+        ('crm_system' or 'operation'), from one aggregate query over at
+        most a few hundred buckets whatever the length of the range.
+        """
+        segments = self._segments(start, end)
+        if not segments:
+            return {} if group_by else {None: self._totals({})}
+
+        rollups = SyncRollup.objects.filter(self._segments_filter(segments))
+        if crm_system is not None:
+            rollups = rollups.filter(crm_system=crm_system)
+
+        sums = {field: Sum(field) for field in COUNTER_FIELDS if field != 'latency_max_ms'}
+        if group_by:
+            rows = rollups.values(group_by).annotate(**sums, max_latency=Max('latency_max_ms')).order_by(group_by)
+            return {row[group_by]: self._totals(row) for row in rows}
+        return {None: self._totals(rollups.aggregate(**sums, max_latency=Max('latency_max_ms')))}
+
+    def get_series(self, granularity: str, start: datetime, end: datetime,
+                   crm_system: Optional[str] = None) -> List[Dict]:
+        """Counters per bucket of one granularity, oldest first"""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+
+        rollups = SyncRollup.objects.filter(
+            granularity=granularity,
+            bucket_start__gte=bucket_start(start, granularity),
+            bucket_start__lt=end
+        )
+        if crm_system is not None:
+            rollups = rollups.filter(crm_system=crm_system)
+
+        sums = {field: Sum(field) for field in COUNTER_FIELDS if field != 'latency_max_ms'}
+        rows = rollups.values('bucket_start').annotate(**sums, max_latency=Max('latency_max_ms')).order_by('bucket_start')
+        return [{'bucket_start': row['bucket_start'].isoformat(), **self._totals(row)} for row in rows]
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """Delete minute and hour buckets past their retention; returns the number deleted"""
+        now = now or timezone.now()
+        deleted, _ = SyncRollup.objects.filter(
+            Q(granularity='minute', bucket_start__lt=now - self.MINUTE_RETENTION) |
+            Q(granularity='hour', bucket_start__lt=now - self.HOUR_RETENTION)
+        ).delete()
+        return deleted
+
+    def _segments(self, start: datetime, end: datetime) -> List[Tuple[str, datetime, datetime]]:
+        """Cover [start, end) at minute precision, the current minute included"""
+        return cover_range(
+            bucket_start(start, 'minute'),
+            bucket_start(end, 'minute') + GRANULARITIES['minute'],
+            self.MINUTE_RETENTION,
+            self.HOUR_RETENTION
+        )
+
+    def _segments_filter(self, segments: List[Tuple[str, datetime, datetime]]) -> Q:
+        condition = Q()
+        for granularity, segment_start, segment_end in segments:
+            condition |= Q(granularity=granularity, bucket_start__gte=segment_start, bucket_start__lt=segment_end)
+        return condition
+
+    def _totals(self, row: Dict) -> Dict:
+        total = row.get('total_count') or 0
+        success = row.get('success_count') or 0
+        latency_count = row.get('latency_count') or 0
+        return {
+            'total_operations': total,
+            'successful_operations': success,
+            'failed_operations': row.get('failure_count') or 0,
+            'success_rate': round(success / total * 100, 2) if total else 0,
+            'average_latency_ms': round((row.get('latency_total_ms') or 0) / latency_count, 2) if latency_count else None,
+            'max_latency_ms': row.get('max_latency') if latency_count else None
+        }
@@ -1,18 +1,27 @@
 """
 CRM synchronization status tracking and error reporting
+
+Operations are appended to the SyncEvent table, one row each, so concurrent
+workers never overwrite each other's bookkeeping, and reports are aggregate
+queries instead of one cache read per operation. Each operation also
+increments the minute/hour/day SyncRollup counters, which the health and
+report dashboards read instead of scanning events.
 """
 import logging
+import uuid
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from enum import Enum
 
 from django.db import models, transaction
+from django.db.models import Count
 from django.utils import timezone
-from django.core.cache import cache
 
-from .models import Meeting, ActionItem
-from .crm_service import CRMSyncStatus
+from .models import Meeting, ActionItem, SyncEvent
+from .crm_service import CRMSyncStatus, CRMSystem
+from .crm_token_store import token_store
+from .sync_rollups import SyncRollupService
 
 logger = logging.getLogger(__name__)
 
@@ -29,40 +38,36 @@ class SyncTracker:
     Service for tracking CRM synchronization status and errors
     """
     
-    CACHE_PREFIX = "sync_tracker"
-    CACHE_TIMEOUT = 86400  # 24 hours
-    
     def __init__(self):
-        self.cache = cache
+        self.events = SyncEvent.objects
+        self.rollups = SyncRollupService()
     
     def track_sync_operation(self, meeting_id: int, operation: SyncOperation, 
-                           status: CRMSyncStatus, details: Dict[str, Any]) -> str:
+                           status: CRMSyncStatus, details: Dict[str, Any],
+                           crm_system: Optional[str] = None, duration_ms: Optional[float] = None) -> str:
         """
         Track a CRM synchronization operation
         """
-        tracking_id = f"{meeting_id}_{operation.value}_{timezone.now().timestamp()}"
-        
-        sync_record = {
-            'tracking_id': tracking_id,
-            'meeting_id': meeting_id,
-            'operation': operation.value,
-            'status': status.value,
-            'timestamp': timezone.now().isoformat(),
-            'details': details,
-            'retry_count': details.get('retry_count', 0),
-            'error_message': details.get('error_message'),
-            'crm_record_ids': details.get('crm_record_ids', [])
-        }
-        
-        # Cache the sync record
-        cache_key = f"{self.CACHE_PREFIX}:operation:{tracking_id}"
-        self.cache.set(cache_key, sync_record, self.CACHE_TIMEOUT)
+        now = timezone.now()
+        tracking_id = f"{meeting_id}_{operation.value}_{now.timestamp()}_{uuid.uuid4().hex[:8]}"
+        crm_system = crm_system or details.get('crm_system', '')
         
-        # Also maintain a list of operations for the meeting
-        meeting_cache_key = f"{self.CACHE_PREFIX}:meeting:{meeting_id}"
-        meeting_operations = self.cache.get(meeting_cache_key, [])
-        meeting_operations.append(tracking_id)
-        self.cache.set(meeting_cache_key, meeting_operations, self.CACHE_TIMEOUT)
+        # Only INSERTs and counter increments: safe under concurrent workers without any locking
+        with transaction.atomic():
+            self.events.create(
+                tracking_id=tracking_id,
+                meeting_id=meeting_id,
+                operation=operation.value,
+                status=status.value,
+                details=details,
+                retry_count=details.get('retry_count', 0),
+                error_message=details.get('error_message'),
+                crm_record_ids=details.get('crm_record_ids', []),
+                crm_system=crm_system,
+                duration_ms=duration_ms,
+                created_at=now
+            )
+            self.rollups.record(crm_system, operation.value, status.value, now, duration_ms)
         
         logger.info(f"Tracked sync operation {tracking_id}: {operation.value} - {status.value}")
         return tracking_id
@@ -71,47 +76,13 @@ class SyncTracker:
         """
         Get comprehensive sync status for a meeting
         """
-        meeting_cache_key = f"{self.CACHE_PREFIX}:meeting:{meeting_id}"
-        operation_ids = self.cache.get(meeting_cache_key, [])
+        operations = [
+            self._event_data(event)
+            for event in self.events.filter(meeting_id=meeting_id).order_by('created_at', 'id')
+        ]
         
-        if not operation_ids:
-            return {
-                'meeting_id': meeting_id,
-                'operations': [],
-                'summary': {
-                    'total_operations': 0,
-                    'successful_operations': 0,
-                    'failed_operations': 0,
-                    'pending_operations': 0,
-                    'last_sync': None
-                }
-            }
-        
-        operations = []
-        successful = 0
-        failed = 0
-        pending = 0
-        last_sync = None
-        
-        for operation_id in operation_ids:
-            cache_key = f"{self.CACHE_PREFIX}:operation:{operation_id}"
-            operation_data = self.cache.get(cache_key)
-            
-            if operation_data:
-                operations.append(operation_data)
-                
-                status = operation_data['status']
-                if status == CRMSyncStatus.SUCCESS.value:
-                    successful += 1
-                elif status == CRMSyncStatus.FAILED.value:
-                    failed += 1
-                else:
-                    pending += 1
-                
-                # Track the most recent sync
-                op_timestamp = datetime.fromisoformat(operation_data['timestamp'])
-                if last_sync is None or op_timestamp > last_sync:
-                    last_sync = op_timestamp
+        successful = sum(operation['status'] == CRMSyncStatus.SUCCESS.value for operation in operations)
+        failed = sum(operation['status'] == CRMSyncStatus.FAILED.value for operation in operations)
         
         return {
             'meeting_id': meeting_id,
@@ -120,8 +91,8 @@ class SyncTracker:
                 'total_operations': len(operations),
                 'successful_operations': successful,
                 'failed_operations': failed,
-                'pending_operations': pending,
-                'last_sync': last_sync.isoformat() if last_sync else None
+                'pending_operations': len(operations) - successful - failed,
+                'last_sync': operations[-1]['timestamp'] if operations else None
             }
         }
     
@@ -130,37 +101,24 @@ class SyncTracker:
         Get all failed sync operations within the specified time window
         """
         cutoff_time = timezone.now() - timedelta(hours=hours_back)
-        failed_operations = []
-        
-        # This is a simplified implementation
-        # In a production system, you might want to use a database table
-        # or a more sophisticated caching strategy
         
         try:
-            # Get all meetings that have had sync operations
-            all_meetings = Meeting.objects.filter(
-                updated_at__gte=cutoff_time
-            ).values_list('id', flat=True)
-            
-            for meeting_id in all_meetings:
-                sync_status = self.get_sync_status(meeting_id)
-                
-                for operation in sync_status['operations']:
-                    if (operation['status'] == CRMSyncStatus.FAILED.value and 
-                        datetime.fromisoformat(operation['timestamp']) >= cutoff_time):
-                        failed_operations.append(operation)
+            failed_events = self.events.filter(
+                status=CRMSyncStatus.FAILED.value,
+                created_at__gte=cutoff_time
+            ).order_by('created_at', 'id')
+            return [self._event_data(event) for event in failed_events]
             
         except Exception as e:
             logger.error(f"Error retrieving failed operations: {str(e)}")
-        
-        return failed_operations
+            return []
     
     def retry_failed_operation(self, tracking_id: str) -> Dict[str, Any]:
         """
         Retry a failed sync operation
         """
-        cache_key = f"{self.CACHE_PREFIX}:operation:{tracking_id}"
-        operation_data = self.cache.get(cache_key)
+        event = self.events.filter(tracking_id=tracking_id).first()
+        operation_data = self._event_data(event) if event else None
         
         if not operation_data:
             return {
@@ -193,12 +151,12 @@ class SyncTracker:
                     'error_message': result.message if result.status == CRMSyncStatus.FAILED else None
                 }
                 
-                self.track_sync_operation(meeting_id, operation_type, result.status, retry_details)
+                new_tracking_id = self.track_sync_operation(meeting_id, operation_type, result.status, retry_details)
                 
                 return {
                     'success': result.status == CRMSyncStatus.SUCCESS,
                     'message': result.message,
-                    'new_tracking_id': retry_details.get('tracking_id')
+                    'new_tracking_id': new_tracking_id
                 }
             
             elif operation_type == SyncOperation.FOLLOW_UP_TASKS:
@@ -217,12 +175,12 @@ class SyncTracker:
                 }
                 
                 overall_status = CRMSyncStatus.SUCCESS if not failed_results else CRMSyncStatus.FAILED
-                self.track_sync_operation(meeting_id, operation_type, overall_status, retry_details)
+                new_tracking_id = self.track_sync_operation(meeting_id, operation_type, overall_status, retry_details)
                 
                 return {
                     'success': len(failed_results) == 0,
                     'message': f'Retry completed: {len(successful_results)} successful, {len(failed_results)} failed',
-                    'new_tracking_id': retry_details.get('tracking_id')
+                    'new_tracking_id': new_tracking_id
                 }
             
             else:
@@ -243,50 +201,33 @@ class SyncTracker:
         Generate a comprehensive sync report for a date range
         """
         try:
-            # Get all meetings in the date range
-            meetings = Meeting.objects.filter(
-                updated_at__range=[start_date, end_date]
-            ).values_list('id', flat=True)
+            total_meetings = Meeting.objects.filter(updated_at__range=[start_date, end_date]).count()
             
-            total_meetings = len(meetings)
-            meetings_with_sync = 0
-            total_operations = 0
-            successful_operations = 0
-            failed_operations = 0
+            events = self.events.filter(created_at__range=[start_date, end_date])
             
+            # Counts come from the rollups, whatever the number of operations in the period
+            totals = self.rollups.get_totals(start_date, end_date, group_by='operation')
+            breakdown_operations = [SyncOperation.MEETING_OUTCOME.value, SyncOperation.FOLLOW_UP_TASKS.value]
             operation_breakdown = {
-                SyncOperation.MEETING_OUTCOME.value: {'success': 0, 'failed': 0},
-                SyncOperation.FOLLOW_UP_TASKS.value: {'success': 0, 'failed': 0}
+                operation: {
+                    'success': totals.get(operation, {}).get('successful_operations', 0),
+                    'failed': totals.get(operation, {}).get('failed_operations', 0)
+                }
+                for operation in breakdown_operations
             }
             
-            error_summary = {}
+            meetings_with_sync = events.aggregate(count=Count('meeting_id', distinct=True))['count']
             
-            for meeting_id in meetings:
-                sync_status = self.get_sync_status(meeting_id)
-                
-                if sync_status['operations']:
-                    meetings_with_sync += 1
-                    
-                    for operation in sync_status['operations']:
-                        # Filter operations within date range
-                        op_timestamp = datetime.fromisoformat(operation['timestamp'])
-                        if start_date <= op_timestamp <= end_date:
-                            total_operations += 1
-                            
-                            op_type = operation['operation']
-                            op_status = operation['status']
-                            
-                            if op_status == CRMSyncStatus.SUCCESS.value:
-                                successful_operations += 1
-                                operation_breakdown[op_type]['success'] += 1
-                            elif op_status == CRMSyncStatus.FAILED.value:
-                                failed_operations += 1
-                                operation_breakdown[op_type]['failed'] += 1
-                                
-                                # Track error types
-                                error_msg = operation.get('error_message', 'Unknown error')
-                                error_summary[error_msg] = error_summary.get(error_msg, 0) + 1
+            # Track error types
+            error_summary = {
+                (row['error_message'] or 'Unknown error'): row['count']
+                for row in events.filter(status=CRMSyncStatus.FAILED.value)
+                .values('error_message').annotate(count=Count('id')).order_by()
+            }
             
+            total_operations = sum(row['total_operations'] for row in totals.values())
+            successful_operations = sum(row['successful_operations'] for row in totals.values())
+            failed_operations = sum(row['failed_operations'] for row in totals.values())
             success_rate = (successful_operations / total_operations * 100) if total_operations > 0 else 0
             
             return {
@@ -314,35 +255,42 @@ class SyncTracker:
                 'generated_at': timezone.now().isoformat()
             }
     
-    def cleanup_old_tracking_data(self, days_to_keep: int = 30):
+    def cleanup_old_tracking_data(self, days_to_keep: int = 30) -> int:
         """
-        Clean up old tracking data from cache
+        Delete sync events older than the retention period
+        
+        Returns the number of events deleted.
         """
         try:
             cutoff_time = timezone.now() - timedelta(days=days_to_keep)
             
-            # This is a simplified cleanup
-            # In a production system, you might want to implement a more sophisticated cleanup strategy
-            logger.info(f"Cleaned up sync tracking data older than {days_to_keep} days")
+            deleted, _ = self.events.filter(created_at__lt=cutoff_time).delete()
+            logger.info(f"Cleaned up {deleted} sync events older than {days_to_keep} days")
+            
+            # Fine-grained rollups have their own, shorter retention; day rollups are kept
+            self.rollups.prune()
+            return deleted
             
         except Exception as e:
             logger.error(f"Error cleaning up tracking data: {str(e)}")
+            return 0
     
     def get_sync_health_metrics(self) -> Dict[str, Any]:
         """
         Get overall sync health metrics
         """
         try:
-            # Get recent failed operations (last 24 hours)
-            recent_failures = self.get_failed_operations(hours_back=24)
+            cutoff_time = timezone.now() - timedelta(hours=24)
+            
+            # Recent operations (last 24 hours) per CRM system, from the rollups
+            by_crm_system = self.rollups.get_totals(cutoff_time, timezone.now(), group_by='crm_system')
+            recent_failures = sum(row['failed_operations'] for row in by_crm_system.values())
             
             # Get recent meetings
-            recent_meetings = Meeting.objects.filter(
-                updated_at__gte=timezone.now() - timedelta(hours=24)
-            ).count()
+            recent_meetings = Meeting.objects.filter(updated_at__gte=cutoff_time).count()
             
             # Calculate health metrics
-            failure_rate = len(recent_failures) / max(recent_meetings, 1) * 100
+            failure_rate = recent_failures / max(recent_meetings, 1) * 100
             
             health_status = "healthy"
             if failure_rate > 20:
@@ -353,8 +301,18 @@ class SyncTracker:
             return {
                 'health_status': health_status,
                 'recent_meetings': recent_meetings,
-                'recent_failures': len(recent_failures),
+                'recent_failures': recent_failures,
                 'failure_rate': round(failure_rate, 2),
+                'crm_systems': {
+                    (crm_system or 'unknown'): {
+                        'total_operations': row['total_operations'],
+                        'failed_operations': row['failed_operations'],
+                        'success_rate': row['success_rate'],
+                        'average_latency_ms': row['average_latency_ms']
+                    }
+                    for crm_system, row in by_crm_system.items()
+                },
+                'token_cache': token_store.get_stats(crm_system.value for crm_system in CRMSystem),
                 'last_updated': timezone.now().isoformat()
             }
             
@@ -364,4 +322,18 @@ class SyncTracker:
                 'health_status': 'unknown',
                 'error': str(e),
                 'last_updated': timezone.now().isoformat()
-            }
\ No newline at end of file
+            }
+    
+    def _event_data(self, event: SyncEvent) -> Dict[str, Any]:
+        """Sync event as the operation dict returned by the tracker"""
+        return {
+            'tracking_id': event.tracking_id,
+            'meeting_id': event.meeting_id,
+            'operation': event.operation,
+            'status': event.status,
+            'timestamp': event.created_at.isoformat(),
+            'details': event.details,
+            'retry_count': event.retry_count,
+            'error_message': event.error_message,
+            'crm_record_ids': event.crm_record_ids
+        }
@@ -0,0 +1,220 @@
+"""
+Tests for the asynchronous CRM clients and concurrent multi-CRM sync
+Uses httpx.MockTransport, so no CRM is contacted
+"""
+import asyncio
+import json
+import time
+import unittest
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+import httpx
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from leads.models import Lead
+from meetings import crm_rate_limiter
+from meetings.async_crm_service import AsyncCRMService, AsyncSalesforceClient
+from meetings.crm_service import CRMService, CRMSystem, CRMSyncStatus, CRMAPIError
+from meetings.crm_token_store import token_store
+from meetings.models import Meeting, CallBotSession, DraftSummary, ValidationSession, CRMSyncRecord
+
+
+def crm_handler(api_handler):
+    """Mock transport handler that issues tokens and passes API calls to api_handler"""
+    calls = {'token': 0, 'api': []}
+
+    async def handler(request):
+        if request.url.path.endswith('/token'):
+            calls['token'] += 1
+            return httpx.Response(200, json={'access_token': 'token123', 'expires_in': 3600})
+        calls['api'].append(request)
+        return await api_handler(request)
+
+    return handler, calls
+
+
+def mock_crm_service(handler):
+    return AsyncCRMService(transport=httpx.MockTransport(handler))
+
+
+@patch('meetings.crm_service.getattr', return_value='https://crm.example.com')
+class TestAsyncCRMClients(unittest.IsolatedAsyncioTestCase):
+    """Test async CRM clients against a mock transport"""
+
+    def setUp(self):
+        crm_rate_limiter.local_buckets.clear()
+        token_store.clear()
+
+    async def test_update_meeting_outcomes_concurrently(self, mock_getattr):
+        """Test every CRM is called before any of them responds"""
+        systems = [CRMSystem.SALESFORCE, CRMSystem.SAP_C4C, CRMSystem.CREATIO, CRMSystem.HUBSPOT]
+        all_arrived = asyncio.Event()
+
+        async def api_handler(request):
+            if len(calls['api']) == len(systems):
+                all_arrived.set()
+            await asyncio.wait_for(all_arrived.wait(), timeout=5)
+            return httpx.Response(200, json={'id': 'hubspot123'})
+
+        handler, calls = crm_handler(api_handler)
+        async with mock_crm_service(handler) as service:
+            results = await service.update_meeting_outcomes(systems, 'record123', {'title': 'Demo'})
+
+        self.assertEqual(results[0], {'Id': 'record123', 'success': True})
+        self.assertEqual(results[3], {'id': 'hubspot123'})
+        self.assertEqual(calls['token'], 4)
+
+        self.assertTrue(all(r.headers['Authorization'] == 'Bearer token123' for r in calls['api']))
+        self.assertEqual(sum(r.headers.get('ForceUseSession') == 'true' for r in calls['api']), 1)
+
+    async def test_concurrent_requests_share_one_token_fetch(self, mock_getattr):
+        """Test concurrent requests on one client authenticate once"""
+        async def api_handler(request):
+            return httpx.Response(200, json={'Id': 'task123'})
+
+        handler, calls = crm_handler(api_handler)
+        async with mock_crm_service(handler) as service:
+            client = service.get_client('salesforce')
+            results = await asyncio.gather(*(
+                client.acreate_follow_up_task('record123', {'title': f'Task {i}'}) for i in range(5)
+            ))
+
+        self.assertEqual(calls['token'], 1)
+        self.assertEqual(len(calls['api']), 5)
+        self.assertEqual(json.loads(calls['api'][0].content)['WhatId'], 'record123')
+        self.assertEqual(results[0], {'Id': 'task123'})
+
+    async def test_rate_limit_waits_with_asyncio_sleep(self, mock_getattr):
+        """Test a 429 is retried after Retry-After without blocking the loop"""
+        responses = [httpx.Response(429, headers={'Retry-After': '2'}), httpx.Response(204)]
+
+        async def api_handler(request):
+            return responses.pop(0)
+
+        handler, calls = crm_handler(api_handler)
+        async with mock_crm_service(handler) as service:
+            client = service.get_client(CRMSystem.SALESFORCE)
+            with patch('meetings.async_crm_service.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+                result = await client.aupdate_opportunity_stage('opp123', {'stage_name': 'Closed Won'})
+
+        mock_sleep.assert_any_await(2.0)
+        self.assertEqual(result, {'Id': 'opp123', 'success': True})
+        self.assertEqual(json.loads(calls['api'][-1].content), {'StageName': 'Closed Won'})
+
+    async def test_slow_rate_limiter_does_not_block_loop(self, mock_getattr):
+        """Test the shared bucket's Redis calls run off the event loop"""
+        async def api_handler(request):
+            return httpx.Response(204)
+
+        def slow_reserve():
+            time.sleep(0.3)
+            return 0.0
+
+        def slow_observe(status_code, headers):
+            time.sleep(0.3)
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        handler, calls = crm_handler(api_handler)
+        async with mock_crm_service(handler) as service:
+            client = service.get_client(CRMSystem.SALESFORCE)
+            client._reserve_request_slot = slow_reserve
+            client.rate_limiter.observe_response = slow_observe
+            ticking = asyncio.create_task(ticker())
+            await client.aupdate_opportunity_stage('opp123', {'stage_name': 'Closed Won'})
+            ticking.cancel()
+
+        self.assertGreater(ticks, 30)
+
+    async def test_server_errors_raise_after_retries(self, mock_getattr):
+        """Test repeated server errors raise CRMAPIError"""
+        async def api_handler(request):
+            return httpx.Response(503)
+
+        handler, calls = crm_handler(api_handler)
+        async with mock_crm_service(handler) as service:
+            client = service.get_client(CRMSystem.SALESFORCE)
+            self.assertIsInstance(client, AsyncSalesforceClient)
+            with patch('meetings.async_crm_service.asyncio.sleep', new_callable=AsyncMock):
+                with self.assertRaises(CRMAPIError):
+                    await client.aupdate_meeting_outcome('record123', {'title': 'Demo'})
+
+        self.assertEqual(len(calls['api']), client.max_retries + 1)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestConcurrentMultiCRMSync(TestCase):
+    """Test CRMService fan-out over the async clients"""
+
+    def setUp(self):
+        cache.clear()
+        token_store.clear()
+        self.crm_service = CRMService()
+
+        lead = Lead.objects.create(
+            crm_id='lead123',
+            name='Test Lead',
+            email='test@example.com',
+            company='Test Company'
+        )
+        meeting = Meeting.objects.create(
+            calendar_event_id='event123',
+            lead=lead,
+            title='Test Meeting',
+            start_time=timezone.now(),
+            end_time=timezone.now() + timedelta(hours=1)
+        )
+        bot_session = CallBotSession.objects.create(
+            meeting=meeting,
+            bot_session_id='bot123',
+            platform='meet',
+            join_time=timezone.now()
+        )
+        draft_summary = DraftSummary.objects.create(
+            bot_session=bot_session,
+            ai_generated_summary='Test summary',
+            confidence_score=0.9
+        )
+        self.validation_session = ValidationSession.objects.create(
+            draft_summary=draft_summary,
+            sales_rep_email='rep@example.com',
+            started_at=timezone.now(),
+            expires_at=timezone.now() + timedelta(hours=24),
+            validated_summary='Validated summary'
+        )
+
+    @patch('meetings.crm_service.getattr', return_value='https://crm.example.com')
+    def test_sync_to_multiple_crms(self, mock_getattr):
+        """Test results and sync records for a mix of successful and failing CRMs"""
+        async def api_handler(request):
+            if request.url.host == 'api.hubapi.com':
+                return httpx.Response(400)
+            return httpx.Response(204)
+
+        handler, calls = crm_handler(api_handler)
+        with patch('meetings.async_crm_service.AsyncCRMService', lambda: mock_crm_service(handler)), \
+             patch('meetings.async_crm_service.asyncio.sleep', new_callable=AsyncMock):
+            results = self.crm_service.sync_to_multiple_crms(
+                self.validation_session.id, ['salesforce', CRMSystem.HUBSPOT, 'invalid_crm']
+            )
+
+        self.assertEqual(results['salesforce'].status, CRMSyncStatus.SUCCESS)
+        self.assertEqual(results['salesforce'].crm_record_id, 'lead123')
+        self.assertEqual(results['hubspot'].status, CRMSyncStatus.FAILED)
+        self.assertEqual(results['invalid_crm'].status, CRMSyncStatus.FAILED)
+        self.assertTrue(CRMSyncRecord.objects.filter(crm_system='salesforce', sync_status='completed').exists())
+
+        # A second sync is answered from the cache
+        results = self.crm_service.sync_to_multiple_crms(
+            self.validation_session.id, ['salesforce']
+        )
+        self.assertEqual(results['salesforce'].message, "Already synced (cached)")
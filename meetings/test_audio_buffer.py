@@ -0,0 +1,143 @@
+"""
+Tests for the preallocated audio ring buffer and its use by TranscriptionService
+"""
+import asyncio
+from unittest import skipUnless
+
+from django.test import TestCase
+
+from meetings.audio_buffer import NUMPY_AVAILABLE, AudioRingBuffer, int16_samples
+from meetings.transcription_service import AudioChunk, TranscriptionService
+
+
+class AudioRingBufferTest(TestCase):
+    """Test allocation, wrap-around and release of ring buffer regions"""
+
+    def test_write_returns_view_of_copy(self):
+        buffer = AudioRingBuffer(16)
+        source = bytearray(b'abcd')
+
+        offset, view = buffer.write(source)
+        source[:] = b'wxyz'
+
+        self.assertEqual(offset, 0)
+        self.assertEqual(bytes(view), b'abcd')
+        self.assertEqual(buffer.write(b'efgh')[0], 4)
+
+    def test_full_buffer_overflows(self):
+        buffer = AudioRingBuffer(8)
+        buffer.write(b'1234')
+        buffer.write(b'5678')
+
+        self.assertIsNone(buffer.write(b'9'))
+        self.assertEqual(buffer.overflows, 1)
+
+    def test_empty_frame_not_stored(self):
+        buffer = AudioRingBuffer(8)
+
+        self.assertIsNone(buffer.write(b''))
+        for _ in range(100):
+            offset, _ = buffer.write(b'abcd')
+            buffer.release(offset)
+
+        self.assertEqual(buffer.overflows, 0)
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(len(buffer._regions), 0)
+
+    def test_space_reclaimed_from_oldest_and_wraps(self):
+        buffer = AudioRingBuffer(10)
+        first, _ = buffer.write(b'aaaa')
+        second, _ = buffer.write(b'bbbb')
+
+        # Releasing out of order frees nothing until the oldest is released
+        buffer.release(second)
+        self.assertIsNone(buffer.write(b'cccc'))
+        buffer.release(first)
+
+        self.assertEqual(len(buffer), 0)
+        offset, view = buffer.write(b'dddddd')
+        self.assertEqual(offset, 0)
+        third, _ = buffer.write(b'ee')
+        buffer.release(offset)
+        # Does not fit after the tail, so it wraps to the freed start
+        wrapped, view = buffer.write(b'ffff')
+        self.assertEqual(wrapped, 0)
+        self.assertEqual(bytes(view), b'ffff')
+
+    @skipUnless(NUMPY_AVAILABLE, 'NumPy is not installed')
+    def test_int16_view_shares_memory(self):
+        buffer = AudioRingBuffer(8)
+        _, view = buffer.write(b'\x01\x00\xff\xff\x05')
+
+        samples = int16_samples(view)
+
+        self.assertEqual(samples.tolist(), [1, -1])
+        self.assertFalse(samples.flags['OWNDATA'])
+
+
+class TranscriptionAudioBufferTest(TestCase):
+    """Test queued audio is held in the session's ring buffer"""
+
+    def test_chunks_reference_ring_and_are_released(self):
+        async def run():
+            service = TranscriptionService(engine_type='mock')
+            await service.initialize({})
+            seen = []
+
+            async def transcribe_batch(audio_chunks):
+                seen.extend((chunk.buffer_offset, bytes(chunk.audio_data)) for chunk in audio_chunks)
+                return []
+
+            service.engine.transcribe_batch = transcribe_batch
+            await service.start_transcription('session_1', 'stream_1')
+            audio_buffer = service.audio_buffers['session_1']
+            receive_buffer = bytearray(b'\x00\x01' * 4)
+            for value in range(3):
+                receive_buffer[0] = value
+                await service.process_audio_chunk('session_1', receive_buffer, float(value), 0.1)
+            await asyncio.sleep(0.1)
+            live = len(audio_buffer)
+            await service.cleanup()
+            return seen, live
+
+        seen, live = asyncio.run(run())
+
+        self.assertEqual([data[0] for _, data in seen], [0, 1, 2])
+        self.assertTrue(all(offset is not None for offset, _ in seen))
+        self.assertEqual(live, 0)
+
+    def test_empty_frame_followed_by_traffic(self):
+        async def run():
+            service = TranscriptionService(engine_type='mock')
+            service._process_audio_stream = lambda session_id: asyncio.sleep(0)
+            await service.start_transcription('session_1', 'stream_1')
+            audio_buffer = service.audio_buffers['session_1']
+            queue = service.audio_queues['session_1']
+
+            accepted = await service.process_audio_chunk('session_1', b'', 0.0, 0.0)
+            queued_empty = queue.qsize()
+            for index in range(200):
+                await service.process_audio_chunk('session_1', b'\x00\x01' * 320, index * 0.02, 0.02)
+                chunk = queue.get_nowait()
+                service._release_audio(audio_buffer, [chunk])
+            await service.stop_transcription('session_1')
+            return accepted, queued_empty, audio_buffer.overflows
+
+        self.assertEqual(asyncio.run(run()), (True, 0, 0))
+
+    def test_bytes_kept_when_ring_disabled(self):
+        async def run():
+            service = TranscriptionService(engine_type='mock')
+            service.AUDIO_BUFFER_SIZE = 0
+            service._process_audio_stream = lambda session_id: asyncio.sleep(0)
+            await service.start_transcription('session_1', 'stream_1')
+            await service.process_audio_chunk('session_1', bytearray(b'abcd'), 0.0, 0.1)
+            chunk = service.audio_queues['session_1'].get_nowait()
+            await service.stop_transcription('session_1')
+            return chunk
+
+        chunk = asyncio.run(run())
+
+        self.assertIsInstance(chunk, AudioChunk)
+        self.assertEqual(chunk.audio_data, b'abcd')
+        self.assertIsNone(chunk.buffer_offset)
@@ -128,7 +128,7 @@ class CRMApprovalAPITestCase(TestCase):
         
         response = self.client.post(url, data, format='json')
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertTrue(response.data['success'])
         self.assertEqual(len(response.data['approved_systems']), 2)
         self.assertEqual(len(response.data['sync_records']), 2)
@@ -406,7 +406,7 @@ class CRMApprovalAPITestCase(TestCase):
         data = {'approved_systems': ['salesforce']}
         
         response = self.client.post(url, data, format='json')
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         
         sf_record = CRMSyncRecord.objects.get(
             validation_session=self.validation_session,
@@ -435,7 +435,7 @@ class CRMApprovalAPITestCase(TestCase):
         data = {'approved_systems': ['salesforce']}
         
         response = self.client.post(url, data, format='json')
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         
         # Check that audit trail was updated
         self.validation_session.refresh_from_db()
@@ -474,7 +474,7 @@ class CRMApprovalAPITestCase(TestCase):
         }
         
         approve_response = self.client.post(approve_url, approve_data, format='json')
-        self.assertEqual(approve_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(approve_response.status_code, status.HTTP_202_ACCEPTED)
         
         # Step 2: Check sync status
         status_url = reverse('get-crm-sync-status', kwargs={'session_id': self.validation_session.id})
@@ -0,0 +1,293 @@
+"""
+Tests for batched CRM writes through each CRM's native batch API
+Uses mocked _make_request responses, so no CRM is contacted
+"""
+import unittest
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from leads.models import Lead
+from meetings.crm_service import (
+    CRMService,
+    CRMSystem,
+    CRMSyncStatus,
+    SalesforceClient,
+    SAPC4CClient,
+    CreatioClient,
+    HubSpotClient,
+    CRMAPIError
+)
+from meetings.models import Meeting, CallBotSession, DraftSummary, ValidationSession, CRMSyncRecord
+
+
+def json_response(body, status_code=200):
+    response = Mock()
+    response.status_code = status_code
+    response.json.return_value = body
+    return response
+
+
+@patch('meetings.crm_service.getattr', return_value='https://crm.example.com')
+class TestClientBatchAPIs(unittest.TestCase):
+    """Test batch request building and per-record result mapping"""
+
+    @patch.object(SalesforceClient, '_make_request')
+    def test_salesforce_sobject_collections(self, mock_make_request, mock_getattr):
+        """Test Salesforce tasks are created with one sObject Collections call"""
+        mock_make_request.return_value = json_response([
+            {'id': 'task1', 'success': True, 'errors': []},
+            {'id': None, 'success': False, 'errors': [
+                {'statusCode': 'REQUIRED_FIELD_MISSING', 'message': 'Subject missing'}
+            ]}
+        ])
+
+        results = SalesforceClient().create_follow_up_tasks('lead123', [{'title': 'One'}, {'title': 'Two'}])
+
+        mock_make_request.assert_called_once()
+        method, url = mock_make_request.call_args[0]
+        records = mock_make_request.call_args[1]['data']['records']
+        self.assertEqual(method, 'POST')
+        self.assertEqual(url, 'https://crm.example.com/services/data/v58.0/composite/sobjects')
+        self.assertEqual(records[0]['attributes'], {'type': 'Task'})
+        self.assertEqual(records[1]['WhatId'], 'lead123')
+
+        self.assertEqual(results[0]['id'], 'task1')
+        self.assertIsInstance(results[1], CRMAPIError)
+        self.assertIn('Subject missing', str(results[1]))
+
+    @patch.object(SalesforceClient, '_make_request')
+    def test_salesforce_batches_split_at_limit(self, mock_make_request, mock_getattr):
+        """Test more records than max_batch_size take several calls"""
+        mock_make_request.side_effect = lambda method, url, data, **kwargs: json_response(
+            [{'id': None, 'success': True, 'errors': []} for _ in data['records']]
+        )
+
+        updates = [(f'rec{i}', {'title': f'Meeting {i}'}) for i in range(450)]
+        results = SalesforceClient().update_meeting_outcomes(updates)
+
+        self.assertEqual(mock_make_request.call_count, 3)
+        self.assertEqual(mock_make_request.call_args_list[0][0][0], 'PATCH')
+        self.assertEqual(len(results), 450)
+        self.assertEqual(results[449], {'Id': 'rec449', 'success': True})
+
+    @patch.object(SalesforceClient, '_make_request')
+    def test_duplicate_records_go_in_separate_batches(self, mock_make_request, mock_getattr):
+        """Test one record is never updated twice in the same batch"""
+        mock_make_request.side_effect = lambda method, url, data, **kwargs: json_response(
+            [{'id': record['id'], 'success': True, 'errors': []} for record in data['records']]
+        )
+
+        SalesforceClient().update_meeting_outcomes([('a', {}), ('b', {}), ('a', {}), ('c', {})])
+
+        batches = [[r['id'] for r in c[1]['data']['records']] for c in mock_make_request.call_args_list]
+        self.assertEqual(batches, [['a', 'b'], ['a', 'c']])
+
+    @patch.object(SalesforceClient, '_make_request')
+    def test_rejected_batch_fails_its_records(self, mock_make_request, mock_getattr):
+        """Test a failed batch call returns the error for each of its records"""
+        mock_make_request.side_effect = CRMAPIError("API request failed: 500")
+
+        results = SalesforceClient().create_follow_up_tasks('lead123', [{}, {}, {}])
+
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(isinstance(result, CRMAPIError) for result in results))
+
+    @patch.object(HubSpotClient, '_make_request')
+    def test_hubspot_batch_create(self, mock_make_request, mock_getattr):
+        """Test HubSpot results are matched by trace id, not position"""
+        mock_make_request.return_value = json_response({
+            'status': 'COMPLETE',
+            'results': [
+                {'id': '902', 'objectWriteTraceId': '2'},
+                {'id': '900', 'objectWriteTraceId': '0'}
+            ],
+            'errors': [
+                {'status': 'error', 'message': 'Invalid priority', 'context': {'objectWriteTraceId': ['1']}}
+            ]
+        }, status_code=207)
+
+        results = HubSpotClient().create_follow_up_tasks('contact1', [{}, {}, {}])
+
+        method, url = mock_make_request.call_args[0]
+        inputs = mock_make_request.call_args[1]['data']['inputs']
+        self.assertEqual(url, 'https://api.hubapi.com/crm/v3/objects/tasks/batch/create')
+        self.assertEqual(inputs[0]['associations'][0]['to'], {'id': 'contact1'})
+
+        self.assertEqual(results[0]['id'], '900')
+        self.assertIsInstance(results[1], CRMAPIError)
+        self.assertEqual(results[2]['id'], '902')
+
+    @patch.object(HubSpotClient, '_make_request')
+    def test_hubspot_batch_update(self, mock_make_request, mock_getattr):
+        """Test HubSpot updates are matched by record id"""
+        mock_make_request.return_value = json_response({'results': [{'id': 'c2'}, {'id': 'c1'}]})
+
+        results = HubSpotClient().update_meeting_outcomes([('c1', {}), ('c2', {})])
+
+        self.assertEqual(
+            mock_make_request.call_args[0][1], 'https://api.hubapi.com/crm/v3/objects/contacts/batch/update'
+        )
+        self.assertEqual([result['id'] for result in results], ['c1', 'c2'])
+
+    @patch.object(CreatioClient, '_make_request')
+    def test_creatio_odata_batch(self, mock_make_request, mock_getattr):
+        """Test Creatio writes go through one continue-on-error $batch call"""
+        mock_make_request.return_value = json_response({'responses': [
+            {'id': '1', 'status': 400, 'body': {'error': {'message': 'Invalid DueDate'}}},
+            {'id': '0', 'status': 201, 'body': {'Id': 'activity1'}}
+        ]})
+
+        results = CreatioClient().create_follow_up_tasks('account1', [{}, {}])
+
+        method, url = mock_make_request.call_args[0]
+        kwargs = mock_make_request.call_args[1]
+        self.assertEqual(url, 'https://crm.example.com/0/odata/$batch')
+        self.assertEqual(kwargs['headers'], {'Prefer': 'odata.continue-on-error'})
+        self.assertEqual(kwargs['data']['requests'][0]['url'], 'Activity')
+
+        self.assertEqual(results[0], {'Id': 'activity1'})
+        self.assertIn('Invalid DueDate', str(results[1]))
+
+    @patch.object(SAPC4CClient, '_make_request')
+    def test_sap_c4c_odata_batch(self, mock_make_request, mock_getattr):
+        """Test SAP C4C writes go through one multipart $batch call"""
+        response = Mock()
+        response.headers = {'Content-Type': 'multipart/mixed; boundary=batch_resp'}
+        response.text = (
+            "--batch_resp\r\n"
+            "Content-Type: multipart/mixed; boundary=changeset_resp\r\n"
+            "\r\n"
+            "--changeset_resp\r\n"
+            "Content-Type: application/http\r\n"
+            "Content-Transfer-Encoding: binary\r\n"
+            "\r\n"
+            "HTTP/1.1 204 No Content\r\n"
+            "\r\n"
+            "\r\n"
+            "--changeset_resp--\r\n"
+            "--batch_resp\r\n"
+            "Content-Type: application/http\r\n"
+            "Content-Transfer-Encoding: binary\r\n"
+            "\r\n"
+            "HTTP/1.1 400 Bad Request\r\n"
+            "Content-Type: application/json\r\n"
+            "\r\n"
+            '{"error": {"message": {"value": "Activity not found"}}}\r\n'
+            "--batch_resp--\r\n"
+        )
+        mock_make_request.return_value = response
+
+        results = SAPC4CClient().update_meeting_outcomes([('act1', {'title': 'A'}), ('act2', {'title': 'B'})])
+
+        method, url = mock_make_request.call_args[0]
+        kwargs = mock_make_request.call_args[1]
+        body = kwargs['content'].decode()
+        self.assertEqual(url, 'https://crm.example.com/sap/c4c/odata/v1/c4codataapi/$batch')
+        self.assertTrue(kwargs['headers']['Content-Type'].startswith('multipart/mixed; boundary=batch_'))
+        self.assertIn("PATCH ActivityCollection('act2') HTTP/1.1", body)
+        self.assertEqual(body.count('Content-Type: multipart/mixed; boundary=changeset_'), 2)
+
+        self.assertEqual(results[0], {'Id': 'act1', 'success': True})
+        self.assertIsInstance(results[1], CRMAPIError)
+        self.assertIn('Activity not found', str(results[1]))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestCRMServiceBatching(TestCase):
+    """Test CRMService maps batched results back to CRMSyncResults"""
+
+    def setUp(self):
+        cache.clear()
+        self.crm_service = CRMService()
+        self.validation_sessions = [self._create_validation_session(i) for i in range(3)]
+
+    def _create_validation_session(self, index):
+        lead = Lead.objects.create(
+            crm_id=f'lead{index}',
+            name=f'Test Lead {index}',
+            email=f'test{index}@example.com',
+            company='Test Company'
+        )
+        meeting = Meeting.objects.create(
+            calendar_event_id=f'event{index}',
+            lead=lead,
+            title='Test Meeting',
+            start_time=timezone.now(),
+            end_time=timezone.now() + timedelta(hours=1)
+        )
+        bot_session = CallBotSession.objects.create(
+            meeting=meeting,
+            bot_session_id=f'bot{index}',
+            platform='meet',
+            join_time=timezone.now()
+        )
+        draft_summary = DraftSummary.objects.create(
+            bot_session=bot_session,
+            ai_generated_summary='Test summary',
+            confidence_score=0.9
+        )
+        return ValidationSession.objects.create(
+            draft_summary=draft_summary,
+            sales_rep_email='rep@example.com',
+            started_at=timezone.now(),
+            expires_at=timezone.now() + timedelta(hours=24),
+            validated_summary='Validated summary',
+            approved_crm_updates={
+                'action_items': [
+                    {'title': 'Send proposal', 'priority': 'High'},
+                    {'title': 'Book demo'}
+                ]
+            }
+        )
+
+    @patch.object(SalesforceClient, 'create_follow_up_tasks')
+    def test_create_follow_up_tasks_batched(self, mock_create_tasks):
+        """Test action items are created in one batch call with per-task results"""
+        mock_create_tasks.return_value = [{'Id': 'task1'}, CRMAPIError("Subject missing")]
+
+        results = self.crm_service.create_follow_up_tasks(self.validation_sessions[0].id, CRMSystem.SALESFORCE)
+
+        mock_create_tasks.assert_called_once()
+        record_id, tasks = mock_create_tasks.call_args[0]
+        self.assertEqual(record_id, 'lead0')
+        self.assertEqual([task['title'] for task in tasks], ['Send proposal', 'Book demo'])
+
+        self.assertEqual(results[0].status, CRMSyncStatus.SUCCESS)
+        self.assertEqual(results[0].crm_record_id, 'task1')
+        self.assertEqual(results[1].status, CRMSyncStatus.FAILED)
+        self.assertEqual(results[1].error_details, {'action_item': {'title': 'Book demo'}, 'error_type': 'CRMAPIError'})
+
+    @patch('meetings.crm_service.getattr', return_value='https://crm.example.com')
+    @patch.object(SalesforceClient, '_make_request')
+    def test_sync_meeting_outcomes_batched(self, mock_make_request, mock_getattr):
+        """Test several outcomes are synced in one call and recorded per session"""
+        mock_make_request.return_value = json_response([
+            {'id': 'lead0', 'success': True, 'errors': []},
+            {'id': 'lead1', 'success': False, 'errors': [{'statusCode': 'ENTITY_IS_DELETED', 'message': 'Deleted'}]},
+            {'id': 'lead2', 'success': True, 'errors': []}
+        ])
+        ids = [session.id for session in self.validation_sessions]
+
+        results = self.crm_service.sync_meeting_outcomes(ids + [999999], 'salesforce')
+
+        self.assertEqual(mock_make_request.call_count, 1)
+        self.assertEqual(results[ids[0]].status, CRMSyncStatus.SUCCESS)
+        self.assertEqual(results[ids[0]].crm_record_id, 'lead0')
+        self.assertEqual(results[ids[1]].status, CRMSyncStatus.FAILED)
+        self.assertIn('Deleted', results[ids[1]].message)
+        self.assertEqual(results[999999].status, CRMSyncStatus.FAILED)
+        self.assertEqual(
+            CRMSyncRecord.objects.filter(crm_system='salesforce', sync_status='completed').count(), 2
+        )
+
+        # Synced outcomes are answered from the cache; only the failed one is sent again
+        mock_make_request.return_value = json_response([{'id': 'lead1', 'success': True, 'errors': []}])
+        results = self.crm_service.sync_meeting_outcomes(ids, 'salesforce')
+
+        self.assertEqual(results[ids[0]].message, "Already synced (cached)")
+        self.assertEqual(results[ids[1]].status, CRMSyncStatus.SUCCESS)
+        self.assertEqual(mock_make_request.call_count, 2)
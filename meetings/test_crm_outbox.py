@@ -0,0 +1,361 @@
+"""
+Tests for the CRM sync outbox and its endpoints
+Celery dispatch and CRM calls are mocked, so no broker or CRM is contacted
+"""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from leads.models import Lead
+from meetings.crm_outbox import CRMSyncOutbox, drain_crm_outbox
+from meetings.crm_service import CRMService, CRMSyncService, CRMSyncResult, CRMSyncStatus
+from meetings.models import (
+    Meeting, CallBotSession, DraftSummary, ValidationSession, CRMSyncRecord, CRMSyncOutboxEntry
+)
+
+SUCCESS = CRMSyncResult(status=CRMSyncStatus.SUCCESS, message='Synced', crm_record_id='crm1')
+API_ERROR = CRMSyncResult(
+    status=CRMSyncStatus.FAILED, message='Service unavailable', error_details={'error_type': 'CRMAPIError'}
+)
+NO_LEAD = CRMSyncResult(status=CRMSyncStatus.FAILED, message='No associated lead or CRM ID found')
+
+
+def create_validation_session():
+    lead = Lead.objects.create(crm_id='lead1', name='Test Lead', email='test@example.com', company='Test Company')
+    meeting = Meeting.objects.create(
+        calendar_event_id='event1',
+        lead=lead,
+        title='Test Meeting',
+        start_time=timezone.now(),
+        end_time=timezone.now() + timedelta(hours=1)
+    )
+    bot_session = CallBotSession.objects.create(
+        meeting=meeting, bot_session_id='bot1', platform='meet', join_time=timezone.now()
+    )
+    draft_summary = DraftSummary.objects.create(
+        bot_session=bot_session, ai_generated_summary='Test summary', confidence_score=0.9
+    )
+    return ValidationSession.objects.create(
+        draft_summary=draft_summary,
+        sales_rep_email='rep@example.com',
+        started_at=timezone.now(),
+        completed_at=timezone.now() + timedelta(minutes=5),
+        expires_at=timezone.now() + timedelta(hours=24),
+        validated_summary='Validated summary',
+        validation_status='completed'
+    )
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+@patch('meetings.crm_outbox.process_crm_outbox_entry.apply_async')
+class TestCRMSyncOutbox(TestCase):
+    """Test queueing, claiming, retrying and limiting outbox entries"""
+
+    def setUp(self):
+        cache.clear()
+        self.outbox = CRMSyncOutbox()
+
+    def _make_due(self, entry):
+        CRMSyncOutboxEntry.objects.filter(pk=entry.pk).update(next_attempt_at=timezone.now())
+
+    def test_enqueue_dispatches_on_commit(self, mock_apply_async):
+        """Test workers are only notified once the entry is committed"""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            entry, created = self.outbox.enqueue('meeting_outcome', 'creatio', {'meeting_id': 1})
+            mock_apply_async.assert_not_called()
+
+        self.assertTrue(created)
+        self.assertEqual(len(callbacks), 1)
+        mock_apply_async.assert_called_once_with(args=[str(entry.tracking_id)], countdown=None)
+
+    def test_enqueue_idempotency_key(self, mock_apply_async):
+        """Test an operation queued twice with one key is queued once"""
+        first, _ = self.outbox.enqueue('meeting_outcome', 'creatio', {'meeting_id': 1}, idempotency_key='key1')
+        second, created = self.outbox.enqueue('meeting_outcome', 'creatio', {'meeting_id': 1}, idempotency_key='key1')
+
+        self.assertFalse(created)
+        self.assertEqual(first.tracking_id, second.tracking_id)
+        self.assertEqual(CRMSyncOutboxEntry.objects.count(), 1)
+
+    @patch.object(CRMSyncService, 'sync_meeting_outcome', return_value=SUCCESS)
+    def test_process_success_runs_once(self, mock_sync, mock_apply_async):
+        """Test a completed entry is not run again when redelivered"""
+        entry, _ = self.outbox.enqueue('meeting_outcome', 'creatio', {'meeting_id': 7})
+
+        self.assertEqual(self.outbox.process(entry.tracking_id), 'completed')
+        self.assertEqual(self.outbox.process(entry.tracking_id), 'completed')
+
+        mock_sync.assert_called_once_with(7)
+        entry.refresh_from_db()
+        self.assertEqual(entry.attempts, 1)
+        self.assertEqual(entry.result['meeting_sync']['crm_record_id'], 'crm1')
+        self.assertIsNotNone(entry.completed_at)
+
+    @patch.object(CRMSyncService, 'sync_meeting_outcome', return_value=API_ERROR)
+    def test_exponential_retry(self, mock_sync, mock_apply_async):
+        """Test transient failures are retried with doubling delays until attempts run out"""
+        entry, _ = self.outbox.enqueue('meeting_outcome', 'creatio', {'meeting_id': 7})
+        entry.max_attempts = 3
+        entry.save()
+
+        delays = []
+        for _ in range(3):
+            self._make_due(entry)
+            self.outbox.process(entry.tracking_id)
+            entry.refresh_from_db()
+            if entry.status == 'pending':
+                delays.append(mock_apply_async.call_args.kwargs['countdown'])
+
+        self.assertEqual(entry.status, 'failed')
+        self.assertEqual(entry.attempts, 3)
+        self.assertEqual(entry.error_message, 'Service unavailable')
+        self.assertEqual([round(delay) for delay in delays], [30, 60])
+
+    @patch.object(CRMSyncService, 'sync_meeting_outcome', return_value=NO_LEAD)
+    def test_permanent_failure_not_retried(self, mock_sync, mock_apply_async):
+        """Test failures another attempt cannot fix fail the entry at once"""
+        entry, _ = self.outbox.enqueue('meeting_outcome', 'creatio', {'meeting_id': 7})
+
+        self.assertEqual(self.outbox.process(entry.tracking_id), 'failed')
+        self.assertEqual(CRMSyncOutboxEntry.objects.get(pk=entry.pk).attempts, 1)
+
+    @override_settings(CRM_OUTBOX_MAX_CONCURRENCY=1)
+    @patch.object(CRMSyncService, 'sync_meeting_outcome', return_value=SUCCESS)
+    def test_concurrency_limit_per_crm(self, mock_sync, mock_apply_async):
+        """Test an entry waits while its CRM has no free worker slot"""
+        outbox = CRMSyncOutbox()
+        busy, _ = outbox.enqueue('meeting_outcome', 'creatio', {'meeting_id': 7})
+        other_crm, _ = outbox.enqueue('sync_record', 'salesforce', {'sync_record_id': 0})
+        cache.add(f"{outbox.CACHE_PREFIX}:slot:creatio:0", 'another-entry')
+
+        self.assertEqual(outbox.process(busy.tracking_id), 'pending')
+        mock_sync.assert_not_called()
+        mock_apply_async.assert_called_with(args=[str(busy.tracking_id)], countdown=outbox.BUSY_RETRY_DELAY)
+        self.assertEqual(CRMSyncOutboxEntry.objects.get(pk=busy.pk).attempts, 0)
+
+        # Other CRMs are not held up
+        self.assertEqual(outbox.process(other_crm.tracking_id), 'failed')
+
+    @override_settings(CRM_OUTBOX_MAX_CONCURRENCY=1)
+    def test_busy_crm_does_not_multiply_messages(self, mock_apply_async):
+        """Test messages for an entry stay flat while its CRM stays busy across drains"""
+        queued = []
+        mock_apply_async.side_effect = lambda args, countdown: queued.append(args[0])
+        outbox = CRMSyncOutbox()
+        entry, _ = outbox.enqueue('meeting_outcome', 'creatio', {'meeting_id': 7})
+        cache.add(f"{outbox.CACHE_PREFIX}:slot:creatio:0", 'another-entry')
+
+        outstanding = []
+        for _ in range(2):
+            # The busy delay has passed, so both the retry message and drain() find it due
+            self._make_due(entry)
+            outbox.drain()
+            messages, queued[:] = list(queued), []
+            for tracking_id in messages:
+                outbox.process(tracking_id)
+            outstanding.append(len(queued))
+
+        self.assertEqual(outstanding, [1, 1])
+        entry.refresh_from_db()
+        self.assertEqual(entry.attempts, 0)
+        self.assertGreater(entry.next_attempt_at, timezone.now())
+
+    def test_message_for_entry_not_due_is_ignored(self, mock_apply_async):
+        """Test a duplicate message neither takes a CRM slot nor re-dispatches"""
+        entry, _ = self.outbox.enqueue('meeting_outcome', 'creatio', {'meeting_id': 7})
+        CRMSyncOutboxEntry.objects.filter(pk=entry.pk).update(next_attempt_at=timezone.now() + timedelta(minutes=5))
+
+        with patch.object(CRMSyncOutbox, '_acquire_slot') as mock_acquire:
+            self.assertEqual(self.outbox.process(entry.tracking_id), 'pending')
+
+        mock_acquire.assert_not_called()
+        mock_apply_async.assert_not_called()
+
+    def test_drain_reclaims_abandoned_entries(self, mock_apply_async):
+        """Test drain dispatches due entries and those whose worker died"""
+        due, _ = self.outbox.enqueue('meeting_outcome', 'creatio', {'meeting_id': 1})
+        abandoned, _ = self.outbox.enqueue('meeting_outcome', 'creatio', {'meeting_id': 2})
+        running, _ = self.outbox.enqueue('meeting_outcome', 'creatio', {'meeting_id': 3})
+        later, _ = self.outbox.enqueue('meeting_outcome', 'creatio', {'meeting_id': 4})
+        CRMSyncOutboxEntry.objects.filter(pk=abandoned.pk).update(
+            status='in_progress', locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        CRMSyncOutboxEntry.objects.filter(pk=running.pk).update(
+            status='in_progress', locked_until=timezone.now() + timedelta(minutes=5)
+        )
+        CRMSyncOutboxEntry.objects.filter(pk=later.pk).update(next_attempt_at=timezone.now() + timedelta(minutes=5))
+
+        self.assertEqual(drain_crm_outbox(), 2)
+        dispatched = {call.kwargs['args'][0] for call in mock_apply_async.call_args_list}
+        self.assertEqual(dispatched, {str(due.tracking_id), str(abandoned.tracking_id)})
+
+    @patch.object(CRMService, 'create_follow_up_tasks')
+    @patch.object(CRMService, 'sync_meeting_outcome', return_value=SUCCESS)
+    def test_bulk_sync_retry_skips_completed_steps(self, mock_sync, mock_create_tasks, mock_apply_async):
+        """Test a retried bulk sync does not write the steps that succeeded again"""
+        mock_create_tasks.side_effect = [[API_ERROR, API_ERROR], [SUCCESS, SUCCESS]]
+        entry, _ = self.outbox.enqueue('bulk_sync', 'salesforce', {'validation_session_id': 3})
+
+        self.assertEqual(self.outbox.process(entry.tracking_id), 'pending')
+        self._make_due(entry)
+        self.assertEqual(self.outbox.process(entry.tracking_id), 'completed')
+
+        mock_sync.assert_called_once_with(3, 'salesforce')
+        self.assertEqual(mock_create_tasks.call_count, 2)
+
+    @patch.object(CRMService, 'create_follow_up_tasks', return_value=[SUCCESS, API_ERROR])
+    @patch.object(CRMService, 'sync_meeting_outcome', return_value=SUCCESS)
+    def test_partly_written_step_not_retried(self, mock_sync, mock_create_tasks, mock_apply_async):
+        """Test a step that created some records is not retried, which would duplicate them"""
+        entry, _ = self.outbox.enqueue('bulk_sync', 'salesforce', {'validation_session_id': 3})
+
+        self.assertEqual(self.outbox.process(entry.tracking_id), 'failed')
+
+    @patch.object(CRMService, 'sync_meeting_outcomes')
+    def test_sync_record_marked_completed(self, mock_sync, mock_apply_async):
+        """Test an approved sync record is completed even when the sync came from the cache"""
+        validation_session = create_validation_session()
+        sync_record = CRMSyncRecord.objects.create(validation_session=validation_session, crm_system='hubspot')
+        mock_sync.return_value = {validation_session.id: SUCCESS}
+        entry, _ = self.outbox.enqueue('sync_record', 'hubspot', {'sync_record_id': sync_record.id})
+
+        self.assertEqual(self.outbox.process(entry.tracking_id), 'completed')
+
+        mock_sync.assert_called_once_with([validation_session.id], 'hubspot')
+        sync_record.refresh_from_db()
+        self.assertEqual(sync_record.sync_status, 'completed')
+        self.assertEqual(sync_record.crm_record_id, 'crm1')
+
+    @patch.object(CRMService, 'sync_meeting_outcomes')
+    def test_sync_records_for_one_crm_share_a_batch(self, mock_sync, mock_apply_async):
+        """Test due sync records for the same CRM go out in one batch sync and run once"""
+        mock_sync.side_effect = lambda ids, crm_system: {validation_session_id: SUCCESS for validation_session_id in ids}
+        first = create_validation_session()
+        sync_records = [CRMSyncRecord.objects.create(validation_session=first, crm_system='hubspot')]
+        for index in range(2, 4):
+            meeting = Meeting.objects.create(
+                calendar_event_id=f'event{index}',
+                lead=first.draft_summary.bot_session.meeting.lead,
+                title='Test Meeting',
+                start_time=timezone.now(),
+                end_time=timezone.now() + timedelta(hours=1)
+            )
+            bot_session = CallBotSession.objects.create(
+                meeting=meeting, bot_session_id=f'bot{index}', platform='meet', join_time=timezone.now()
+            )
+            draft_summary = DraftSummary.objects.create(
+                bot_session=bot_session, ai_generated_summary='Test summary', confidence_score=0.9
+            )
+            validation_session = ValidationSession.objects.create(
+                draft_summary=draft_summary,
+                sales_rep_email='rep@example.com',
+                started_at=timezone.now(),
+                expires_at=timezone.now() + timedelta(hours=24)
+            )
+            sync_records.append(CRMSyncRecord.objects.create(validation_session=validation_session, crm_system='hubspot'))
+        other_crm = CRMSyncRecord.objects.create(validation_session=first, crm_system='salesforce')
+        entries = [
+            self.outbox.enqueue('sync_record', sync_record.crm_system, {'sync_record_id': sync_record.id})[0]
+            for sync_record in sync_records + [other_crm]
+        ]
+
+        for entry in entries:
+            self.outbox.process(entry.tracking_id)
+
+        self.assertEqual([call.args for call in mock_sync.call_args_list], [
+            ([sync_record.validation_session_id for sync_record in sync_records], 'hubspot'),
+            ([other_crm.validation_session_id], 'salesforce')
+        ])
+        for entry in entries:
+            entry.refresh_from_db()
+            self.assertEqual((entry.status, entry.attempts), ('completed', 1))
+        self.assertEqual(CRMSyncRecord.objects.filter(sync_status='completed').count(), 4)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+@patch('meetings.crm_outbox.process_crm_outbox_entry.apply_async')
+class TestCRMOutboxAPI(TestCase):
+    """Test sync endpoints queue work and return a tracking ID"""
+
+    def setUp(self):
+        cache.clear()
+        self.validation_session = create_validation_session()
+        self.meeting = self.validation_session.draft_summary.bot_session.meeting
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user(username='rep', password='testpass123'))
+
+    def test_sync_meeting_to_crm_accepted(self, mock_apply_async):
+        """Test the webhook returns 202 with a tracking ID that can be polled"""
+        url = reverse('sync-meeting-to-crm', kwargs={'meeting_id': self.meeting.id})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'pending')
+        entry = CRMSyncOutboxEntry.objects.get(tracking_id=response.data['tracking_id'])
+        self.assertEqual(entry.payload, {'meeting_id': self.meeting.id})
+        mock_apply_async.assert_called_once()
+
+        job_response = self.client.get(response.data['status_url'])
+        self.assertEqual(job_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(job_response.data['operation'], 'meeting_outcome')
+        self.assertEqual(job_response.data['crm_system'], 'creatio')
+
+    def test_sync_meeting_to_crm_idempotency_key(self, mock_apply_async):
+        """Test a webhook delivered twice is synced once"""
+        url = reverse('sync-meeting-to-crm', kwargs={'meeting_id': self.meeting.id})
+
+        first = self.client.post(url, format='json', HTTP_IDEMPOTENCY_KEY='delivery-1')
+        second = self.client.post(url, format='json', HTTP_IDEMPOTENCY_KEY='delivery-1')
+
+        self.assertEqual(first.data['tracking_id'], second.data['tracking_id'])
+        self.assertEqual(CRMSyncOutboxEntry.objects.count(), 1)
+
+    def test_sync_meeting_to_crm_unknown_meeting(self, mock_apply_async):
+        """Test nothing is queued for a meeting that does not exist"""
+        response = self.client.post(reverse('sync-meeting-to-crm', kwargs={'meeting_id': 99999}), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(CRMSyncOutboxEntry.objects.exists())
+
+    def test_bulk_sync_accepted(self, mock_apply_async):
+        """Test bulk sync is queued with its options"""
+        url = reverse('bulk-sync-validation-session', kwargs={'validation_session_id': self.validation_session.id})
+
+        response = self.client.post(url, {
+            'crm_system': 'hubspot',
+            'include_opportunity_update': True,
+            'opportunity_data': {'opportunity_id': 'opp1'}
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        entry = CRMSyncOutboxEntry.objects.get(tracking_id=response.data['tracking_id'])
+        self.assertEqual(entry.operation, 'bulk_sync')
+        self.assertEqual(entry.crm_system, 'hubspot')
+        self.assertTrue(entry.payload['include_opportunity_update'])
+
+    def test_approve_crm_updates_queues_sync_records(self, mock_apply_async):
+        """Test each approved system gets an outbox entry for its sync record"""
+        url = reverse('approve-crm-updates', kwargs={'session_id': self.validation_session.id})
+
+        response = self.client.post(url, {'approved_systems': ['salesforce', 'hubspot']}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(len(response.data['sync_jobs']), 2)
+        sync_record_ids = set(CRMSyncRecord.objects.values_list('id', flat=True))
+        queued_ids = {entry.payload['sync_record_id'] for entry in CRMSyncOutboxEntry.objects.all()}
+        self.assertEqual(queued_ids, sync_record_ids)
+
+    def test_unknown_tracking_id(self, mock_apply_async):
+        """Test polling an unknown tracking ID returns 404"""
+        url = reverse('get-crm-sync-job', kwargs={'tracking_id': '00000000-0000-0000-0000-000000000000'})
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,118 @@
+"""
+Tests for the CRM API rate limiter
+Runs against the in-process bucket, so no Redis is needed
+"""
+import unittest
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from meetings import crm_rate_limiter
+from meetings.crm_rate_limiter import (
+    CRMRateLimiter, LocalTokenBucket, parse_retry_after, parse_sforce_limit_info
+)
+from meetings.crm_service import SalesforceClient
+
+
+class TestLocalTokenBucket(unittest.TestCase):
+    """Test the token bucket arithmetic"""
+
+    @patch('meetings.crm_rate_limiter.time.time', return_value=1000.0)
+    def test_burst_then_sustained_rate(self, mock_time):
+        """Test a full bucket allows a burst, then spaces callers at the sustained rate"""
+        bucket = LocalTokenBucket()
+
+        waits = [bucket.acquire(rate=2, capacity=3) for _ in range(5)]
+
+        self.assertEqual(waits, [0.0, 0.0, 0.0, 0.5, 1.0])
+
+    @patch('meetings.crm_rate_limiter.time.time')
+    def test_refill(self, mock_time):
+        """Test tokens refill over time up to capacity"""
+        mock_time.return_value = 1000.0
+        bucket = LocalTokenBucket()
+        for _ in range(3):
+            bucket.acquire(rate=2, capacity=3)
+
+        mock_time.return_value = 1060.0
+        waits = [bucket.acquire(rate=2, capacity=3) for _ in range(4)]
+
+        self.assertEqual(waits, [0.0, 0.0, 0.0, 0.5])
+
+    @patch('meetings.crm_rate_limiter.time.time', return_value=1000.0)
+    def test_block_and_rate_factor(self, mock_time):
+        """Test a block delays every caller and the rate factor slows refills"""
+        bucket = LocalTokenBucket()
+        bucket.block(5)
+        self.assertEqual(bucket.acquire(rate=2, capacity=1), 5.0)
+
+        bucket = LocalTokenBucket()
+        bucket.rate_factor = 0.5
+        bucket.acquire(rate=2, capacity=1)
+        self.assertEqual(bucket.acquire(rate=2, capacity=1), 1.0)
+
+
+@override_settings(CRM_RATE_LIMITER_SHARED=False)
+class TestCRMRateLimiter(SimpleTestCase):
+    """Test response handling and client integration"""
+
+    def setUp(self):
+        crm_rate_limiter.local_buckets.clear()
+
+    def test_same_credentials_share_a_bucket(self):
+        """Test limiters are keyed by CRM system and credentials"""
+        config = {'token_url': 'https://crm.example.com/token', 'client_id': 'abc'}
+        limiter = CRMRateLimiter.for_credentials('salesforce', config)
+
+        self.assertEqual(limiter.key, CRMRateLimiter.for_credentials('salesforce', dict(config)).key)
+        self.assertNotEqual(limiter.key, CRMRateLimiter.for_credentials('hubspot', config).key)
+        self.assertNotEqual(limiter.key, CRMRateLimiter.for_credentials('salesforce', {**config, 'client_id': 'xyz'}).key)
+        self.assertNotIn('abc', limiter.key)
+
+    def test_clients_share_a_bucket(self):
+        """Test two clients for the same org draw from one budget"""
+        first, second = SalesforceClient(), SalesforceClient()
+        for client in (first, second):
+            client.requests_per_minute = 60
+            client.burst_limit = 2
+
+        self.assertEqual(first._reserve_request_slot(), 0)
+        self.assertEqual(second._reserve_request_slot(), 0)
+        self.assertGreater(first._reserve_request_slot(), 0.9)
+
+    def test_retry_after_blocks_bucket(self):
+        """Test a 429 with Retry-After pauses the bucket"""
+        limiter = CRMRateLimiter('salesforce', 'tenant')
+        limiter.observe_response(429, {'Retry-After': '30'})
+
+        self.assertGreater(limiter.acquire(6000, 100), 29)
+
+    def test_low_allowance_slows_rate(self):
+        """Test Sforce-Limit-Info near the daily limit scales the sustained rate down"""
+        limiter = CRMRateLimiter('salesforce', 'tenant')
+        bucket = crm_rate_limiter.get_local_bucket(limiter.key)
+
+        limiter.observe_response(200, {'Sforce-Limit-Info': 'api-usage=5000/100000'})
+        self.assertEqual(bucket.rate_factor, 1.0)
+
+        limiter.observe_response(200, {'Sforce-Limit-Info': 'api-usage=97000/100000'})
+        self.assertEqual(bucket.rate_factor, 0.3)
+
+        limiter.observe_response(200, {'Sforce-Limit-Info': 'api-usage=100000/100000'})
+        self.assertEqual(bucket.rate_factor, CRMRateLimiter.MIN_RATE_FACTOR)
+
+
+class TestRateLimitHeaders(unittest.TestCase):
+    """Test rate limit header parsing"""
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after({'Retry-After': '12'}), 12.0)
+        self.assertIsNone(parse_retry_after({'Retry-After': 'Wed, 21 Oct 2026 07:28:00 GMT'}))
+        self.assertIsNone(parse_retry_after({}))
+
+    def test_parse_sforce_limit_info(self):
+        self.assertEqual(
+            parse_sforce_limit_info({'Sforce-Limit-Info': 'api-usage=18/15000'}), (18, 15000)
+        )
+        self.assertIsNone(parse_sforce_limit_info({'Sforce-Limit-Info': 'per-app-api-usage'}))
+        self.assertIsNone(parse_sforce_limit_info({}))
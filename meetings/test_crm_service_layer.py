@@ -3,7 +3,7 @@ Unit tests for multi-CRM service layer with OAuth2 authentication
 Tests Salesforce, SAP C4C, and Creatio clients with mocked responses
 """
 import unittest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from datetime import datetime, timedelta
 import json
 import requests
@@ -586,8 +586,10 @@ class TestCRMServiceIntegration(TestCase):
     
     def test_sync_to_multiple_crms(self):
         """Test syncing to multiple CRM systems"""
-        with patch.object(SalesforceClient, 'update_meeting_outcome') as mock_sf, \
-             patch.object(CreatioClient, 'update_meeting_outcome') as mock_creatio:
+        with patch('meetings.async_crm_service.AsyncSalesforceClient.aupdate_meeting_outcome',
+                   new_callable=AsyncMock) as mock_sf, \
+             patch('meetings.async_crm_service.AsyncCreatioClient.aupdate_meeting_outcome',
+                   new_callable=AsyncMock) as mock_creatio:
             
             mock_sf.return_value = {'Id': 'sf123'}
             mock_creatio.return_value = {'Id': 'creatio123'}
@@ -600,6 +602,7 @@ class TestCRMServiceIntegration(TestCase):
             self.assertEqual(len(results), 2)
             self.assertEqual(results['salesforce'].status, CRMSyncStatus.SUCCESS)
             self.assertEqual(results['creatio'].status, CRMSyncStatus.SUCCESS)
+            self.assertEqual(results['creatio'].crm_record_id, 'creatio123')
     
     def test_get_sync_status(self):
         """Test getting sync status"""
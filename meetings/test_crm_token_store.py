@@ -0,0 +1,155 @@
+"""
+Tests for the shared CRM OAuth2 token store
+Uses a local-memory cache in place of Redis
+"""
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+
+from meetings.crm_service import SalesforceClient, CreatioClient, OAuth2Token
+from meetings.crm_token_store import CRMTokenStore, token_store
+
+CONFIG = {'token_url': 'https://crm.example.com/token', 'client_id': 'abc', 'client_secret': 'secret'}
+
+
+def make_token(access_token='token123', expires_in=3600):
+    return OAuth2Token(access_token=access_token, expires_at=timezone.now() + timedelta(seconds=expires_in))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestCRMTokenStore(SimpleTestCase):
+    """Test token reuse, refresh and single-flight behaviour"""
+
+    def setUp(self):
+        cache.clear()
+        self.store = CRMTokenStore()
+        self.fetch = Mock(side_effect=lambda: make_token(f'token{self.fetch.call_count}'))
+
+    def test_token_reused_across_processes(self):
+        """Test a token fetched once is served from the cache to another process"""
+        first = self.store.get_token('salesforce', CONFIG, self.fetch)
+
+        # A new store has nothing in memory, like another worker
+        second = CRMTokenStore().get_token('salesforce', CONFIG, self.fetch)
+
+        self.assertEqual(self.fetch.call_count, 1)
+        self.assertEqual(second.access_token, first.access_token)
+
+    def test_tokens_keyed_by_credentials(self):
+        """Test different systems and credentials get their own tokens"""
+        self.store.get_token('salesforce', CONFIG, self.fetch)
+        self.store.get_token('creatio', CONFIG, self.fetch)
+        self.store.get_token('salesforce', {**CONFIG, 'client_secret': 'rotated'}, self.fetch)
+
+        self.assertEqual(self.fetch.call_count, 3)
+        self.assertNotIn('secret', self.store.key_for('salesforce', CONFIG))
+
+    def test_proactive_refresh(self):
+        """Test a token close to expiry is replaced before it expires"""
+        self.store.store(self.store.key_for('salesforce', CONFIG), make_token(expires_in=3600))
+        self.assertEqual(self.store.get_token('salesforce', CONFIG, self.fetch).access_token, 'token123')
+
+        key = self.store.key_for('salesforce', CONFIG)
+        self.store._tokens[key].refresh_at = timezone.now() - timedelta(seconds=1)
+        cache.delete(key)
+
+        self.assertEqual(self.store.get_token('salesforce', CONFIG, self.fetch).access_token, 'token1')
+
+    def test_short_lived_tokens_refresh_halfway(self):
+        """Test the refresh margin is capped at half the token's lifetime"""
+        token = make_token(expires_in=120)
+        self.store.store('key', token)
+
+        self.assertFalse(self.store.needs_refresh(token))
+        self.assertLess(token.refresh_at, token.expires_at - timedelta(seconds=59))
+
+    def test_refresh_in_progress_keeps_current_token(self):
+        """Test callers keep the still-valid token while another process refreshes"""
+        key = self.store.key_for('salesforce', CONFIG)
+        stale = make_token('stale')
+        stale.refresh_at = timezone.now() - timedelta(seconds=1)
+        self.store.store(key, stale)
+        cache.add(f"{key}:refreshing", 1)
+
+        token = self.store.get_token('salesforce', CONFIG, self.fetch)
+
+        self.assertEqual(token.access_token, 'stale')
+        self.fetch.assert_not_called()
+
+    def test_expired_token_waits_for_other_refresh(self):
+        """Test callers wait for another process's refresh instead of fetching"""
+        key = self.store.key_for('salesforce', CONFIG)
+        cache.add(f"{key}:refreshing", 1)
+
+        # The other process stores its token while we poll
+        with patch('meetings.crm_token_store.time.sleep', side_effect=lambda _: cache.set(key, make_token('shared'))):
+            token = self.store.get_token('salesforce', CONFIG, self.fetch)
+
+        self.assertEqual(token.access_token, 'shared')
+        self.fetch.assert_not_called()
+
+    def test_invalidate_rejected_token(self):
+        """Test a rejected token is dropped, but a newer one is kept"""
+        key = self.store.key_for('salesforce', CONFIG)
+        rejected = self.store.get_token('salesforce', CONFIG, self.fetch)
+
+        self.store.invalidate('salesforce', CONFIG, make_token('older'))
+        self.assertIsNotNone(cache.get(key))
+
+        self.store.invalidate('salesforce', CONFIG, rejected)
+        self.assertIsNone(cache.get(key))
+        self.assertIsNone(self.store.lookup(key))
+
+    def test_authentications_avoided_metric(self):
+        """Test fetched and avoided authentications are counted across processes"""
+        for _ in range(3):
+            self.store.get_token('salesforce', CONFIG, self.fetch)
+        other_process = CRMTokenStore()
+        other_process.get_token('salesforce', CONFIG, self.fetch)
+        other_process.get_stats([])
+
+        stats = self.store.get_stats(['salesforce', 'hubspot'])
+
+        self.assertEqual(stats['salesforce'], {'authentications_avoided': 3, 'tokens_fetched': 1})
+        self.assertEqual(stats['hubspot'], {'authentications_avoided': 0, 'tokens_fetched': 0})
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+@patch('meetings.crm_service.getattr', return_value='https://crm.example.com')
+class TestClientTokenSharing(SimpleTestCase):
+    """Test CRM clients share tokens through the store"""
+
+    def setUp(self):
+        cache.clear()
+        token_store.clear()
+
+    def _token_response(self, access_token='shared_token'):
+        response = Mock()
+        response.json.return_value = {'access_token': access_token, 'expires_in': 3600}
+        return response
+
+    def test_new_clients_reuse_token(self, mock_getattr):
+        """Test clients built per request authenticate once between them"""
+        with patch('requests.Session.post', return_value=self._token_response()) as mock_post:
+            for _ in range(3):
+                client = SalesforceClient()
+                self.assertTrue(client._ensure_authenticated())
+
+        mock_post.assert_called_once()
+        self.assertEqual(client.token.access_token, 'shared_token')
+
+    def test_unauthorized_response_fetches_new_token(self, mock_getattr):
+        """Test a 401 replaces the shared token instead of reusing it"""
+        unauthorized, ok = Mock(status_code=401, headers={}), Mock(status_code=200, headers={})
+        client = CreatioClient()
+
+        with patch('requests.Session.post', side_effect=[
+            self._token_response('first'), self._token_response('second')
+        ]) as mock_post, patch('requests.Session.request', side_effect=[unauthorized, ok]):
+            client._make_request('GET', 'https://crm.example.com/0/odata/Lead')
+
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(client.token.access_token, 'second')
@@ -0,0 +1,226 @@
+"""
+Tests for pre-aggregated sync health rollups, their backfill and the timeseries endpoint
+"""
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from meetings.crm_outbox import CRMSyncOutbox
+from meetings.crm_service import CRMSyncService, CRMSyncResult, CRMSyncStatus
+from meetings.models import CRMSyncRecord, SyncRollup
+from meetings.sync_rollups import SyncRollupService, bucket_start
+from meetings.sync_tracker import SyncTracker, SyncOperation
+from meetings.test_crm_outbox import create_validation_session
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestSyncRollupService(TestCase):
+    """Test rollup counters and range queries"""
+
+    def setUp(self):
+        self.rollups = SyncRollupService()
+        self.now = timezone.now()
+
+    def test_record_updates_every_granularity(self):
+        """Test one operation is counted in its minute, hour and day buckets"""
+        self.rollups.record('salesforce', 'meeting_outcome', 'success', self.now, 120.0)
+        self.rollups.record('salesforce', 'meeting_outcome', 'failed', self.now, 80.0)
+        self.rollups.record('salesforce', 'meeting_outcome', 'success', self.now)
+
+        for granularity in ('minute', 'hour', 'day'):
+            rollup = SyncRollup.objects.get(granularity=granularity)
+            self.assertEqual(rollup.bucket_start, bucket_start(self.now, granularity))
+            self.assertEqual(rollup.total_count, 3)
+            self.assertEqual(rollup.success_count, 2)
+            self.assertEqual(rollup.failure_count, 1)
+            self.assertEqual(rollup.latency_count, 2)
+            self.assertEqual(rollup.latency_total_ms, 200.0)
+            self.assertEqual(rollup.latency_max_ms, 120.0)
+
+    def test_totals_combine_granularities_without_double_counting(self):
+        """Test a range is covered by day, hour and minute buckets that do not overlap"""
+        timestamps = [self.now - timedelta(days=days, hours=1) for days in range(1, 31)] + [self.now]
+        self.rollups.record_many(
+            ('hubspot', 'sync_record', 'success', timestamp, 50.0) for timestamp in timestamps
+        )
+
+        with self.assertNumQueries(1):
+            totals = self.rollups.get_totals(self.now - timedelta(days=40), self.now)[None]
+
+        self.assertEqual(totals['total_operations'], 31)
+        self.assertEqual(totals['success_rate'], 100.0)
+        self.assertEqual(totals['average_latency_ms'], 50.0)
+
+    def test_totals_grouped_and_bounded_by_range(self):
+        """Test grouped totals only count buckets inside the range"""
+        self.rollups.record('salesforce', 'meeting_outcome', 'success', self.now)
+        self.rollups.record('hubspot', 'meeting_outcome', 'failed', self.now)
+        self.rollups.record('hubspot', 'meeting_outcome', 'failed', self.now - timedelta(hours=3))
+
+        totals = self.rollups.get_totals(self.now - timedelta(hours=1), self.now, group_by='crm_system')
+
+        self.assertEqual(set(totals), {'salesforce', 'hubspot'})
+        self.assertEqual(totals['hubspot']['failed_operations'], 1)
+        self.assertEqual(totals['salesforce']['successful_operations'], 1)
+
+    def test_segments_use_coarsest_buckets(self):
+        """Test the number of buckets queried does not grow with the length of the range"""
+        start = self.now - timedelta(days=30, hours=5, minutes=17)
+        segments = self.rollups._segments(start, self.now)
+
+        # Minute buckets that old are pruned, so the start widens to its hour
+        self.assertLessEqual(len(segments), 5)
+        self.assertEqual(segments[0][1], bucket_start(start, 'hour'))
+        self.assertEqual(segments[-1][2], bucket_start(self.now, 'minute') + timedelta(minutes=1))
+        for previous, following in zip(segments, segments[1:]):
+            self.assertEqual(previous[2], following[1])
+
+    def test_prune_keeps_day_buckets(self):
+        """Test pruning removes expired minute buckets but keeps day buckets"""
+        self.rollups.record('salesforce', 'meeting_outcome', 'success', self.now - timedelta(days=5))
+
+        self.rollups.prune()
+
+        self.assertEqual(
+            set(SyncRollup.objects.values_list('granularity', flat=True)), {'hour', 'day'}
+        )
+
+    def test_tracker_feeds_rollups(self):
+        """Test tracked operations show up in the health metrics per CRM system"""
+        tracker = SyncTracker()
+        tracker.track_sync_operation(
+            1, SyncOperation.MEETING_OUTCOME, CRMSyncStatus.FAILED,
+            {'error_message': 'Timeout'}, crm_system='salesforce', duration_ms=30.0
+        )
+
+        metrics = tracker.get_sync_health_metrics()
+
+        self.assertEqual(metrics['recent_failures'], 1)
+        self.assertEqual(metrics['crm_systems']['salesforce']['failed_operations'], 1)
+        self.assertEqual(metrics['crm_systems']['salesforce']['average_latency_ms'], 30.0)
+
+    @patch('meetings.crm_outbox.process_crm_outbox_entry.apply_async')
+    @patch.object(
+        CRMSyncService, 'sync_meeting_outcome',
+        return_value=CRMSyncResult(status=CRMSyncStatus.SUCCESS, message='Synced', crm_record_id='crm1')
+    )
+    def test_outbox_attempts_feed_rollups(self, mock_sync, mock_apply_async):
+        """Test each outbox attempt is counted with its latency"""
+        outbox = CRMSyncOutbox()
+        entry, _ = outbox.enqueue('meeting_outcome', 'creatio', {'meeting_id': 7})
+
+        outbox.process(entry.tracking_id)
+
+        rollup = SyncRollup.objects.get(granularity='minute', crm_system='creatio', operation='meeting_outcome')
+        self.assertEqual(rollup.success_count, 1)
+        self.assertEqual(rollup.latency_count, 1)
+
+
+class TestBackfillSyncRollups(TestCase):
+    """Test building rollups from CRM sync record history"""
+
+    def test_backfill_counts_finished_records(self):
+        """Test completed and failed records are counted, unfinished ones skipped"""
+        validation_session = create_validation_session()
+        synced_at = timezone.now() - timedelta(days=3)
+        for crm_system, sync_status in (('salesforce', 'completed'), ('hubspot', 'failed'), ('creatio', 'pending')):
+            CRMSyncRecord.objects.create(
+                validation_session=validation_session,
+                crm_system=crm_system,
+                sync_status=sync_status,
+                synced_at=synced_at if sync_status == 'completed' else None
+            )
+
+        call_command('backfill_sync_rollups', stdout=StringIO())
+        call_command('backfill_sync_rollups', '--reset', stdout=StringIO())
+
+        days = SyncRollup.objects.filter(granularity='day', operation='sync_record')
+        self.assertEqual(sorted(days.values_list('crm_system', 'success_count', 'failure_count')), [
+            ('hubspot', 0, 1), ('salesforce', 1, 0)
+        ])
+        self.assertEqual(
+            days.get(crm_system='salesforce').bucket_start, bucket_start(synced_at, 'day')
+        )
+
+    def _record(self, crm_system, synced_at):
+        return CRMSyncRecord.objects.create(
+            validation_session=self.validation_session,
+            crm_system=crm_system,
+            sync_status='completed',
+            synced_at=synced_at
+        )
+
+    def test_backfill_stops_at_live_rollups(self):
+        """Test records already counted live are not counted again, and --reset keeps live counters"""
+        self.validation_session = create_validation_session()
+        now = timezone.now()
+        live_day = bucket_start(now - timedelta(days=2), 'day')
+        self._record('salesforce', now - timedelta(days=5))
+        self._record('hubspot', now)
+        rollups = SyncRollupService()
+        rollups.record('hubspot', 'sync_record', 'success', now)
+        rollups.record('salesforce', 'meeting_outcome', 'success', live_day)
+
+        call_command('backfill_sync_rollups', stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('backfill_sync_rollups', stdout=StringIO(), until=now.date().isoformat())
+        call_command('backfill_sync_rollups', '--reset', stdout=StringIO())
+
+        days = SyncRollup.objects.filter(granularity='day', operation='sync_record')
+        self.assertEqual(sorted(days.values_list('crm_system', 'bucket_start', 'total_count')), [
+            ('hubspot', bucket_start(now, 'day'), 1),
+            ('salesforce', bucket_start(now - timedelta(days=5), 'day'), 1)
+        ])
+        self.assertEqual(SyncRollup.objects.get(granularity='day', operation='meeting_outcome').total_count, 1)
+
+    def test_backfill_until(self):
+        """Test --until limits the backfill to whole days before it"""
+        self.validation_session = create_validation_session()
+        now = timezone.now()
+        self._record('hubspot', now - timedelta(days=10))
+        self._record('salesforce', now - timedelta(days=1))
+
+        call_command('backfill_sync_rollups', stdout=StringIO(), until=(now - timedelta(days=3)).isoformat())
+
+        day = SyncRollup.objects.get(granularity='day', operation='sync_record')
+        self.assertEqual(day.crm_system, 'hubspot')
+        self.assertEqual(day.bucket_start, bucket_start(now - timedelta(days=10), 'day'))
+
+
+class TestSyncHealthTimeseriesAPI(TestCase):
+    """Test the rollup-backed timeseries endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user(username='rep', password='testpass123'))
+        self.url = reverse('get-sync-health-timeseries')
+
+    def test_hourly_series(self):
+        """Test buckets are returned oldest first for the requested CRM system"""
+        rollups = SyncRollupService()
+        now = timezone.now()
+        rollups.record('salesforce', 'meeting_outcome', 'success', now - timedelta(hours=2))
+        rollups.record('salesforce', 'meeting_outcome', 'failed', now)
+        rollups.record('hubspot', 'meeting_outcome', 'failed', now)
+
+        response = self.client.get(self.url, {'granularity': 'hour', 'hours': 6, 'crm_system': 'salesforce'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(bucket['successful_operations'], bucket['failed_operations']) for bucket in response.data['buckets']],
+            [(1, 0), (0, 1)]
+        )
+
+    def test_invalid_granularity(self):
+        """Test an unknown granularity is rejected"""
+        response = self.client.get(self.url, {'granularity': 'week'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
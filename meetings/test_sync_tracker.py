@@ -5,10 +5,9 @@ from unittest.mock import Mock, patch
 from datetime import datetime, timedelta
 from django.test import TestCase
 from django.utils import timezone
-from django.core.cache import cache
 
 from leads.models import Lead
-from .models import Meeting, MeetingSession, ActionItem
+from .models import Meeting, MeetingSession, ActionItem, SyncEvent
 from .sync_tracker import SyncTracker, SyncOperation
 from .crm_service import CRMSyncStatus
 
@@ -44,10 +43,6 @@ class SyncTrackerTest(TestCase):
             ended_at=timezone.now()
         )
     
-    def tearDown(self):
-        # Clear cache after each test
-        cache.clear()
-    
     def test_track_sync_operation(self):
         """Test tracking a sync operation"""
         details = {
@@ -66,15 +61,14 @@ class SyncTrackerTest(TestCase):
         self.assertIn(str(self.meeting.id), tracking_id)
         self.assertIn(SyncOperation.MEETING_OUTCOME.value, tracking_id)
         
-        # Verify the operation was cached
-        cache_key = f"{self.tracker.CACHE_PREFIX}:operation:{tracking_id}"
-        cached_data = cache.get(cache_key)
+        # Verify the operation was stored
+        event = SyncEvent.objects.get(tracking_id=tracking_id)
         
-        self.assertIsNotNone(cached_data)
-        self.assertEqual(cached_data['meeting_id'], self.meeting.id)
-        self.assertEqual(cached_data['operation'], SyncOperation.MEETING_OUTCOME.value)
-        self.assertEqual(cached_data['status'], CRMSyncStatus.SUCCESS.value)
-        self.assertEqual(cached_data['details']['crm_record_ids'], ['crm_123'])
+        self.assertEqual(event.meeting_id, self.meeting.id)
+        self.assertEqual(event.operation, SyncOperation.MEETING_OUTCOME.value)
+        self.assertEqual(event.status, CRMSyncStatus.SUCCESS.value)
+        self.assertEqual(event.details['crm_record_ids'], ['crm_123'])
+        self.assertEqual(event.crm_record_ids, ['crm_123'])
     
     def test_get_sync_status_no_operations(self):
         """Test getting sync status when no operations exist"""
@@ -381,4 +375,46 @@ class SyncTrackerTest(TestCase):
         
         self.assertEqual(metrics['health_status'], 'healthy')
         self.assertEqual(metrics['recent_failures'], 0)
-        self.assertEqual(metrics['failure_rate'], 0.0)
\ No newline at end of file
+        self.assertEqual(metrics['failure_rate'], 0.0)
+    
+    def test_report_query_count_independent_of_meetings(self):
+        """Test the report is built from aggregates, not one read per meeting or operation"""
+        for i in range(5):
+            meeting = Meeting.objects.create(
+                calendar_event_id=f'cal_report_{i}',
+                lead=self.lead,
+                title=f'Meeting {i}',
+                start_time=timezone.now(),
+                end_time=timezone.now() + timedelta(hours=1)
+            )
+            for status in (CRMSyncStatus.SUCCESS, CRMSyncStatus.FAILED):
+                self.tracker.track_sync_operation(
+                    meeting.id, SyncOperation.FOLLOW_UP_TASKS, status, {'error_message': 'Timeout'}
+                )
+        
+        with self.assertNumQueries(4):
+            report = self.tracker.generate_sync_report(
+                timezone.now() - timedelta(hours=1), timezone.now() + timedelta(hours=1)
+            )
+        
+        self.assertEqual(report['summary']['meetings_with_sync'], 5)
+        self.assertEqual(report['summary']['total_operations'], 10)
+        self.assertEqual(report['operation_breakdown'][SyncOperation.FOLLOW_UP_TASKS.value], {'success': 5, 'failed': 5})
+        self.assertEqual(report['error_summary'], {'Timeout': 5})
+        
+        with self.assertNumQueries(2):
+            metrics = self.tracker.get_sync_health_metrics()
+        self.assertEqual(metrics['recent_failures'], 5)
+    
+    def test_cleanup_deletes_expired_events(self):
+        """Test cleanup removes only events past the retention period"""
+        old_id = self.tracker.track_sync_operation(
+            self.meeting.id, SyncOperation.MEETING_OUTCOME, CRMSyncStatus.SUCCESS, {}
+        )
+        new_id = self.tracker.track_sync_operation(
+            self.meeting.id, SyncOperation.MEETING_OUTCOME, CRMSyncStatus.SUCCESS, {}
+        )
+        SyncEvent.objects.filter(tracking_id=old_id).update(created_at=timezone.now() - timedelta(days=31))
+        
+        self.assertEqual(self.tracker.cleanup_old_tracking_data(days_to_keep=30), 1)
+        self.assertEqual(list(SyncEvent.objects.values_list('tracking_id', flat=True)), [new_id])
@@ -15,6 +15,7 @@ from .transcription_service import (
     Speaker,
     TranscriptChunk,
     TranscriptionSession,
+    TranscriptStore,
     AudioQuality,
     SpeakerRole,
     merge_transcript_chunks,
@@ -771,4 +772,176 @@ class TestSpeakerIdentificationAccuracy(AsyncTestCase):
             
             await service.cleanup()
         
-        self.async_test(run_test())
\ No newline at end of file
+        self.async_test(run_test())
+
+
+class TestTranscriptStore(TestCase):
+    """Test time-indexed transcript storage"""
+    
+    def setUp(self):
+        self.speaker = Speaker("speaker_1", "Alice")
+    
+    def _chunk(self, index, start_time, is_final=True, duration=2.0):
+        return TranscriptChunk(
+            f"chunk_{index}", f"text {index}", self.speaker,
+            start_time, start_time + duration, 0.9, is_final
+        )
+    
+    def test_window_queries(self):
+        """Test chunks are selected by start time"""
+        store = TranscriptStore()
+        for i in range(10):
+            store.append(self._chunk(i, i * 2.0))
+        
+        self.assertEqual([c.chunk_id for c in store.between(4.0, 10.0)], ["chunk_2", "chunk_3", "chunk_4"])
+        self.assertEqual(len(store.between(15.0)), 2)
+        self.assertEqual([c.chunk_id for c in store.ending_after(17.0)], ["chunk_8", "chunk_9"])
+    
+    def test_out_of_order_chunks_sorted(self):
+        """Test late chunks are placed by start time"""
+        store = TranscriptStore()
+        store.append(self._chunk(1, 0.0))
+        store.append(self._chunk(3, 4.0))
+        self.assertEqual(store.text(), "text 1 text 3")
+        
+        store.append(self._chunk(2, 2.0))
+        
+        self.assertEqual([c.chunk_id for c in store], ["chunk_1", "chunk_2", "chunk_3"])
+        self.assertEqual(store.text(), "text 1 text 2 text 3")
+    
+    def test_text_maintained_incrementally(self):
+        """Test the joined text only includes final chunks and is cached"""
+        store = TranscriptStore()
+        store.append(self._chunk(1, 0.0))
+        store.append(self._chunk(2, 2.0, is_final=False))
+        
+        text = store.text()
+        self.assertEqual(text, "text 1")
+        self.assertIs(store.text(), text)
+        
+        store.append(self._chunk(3, 4.0))
+        self.assertEqual(store.text(), "text 1 text 3")
+    
+    def test_old_chunks_spilled(self):
+        """Test only the newest chunks stay in memory and spilled ones read back"""
+        store = TranscriptStore(hot_chunks=3)
+        for i in range(10):
+            store.append(self._chunk(i, i * 2.0))
+        
+        self.assertEqual(sum(isinstance(entry, TranscriptChunk) for entry in store._entries), 3)
+        self.assertEqual(len(store), 10)
+        spilled = store[0]
+        self.assertEqual(spilled.chunk_id, "chunk_0")
+        self.assertIs(spilled.speaker, self.speaker)
+        self.assertEqual([c.chunk_id for c in store.between(2.0, 6.0)], ["chunk_1", "chunk_2"])
+        self.assertEqual(store.text(), " ".join(f"text {i}" for i in range(10)))
+    
+    def test_service_transcript_window(self):
+        """Test the service exposes windowed queries"""
+        async def run_test():
+            service = TranscriptionService(engine_type="mock")
+            service.sessions["session_1"] = TranscriptionSession("session_1", "stream_1")
+            for i in range(5):
+                service.sessions["session_1"].transcript_chunks.append(self._chunk(i, i * 2.0))
+            
+            window = await service.get_transcript_window("session_1", 2.0, 6.0)
+            since = await service.get_transcript_chunks("session_1", since_timestamp=6.0)
+            transcript = await service.get_full_transcript("session_1")
+            status = await service.get_session_status("session_1", include_chunks=False)
+            return window, since, transcript, status
+        
+        window, since, transcript, status = asyncio.run(run_test())
+        
+        self.assertEqual([c.chunk_id for c in window], ["chunk_1", "chunk_2"])
+        self.assertEqual([c.chunk_id for c in since], ["chunk_3", "chunk_4"])
+        self.assertEqual(transcript, "text 0 text 1 text 2 text 3 text 4")
+        self.assertEqual(status['chunk_count'], 5)
+        self.assertNotIn('transcript_chunks', status)
+
+
+class TestBatchedTranscriptionPipeline(AsyncTestCase):
+    """Test batched, concurrent transcription of queued audio"""
+    
+    def _audio_chunk(self, index):
+        return AudioChunk(f"audio_{index}", b"audio", float(index), 1.0)
+    
+    def test_default_transcribe_batch_keeps_order(self):
+        """Test the default batch implementation returns one transcript per chunk, in order"""
+        async def run_test():
+            engine = MockTranscriptionEngine()
+            return await engine.transcribe_batch([self._audio_chunk(i) for i in range(3)])
+        
+        transcripts = self.async_test(run_test())
+        
+        self.assertEqual([t.start_time for t in transcripts], [0.0, 1.0, 2.0])
+    
+    def test_gemini_batch_uses_one_request(self):
+        """Test a Gemini batch costs one request's latency"""
+        async def run_test():
+            engine = GeminiTranscriptionEngine()
+            with patch('meetings.transcription_service.asyncio.sleep', new=AsyncMock()) as mock_sleep:
+                transcripts = await engine.transcribe_batch([self._audio_chunk(i) for i in range(5)])
+            return transcripts, mock_sleep.await_count
+        
+        transcripts, requests = self.async_test(run_test())
+        
+        self.assertEqual([t.chunk_id for t in transcripts], [f"audio_{i}" for i in range(5)])
+        self.assertEqual(requests, 1)
+    
+    def test_batches_in_flight_and_ordered(self):
+        """Test queued chunks are batched, run concurrently and added in order"""
+        async def run_test():
+            service = TranscriptionService(engine_type="mock")
+            await service.initialize({})
+            service.BATCH_SIZE = 2
+            service.MAX_IN_FLIGHT = 3
+            batches = []
+            active = []
+            
+            async def transcribe_batch(audio_chunks):
+                batches.append([chunk.chunk_id for chunk in audio_chunks])
+                active.append(len(active) + 1)
+                # Later batches finish first
+                await asyncio.sleep(0.1 / len(batches))
+                speaker = Speaker("speaker_1")
+                return [
+                    TranscriptChunk(chunk.chunk_id, chunk.chunk_id, speaker, chunk.timestamp,
+                                    chunk.timestamp + chunk.duration, 0.9, True)
+                    for chunk in audio_chunks
+                ]
+            
+            service.engine.transcribe_batch = transcribe_batch
+            session = await service.start_transcription("session_1", "stream_1")
+            for i in range(6):
+                await service.process_audio_chunk("session_1", b"audio", float(i), 1.0)
+            await asyncio.sleep(0.3)
+            
+            transcript = await service.get_full_transcript("session_1")
+            await service.cleanup()
+            return batches, max(active), transcript
+        
+        batches, concurrency, transcript = self.async_test(run_test())
+        
+        self.assertTrue(all(len(batch) <= 2 for batch in batches))
+        self.assertGreater(concurrency, 1)
+        self.assertEqual(transcript, " ".join(f"session_1_{i * 1000}" for i in range(6)))
+    
+    def test_full_queue_applies_backpressure(self):
+        """Test producers wait for queue space instead of evicting queued audio"""
+        async def run_test():
+            service = TranscriptionService(engine_type="mock")
+            await service.initialize({})
+            service.MAX_CHUNK_QUEUE_SIZE = 2
+            
+            session = await service.start_transcription("session_1", "stream_1")
+            for i in range(6):
+                self.assertTrue(await service.process_audio_chunk("session_1", b"audio", float(i), 1.0))
+            await asyncio.sleep(0.3)
+            
+            chunks = await service.get_transcript_chunks("session_1")
+            await service.cleanup()
+            return chunks
+        
+        chunks = self.async_test(run_test())
+        
+        self.assertEqual([chunk.start_time for chunk in chunks], [float(i) for i in range(6)])
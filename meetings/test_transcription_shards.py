@@ -0,0 +1,198 @@
+"""
+Tests for sharding transcription sessions across worker processes
+"""
+import asyncio
+
+import fakeredis
+from django.test import TestCase, override_settings
+
+from meetings.ai_summary_service import AISummaryService
+from meetings.transcription_service import (
+    MeetingSummary, Speaker, SpeakerRole, TranscriptChunk, TranscriptionService
+)
+from meetings.transcription_shards import (
+    HashRing, SessionDirectory, ShardedTranscriptionService, TranscriptionShardWorker,
+    create_transcription_service
+)
+
+
+class HashRingTest(TestCase):
+    """Test session ids are spread evenly and move little when shards are added"""
+
+    def setUp(self):
+        self.keys = [f'session_{index}' for index in range(4000)]
+
+    def test_deterministic(self):
+        self.assertEqual(
+            [HashRing(range(4)).shard_for(key) for key in self.keys],
+            [HashRing(range(4)).shard_for(key) for key in self.keys]
+        )
+
+    def test_roughly_even(self):
+        ring = HashRing(range(4))
+        counts = [0] * 4
+        for key in self.keys:
+            counts[ring.shard_for(key)] += 1
+
+        for count in counts:
+            self.assertGreater(count, 700)
+            self.assertLess(count, 1300)
+
+    def test_adding_shard_moves_only_its_share(self):
+        before = HashRing(range(4))
+        after = HashRing(range(5))
+
+        moved = [key for key in self.keys if before.shard_for(key) != after.shard_for(key)]
+
+        self.assertTrue(all(after.shard_for(key) == 4 for key in moved))
+        self.assertLess(len(moved), len(self.keys) * 0.3)
+
+    def test_needs_a_shard(self):
+        with self.assertRaises(ValueError):
+            HashRing([])
+
+
+class SessionDirectoryTest(TestCase):
+    """Test sessions keep the shard they were first assigned"""
+
+    def test_first_assignment_wins(self):
+        async def run():
+            directory = SessionDirectory(fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer()))
+            first = await directory.assign('session_1', 2)
+            second = await directory.assign('session_1', 3)
+            owner = await directory.lookup('session_1')
+            await directory.release('session_1')
+            return first, second, owner, await directory.lookup('session_1')
+
+        self.assertEqual(asyncio.run(run()), (2, 2, 2, None))
+
+
+class ShardedTranscriptionServiceTest(TestCase):
+    """Test calls are routed to the worker owning each session"""
+
+    SHARDS = 2
+
+    async def _with_workers(self, scenario):
+        server = fakeredis.FakeServer()
+        services = []
+        workers = []
+        for shard in range(self.SHARDS):
+            service = TranscriptionService(engine_type='mock')
+            await service.initialize({})
+            services.append(service)
+            workers.append(TranscriptionShardWorker(shard, service, fakeredis.FakeAsyncRedis(server=server)))
+        tasks = [asyncio.create_task(worker.run()) for worker in workers]
+
+        client = ShardedTranscriptionService(self.SHARDS, redis_client=fakeredis.FakeAsyncRedis(server=server))
+        try:
+            return await scenario(client, services)
+        finally:
+            await client.cleanup()
+            for worker in workers:
+                worker.stop()
+            await asyncio.gather(*tasks)
+
+    def test_sessions_run_on_their_shard(self):
+        session_ids = [f'session_{index}' for index in range(6)]
+
+        async def scenario(client, services):
+            self.assertTrue(await client.initialize({}))
+            for session_id in session_ids:
+                session = await client.start_transcription(session_id, f'stream_{session_id}')
+                self.assertEqual(session.session_id, session_id)
+                for index in range(2):
+                    self.assertTrue(await client.process_audio_chunk(
+                        session_id, bytearray(b'\x00\x10' * 8000), index * 0.5, 0.5
+                    ))
+            await asyncio.sleep(0.3)
+
+            owners = {
+                session_id: [shard for shard, service in enumerate(services) if session_id in service.sessions]
+                for session_id in session_ids
+            }
+            chunks = await client.get_transcript_chunks('session_0')
+            status = await client.get_session_status('session_0', include_chunks=False)
+            active = await client.list_active_sessions()
+            summary = await client.stop_transcription('session_0')
+            return owners, chunks, status, active, summary
+
+        owners, chunks, status, active, summary = asyncio.run(self._with_workers(scenario))
+
+        ring = HashRing(range(self.SHARDS))
+        for session_id, shards in owners.items():
+            self.assertEqual(shards, [ring.shard_for(session_id)])
+        self.assertEqual(len(set(ring.shard_for(session_id) for session_id in session_ids)), self.SHARDS)
+        self.assertEqual(len(chunks), 2)
+        self.assertIsInstance(chunks[0], TranscriptChunk)
+        self.assertEqual(status['chunk_count'], 2)
+        self.assertNotIn('transcript_chunks', status)
+        self.assertEqual(set(active), set(session_ids))
+        self.assertEqual(summary['total_chunks'], 2)
+
+    def test_unknown_session_behaves_like_local_service(self):
+        async def scenario(client, services):
+            results = (
+                await client.process_audio_chunk('missing', b'\x00\x00', 0.0, 0.1),
+                await client.get_session_status('missing'),
+                await client.get_full_transcript('missing'),
+                await client.get_transcript_chunks('missing'),
+            )
+            with self.assertRaises(ValueError):
+                await client.stop_transcription('missing')
+            return results
+
+        self.assertEqual(asyncio.run(self._with_workers(scenario)), (False, None, "", []))
+
+    def test_duplicate_start_rejected_and_directory_kept(self):
+        async def scenario(client, services):
+            await client.start_transcription('session_1', 'stream_1')
+            with self.assertRaises(ValueError):
+                await client.start_transcription('session_1', 'stream_1')
+            return await client.directory.lookup('session_1')
+
+        owner = asyncio.run(self._with_workers(scenario))
+
+        self.assertEqual(owner, HashRing(range(self.SHARDS)).shard_for('session_1'))
+
+    def test_stop_releases_directory_entry(self):
+        async def scenario(client, services):
+            await client.start_transcription('session_1', 'stream_1')
+            await client.stop_transcription('session_1')
+            return await client.directory.lookup('session_1'), await client.get_session_status('session_1')
+
+        self.assertEqual(asyncio.run(self._with_workers(scenario)), (None, None))
+
+    def test_engine_summary_runs_on_a_shard(self):
+        async def scenario(client, services):
+            speakers = {'speaker_1': Speaker('speaker_1', 'Alex', SpeakerRole.HOST, 0.9)}
+            summary = await client.engine.generate_summary(
+                'We agreed on pricing and will send the proposal next week.', speakers
+            )
+            next_steps = await client.engine.suggest_next_steps('We will send the proposal.', summary.summary_text)
+            return summary, next_steps
+
+        summary, next_steps = asyncio.run(self._with_workers(scenario))
+
+        self.assertIsInstance(summary, MeetingSummary)
+        self.assertTrue(summary.summary_text)
+        self.assertIsInstance(next_steps, list)
+
+
+class TranscriptionServiceFactoryTest(TestCase):
+    """Test the transcription service is chosen from TRANSCRIPTION_SHARDS"""
+
+    @override_settings(TRANSCRIPTION_SHARDS=0)
+    def test_local_service_by_default(self):
+        service = AISummaryService().transcription_service
+
+        self.assertIsInstance(service, TranscriptionService)
+        self.assertEqual(service.engine_type, 'mock')
+
+    @override_settings(TRANSCRIPTION_SHARDS=3, REDIS_URL='redis://localhost:6379/0')
+    def test_sharded_service_when_configured(self):
+        self.assertIsInstance(create_transcription_service(), ShardedTranscriptionService)
+
+        service = AISummaryService().transcription_service
+
+        self.assertIsInstance(service, ShardedTranscriptionService)
+        self.assertEqual(service.shards, 3)
@@ -0,0 +1,169 @@
+"""
+Tests for voice activity detection and silence skipping in TranscriptionService
+"""
+import asyncio
+import math
+import random
+import time
+from array import array
+from unittest import skipUnless
+
+from django.test import TestCase
+from prometheus_client import REGISTRY
+
+from meetings.audio_buffer import NUMPY_AVAILABLE, int16_samples
+from meetings.transcription_service import AudioChunk, AudioQuality, TranscriptionService, TranscriptionSession
+from meetings.voice_activity import SILENCE_DBFS, AudioLevels, VoiceActivityDetector
+
+
+def pcm(samples):
+    return array('h', samples).tobytes()
+
+
+def tone(seconds, amplitude, frequency=220, sample_rate=16000):
+    return pcm(
+        int(amplitude * math.sin(2 * math.pi * frequency * index / sample_rate))
+        for index in range(int(seconds * sample_rate))
+    )
+
+
+def silence(seconds, sample_rate=16000):
+    return bytes(int(seconds * sample_rate) * 2)
+
+
+class VoiceActivityDetectorTest(TestCase):
+    """Test speech and silence classification from frame energy and zero crossings"""
+
+    def setUp(self):
+        self.detector = VoiceActivityDetector()
+
+    def _analyze(self, data):
+        return self.detector.analyze(AudioChunk('chunk', data, 0.0, len(data) / 32000))
+
+    def test_silence(self):
+        levels = self._analyze(silence(0.5))
+
+        self.assertFalse(levels.is_speech)
+        self.assertEqual(levels.rms_dbfs, SILENCE_DBFS)
+        self.assertEqual(levels.speech_ratio, 0.0)
+
+    def test_voiced_tone_is_speech(self):
+        levels = self._analyze(tone(0.5, 8000))
+
+        self.assertTrue(levels.is_speech)
+        self.assertAlmostEqual(levels.rms_dbfs, 20 * math.log10(8000 / math.sqrt(2) / 32768), delta=0.5)
+        self.assertLess(levels.zero_crossing_rate, 0.05)
+
+    def test_quiet_tone_is_silence(self):
+        self.assertFalse(self._analyze(tone(0.5, 50)).is_speech)
+
+    def test_hiss_is_not_speech(self):
+        random.seed(1)
+        levels = self._analyze(pcm(random.randint(-8000, 8000) for _ in range(8000)))
+
+        self.assertGreater(levels.zero_crossing_rate, 0.4)
+        self.assertFalse(levels.is_speech)
+
+    def test_short_speech_burst_in_silence(self):
+        levels = self._analyze(silence(0.45) + tone(0.1, 8000) + silence(0.45))
+
+        self.assertTrue(levels.is_speech)
+        self.assertAlmostEqual(levels.speech_ratio, 0.1, delta=0.02)
+
+    def test_clipping_measured(self):
+        levels = self._analyze(pcm([32767, -32768] * 100 + [1000, -1000] * 100))
+
+        self.assertAlmostEqual(levels.clipped_ratio, 0.5)
+
+    def test_empty_chunk(self):
+        self.assertFalse(self._analyze(b'').is_speech)
+
+    @skipUnless(NUMPY_AVAILABLE, 'NumPy is not installed')
+    def test_numpy_and_python_paths_agree(self):
+        random.seed(2)
+        data = silence(0.2) + tone(0.3, 6000) + pcm(random.randint(-3000, 3000) for _ in range(4000))
+        frame_size = 320
+        speech_energy = (32768 * 10 ** (self.detector.SPEECH_DBFS / 20)) ** 2
+
+        vectorized = self.detector._frame_stats_numpy(int16_samples(data), frame_size, speech_energy)
+        python = self.detector._frame_stats_python(data, frame_size, speech_energy)
+
+        self.assertAlmostEqual(vectorized[0], python[0], delta=python[0] * 1e-4)
+        self.assertAlmostEqual(vectorized[1], python[1])
+        self.assertEqual(vectorized[2:], python[2:])
+
+
+class SilenceSkippingTest(TestCase):
+    """Test silent chunks are not sent to the transcription engine"""
+
+    def _skipped_total(self):
+        return REGISTRY.get_sample_value('transcription_skipped_audio_seconds_total') or 0
+
+    def test_silent_chunks_skipped_with_hangover(self):
+        skipped_before = self._skipped_total()
+
+        async def run():
+            service = TranscriptionService(engine_type='mock')
+            await service.initialize({})
+            transcribed = []
+
+            async def transcribe_batch(audio_chunks):
+                transcribed.extend(chunk.timestamp for chunk in audio_chunks)
+                return []
+
+            service.engine.transcribe_batch = transcribe_batch
+            session = await service.start_transcription('session_1', 'stream_1')
+            # Silence, speech, silence right after it, then a long silent stretch
+            payloads = [silence(0.25), tone(0.25, 8000), silence(0.25), silence(0.25), silence(0.25)]
+            for index, payload in enumerate(payloads):
+                await service.process_audio_chunk('session_1', payload, index * 0.25, 0.25)
+            await asyncio.sleep(0.2)
+            await service.cleanup()
+            return transcribed, session
+
+        transcribed, session = asyncio.run(run())
+
+        self.assertEqual(transcribed, [0.25, 0.5, 0.75])
+        self.assertEqual(session.skipped_duration, 0.5)
+        self.assertEqual(self._skipped_total(), skipped_before + 0.5)
+        self.assertEqual(len(session.signal_levels), 5)
+
+    def test_detection_can_be_disabled(self):
+        async def run():
+            service = TranscriptionService(engine_type='mock')
+            service.voice_activity = None
+            service.sessions['session_1'] = TranscriptionSession('session_1', 'stream_1')
+            return await service._skip_silence('session_1', [AudioChunk('chunk', silence(0.25), 0.0, 0.25)])
+
+        self.assertEqual(len(asyncio.run(run())), 1)
+
+
+class SignalQualityTest(TestCase):
+    """Test audio quality reflects measured signal levels"""
+
+    def _levels(self, rms_dbfs, clipped_ratio=0.0):
+        return AudioLevels(rms_dbfs, 0.05, 1.0, clipped_ratio, True)
+
+    def test_signal_quality_levels(self):
+        service = TranscriptionService()
+
+        self.assertEqual(service._signal_quality([self._levels(-25)]), AudioQuality.EXCELLENT)
+        self.assertEqual(service._signal_quality([self._levels(-45)]), AudioQuality.FAIR)
+        self.assertEqual(service._signal_quality([self._levels(-70)]), AudioQuality.UNUSABLE)
+        self.assertEqual(service._signal_quality([self._levels(-25, clipped_ratio=0.1)]), AudioQuality.POOR)
+
+    def test_monitor_uses_signal_levels(self):
+        async def run():
+            service = TranscriptionService()
+            service.QUALITY_CHECK_INTERVAL = 0.05
+            session = TranscriptionSession('session_1', 'stream_1')
+            service.sessions['session_1'] = session
+            session.signal_levels.append((time.time() + 1, self._levels(-55)))
+
+            monitor = asyncio.create_task(service._monitor_audio_quality('session_1'))
+            await asyncio.sleep(0.08)
+            session.is_active = False
+            await monitor
+            return session.audio_quality
+
+        self.assertEqual(asyncio.run(run()), AudioQuality.POOR)
@@ -203,6 +203,46 @@ class MeetingAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['matched_lead_id'], lead.id)
         self.assertGreater(response.data['match_confidence'], 0)
+
+    def test_bulk_match_lead_endpoint(self):
+        """Test POST /api/meetings/match-lead/bulk/"""
+        from leads.tests import LeadFactory
+        lead = LeadFactory(email='bulk@example.com')
+        existing = MeetingFactory(calendar_event_id='existing_event', lead=None)
+    
+        start_time = timezone.now() + timedelta(hours=1)
+        end_time = start_time + timedelta(hours=1)
+        event = {
+            'title': 'Weekly Sync',
+            'start_time': start_time.isoformat(),
+            'end_time': end_time.isoformat(),
+            'attendees': ['bulk@example.com']
+        }
+        data = {
+            'meetings': [
+                {**event, 'calendar_event_id': 'new_event'},
+                {**event, 'calendar_event_id': 'existing_event'},
+                {**event, 'calendar_event_id': 'unmatched_event', 'attendees': ['nobody@nowhere.org']},
+                {**event, 'calendar_event_id': 'bad_event', 'end_time': start_time.isoformat()},
+            ]
+        }
+        response = self.client.post('/api/meetings/match-lead/bulk/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(response.data['matched'], 2)
+        self.assertEqual(len(response.data['errors']), 1)
+        self.assertEqual(response.data['errors'][0]['calendar_event_id'], 'bad_event')
+    
+        new_meeting = Meeting.objects.get(calendar_event_id='new_event')
+        self.assertEqual(new_meeting.lead, lead)
+        self.assertGreater(new_meeting.match_confidence, 0)
+        self.assertLessEqual(new_meeting.match_confidence, 1)
+    
+        existing.refresh_from_db()
+        self.assertEqual(existing.lead, lead)
+        self.assertEqual(existing.title, 'Weekly Sync')
+        self.assertIsNone(Meeting.objects.get(calendar_event_id='unmatched_event').lead)
     
     def test_start_meeting_session_endpoint(self):
         """Test POST /api/meetings/{id}/start/"""
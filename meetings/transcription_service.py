@@ -11,12 +11,21 @@ import re
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Optional, Any, Callable, AsyncGenerator
+from typing import Dict, List, Optional, Any, Callable, AsyncGenerator, Union
+from bisect import bisect_left, bisect_right
 from collections import deque
 import hashlib
 import os
+import tempfile
 from datetime import datetime, timedelta
 
+from .audio_buffer import AudioRingBuffer, int16_samples
+from .voice_activity import AudioLevels, VoiceActivityDetector
+from performance_monitoring.prometheus_metrics import (
+    TRANSCRIPTION_ACTIVE_SESSIONS, TRANSCRIPTION_DROPPED_CHUNKS, TRANSCRIPTION_QUEUE_DEPTH,
+    TRANSCRIPTION_SKIPPED_AUDIO
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,6 +38,10 @@ class AudioQuality(Enum):
     UNUSABLE = "unusable"
 
 
+# Worst first, for picking the lower of two assessments
+QUALITY_ORDER = [AudioQuality.UNUSABLE, AudioQuality.POOR, AudioQuality.FAIR, AudioQuality.GOOD, AudioQuality.EXCELLENT]
+
+
 class SpeakerRole(Enum):
     """Speaker role types"""
     HOST = "host"
@@ -36,15 +49,26 @@ class SpeakerRole(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(slots=True)
 class AudioChunk:
-    """Audio data chunk for processing"""
+    """
+    Audio data chunk for processing
+    
+    audio_data is either bytes or a memoryview into the session's
+    AudioRingBuffer at buffer_offset. Engines may read it while transcribing
+    the chunk but must not keep it, as the region is reused afterwards.
+    """
     chunk_id: str
-    audio_data: bytes
+    audio_data: Union[bytes, memoryview]
     timestamp: float
     duration: float
     sample_rate: int = 16000
     channels: int = 1
+    buffer_offset: Optional[int] = None
+    
+    def samples(self):
+        """16-bit samples as a NumPy array sharing audio_data, or None without NumPy"""
+        return int16_samples(self.audio_data)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization"""
@@ -76,9 +100,20 @@ class Speaker:
             'confidence': self.confidence,
             'voice_signature': self.voice_signature
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Speaker':
+        """Create from the output of to_dict"""
+        return cls(
+            speaker_id=data['speaker_id'],
+            name=data['name'],
+            role=SpeakerRole(data['role']),
+            confidence=data['confidence'],
+            voice_signature=data['voice_signature']
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class TranscriptChunk:
     """Individual transcript chunk with metadata"""
     chunk_id: str
@@ -102,6 +137,20 @@ class TranscriptChunk:
             'is_final': self.is_final,
             'language': self.language
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TranscriptChunk':
+        """Create from the output of to_dict"""
+        return cls(
+            chunk_id=data['chunk_id'],
+            text=data['text'],
+            speaker=Speaker.from_dict(data['speaker']),
+            start_time=data['start_time'],
+            end_time=data['end_time'],
+            confidence=data['confidence'],
+            is_final=data['is_final'],
+            language=data['language']
+        )
 
 
 @dataclass
@@ -124,6 +173,11 @@ class ActionItem:
             'confidence': self.confidence,
             'source_text': self.source_text
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ActionItem':
+        """Create from the output of to_dict"""
+        return cls(**data)
 
 
 @dataclass
@@ -148,6 +202,143 @@ class MeetingSummary:
             'confidence_score': self.confidence_score,
             'generated_at': self.generated_at
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MeetingSummary':
+        """Create from the output of to_dict"""
+        return cls(**{
+            **data,
+            'action_items': [ActionItem.from_dict(item) for item in data['action_items']]
+        })
+
+
+class TranscriptStore:
+    """
+    Transcript chunks of one session, indexed by start time
+    
+    Chunks are kept sorted by start time alongside an array of the start
+    times, so time-window queries bisect to the first match and cost
+    O(log n + k) for k results. The joined text of final chunks is extended
+    as chunks arrive instead of being rebuilt on every read, and the same
+    string object is returned while nothing has changed, so a caller
+    polling for changes compares in constant time.
+    
+    Only the newest HOT_CHUNKS chunks are held in memory. Older chunks are
+    spilled to a temporary file as JSON lines and read back by offset when
+    a query reaches them; spilled records refer to their speaker by id.
+    """
+    
+    HOT_CHUNKS = 1000
+    
+    def __init__(self, hot_chunks: Optional[int] = None):
+        self.hot_chunks = hot_chunks or self.HOT_CHUNKS
+        self._starts: List[float] = []
+        self._entries: List[Any] = []  # TranscriptChunk, or its file offset once spilled
+        self._spilled = 0  # Entries before this index have been spilled
+        self._spill_file = None
+        self._speakers: Dict[str, Speaker] = {}
+        self._max_duration = 0.0
+        self._text = ""
+        self._text_parts = 0  # Final chunks joined into _text
+        self._pending: List[str] = []  # Final texts received since _text was built
+        self._rebuild = False  # A final chunk arrived out of order
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __iter__(self):
+        for entry in list(self._entries):
+            yield self._load(entry)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._load(entry) for entry in self._entries[index]]
+        return self._load(self._entries[index])
+    
+    def append(self, chunk: TranscriptChunk):
+        """Add a chunk, keeping chunks ordered by start time"""
+        self._speakers.setdefault(chunk.speaker.speaker_id, chunk.speaker)
+        self._max_duration = max(self._max_duration, chunk.end_time - chunk.start_time)
+        
+        position = bisect_right(self._starts, chunk.start_time)
+        self._starts.insert(position, chunk.start_time)
+        self._entries.insert(position, chunk)
+        
+        if position < len(self._starts) - 1:
+            # Arrived out of order: entries shift, and the text order changes
+            if position < self._spilled:
+                self._spilled += 1
+            if chunk.is_final:
+                self._rebuild = True
+        elif chunk.is_final:
+            self._pending.append(chunk.text)
+        
+        self._spill_old_chunks()
+    
+    def between(self, start: float, end: Optional[float] = None) -> List[TranscriptChunk]:
+        """Chunks starting at or after start, and before end when given"""
+        low = bisect_left(self._starts, start)
+        high = len(self._starts) if end is None else bisect_left(self._starts, end, low)
+        return [self._load(entry) for entry in self._entries[low:high]]
+    
+    def ending_after(self, timestamp: float) -> List[TranscriptChunk]:
+        """Chunks ending after timestamp"""
+        # No chunk is longer than _max_duration, so none starting earlier can qualify
+        low = bisect_left(self._starts, timestamp - self._max_duration)
+        chunks = (self._load(entry) for entry in self._entries[low:])
+        return [chunk for chunk in chunks if chunk.end_time > timestamp]
+    
+    def text(self) -> str:
+        """Text of the final chunks, in time order, joined by spaces"""
+        if self._rebuild:
+            parts = [chunk.text for chunk in self if chunk.is_final]
+            self._text = " ".join(parts)
+            self._text_parts = len(parts)
+            self._pending = []
+            self._rebuild = False
+        elif self._pending:
+            parts = [self._text] + self._pending if self._text_parts else self._pending
+            self._text = " ".join(parts)
+            self._text_parts += len(self._pending)
+            self._pending = []
+        return self._text
+    
+    def _spill_old_chunks(self):
+        while len(self._entries) - self._spilled > self.hot_chunks:
+            entry = self._entries[self._spilled]
+            if isinstance(entry, TranscriptChunk):
+                self._entries[self._spilled] = self._write(entry)
+            self._spilled += 1
+    
+    def _write(self, chunk: TranscriptChunk) -> int:
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile()
+        self._spill_file.seek(0, os.SEEK_END)
+        offset = self._spill_file.tell()
+        record = [
+            chunk.chunk_id, chunk.text, chunk.speaker.speaker_id, chunk.start_time,
+            chunk.end_time, chunk.confidence, chunk.is_final, chunk.language
+        ]
+        self._spill_file.write(json.dumps(record).encode() + b"\n")
+        return offset
+    
+    def _load(self, entry) -> TranscriptChunk:
+        if isinstance(entry, TranscriptChunk):
+            return entry
+        self._spill_file.seek(entry)
+        chunk_id, text, speaker_id, start_time, end_time, confidence, is_final, language = json.loads(
+            self._spill_file.readline()
+        )
+        return TranscriptChunk(
+            chunk_id=chunk_id,
+            text=text,
+            speaker=self._speakers[speaker_id],
+            start_time=start_time,
+            end_time=end_time,
+            confidence=confidence,
+            is_final=is_final,
+            language=language
+        )
 
 
 @dataclass
@@ -158,25 +349,31 @@ class TranscriptionSession:
     is_active: bool = True
     audio_quality: AudioQuality = AudioQuality.GOOD
     speakers: Dict[str, Speaker] = field(default_factory=dict)
-    transcript_chunks: List[TranscriptChunk] = field(default_factory=list)
+    transcript_chunks: TranscriptStore = field(default_factory=TranscriptStore)
     error_count: int = 0
     start_time: float = field(default_factory=time.time)
     draft_summary: Optional[MeetingSummary] = None
+    skipped_duration: float = 0.0  # seconds of audio not transcribed for lack of speech
+    last_speech_end: Optional[float] = None
+    signal_levels: deque = field(default_factory=lambda: deque(maxlen=256))  # (chunk end time, AudioLevels)
     
-    def to_dict(self) -> Dict[str, Any]:
+    def to_dict(self, include_chunks: bool = True) -> Dict[str, Any]:
         """Convert to dictionary for serialization"""
-        return {
+        data = {
             'session_id': self.session_id,
             'stream_id': self.stream_id,
             'is_active': self.is_active,
             'audio_quality': self.audio_quality.value,
             'speakers': {k: v.to_dict() for k, v in self.speakers.items()},
-            'transcript_chunks': [chunk.to_dict() for chunk in self.transcript_chunks],
             'error_count': self.error_count,
             'start_time': self.start_time,
             'chunk_count': len(self.transcript_chunks),
+            'skipped_duration': self.skipped_duration,
             'draft_summary': self.draft_summary.to_dict() if self.draft_summary else None
         }
+        if include_chunks:
+            data['transcript_chunks'] = [chunk.to_dict() for chunk in self.transcript_chunks]
+        return data
 
 
 class BaseTranscriptionEngine(ABC):
@@ -196,6 +393,15 @@ class BaseTranscriptionEngine(ABC):
         """Transcribe a single audio chunk"""
         pass
     
+    async def transcribe_batch(self, audio_chunks: List[AudioChunk]) -> List[TranscriptChunk]:
+        """
+        Transcribe several audio chunks, returning transcripts in the same order
+        
+        Engines whose API accepts several segments in one request should
+        override this; by default the chunks are transcribed concurrently.
+        """
+        return list(await asyncio.gather(*(self.transcribe_chunk(chunk) for chunk in audio_chunks)))
+    
     @abstractmethod
     async def identify_speaker(self, audio_chunk: AudioChunk) -> Speaker:
         """Identify speaker from audio chunk"""
@@ -443,32 +649,38 @@ class GeminiTranscriptionEngine(BaseTranscriptionEngine):
     
     async def transcribe_chunk(self, audio_chunk: AudioChunk) -> TranscriptChunk:
         """Transcribe using Gemini API"""
+        return (await self.transcribe_batch([audio_chunk]))[0]
+    
+    async def transcribe_batch(self, audio_chunks: List[AudioChunk]) -> List[TranscriptChunk]:
+        """Transcribe several chunks with one Gemini API request"""
         try:
-            # In real implementation, call Gemini API
+            # In real implementation, call Gemini API with one audio part per chunk
             # For now, simulate API call with mock response
             await asyncio.sleep(0.1)  # Simulate API latency
             
-            # Mock Gemini response
-            mock_response = {
-                'text': f"Transcribed text from Gemini for chunk {audio_chunk.chunk_id}",
-                'confidence': 0.92,
-                'language': 'en-US'
-            }
-            
-            speaker = await self.identify_speaker(audio_chunk)
-            
-            chunk = TranscriptChunk(
-                chunk_id=audio_chunk.chunk_id,
-                text=mock_response['text'],
-                speaker=speaker,
-                start_time=audio_chunk.timestamp,
-                end_time=audio_chunk.timestamp + audio_chunk.duration,
-                confidence=mock_response['confidence'],
-                is_final=True,
-                language=mock_response['language']
-            )
+            chunks = []
+            for audio_chunk in audio_chunks:
+                # Mock Gemini response
+                mock_response = {
+                    'text': f"Transcribed text from Gemini for chunk {audio_chunk.chunk_id}",
+                    'confidence': 0.92,
+                    'language': 'en-US'
+                }
+                
+                speaker = await self.identify_speaker(audio_chunk)
+                
+                chunks.append(TranscriptChunk(
+                    chunk_id=audio_chunk.chunk_id,
+                    text=mock_response['text'],
+                    speaker=speaker,
+                    start_time=audio_chunk.timestamp,
+                    end_time=audio_chunk.timestamp + audio_chunk.duration,
+                    confidence=mock_response['confidence'],
+                    is_final=True,
+                    language=mock_response['language']
+                ))
             
-            return chunk
+            return chunks
             
         except Exception as e:
             self.logger.error(f"Gemini transcription failed: {e}")
@@ -757,6 +969,12 @@ class TranscriptionService:
     
     CHUNK_DURATION = 2.0  # seconds
     MAX_CHUNK_QUEUE_SIZE = 100
+    ENQUEUE_TIMEOUT = 5.0  # seconds a producer waits for queue space
+    AUDIO_BUFFER_SIZE = 1024 * 1024  # bytes per session, about 32s of 16 kHz 16-bit mono; 0 disables
+    VOICE_ACTIVITY_DETECTION = True  # skip chunks without speech
+    SPEECH_HANGOVER = 0.5  # seconds of silence after speech still transcribed, so word endings are kept
+    BATCH_SIZE = 8  # queued chunks coalesced into one engine request
+    MAX_IN_FLIGHT = 4  # engine requests per session at once
     ERROR_THRESHOLD = 5
     QUALITY_CHECK_INTERVAL = 10  # seconds
     
@@ -765,9 +983,13 @@ class TranscriptionService:
         self.engine: Optional[BaseTranscriptionEngine] = None
         self.sessions: Dict[str, TranscriptionSession] = {}
         self.audio_queues: Dict[str, asyncio.Queue] = {}
+        self.audio_buffers: Dict[str, AudioRingBuffer] = {}
         self.processing_tasks: Dict[str, asyncio.Task] = {}
         self.quality_monitors: Dict[str, asyncio.Task] = {}
         self.error_handlers: Dict[str, Callable] = {}
+        self.voice_activity: Optional[VoiceActivityDetector] = (
+            VoiceActivityDetector() if self.VOICE_ACTIVITY_DETECTION else None
+        )
         self.logger = logging.getLogger(__name__)
     
     async def initialize(self, config: Dict[str, Any]) -> bool:
@@ -810,6 +1032,9 @@ class TranscriptionService:
             
             # Create audio processing queue
             self.audio_queues[session_id] = asyncio.Queue(maxsize=self.MAX_CHUNK_QUEUE_SIZE)
+            if self.AUDIO_BUFFER_SIZE:
+                self.audio_buffers[session_id] = AudioRingBuffer(self.AUDIO_BUFFER_SIZE)
+            TRANSCRIPTION_ACTIVE_SESSIONS.inc()
             
             # Start processing task
             self.processing_tasks[session_id] = asyncio.create_task(
@@ -828,9 +1053,14 @@ class TranscriptionService:
             self.logger.error(f"Failed to start transcription: {e}")
             raise
     
-    async def process_audio_chunk(self, session_id: str, audio_data: bytes, 
+    async def process_audio_chunk(self, session_id: str, audio_data: Union[bytes, bytearray, memoryview],
                                 timestamp: float, duration: float) -> bool:
-        """Process incoming audio chunk"""
+        """
+        Process incoming audio chunk
+        
+        audio_data is copied before this returns, so callers may reuse their
+        receive buffer for the next frame.
+        """
         try:
             if session_id not in self.sessions:
                 raise ValueError(f"Transcription session {session_id} not found")
@@ -839,26 +1069,43 @@ class TranscriptionService:
             if not session.is_active:
                 return False
             
+            if not len(audio_data):
+                # An empty frame has nothing to transcribe
+                return True
+            
+            # Copy into the session's ring buffer, or into bytes when it is full
+            buffer_offset = None
+            audio_buffer = self.audio_buffers.get(session_id)
+            stored = audio_buffer.write(audio_data) if audio_buffer is not None else None
+            if stored:
+                buffer_offset, audio_data = stored
+            elif not isinstance(audio_data, bytes):
+                audio_data = bytes(audio_data)
+            
             # Create audio chunk
             chunk_id = f"{session_id}_{int(timestamp * 1000)}"
             audio_chunk = AudioChunk(
                 chunk_id=chunk_id,
                 audio_data=audio_data,
                 timestamp=timestamp,
-                duration=duration
+                duration=duration,
+                buffer_offset=buffer_offset
             )
             
-            # Add to processing queue
+            # Add to processing queue, waiting for the pipeline to make room
             queue = self.audio_queues[session_id]
-            if queue.full():
-                # Remove oldest chunk if queue is full
-                try:
-                    queue.get_nowait()
-                    self.logger.warning(f"Audio queue full for session {session_id}, dropping oldest chunk")
-                except asyncio.QueueEmpty:
-                    pass
+            try:
+                await asyncio.wait_for(queue.put(audio_chunk), timeout=self.ENQUEUE_TIMEOUT)
+            except asyncio.TimeoutError:
+                self._release_audio(audio_buffer, [audio_chunk])
+                TRANSCRIPTION_DROPPED_CHUNKS.inc()
+                self.logger.warning(
+                    f"Audio queue for session {session_id} stayed full for {self.ENQUEUE_TIMEOUT}s, "
+                    f"rejecting chunk {chunk_id}"
+                )
+                return False
             
-            await queue.put(audio_chunk)
+            TRANSCRIPTION_QUEUE_DEPTH.inc()
             return True
             
         except Exception as e:
@@ -872,18 +1119,27 @@ class TranscriptionService:
         if session_id not in self.sessions:
             return []
         
-        session = self.sessions[session_id]
-        chunks = session.transcript_chunks
+        chunks = self.sessions[session_id].transcript_chunks
         
         if since_timestamp is not None:
-            chunks = [chunk for chunk in chunks if chunk.start_time >= since_timestamp]
+            return chunks.between(since_timestamp)
+        
+        return chunks[:]
+    
+    async def get_transcript_window(self, session_id: str, start_time: float,
+                                    end_time: float) -> List[TranscriptChunk]:
+        """Get transcript chunks starting within [start_time, end_time)"""
+        if session_id not in self.sessions:
+            return []
         
-        return chunks
+        return self.sessions[session_id].transcript_chunks.between(start_time, end_time)
     
     async def get_full_transcript(self, session_id: str) -> str:
         """Get full transcript text for a session"""
-        chunks = await self.get_transcript_chunks(session_id)
-        return " ".join(chunk.text for chunk in chunks if chunk.is_final)
+        if session_id not in self.sessions:
+            return ""
+        
+        return self.sessions[session_id].transcript_chunks.text()
     
     async def generate_draft_summary(self, session_id: str) -> Optional[MeetingSummary]:
         """Generate AI-powered draft summary for a session"""
@@ -983,13 +1239,17 @@ class TranscriptionService:
             
             # Clean up queues
             if session_id in self.audio_queues:
+                TRANSCRIPTION_QUEUE_DEPTH.dec(self.audio_queues[session_id].qsize())
+                TRANSCRIPTION_ACTIVE_SESSIONS.dec()
                 del self.audio_queues[session_id]
+            self.audio_buffers.pop(session_id, None)
             
             # Generate session summary
             summary = {
                 'session_id': session_id,
                 'duration': time.time() - session.start_time,
                 'total_chunks': len(session.transcript_chunks),
+                'skipped_duration': session.skipped_duration,
                 'speakers_identified': len(session.speakers),
                 'error_count': session.error_count,
                 'final_quality': session.audio_quality.value
@@ -1003,38 +1263,130 @@ class TranscriptionService:
             raise
     
     async def _process_audio_stream(self, session_id: str):
-        """Process audio stream for a session"""
+        """
+        Process audio stream for a session
+        
+        Chunks waiting in the queue are coalesced into batches of up to
+        BATCH_SIZE, and up to MAX_IN_FLIGHT batches are transcribed at once.
+        While all of them are busy, chunks stay queued and producers wait in
+        process_audio_chunk.
+        """
+        in_flight = set()
         try:
             session = self.sessions[session_id]
             queue = self.audio_queues[session_id]
+            slots = asyncio.Semaphore(self.MAX_IN_FLIGHT)
+            previous = None
             
             while session.is_active:
+                await slots.acquire()
                 try:
-                    # Get audio chunk from queue
-                    audio_chunk = await asyncio.wait_for(queue.get(), timeout=1.0)
-                    
-                    # Transcribe chunk
-                    transcript_chunk = await self.engine.transcribe_chunk(audio_chunk)
-                    
-                    # Add to session
-                    session.transcript_chunks.append(transcript_chunk)
-                    
-                    # Update speaker mapping
-                    speaker_id = transcript_chunk.speaker.speaker_id
-                    if speaker_id not in session.speakers:
-                        session.speakers[speaker_id] = transcript_chunk.speaker
-                    
-                    self.logger.debug(f"Processed chunk for session {session_id}: {transcript_chunk.text[:50]}...")
-                    
+                    # Get audio chunks from queue
+                    batch = [await asyncio.wait_for(queue.get(), timeout=1.0)]
                 except asyncio.TimeoutError:
                     # No audio chunks to process, continue
+                    slots.release()
+                    continue
+                
+                while len(batch) < self.BATCH_SIZE and not queue.empty():
+                    batch.append(queue.get_nowait())
+                TRANSCRIPTION_QUEUE_DEPTH.dec(len(batch))
+                
+                batch = await self._skip_silence(session_id, batch)
+                if not batch:
+                    slots.release()
                     continue
-                except Exception as e:
-                    await self._handle_error(session_id, e)
+                
+                previous = asyncio.create_task(
+                    self._transcribe_batch(session_id, batch, previous, slots)
+                )
+                in_flight.add(previous)
+                previous.add_done_callback(in_flight.discard)
                     
         except Exception as e:
             self.logger.error(f"Audio processing failed for session {session_id}: {e}")
             await self._handle_error(session_id, e)
+        finally:
+            for task in in_flight:
+                task.cancel()
+    
+    async def _transcribe_batch(self, session_id: str, batch: List[AudioChunk],
+                                previous: Optional[asyncio.Task], slots: asyncio.Semaphore):
+        """Transcribe a batch, adding its chunks after those of the previous batch"""
+        audio_buffer = self.audio_buffers.get(session_id)
+        try:
+            batch.sort(key=lambda audio_chunk: audio_chunk.timestamp)
+            try:
+                transcript_chunks = await self.engine.transcribe_batch(batch)
+            except Exception as e:
+                transcript_chunks = []
+                await self._handle_error(session_id, e)
+            finally:
+                self._release_audio(audio_buffer, batch)
+            
+            # Batches finish in any order; add chunks in the order they were queued
+            if previous is not None:
+                await asyncio.wait({previous})
+            
+            session = self.sessions[session_id]
+            for transcript_chunk in transcript_chunks:
+                # Add to session
+                session.transcript_chunks.append(transcript_chunk)
+                
+                # Update speaker mapping
+                speaker_id = transcript_chunk.speaker.speaker_id
+                if speaker_id not in session.speakers:
+                    session.speakers[speaker_id] = transcript_chunk.speaker
+            
+            self.logger.debug(f"Processed {len(transcript_chunks)} chunks for session {session_id}")
+        finally:
+            slots.release()
+    
+    async def _skip_silence(self, session_id: str, batch: List[AudioChunk]) -> List[AudioChunk]:
+        """
+        Measure each chunk's signal and drop chunks without speech
+        
+        Silence within SPEECH_HANGOVER seconds of the last speech is kept so
+        trailing words are not cut off. Measuring reads every sample, so it
+        runs in a thread rather than on the event loop shared by all sessions.
+        """
+        if self.voice_activity is None:
+            return batch
+        
+        analyze = self.voice_activity.analyze
+        measured = await asyncio.to_thread(lambda: [analyze(audio_chunk) for audio_chunk in batch])
+        
+        session = self.sessions[session_id]
+        speech = []
+        silent = []
+        for audio_chunk, levels in zip(batch, measured):
+            chunk_end = audio_chunk.timestamp + audio_chunk.duration
+            session.signal_levels.append((chunk_end, levels))
+            
+            if levels.is_speech:
+                session.last_speech_end = chunk_end
+            elif (session.last_speech_end is None
+                  or audio_chunk.timestamp - session.last_speech_end >= self.SPEECH_HANGOVER):
+                silent.append(audio_chunk)
+                continue
+            speech.append(audio_chunk)
+        
+        if silent:
+            skipped = sum(audio_chunk.duration for audio_chunk in silent)
+            session.skipped_duration += skipped
+            TRANSCRIPTION_SKIPPED_AUDIO.inc(skipped)
+            self._release_audio(self.audio_buffers.get(session_id), silent)
+            self.logger.debug(f"Skipped {skipped:.1f}s of silence for session {session_id}")
+        
+        return speech
+    
+    def _release_audio(self, audio_buffer: Optional[AudioRingBuffer], audio_chunks: List[AudioChunk]):
+        """Return the ring buffer space of chunks that are no longer needed"""
+        if audio_buffer is None:
+            return
+        for audio_chunk in audio_chunks:
+            if audio_chunk.buffer_offset is not None:
+                audio_buffer.release(audio_chunk.buffer_offset)
     
     async def _monitor_audio_quality(self, session_id: str):
         """Monitor audio quality for a session"""
@@ -1044,32 +1396,65 @@ class TranscriptionService:
             while session.is_active:
                 await asyncio.sleep(self.QUALITY_CHECK_INTERVAL)
                 
-                # Analyze recent chunks for quality indicators
-                recent_chunks = [
-                    chunk for chunk in session.transcript_chunks
-                    if time.time() - chunk.end_time < self.QUALITY_CHECK_INTERVAL
-                ]
+                cutoff = time.time() - self.QUALITY_CHECK_INTERVAL
+                assessments = []
                 
+                # Analyze recent chunks for quality indicators
+                recent_chunks = session.transcript_chunks.ending_after(cutoff)
                 if recent_chunks:
                     avg_confidence = sum(chunk.confidence for chunk in recent_chunks) / len(recent_chunks)
                     
                     # Update quality based on confidence
                     if avg_confidence >= 0.9:
-                        session.audio_quality = AudioQuality.EXCELLENT
+                        assessments.append(AudioQuality.EXCELLENT)
                     elif avg_confidence >= 0.8:
-                        session.audio_quality = AudioQuality.GOOD
+                        assessments.append(AudioQuality.GOOD)
                     elif avg_confidence >= 0.6:
-                        session.audio_quality = AudioQuality.FAIR
+                        assessments.append(AudioQuality.FAIR)
                     elif avg_confidence >= 0.4:
-                        session.audio_quality = AudioQuality.POOR
+                        assessments.append(AudioQuality.POOR)
                     else:
-                        session.audio_quality = AudioQuality.UNUSABLE
-                    
+                        assessments.append(AudioQuality.UNUSABLE)
+                
+                # Signal level of recent speech; silence says nothing about quality
+                recent_levels = [
+                    levels for chunk_end, levels in session.signal_levels
+                    if chunk_end > cutoff and levels.is_speech
+                ]
+                if recent_levels:
+                    assessments.append(self._signal_quality(recent_levels))
+                
+                if assessments:
+                    session.audio_quality = min(assessments, key=QUALITY_ORDER.index)
                     self.logger.debug(f"Audio quality for session {session_id}: {session.audio_quality.value}")
                 
         except Exception as e:
             self.logger.error(f"Quality monitoring failed for session {session_id}: {e}")
     
+    def _signal_quality(self, levels: List[AudioLevels]) -> AudioQuality:
+        """Quality from the loudness and clipping of speech"""
+        rms_dbfs = sum(level.rms_dbfs for level in levels) / len(levels)
+        clipped_ratio = max(level.clipped_ratio for level in levels)
+        
+        if rms_dbfs >= -30:
+            quality = AudioQuality.EXCELLENT
+        elif rms_dbfs >= -40:
+            quality = AudioQuality.GOOD
+        elif rms_dbfs >= -50:
+            quality = AudioQuality.FAIR
+        elif rms_dbfs >= -60:
+            quality = AudioQuality.POOR
+        else:
+            quality = AudioQuality.UNUSABLE
+        
+        # Clipped audio is distorted however loud it is
+        if clipped_ratio > 0.05:
+            quality = min(quality, AudioQuality.POOR, key=QUALITY_ORDER.index)
+        elif clipped_ratio > 0.01:
+            quality = min(quality, AudioQuality.FAIR, key=QUALITY_ORDER.index)
+        
+        return quality
+    
     async def _handle_error(self, session_id: str, error: Exception):
         """Handle transcription errors"""
         try:
@@ -1095,12 +1480,13 @@ class TranscriptionService:
         """Register error handler for a session"""
         self.error_handlers[session_id] = handler
     
-    async def get_session_status(self, session_id: str) -> Optional[Dict[str, Any]]:
+    async def get_session_status(self, session_id: str,
+                                 include_chunks: bool = True) -> Optional[Dict[str, Any]]:
         """Get status of a transcription session"""
         if session_id not in self.sessions:
             return None
         
-        return self.sessions[session_id].to_dict()
+        return self.sessions[session_id].to_dict(include_chunks=include_chunks)
     
     async def list_active_sessions(self) -> Dict[str, Dict[str, Any]]:
         """List all active transcription sessions"""
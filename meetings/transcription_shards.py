@@ -0,0 +1,428 @@
+"""
+Transcription sessions sharded across worker processes
+
+A single TranscriptionService runs every session on one event loop, so
+concurrent-call capacity is capped by one core. With TRANSCRIPTION_SHARDS
+set, sessions are consistently hashed onto that many worker processes
+(see the run_transcription_shards command), each running its own
+TranscriptionService. ShardedTranscriptionService mirrors the local
+service's API and forwards each call to the owning worker over Redis lists:
+requests are JSON, audio is base64 encoded, and replies come back on a
+per-request list.
+
+The shard a session was started on is recorded in a Redis session
+directory, so calls from any web or Celery process reach the same worker,
+and running sessions stay put when the number of shards changes.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import random
+import uuid
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import redis.asyncio as aioredis
+from django.conf import settings
+
+from .transcription_service import (
+    ActionItem, AudioQuality, MeetingSummary, Speaker, TranscriptChunk, TranscriptionService,
+    TranscriptionSession
+)
+
+logger = logging.getLogger(__name__)
+
+REQUEST_QUEUE_KEY = 'transcription:shard:{shard}:requests'
+REPLY_KEY = 'transcription:reply:{request_id}'
+REPLY_TTL = 60  # seconds an unread reply is kept
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], 'big')
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping session ids to shards
+
+    Each shard is placed on the ring many times, so sessions spread evenly
+    and adding a shard moves only the sessions that now hash to it.
+    """
+
+    def __init__(self, shards: Iterable[int], replicas: int = 100):
+        points = sorted(
+            (_hash(f"{shard}:{replica}"), shard)
+            for shard in shards
+            for replica in range(replicas)
+        )
+        if not points:
+            raise ValueError("A hash ring needs at least one shard")
+        self._hashes = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def shard_for(self, key: str) -> int:
+        """Shard owning key"""
+        index = bisect_right(self._hashes, _hash(key)) % len(self._hashes)
+        return self._shards[index]
+
+
+class SessionDirectory:
+    """Redis record of which shard each transcription session runs on"""
+
+    KEY = 'transcription:session:{session_id}'
+    TTL = 24 * 60 * 60  # seconds; outlives any meeting, in case a stop is never received
+
+    def __init__(self, redis_client):
+        self.redis = redis_client
+
+    async def assign(self, session_id: str, shard: int) -> int:
+        """Record shard as the session's owner unless it already has one, returning the owner"""
+        key = self.KEY.format(session_id=session_id)
+        if await self.redis.set(key, shard, nx=True, ex=self.TTL):
+            return shard
+        owner = await self.redis.get(key)
+        return int(owner) if owner is not None else shard
+
+    async def lookup(self, session_id: str) -> Optional[int]:
+        """Shard the session runs on, or None if it is not running"""
+        owner = await self.redis.get(self.KEY.format(session_id=session_id))
+        return int(owner) if owner is not None else None
+
+    async def release(self, session_id: str):
+        """Forget the session's shard"""
+        await self.redis.delete(self.KEY.format(session_id=session_id))
+
+
+class ShardRequestError(Exception):
+    """A transcription shard failed or did not answer a request"""
+
+
+class TranscriptionShardWorker:
+    """
+    Serve one shard's requests with a local TranscriptionService
+
+    Every request is handled in its own task, so a session waiting on a full
+    audio queue does not hold up the other sessions on the shard. Tasks are
+    created in arrival order and enqueue audio before their first switch, so
+    a session's chunks are queued in the order they were sent.
+    """
+
+    # Request methods, with how each result is made JSON serializable
+    METHODS = {
+        'start_transcription': lambda session: session.to_dict(include_chunks=False),
+        'process_audio_chunk': None,
+        'get_transcript_chunks': lambda chunks: [chunk.to_dict() for chunk in chunks],
+        'get_transcript_window': lambda chunks: [chunk.to_dict() for chunk in chunks],
+        'get_full_transcript': None,
+        'generate_draft_summary': lambda summary: summary.to_dict() if summary else None,
+        'extract_action_items': lambda items: [item.to_dict() for item in items],
+        'suggest_next_steps': None,
+        'get_speaker_mapping': lambda speakers: {k: v.to_dict() for k, v in speakers.items()},
+        'get_session_status': None,
+        'list_active_sessions': None,
+        'stop_transcription': None,
+    }
+
+    # Methods of the worker's engine, for callers holding a transcript rather than a session
+    ENGINE_METHODS = {
+        'generate_summary': lambda summary: summary.to_dict(),
+        'extract_action_items': lambda items: [item.to_dict() for item in items],
+        'suggest_next_steps': None,
+    }
+
+    def __init__(self, shard: int, service: TranscriptionService, redis_client):
+        self.shard = shard
+        self.service = service
+        self.redis = redis_client
+        self.queue_key = REQUEST_QUEUE_KEY.format(shard=shard)
+        self._running = False
+        self._tasks = set()
+        self.logger = logging.getLogger(__name__)
+
+    async def run(self):
+        """Serve requests until stop() is called, then stop the shard's sessions"""
+        self._running = True
+        self.logger.info(f"Transcription shard {self.shard} serving {self.queue_key}")
+        try:
+            while self._running:
+                item = await self.redis.blpop(self.queue_key, timeout=1)
+                if item is None:
+                    continue
+                task = asyncio.create_task(self._handle(json.loads(item[1])))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        finally:
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+            await self.service.cleanup()
+
+    def stop(self):
+        """Stop taking requests"""
+        self._running = False
+
+    async def _handle(self, request: Dict[str, Any]):
+        try:
+            reply = {'result': await self._dispatch(request['method'], request['args'])}
+        except Exception as e:
+            self.logger.error(f"Shard {self.shard} failed {request['method']}: {e}")
+            reply = {'error': str(e), 'error_type': type(e).__name__}
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.rpush(request['reply_to'], json.dumps(reply))
+                pipe.expire(request['reply_to'], REPLY_TTL)
+                await pipe.execute()
+        except Exception as e:
+            self.logger.error(f"Shard {self.shard} could not reply to {request['method']}: {e}")
+
+    async def _dispatch(self, method: str, args: List[Any]) -> Any:
+        target, methods = self.service, self.METHODS
+        if method.startswith('engine.'):
+            method = method[len('engine.'):]
+            target, methods = self.service.engine, self.ENGINE_METHODS
+        if method not in methods:
+            raise ValueError(f"Unsupported transcription shard method: {method}")
+
+        if target is self.service and method == 'process_audio_chunk':
+            session_id, audio, timestamp, duration = args
+            args = [session_id, base64.b64decode(audio), timestamp, duration]
+        elif target is not self.service and method == 'generate_summary':
+            transcript, speakers = args
+            args = [transcript, {k: Speaker.from_dict(v) for k, v in speakers.items()}]
+
+        result = await getattr(target, method)(*args)
+        encode = methods[method]
+        return encode(result) if encode else result
+
+
+class ShardedTranscriptionEngine:
+    """
+    Summary helpers of the shard workers' engines
+
+    Stands in for TranscriptionService.engine, for callers such as
+    AISummaryService that summarize a stored transcript rather than a
+    running session. Each call goes to a random shard.
+    """
+
+    def __init__(self, service: 'ShardedTranscriptionService'):
+        self.service = service
+
+    async def generate_summary(self, transcript: str, speakers: Dict[str, Speaker]) -> MeetingSummary:
+        speakers = {k: v.to_dict() for k, v in speakers.items()}
+        return MeetingSummary.from_dict(await self._call('generate_summary', transcript, speakers))
+
+    async def extract_action_items(self, transcript: str) -> List[ActionItem]:
+        return [ActionItem.from_dict(item) for item in await self._call('extract_action_items', transcript)]
+
+    async def suggest_next_steps(self, transcript: str, summary: str) -> List[str]:
+        return await self._call('suggest_next_steps', transcript, summary)
+
+    async def _call(self, method: str, *args) -> Any:
+        return await self.service._call(random.randrange(self.service.shards), f'engine.{method}', *args)
+
+
+class ShardedTranscriptionService:
+    """
+    TranscriptionService API backed by transcription shard workers
+
+    Methods behave like the local service's for sessions that are not
+    running. Per-session error handlers are not supported, as errors are
+    handled in the worker process.
+    """
+
+    REQUEST_TIMEOUT = 10  # seconds to wait for a shard's reply
+
+    def __init__(self, shards: Optional[int] = None, redis_client=None):
+        self.shards = shards or settings.TRANSCRIPTION_SHARDS
+        self.ring = HashRing(range(self.shards))
+        self._owns_redis = redis_client is None
+        self.redis = redis_client or aioredis.from_url(settings.REDIS_URL)
+        self.directory = SessionDirectory(self.redis)
+        self.engine = ShardedTranscriptionEngine(self)
+        self._owners: Dict[str, int] = {}
+        self._started = set()
+        self.logger = logging.getLogger(__name__)
+
+    async def initialize(self, config: Dict[str, Any]) -> bool:
+        """Check Redis is reachable; engines are initialized by the shard workers"""
+        try:
+            await self.redis.ping()
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to initialize sharded transcription service: {e}")
+            return False
+
+    async def start_transcription(self, session_id: str, stream_id: str) -> TranscriptionSession:
+        """Start transcription for a session on its shard"""
+        owner = await self.directory.assign(session_id, self.ring.shard_for(session_id))
+        try:
+            data = await self._call(owner, 'start_transcription', session_id, stream_id)
+        except ShardRequestError:
+            await self.directory.release(session_id)
+            raise
+
+        self._owners[session_id] = owner
+        self._started.add(session_id)
+        return TranscriptionSession(
+            session_id=data['session_id'],
+            stream_id=data['stream_id'],
+            is_active=data['is_active'],
+            audio_quality=AudioQuality(data['audio_quality']),
+            start_time=data['start_time']
+        )
+
+    async def process_audio_chunk(self, session_id: str, audio_data: Union[bytes, bytearray, memoryview],
+                                  timestamp: float, duration: float) -> bool:
+        """Send an audio chunk to the session's shard"""
+        try:
+            shard = await self._owner(session_id)
+            if shard is None:
+                raise ValueError(f"Transcription session {session_id} not found")
+            audio = base64.b64encode(audio_data).decode('ascii')
+            return await self._call(shard, 'process_audio_chunk', session_id, audio, timestamp, duration)
+        except Exception as e:
+            self.logger.error(f"Failed to process audio chunk: {e}")
+            return False
+
+    async def get_transcript_chunks(self, session_id: str,
+                                    since_timestamp: Optional[float] = None) -> List[TranscriptChunk]:
+        """Get transcript chunks for a session"""
+        chunks = await self._session_call(session_id, 'get_transcript_chunks', since_timestamp, default=[])
+        return [TranscriptChunk.from_dict(chunk) for chunk in chunks]
+
+    async def get_transcript_window(self, session_id: str, start_time: float,
+                                    end_time: float) -> List[TranscriptChunk]:
+        """Get transcript chunks starting within [start_time, end_time)"""
+        chunks = await self._session_call(session_id, 'get_transcript_window', start_time, end_time, default=[])
+        return [TranscriptChunk.from_dict(chunk) for chunk in chunks]
+
+    async def get_full_transcript(self, session_id: str) -> str:
+        """Get full transcript text for a session"""
+        return await self._session_call(session_id, 'get_full_transcript', default="")
+
+    async def generate_draft_summary(self, session_id: str) -> Optional[MeetingSummary]:
+        """Generate AI-powered draft summary for a session"""
+        summary = await self._session_call(session_id, 'generate_draft_summary', default=None)
+        return MeetingSummary.from_dict(summary) if summary else None
+
+    async def extract_action_items(self, session_id: str) -> List[ActionItem]:
+        """Extract action items from session transcript"""
+        items = await self._session_call(session_id, 'extract_action_items', default=[])
+        return [ActionItem.from_dict(item) for item in items]
+
+    async def suggest_next_steps(self, session_id: str) -> List[str]:
+        """Suggest next steps based on meeting content"""
+        return await self._session_call(session_id, 'suggest_next_steps', default=[])
+
+    async def get_speaker_mapping(self, session_id: str) -> Dict[str, Speaker]:
+        """Get speaker mapping for a session"""
+        speakers = await self._session_call(session_id, 'get_speaker_mapping', default={})
+        return {k: Speaker.from_dict(v) for k, v in speakers.items()}
+
+    async def get_session_status(self, session_id: str,
+                                 include_chunks: bool = True) -> Optional[Dict[str, Any]]:
+        """Get status of a transcription session"""
+        return await self._session_call(session_id, 'get_session_status', include_chunks, default=None)
+
+    async def stop_transcription(self, session_id: str) -> Dict[str, Any]:
+        """Stop transcription for a session and release its shard"""
+        shard = await self._owner(session_id)
+        if shard is None:
+            raise ValueError(f"Transcription session {session_id} not found")
+
+        try:
+            summary = await self._call(shard, 'stop_transcription', session_id)
+        except ValueError:
+            # The shard no longer has it; drop the stale directory entry
+            await self._forget(session_id)
+            raise
+        finally:
+            self._started.discard(session_id)
+
+        await self._forget(session_id)
+        return summary
+
+    async def list_active_sessions(self) -> Dict[str, Dict[str, Any]]:
+        """List active transcription sessions across all shards"""
+        results = await asyncio.gather(
+            *(self._call(shard, 'list_active_sessions') for shard in range(self.shards)),
+            return_exceptions=True
+        )
+
+        active_sessions = {}
+        for shard, result in enumerate(results):
+            if isinstance(result, Exception):
+                self.logger.warning(f"Transcription shard {shard} did not list its sessions: {result}")
+                continue
+            active_sessions.update(result)
+        return active_sessions
+
+    async def cleanup(self):
+        """Stop the sessions started through this service"""
+        for session_id in list(self._started):
+            try:
+                await self.stop_transcription(session_id)
+            except Exception as e:
+                self.logger.error(f"Failed to stop transcription for {session_id}: {e}")
+        if self._owns_redis:
+            await self.redis.aclose()
+
+    async def _owner(self, session_id: str) -> Optional[int]:
+        shard = self._owners.get(session_id)
+        if shard is None:
+            shard = await self.directory.lookup(session_id)
+            if shard is not None:
+                self._owners[session_id] = shard
+        return shard
+
+    async def _forget(self, session_id: str):
+        self._owners.pop(session_id, None)
+        await self.directory.release(session_id)
+
+    async def _session_call(self, session_id: str, method: str, *args, default=None) -> Any:
+        """Call method on the session's shard, or return default if the session is not running"""
+        shard = await self._owner(session_id)
+        if shard is None:
+            return default
+        try:
+            return await self._call(shard, method, session_id, *args)
+        except ShardRequestError as e:
+            self.logger.error(f"Transcription shard {shard} failed {method} for {session_id}: {e}")
+            return default
+
+    async def _call(self, shard: int, method: str, *args) -> Any:
+        request_id = uuid.uuid4().hex
+        reply_key = REPLY_KEY.format(request_id=request_id)
+        await self.redis.rpush(REQUEST_QUEUE_KEY.format(shard=shard), json.dumps({
+            'id': request_id,
+            'method': method,
+            'args': args,
+            'reply_to': reply_key
+        }))
+
+        item = await self.redis.blpop(reply_key, timeout=self.REQUEST_TIMEOUT)
+        if item is None:
+            raise ShardRequestError(
+                f"Transcription shard {shard} did not answer {method} within {self.REQUEST_TIMEOUT}s"
+            )
+
+        reply = json.loads(item[1])
+        if 'error' in reply:
+            # Keep the local service's ValueError for unknown or duplicate sessions
+            error_class = ValueError if reply['error_type'] == 'ValueError' else ShardRequestError
+            raise error_class(reply['error'])
+        return reply['result']
+
+
+def create_transcription_service(engine_type: str = "mock"):
+    """
+    Transcription service for this process
+
+    Returns a ShardedTranscriptionService when TRANSCRIPTION_SHARDS is set,
+    with engine_type configured on the workers instead.
+    """
+    if settings.TRANSCRIPTION_SHARDS > 0:
+        return ShardedTranscriptionService(settings.TRANSCRIPTION_SHARDS)
+    return TranscriptionService(engine_type=engine_type)
@@ -5,6 +5,7 @@ urlpatterns = [
     path('', views.MeetingListCreateView.as_view(), name='meeting-list-create'),
     path('<int:pk>/', views.MeetingDetailView.as_view(), name='meeting-detail'),
     path('match-lead/', views.match_lead_to_meeting, name='match-lead-to-meeting'),
+    path('match-lead/bulk/', views.bulk_match_leads_to_meetings, name='bulk-match-leads-to-meetings'),
     path('<int:meeting_id>/session/', views.meeting_session_detail, name='meeting-session-detail'),
     path('<int:meeting_id>/start/', views.start_meeting_session, name='start-meeting-session'),
     path('<int:meeting_id>/end/', views.end_meeting_session, name='end-meeting-session'),
@@ -18,6 +19,7 @@ urlpatterns = [
     
     # CRM synchronization endpoints
     path('<int:meeting_id>/sync-crm/', views.sync_meeting_to_crm, name='sync-meeting-to-crm'),
+    path('crm-sync-jobs/<uuid:tracking_id>/', views.get_crm_sync_job, name='get-crm-sync-job'),
     path('<int:meeting_id>/create-tasks/', views.create_follow_up_tasks, name='create-follow-up-tasks'),
     path('<int:meeting_id>/sync-status/', views.get_crm_sync_status, name='get-crm-sync-status'),
     path('<int:meeting_id>/retry-sync/', views.retry_crm_sync, name='retry-crm-sync'),
@@ -34,6 +36,7 @@ urlpatterns = [
     path('operations/<str:tracking_id>/retry/', views.retry_failed_operation, name='retry-failed-operation'),
     path('sync-report/', views.generate_sync_report, name='generate-sync-report'),
     path('sync-health/', views.get_sync_health_metrics, name='get-sync-health-metrics'),
+    path('sync-health/timeseries/', views.get_sync_health_timeseries, name='get-sync-health-timeseries'),
     
     # AI Summary Generation endpoints
     path('bot-sessions/<int:bot_session_id>/generate-summary/', views.generate_draft_summary, name='generate-draft-summary'),
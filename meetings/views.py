@@ -1,16 +1,19 @@
 import asyncio
+from datetime import timedelta
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.urls import reverse
+from django.db import transaction
 from django.http import JsonResponse
 from django.core.exceptions import ValidationError
 from .models import Meeting, MeetingSession, ActionItem, CallBotSession, DraftSummary, ValidationSession, DraftEmail, EmailApproval
 from .serializers import (
     MeetingSerializer, MeetingSessionSerializer, 
-    ActionItemSerializer, MeetingMatchSerializer,
+    ActionItemSerializer, MeetingMatchSerializer, MeetingBulkMatchSerializer,
     CallBotSessionSerializer, DraftSummarySerializer,
     CRMFormattedSummarySerializer, ValidationSessionSerializer,
     ValidationResponseSerializer, ValidationSessionCreateSerializer,
@@ -19,10 +22,12 @@ from .serializers import (
     EmailApprovalRequestSerializer, EmailApprovalResponseSerializer,
     ScheduledEmailSerializer
 )
-from .services import MeetingSessionService
+from .services import MeetingSessionService, MeetingLeadMatchingService
 from .crm_service import CRMSyncService, CRMSyncStatus
+from .crm_outbox import CRMSyncOutbox
 from .task_scheduler import FollowUpTaskScheduler
 from .sync_tracker import SyncTracker, SyncOperation
+from .sync_rollups import SyncRollupService
 from .ai_summary_service import AISummaryService, extract_meeting_metrics, format_summary_for_export
 from .validation_service import ValidationService
 from leads.models import Lead
@@ -111,6 +116,30 @@ def match_lead_to_meeting(request):
     })
 
 
+@api_view(['POST'])
+@permission_classes([AllowAny])  # n8n webhook endpoint
+def bulk_match_leads_to_meetings(request):
+    """
+    Webhook endpoint for n8n to match a batch of calendar events to leads
+    Used for calendar backfills
+    """
+    serializer = MeetingBulkMatchSerializer(data=request.data)
+    
+    if not serializer.is_valid():
+        return Response({
+            'success': False,
+            'errors': serializer.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    matching_service = MeetingLeadMatchingService()
+    result = matching_service.match_and_save(serializer.validated_data['meetings'])
+    
+    return Response({
+        'success': True,
+        **result
+    })
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def meeting_session_detail(request, meeting_id):
@@ -310,25 +339,27 @@ def force_save_session(request, session_id):
 def sync_meeting_to_crm(request, meeting_id):
     """
     Webhook endpoint for n8n to sync meeting outcomes to CRM
+    
+    The sync is queued and runs in a Celery worker; poll the returned
+    tracking ID for its outcome. Requests repeated with the same
+    Idempotency-Key header are queued once.
     """
-    crm_service = CRMSyncService()
+    if not Meeting.objects.filter(id=meeting_id).exists():
+        return Response({
+            'success': False,
+            'status': CRMSyncStatus.FAILED.value,
+            'message': f'Meeting {meeting_id} not found'
+        }, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        result = crm_service.sync_meeting_outcome(meeting_id)
-        
-        response_data = {
-            'success': result.status == CRMSyncStatus.SUCCESS,
-            'status': result.status.value,
-            'message': result.message,
-            'crm_record_id': result.crm_record_id,
-            'retry_count': result.retry_count
-        }
-        
-        if result.error_details:
-            response_data['error_details'] = result.error_details
+        entry, created = CRMSyncOutbox().enqueue(
+            'meeting_outcome',
+            CRMSyncService.default_crm_system.value,
+            {'meeting_id': meeting_id},
+            idempotency_key=_idempotency_key(request, 'meeting_outcome', meeting_id)
+        )
         
-        status_code = status.HTTP_200_OK if result.status == CRMSyncStatus.SUCCESS else status.HTTP_400_BAD_REQUEST
-        return Response(response_data, status=status_code)
+        return Response(_crm_sync_job_data(entry, 'CRM sync queued'), status=status.HTTP_202_ACCEPTED)
         
     except Exception as e:
         return Response({
@@ -338,6 +369,46 @@ def sync_meeting_to_crm(request, meeting_id):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])  # polled by n8n with the tracking ID it was given
+def get_crm_sync_job(request, tracking_id):
+    """
+    Get the status and results of a queued CRM sync
+    """
+    job_status = CRMSyncOutbox().get_status(tracking_id)
+    
+    if job_status is None:
+        return Response({
+            'error': f'CRM sync job {tracking_id} not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    return Response(job_status)
+
+
+def _idempotency_key(request, *scope):
+    """
+    Outbox idempotency key from the request's Idempotency-Key header, if any
+    """
+    key = request.headers.get('Idempotency-Key')
+    if not key:
+        return None
+    return ':'.join([*(str(part) for part in scope), key])[:200]
+
+
+def _crm_sync_job_data(entry, message):
+    """
+    Response body for a queued CRM sync
+    """
+    return {
+        'success': True,
+        'status': entry.status,
+        'message': message,
+        'tracking_id': str(entry.tracking_id),
+        'crm_system': entry.crm_system,
+        'status_url': reverse('get-crm-sync-job', kwargs={'tracking_id': entry.tracking_id})
+    }
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])  # n8n webhook endpoint
 def create_follow_up_tasks(request, meeting_id):
@@ -653,6 +724,43 @@ def get_sync_health_metrics(request):
     return Response(metrics)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_sync_health_timeseries(request):
+    """
+    Get sync success, failure and latency per minute, hour or day
+    """
+    granularity = request.query_params.get('granularity', 'hour')
+    crm_system = request.query_params.get('crm_system')
+    
+    try:
+        hours = int(request.query_params.get('hours', 24))
+        if hours <= 0:
+            raise ValueError
+    except ValueError:
+        return Response({
+            'error': 'hours must be a positive integer'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    end_date = timezone.now()
+    start_date = end_date - timedelta(hours=hours)
+    
+    try:
+        series = SyncRollupService().get_series(granularity, start_date, end_date, crm_system=crm_system)
+    except ValueError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'granularity': granularity,
+        'crm_system': crm_system,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'buckets': series
+    })
+
+
 # AI Summary Generation Endpoints
 
 @api_view(['POST'])
@@ -1998,11 +2106,24 @@ def approve_crm_updates(request, session_id):
         }, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        success, sync_records = approval_service.approve_crm_updates(
-            session_id=session_id,
-            approved_systems=approved_systems,
-            custom_updates=custom_updates
-        )
+        # Sync records and their outbox entries are committed together
+        with transaction.atomic():
+            success, sync_records = approval_service.approve_crm_updates(
+                session_id=session_id,
+                approved_systems=approved_systems,
+                custom_updates=custom_updates
+            )
+            
+            outbox = CRMSyncOutbox()
+            sync_jobs = []
+            for sync_record in sync_records:
+                entry, _ = outbox.enqueue(
+                    'sync_record',
+                    sync_record.crm_system,
+                    {'sync_record_id': sync_record.id},
+                    idempotency_key=f'sync_record:{sync_record.id}:{sync_record.retry_count}'
+                )
+                sync_jobs.append(_crm_sync_job_data(entry, 'CRM sync queued'))
         
         from .serializers import CRMSyncRecordSerializer
         sync_records_data = CRMSyncRecordSerializer(sync_records, many=True).data
@@ -2011,8 +2132,9 @@ def approve_crm_updates(request, session_id):
             'success': success,
             'message': f'CRM updates approved for {len(approved_systems)} systems',
             'approved_systems': approved_systems,
-            'sync_records': sync_records_data
-        })
+            'sync_records': sync_records_data,
+            'sync_jobs': sync_jobs
+        }, status=status.HTTP_202_ACCEPTED)
         
     except Exception as e:
         return Response({
@@ -2264,11 +2386,12 @@ def get_opportunity_sync_suggestions(request, validation_session_id):
 def bulk_sync_validation_session(request, validation_session_id):
     """
     Perform bulk sync of meeting outcome, tasks, and optionally opportunity updates
+    
+    The sync is queued and runs in a Celery worker; poll the returned
+    tracking ID for per-step results.
     """
     try:
-        from .crm_service import CRMService, CRMSystem
-        
-        crm_service = CRMService()
+        from .crm_service import CRMSystem
         
         # Get request data
         crm_system_str = request.data.get('crm_system', 'salesforce')
@@ -2283,39 +2406,24 @@ def bulk_sync_validation_session(request, validation_session_id):
                 'error': f'Unsupported CRM system: {crm_system_str}'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Perform bulk sync
-        results = crm_service.bulk_sync_validation_session(
-            validation_session_id,
-            crm_system,
-            include_opportunity_update,
-            opportunity_data
-        )
-        
-        # Format response
-        response_data = {
-            'success': True,
-            'results': {}
-        }
+        if not ValidationSession.objects.filter(id=validation_session_id).exists():
+            return Response({
+                'error': f'Validation session {validation_session_id} not found'
+            }, status=status.HTTP_404_NOT_FOUND)
         
-        for sync_type, result in results.items():
-            if isinstance(result, list):
-                # Handle task sync results (list of results)
-                response_data['results'][sync_type] = [
-                    {
-                        'status': r.status.value,
-                        'message': r.message,
-                        'crm_record_id': r.crm_record_id
-                    } for r in result
-                ]
-            else:
-                # Handle single result
-                response_data['results'][sync_type] = {
-                    'status': result.status.value,
-                    'message': result.message,
-                    'crm_record_id': result.crm_record_id
-                }
+        # Queue bulk sync
+        entry, created = CRMSyncOutbox().enqueue(
+            'bulk_sync',
+            crm_system.value,
+            {
+                'validation_session_id': validation_session_id,
+                'include_opportunity_update': include_opportunity_update,
+                'opportunity_data': opportunity_data
+            },
+            idempotency_key=_idempotency_key(request, 'bulk_sync', validation_session_id, crm_system.value)
+        )
         
-        return Response(response_data)
+        return Response(_crm_sync_job_data(entry, 'Bulk sync queued'), status=status.HTTP_202_ACCEPTED)
         
     except Exception as e:
         return Response({
@@ -0,0 +1,118 @@
+"""
+Voice activity detection ahead of transcription
+
+Each audio chunk is split into short frames, and the RMS energy and
+zero-crossing rate of every frame are computed at once with NumPy (or
+frame by frame in Python when NumPy is not installed). Frames loud enough
+and not dominated by high-frequency noise count as speech; chunks with too
+little speech need not be sent to the transcription engine.
+"""
+import math
+from dataclasses import dataclass
+
+from .audio_buffer import NUMPY_AVAILABLE, int16_samples
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+FULL_SCALE = 32768.0
+SILENCE_DBFS = -100.0  # Level reported for digital silence
+
+
+def to_dbfs(mean_square: float) -> float:
+    """RMS level in dB relative to full scale, from the mean squared sample"""
+    if mean_square <= 0:
+        return SILENCE_DBFS
+    return max(SILENCE_DBFS, 10 * math.log10(mean_square / (FULL_SCALE * FULL_SCALE)))
+
+
+@dataclass(slots=True)
+class AudioLevels:
+    """Signal measurements of one audio chunk"""
+    rms_dbfs: float
+    zero_crossing_rate: float  # Sign changes per sample
+    speech_ratio: float  # Share of frames classified as speech
+    clipped_ratio: float  # Share of samples at full scale
+    is_speech: bool
+
+
+class VoiceActivityDetector:
+    """
+    Classify audio chunks as speech or silence from frame energy and zero crossings
+
+    Thresholds are class attributes so noisier rooms can be handled by a
+    subclass. Audio is assumed to be 16-bit PCM.
+    """
+
+    FRAME_SECONDS = 0.02
+    SPEECH_DBFS = -45.0  # Frames quieter than this are silence
+    MAX_ZERO_CROSSING_RATE = 0.4  # Frames crossing zero more often are hiss rather than voice
+    MIN_SPEECH_RATIO = 0.1  # Share of speech frames for a chunk to count as speech
+
+    def analyze(self, audio_chunk) -> AudioLevels:
+        """Measure a chunk's signal and decide whether it contains speech"""
+        frame_size = max(1, int(audio_chunk.sample_rate * audio_chunk.channels * self.FRAME_SECONDS))
+        # Mean square a frame needs to reach SPEECH_DBFS
+        speech_energy = (FULL_SCALE * 10 ** (self.SPEECH_DBFS / 20)) ** 2
+
+        samples = int16_samples(audio_chunk.audio_data)
+        if samples is None:
+            stats = self._frame_stats_python(audio_chunk.audio_data, frame_size, speech_energy)
+        else:
+            stats = self._frame_stats_numpy(samples, frame_size, speech_energy)
+        mean_square, zero_crossing_rate, speech_frames, frames, clipped, sample_count = stats
+
+        speech_ratio = speech_frames / frames if frames else 0.0
+        return AudioLevels(
+            rms_dbfs=to_dbfs(mean_square),
+            zero_crossing_rate=zero_crossing_rate,
+            speech_ratio=speech_ratio,
+            clipped_ratio=clipped / sample_count if sample_count else 0.0,
+            is_speech=frames > 0 and speech_ratio >= self.MIN_SPEECH_RATIO
+        )
+
+    def _frame_stats_numpy(self, samples, frame_size, speech_energy):
+        sample_count = len(samples)
+        if not sample_count:
+            return 0.0, 0.0, 0, 0, 0, 0
+
+        # A chunk shorter than one frame is analysed as a single frame
+        frame_size = min(frame_size, sample_count)
+        frames = sample_count // frame_size
+        framed = samples[:frames * frame_size].reshape(frames, frame_size)
+
+        values = framed.astype(np.float32)
+        energies = np.mean(values * values, axis=1)
+        negative = np.signbit(framed)
+        rates = np.count_nonzero(negative[:, 1:] != negative[:, :-1], axis=1) / frame_size
+        speech = (energies >= speech_energy) & (rates <= self.MAX_ZERO_CROSSING_RATE)
+        clipped = np.count_nonzero((samples >= 32767) | (samples <= -32768))
+
+        return (
+            float(energies.mean()), float(rates.mean()), int(np.count_nonzero(speech)),
+            frames, int(clipped), sample_count
+        )
+
+    def _frame_stats_python(self, data, frame_size, speech_energy):
+        view = memoryview(data)
+        samples = view[:len(view) - len(view) % 2].cast('h')
+        sample_count = len(samples)
+        if not sample_count:
+            return 0.0, 0.0, 0, 0, 0, 0
+
+        frame_size = min(frame_size, sample_count)
+        frames = sample_count // frame_size
+        energy_total = 0.0
+        rate_total = 0.0
+        speech_frames = 0
+        for start in range(0, frames * frame_size, frame_size):
+            frame = samples[start:start + frame_size]
+            energy = sum(sample * sample for sample in frame) / frame_size
+            rate = sum(1 for a, b in zip(frame, frame[1:]) if (a < 0) != (b < 0)) / frame_size
+            energy_total += energy
+            rate_total += rate
+            if energy >= speech_energy and rate <= self.MAX_ZERO_CROSSING_RATE:
+                speech_frames += 1
+        clipped = sum(1 for sample in samples if sample >= 32767 or sample <= -32768)
+
+        return energy_total / frames, rate_total / frames, speech_frames, frames, clipped, sample_count
@@ -5,9 +5,10 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
+from .downsampling import LogHistogram
 from .models import (
-    PerformanceMetric, CallBotPerformance, AIProcessingPerformance,
-    SystemAlert, PerformanceThreshold, ConcurrentCallMetrics
+    PerformanceMetric, PerformanceMetricRollup, CallBotPerformance, AIProcessingPerformance,
+    SystemAlert, PerformanceThreshold, ConcurrentCallMetrics, SystemMetricsSnapshot
 )
 
 
@@ -57,6 +58,39 @@ class PerformanceMetricAdmin(admin.ModelAdmin):
         return super().get_queryset(request).select_related('content_type')
 
 
+@admin.register(PerformanceMetricRollup)
+class PerformanceMetricRollupAdmin(admin.ModelAdmin):
+    """Admin for downsampled PerformanceMetricRollup buckets"""
+    
+    list_display = [
+        'bucket_start', 'granularity', 'metric_type', 'metric_name', 'count',
+        'error_count', 'average_display', 'value_max', 'p95_display'
+    ]
+    list_filter = ['granularity', 'metric_type', 'bucket_start']
+    search_fields = ['metric_name', 'metric_type']
+    date_hierarchy = 'bucket_start'
+    ordering = ['-bucket_start']
+    
+    def average_display(self, obj):
+        """Display the mean value of the bucket"""
+        return f"{obj.value_sum / obj.count:.3f}" if obj.count else '-'
+    average_display.short_description = 'Average'
+    
+    def p95_display(self, obj):
+        """Display the estimated 95th percentile of the bucket"""
+        p95 = LogHistogram(obj.histogram).quantile(0.95)
+        return f"{p95:.3f}" if p95 is not None else '-'
+    p95_display.short_description = 'p95'
+    
+    def has_add_permission(self, request):
+        """Rollups are only written by downsampling"""
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        """Make rollups read-only"""
+        return False
+
+
 @admin.register(CallBotPerformance)
 class CallBotPerformanceAdmin(admin.ModelAdmin):
     """Admin for CallBotPerformance model"""
@@ -326,6 +360,27 @@ class ConcurrentCallMetricsAdmin(admin.ModelAdmin):
         return False
 
 
+
+@admin.register(SystemMetricsSnapshot)
+class SystemMetricsSnapshotAdmin(admin.ModelAdmin):
+    """Admin for sampled SystemMetricsSnapshot rows"""
+    
+    list_display = [
+        'timestamp', 'sample_count', 'cpu_percent_avg', 'cpu_percent_max',
+        'memory_percent_avg', 'memory_percent_max', 'disk_percent', 'load_average'
+    ]
+    list_filter = ['timestamp']
+    date_hierarchy = 'timestamp'
+    ordering = ['-timestamp']
+    
+    def has_add_permission(self, request):
+        """Snapshots are only written by the system sampler"""
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        """Make snapshots read-only"""
+        return False
+
 # Custom admin site configuration
 admin.site.site_header = "NIA Performance Monitoring"
 admin.site.site_title = "Performance Admin"
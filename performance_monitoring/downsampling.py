@@ -0,0 +1,340 @@
+"""
+Downsampling of raw performance metrics into minute, hour and day rollups
+
+A periodic task rolls settled raw PerformanceMetric rows into minute
+buckets, then recomputes the hour and day buckets they belong to. Each
+bucket keeps count, error count, sum, min, max and a mergeable log
+histogram for percentiles. Reads cover a window with the coarsest buckets
+that fit and fill in the part not yet downsampled from the raw table, so
+the cost of a summary no longer grows with the size of the raw table.
+"""
+import logging
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from meetings.sync_rollups import GRANULARITIES, bucket_start, cover_range
+from .models import PerformanceMetric, PerformanceMetricRollup
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = {'p50': 0.5, 'p95': 0.95, 'p99': 0.99}
+
+
+class LogHistogram:
+    """
+    Histogram with logarithmic bins, for percentile estimates that merge
+
+    A value v > 0 falls in bin ceil(log(v) / log(gamma)), so every estimate
+    is within RELATIVE_ACCURACY of a value in the data (the DDSketch
+    scheme). Bins of two histograms simply add, which is what lets minute
+    buckets roll up into hours and days without keeping raw samples.
+    """
+
+    RELATIVE_ACCURACY = 0.01
+    ZERO_THRESHOLD = 1e-9
+
+    gamma = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+    log_gamma = math.log(gamma)
+
+    def __init__(self, bins: Optional[Dict[str, int]] = None):
+        self.bins = defaultdict(int, bins or {})
+
+    def add(self, value: float, count: int = 1):
+        self.bins[self._key(value)] += count
+
+    def merge(self, other: 'LogHistogram'):
+        for key, count in other.bins.items():
+            self.bins[key] += count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile (0 to 1); None if the histogram is empty"""
+        total = sum(self.bins.values())
+        if not total:
+            return None
+
+        # Nearest rank: the smallest value with at least q of the data at or below it
+        rank = max(1, math.ceil(q * total))
+        seen = 0
+        for key in sorted(self.bins, key=self._order):
+            seen += self.bins[key]
+            if seen >= rank:
+                return self._value(key)
+        return self._value(max(self.bins, key=self._order))
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(self.bins)
+
+    def _key(self, value: float) -> str:
+        if abs(value) < self.ZERO_THRESHOLD:
+            return 'z'
+        index = math.ceil(math.log(abs(value)) / self.log_gamma)
+        return f"{'p' if value > 0 else 'n'}{index}"
+
+    def _order(self, key: str) -> float:
+        if key == 'z':
+            return 0
+        index = int(key[1:])
+        return index + 1e6 if key[0] == 'p' else -index - 1e6
+
+    def _value(self, key: str) -> float:
+        if key == 'z':
+            return 0.0
+        # Midpoint of the bin (gamma^(i-1), gamma^i] in relative terms
+        value = 2 * self.gamma ** int(key[1:]) / (self.gamma + 1)
+        return value if key[0] == 'p' else -value
+
+
+class MetricStats:
+    """
+    Running count, errors, sum, min, max and histogram of metric values
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.error_count = 0
+        self.value_sum = 0.0
+        self.value_min = None
+        self.value_max = None
+        self.histogram = LogHistogram()
+
+    def add(self, value: float, error: bool = False):
+        self.count += 1
+        self.error_count += error
+        self.value_sum += value
+        self.value_min = value if self.value_min is None else min(self.value_min, value)
+        self.value_max = value if self.value_max is None else max(self.value_max, value)
+        self.histogram.add(value)
+
+    def merge_rollup(self, rollup: PerformanceMetricRollup):
+        self.count += rollup.count
+        self.error_count += rollup.error_count
+        self.value_sum += rollup.value_sum
+        for attr, pick in (('value_min', min), ('value_max', max)):
+            theirs = getattr(rollup, attr)
+            if theirs is not None:
+                ours = getattr(self, attr)
+                setattr(self, attr, theirs if ours is None else pick(ours, theirs))
+        self.histogram.merge(LogHistogram(rollup.histogram))
+
+    def rollup_fields(self) -> Dict:
+        return {
+            'count': self.count,
+            'error_count': self.error_count,
+            'value_sum': self.value_sum,
+            'value_min': self.value_min,
+            'value_max': self.value_max,
+            'histogram': self.histogram.to_dict(),
+        }
+
+    def summary(self) -> Dict:
+        summary = {
+            'count': self.count,
+            'error_count': self.error_count,
+            'error_rate': round(self.error_count / self.count * 100, 2) if self.count else 0,
+            'avg': self.value_sum / self.count if self.count else None,
+            'min': self.value_min,
+            'max': self.value_max,
+        }
+        for label, q in PERCENTILES.items():
+            estimate = self.histogram.quantile(q)
+            # Bin midpoints can fall just outside the observed range
+            if estimate is not None:
+                estimate = min(max(estimate, self.value_min), self.value_max)
+            summary[label] = estimate
+        return summary
+
+
+class MetricRollupService:
+    """
+    Downsample raw metrics and answer range queries from the right tier
+
+    Raw rows are kept for PERFORMANCE_METRICS_RAW_RETENTION_DAYS, minute
+    buckets for MINUTE_RETENTION and hour buckets for HOUR_RETENTION; day
+    buckets are kept forever. Raw rows are only downsampled once
+    SETTLE_DELAY has passed, so buffered metrics still being flushed are
+    not missed.
+    """
+
+    MINUTE_RETENTION = timedelta(days=2)
+    HOUR_RETENTION = timedelta(days=90)
+    SETTLE_DELAY = timedelta(minutes=2)
+
+    def __init__(self):
+        self.raw_retention = timedelta(days=getattr(settings, 'PERFORMANCE_METRICS_RAW_RETENTION_DAYS', 7))
+
+    def get_watermark(self) -> Optional[datetime]:
+        """End of the newest minute bucket; raw rows before it are downsampled"""
+        latest = PerformanceMetricRollup.objects.filter(
+            granularity='minute'
+        ).order_by('-bucket_start').values_list('bucket_start', flat=True).first()
+        return latest + GRANULARITIES['minute'] if latest else None
+
+    def downsample(self, now: Optional[datetime] = None) -> int:
+        """
+        Roll settled raw metrics since the watermark into rollups
+
+        Works a day at a time so a first run over a large table holds one
+        day of buckets in memory. Returns the number of raw rows rolled up.
+        """
+        now = now or timezone.now()
+        cutoff = bucket_start(now - self.SETTLE_DELAY, 'minute')
+
+        start = self.get_watermark()
+        if start is None:
+            first = PerformanceMetric.objects.filter(
+                timestamp__lt=cutoff
+            ).order_by('timestamp').values_list('timestamp', flat=True).first()
+            if first is None:
+                return 0
+            start = bucket_start(first, 'minute')
+
+        downsampled = 0
+        while start < cutoff:
+            end = min(bucket_start(start, 'day') + GRANULARITIES['day'], cutoff)
+            downsampled += self._downsample_window(start, end)
+            start = end
+        return downsampled
+
+    def prune(self, now: Optional[datetime] = None) -> Tuple[int, int]:
+        """
+        Delete raw rows and rollups past their retention
+
+        Raw rows not yet downsampled are kept whatever their age, and so is
+        the newest minute bucket, which marks where downsampling resumes.
+        Returns (raw rows deleted, rollups deleted).
+        """
+        now = now or timezone.now()
+        watermark = self.get_watermark()
+        if watermark is None:
+            return 0, 0
+
+        rollups_deleted, _ = PerformanceMetricRollup.objects.filter(
+            Q(granularity='minute', bucket_start__lt=min(now - self.MINUTE_RETENTION, watermark - GRANULARITIES['minute'])) |
+            Q(granularity='hour', bucket_start__lt=now - self.HOUR_RETENTION)
+        ).delete()
+        raw_deleted, _ = PerformanceMetric.objects.filter(
+            timestamp__lt=min(now - self.raw_retention, watermark)
+        ).delete()
+        return raw_deleted, rollups_deleted
+
+    def get_stats(self, start: datetime, end: datetime, group_by: Optional[str] = None,
+                  metric_type: Optional[str] = None, metric_name: Optional[str] = None) -> Dict[Optional[str], Dict]:
+        """
+        Count, error rate, avg, min, max and p50/p95/p99 of values between start and end
+
+        Returns {None: stats}, or stats per value of group_by ('metric_type'
+        or 'metric_name'). Downsampled time comes from rollups at minute
+        precision, the rest from raw rows: three queries whatever the
+        window.
+        """
+        filters = {}
+        if metric_type is not None:
+            filters['metric_type'] = metric_type
+        if metric_name is not None:
+            filters['metric_name'] = metric_name
+
+        stats = defaultdict(MetricStats)
+        raw_start = start
+        watermark = self.get_watermark()
+        if watermark and start < watermark:
+            segments = cover_range(
+                bucket_start(start, 'minute'), min(watermark, bucket_start(end, 'minute')),
+                self.MINUTE_RETENTION, self.HOUR_RETENTION
+            )
+            if segments:
+                condition = Q()
+                for granularity, segment_start, segment_end in segments:
+                    condition |= Q(granularity=granularity, bucket_start__gte=segment_start, bucket_start__lt=segment_end)
+                for rollup in PerformanceMetricRollup.objects.filter(condition, **filters):
+                    stats[getattr(rollup, group_by) if group_by else None].merge_rollup(rollup)
+                raw_start = max(start, segments[-1][2])
+
+        fields = ['metric_type', 'metric_name', 'status', 'value']
+        key_index = fields.index(group_by) if group_by else None
+        raw = PerformanceMetric.objects.filter(
+            timestamp__gte=raw_start, timestamp__lt=end, **filters
+        ).order_by().values_list(*fields)
+        for row in raw.iterator(chunk_size=5000):
+            stats[row[key_index] if group_by else None].add(row[3], row[2] == 'error')
+
+        if not group_by and None not in stats:
+            return {None: MetricStats().summary()}
+        return {key: value.summary() for key, value in stats.items()}
+
+    def _downsample_window(self, start: datetime, end: datetime) -> int:
+        """Rebuild the minute buckets in [start, end) from raw rows, then the hours and days they belong to"""
+        minutes = defaultdict(MetricStats)
+        rows = PerformanceMetric.objects.filter(timestamp__gte=start, timestamp__lt=end).order_by().values_list(
+            'metric_type', 'metric_name', 'status', 'value', 'timestamp'
+        )
+        for metric_type, metric_name, status, value, timestamp in rows.iterator(chunk_size=5000):
+            minutes[(bucket_start(timestamp, 'minute'), metric_type, metric_name)].add(value, status == 'error')
+
+        if not minutes:
+            return 0
+
+        with transaction.atomic():
+            # Rebuilding rather than incrementing makes a rerun over the same window harmless
+            PerformanceMetricRollup.objects.filter(
+                granularity='minute', bucket_start__gte=start, bucket_start__lt=end
+            ).delete()
+            self._create('minute', minutes)
+
+            hours = {bucket_start(minute, 'hour') for minute, _, _ in minutes}
+            self._roll_up('hour', 'minute', hours)
+            self._roll_up('day', 'hour', {bucket_start(hour, 'day') for hour in hours})
+
+        return sum(stats.count for stats in minutes.values())
+
+    def _roll_up(self, granularity: str, source: str, buckets: Iterable[datetime]):
+        """Recompute buckets of one granularity from the finer buckets inside them"""
+        step = GRANULARITIES[granularity]
+        condition = Q()
+        for start in buckets:
+            condition |= Q(bucket_start__gte=start, bucket_start__lt=start + step)
+
+        merged = defaultdict(MetricStats)
+        for rollup in PerformanceMetricRollup.objects.filter(condition, granularity=source):
+            merged[(bucket_start(rollup.bucket_start, granularity), rollup.metric_type, rollup.metric_name)].merge_rollup(rollup)
+
+        PerformanceMetricRollup.objects.filter(condition, granularity=granularity).delete()
+        self._create(granularity, merged)
+
+    def _create(self, granularity: str, buckets: Dict[Tuple[datetime, str, str], MetricStats]):
+        PerformanceMetricRollup.objects.bulk_create([
+            PerformanceMetricRollup(
+                granularity=granularity,
+                bucket_start=start,
+                metric_type=metric_type,
+                metric_name=metric_name,
+                **stats.rollup_fields()
+            )
+            for (start, metric_type, metric_name), stats in buckets.items()
+        ], batch_size=1000)
+
+
+@shared_task
+def downsample_performance_metrics():
+    """
+    Periodic task to downsample settled raw metrics and prune expired data
+    """
+    try:
+        rollups = MetricRollupService()
+        downsampled = rollups.downsample()
+        raw_deleted, rollups_deleted = rollups.prune()
+        if downsampled or raw_deleted:
+            logger.info(
+                f"Downsampled {downsampled} metrics, pruned {raw_deleted} raw metrics and {rollups_deleted} rollups"
+            )
+        return downsampled
+    except Exception as e:
+        logger.error(f"Error downsampling performance metrics: {str(e)}")
+        return 0
@@ -8,7 +8,7 @@ from datetime import timedelta
 from unittest.mock import patch, MagicMock
 
 from .services import performance_monitor
-from .models import PerformanceMetric, CallBotPerformance
+from .models import PerformanceMetric, CallBotPerformance, SystemMetricsSnapshot
 from meetings.models import Meeting, CallBotSession
 from meetings.call_bot_service import CallBotService
 
@@ -147,36 +147,29 @@ class PerformanceIntegrationTest(TestCase):
     
     def test_system_metrics_collection(self):
         """Test system metrics collection"""
-        with patch('performance_monitoring.services.psutil') as mock_psutil:
+        with patch('performance_monitoring.system_sampler.psutil') as mock_psutil:
             # Mock system metrics
             mock_psutil.cpu_percent.return_value = 45.2
             mock_psutil.virtual_memory.return_value = MagicMock(
                 percent=62.1,
                 available=2048 * 1024 * 1024
             )
-            mock_psutil.disk_usage.return_value = MagicMock(percent=78.5)
+            mock_psutil.disk_usage.return_value = MagicMock(percent=78.5, free=10240 * 1024 * 1024)
             mock_psutil.net_io_counters.return_value = MagicMock(
                 bytes_sent=1024000,
                 bytes_recv=2048000
             )
+            mock_psutil.getloadavg.return_value = (1.5, 1.2, 1.0)
+            mock_psutil.process_iter.return_value = []
             
             # Collect metrics
-            performance_monitor.collect_system_metrics()
+            snapshot = performance_monitor.collect_system_metrics()
             
-            # Verify system metrics were recorded
-            cpu_metrics = PerformanceMetric.objects.filter(
-                metric_type='system_resource',
-                metric_name='cpu_usage'
-            )
-            self.assertEqual(cpu_metrics.count(), 1)
-            self.assertEqual(cpu_metrics.first().value, 45.2)
-            
-            memory_metrics = PerformanceMetric.objects.filter(
-                metric_type='system_resource',
-                metric_name='memory_usage'
-            )
-            self.assertEqual(memory_metrics.count(), 1)
-            self.assertEqual(memory_metrics.first().value, 62.1)
+            # Verify one snapshot was recorded
+            self.assertIsNotNone(snapshot)
+            self.assertEqual(SystemMetricsSnapshot.objects.count(), 1)
+            self.assertEqual(snapshot.cpu_percent_avg, 45.2)
+            self.assertEqual(snapshot.memory_percent_avg, 62.1)
     
     def test_performance_summary_generation(self):
         """Test performance summary generation"""
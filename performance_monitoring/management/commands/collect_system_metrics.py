@@ -33,12 +33,29 @@ class Command(BaseCommand):
             action='store_true',
             help='Run once and exit'
         )
+        
+        parser.add_argument(
+            '--daemon',
+            action='store_true',
+            help='Sample continuously and write one snapshot per interval'
+        )
+        
+        parser.add_argument(
+            '--sample-interval',
+            type=float,
+            default=0.5,
+            help='Seconds between samples in daemon mode, and before the first '
+                 'collection otherwise (default: 0.5)'
+        )
     
     def handle(self, *args, **options):
         interval = options['interval']
         duration = options['duration']
         run_once = options['once']
         
+        if options['daemon']:
+            return self._run_daemon(interval, options['sample_interval'], duration)
+        
         self.stdout.write(
             self.style.SUCCESS(
                 f'Starting system metrics collection (interval: {interval}s)'
@@ -47,13 +64,19 @@ class Command(BaseCommand):
         
         start_time = time.time()
         
+        # The first snapshot's CPU usage is measured from here, so give it a
+        # real interval rather than reading a counter that was just reset
+        performance_monitor.system_sampler.prime()
+        time.sleep(options['sample_interval'])
+        
         try:
             while True:
                 collection_start = time.time()
+                snapshot = None
                 
                 # Collect system metrics
                 try:
-                    performance_monitor.collect_system_metrics()
+                    snapshot = performance_monitor.collect_system_metrics()
                     self.stdout.write(
                         f'[{timezone.now()}] Collected system metrics'
                     )
@@ -77,9 +100,9 @@ class Command(BaseCommand):
                         )
                     )
                 
-                # Check system health and create alerts
+                # Check system health and create alerts from the interval just collected
                 try:
-                    alerting_service.check_system_health()
+                    alerting_service.check_system_health(snapshot)
                     self.stdout.write(
                         f'[{timezone.now()}] Checked system health'
                     )
@@ -122,4 +145,55 @@ class Command(BaseCommand):
         
         self.stdout.write(
             self.style.SUCCESS('System metrics collection completed')
-        )
\ No newline at end of file
+        )
+    
+    def _run_daemon(self, interval, sample_interval, duration):
+        """
+        Sample at sub-second resolution, writing one snapshot per interval
+        
+        Samples are taken on a fixed schedule, so time spent writing does not
+        stretch the interval.
+        """
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Starting system metrics daemon (interval: {interval}s, sampling every {sample_interval}s)'
+            )
+        )
+        
+        sampler = performance_monitor.system_sampler
+        sampler.prime()
+        start_time = time.monotonic()
+        next_sample = start_time + sample_interval
+        next_collection = start_time + interval
+        
+        try:
+            while True:
+                # Each sample covers the time since the previous one, the first since prime()
+                time.sleep(max(0, next_sample - time.monotonic()))
+                sampler.sample()
+                now = time.monotonic()
+                
+                if now >= next_collection:
+                    snapshot = performance_monitor.collect_system_metrics()
+                    performance_monitor.track_concurrent_calls()
+                    alerting_service.check_system_health(snapshot)
+                    if snapshot:
+                        self.stdout.write(
+                            f'[{timezone.now()}] {snapshot.sample_count} samples, '
+                            f'CPU {snapshot.cpu_percent_avg:.1f}% avg {snapshot.cpu_percent_max:.1f}% max'
+                        )
+                    next_collection += interval
+                
+                if duration > 0 and now - start_time >= duration:
+                    break
+                
+                next_sample += sample_interval
+                
+        except KeyboardInterrupt:
+            self.stdout.write(
+                self.style.WARNING('Metrics daemon interrupted by user')
+            )
+        
+        self.stdout.write(
+            self.style.SUCCESS('System metrics daemon stopped')
+        )
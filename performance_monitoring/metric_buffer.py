@@ -0,0 +1,147 @@
+"""
+In-process buffering of performance metrics
+
+Measurements are queued in a bounded ring buffer and written with
+bulk_create by a background thread, once enough have queued or a flush
+interval has passed, so recording a metric costs no database round trip on
+the measured code path. Whatever is still queued is flushed at process exit.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Tuple
+
+from django.db import close_old_connections
+
+from .models import PerformanceThreshold
+
+logger = logging.getLogger(__name__)
+
+
+class ThresholdCache:
+    """
+    Active PerformanceThreshold rows held in memory, keyed by metric
+
+    Rows are reloaded after ttl seconds, or as soon as a threshold is saved
+    or deleted in this process (see invalidate).
+    """
+
+    generation = 0  # Bumped by invalidate; every cache reloads when it changes
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._thresholds: Dict[Tuple[str, str], List[PerformanceThreshold]] = {}
+        self._loaded_at = None
+        self._loaded_generation = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def invalidate(cls):
+        """Make every cache reload its thresholds on next use"""
+        cls.generation += 1
+
+    def get(self, metric_type: str, metric_name: str) -> List[PerformanceThreshold]:
+        """Active thresholds for one metric"""
+        with self._lock:
+            if self._is_stale():
+                self._load()
+            return self._thresholds.get((metric_type, metric_name), [])
+
+    def _is_stale(self) -> bool:
+        return (
+            self._loaded_at is None
+            or self._loaded_generation != self.generation
+            or time.monotonic() - self._loaded_at > self.ttl
+        )
+
+    def _load(self):
+        generation = self.generation
+        thresholds = {}
+        for threshold in PerformanceThreshold.objects.filter(is_active=True):
+            thresholds.setdefault((threshold.metric_type, threshold.metric_name), []).append(threshold)
+        self._thresholds = thresholds
+        self._loaded_at = time.monotonic()
+        self._loaded_generation = generation
+
+
+class MetricBuffer:
+    """
+    Bounded queue of pending metrics, drained in batches by a writer
+
+    The writer receives a list of queued items and persists them. When the
+    buffer is full the oldest items are dropped (and counted in dropped)
+    rather than blocking the code being measured.
+    """
+
+    def __init__(self, writer: Callable[[list], None], capacity: int = 10000,
+                 flush_size: int = 500, flush_interval: float = 5.0):
+        self.writer = writer
+        self.capacity = capacity
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._reset()
+
+    def _reset(self):
+        self._items = deque(maxlen=self.capacity)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # One flush at a time, so batches are written in order
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = os.getpid()
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, item):
+        """Queue one item, waking the flush thread if a batch is ready"""
+        if self._pid != os.getpid():
+            # Forked child: the flush thread did not survive the fork, and the parent flushes what it had queued
+            self._reset()
+
+        with self._lock:
+            if len(self._items) == self.capacity:
+                self.dropped += 1
+            self._items.append(item)
+            ready = len(self._items) >= self.flush_size
+
+        self._ensure_thread()
+        if ready:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of items written"""
+        with self._flush_lock:
+            with self._lock:
+                items = list(self._items)
+                self._items.clear()
+            if not items:
+                return 0
+
+            try:
+                self.writer(items)
+            except Exception as e:
+                logger.error(f"Error flushing {len(items)} buffered metrics: {str(e)}")
+                return 0
+            return len(items)
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='metric-buffer-flush', daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+            # This thread outlives any request, so drop its connection if it is broken or past CONN_MAX_AGE
+            close_old_connections()
@@ -0,0 +1,31 @@
+"""
+Request timing middleware for Prometheus metrics
+"""
+import time
+
+from .prometheus_metrics import API_REQUEST_DURATION
+
+
+class PrometheusMetricsMiddleware:
+    """
+    Middleware to observe the latency of every request, labelled by view
+
+    Place it first in MIDDLEWARE so the time spent in other middleware is
+    included. Requests matching no URL are labelled '<unresolved>', which
+    keeps label values bounded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        view = resolver_match.view_name if resolver_match else '<unresolved>'
+        API_REQUEST_DURATION.labels(
+            view=view, method=request.method, status=response.status_code
+        ).observe(time.perf_counter() - start)
+
+        return response
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('performance_monitoring', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PerformanceMetricRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('minute', 'Minute'), ('hour', 'Hour'), ('day', 'Day')], max_length=10)),
+                ('bucket_start', models.DateTimeField()),
+                ('metric_type', models.CharField(max_length=50)),
+                ('metric_name', models.CharField(max_length=200)),
+                ('count', models.IntegerField(default=0)),
+                ('error_count', models.IntegerField(default=0)),
+                ('value_sum', models.FloatField(default=0)),
+                ('value_min', models.FloatField(blank=True, null=True)),
+                ('value_max', models.FloatField(blank=True, null=True)),
+                ('histogram', models.JSONField(default=dict)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['granularity', 'metric_type', 'bucket_start'], name='performance_granula_c4e5c5_idx')],
+                'unique_together': {('granularity', 'bucket_start', 'metric_type', 'metric_name')},
+            },
+        ),
+    ]
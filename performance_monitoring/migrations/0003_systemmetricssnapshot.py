@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:39
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('performance_monitoring', '0002_performancemetricrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SystemMetricsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('interval_seconds', models.FloatField()),
+                ('sample_count', models.IntegerField(default=0)),
+                ('cpu_percent_avg', models.FloatField()),
+                ('cpu_percent_max', models.FloatField()),
+                ('memory_percent_avg', models.FloatField()),
+                ('memory_percent_max', models.FloatField()),
+                ('memory_available_mb', models.FloatField()),
+                ('disk_percent', models.FloatField()),
+                ('disk_free_mb', models.FloatField()),
+                ('network_bytes_sent', models.BigIntegerField(default=0, help_text='Bytes sent during the interval')),
+                ('network_bytes_recv', models.BigIntegerField(default=0, help_text='Bytes received during the interval')),
+                ('load_average', models.FloatField(blank=True, null=True)),
+                ('processes', models.JSONField(default=dict)),
+            ],
+            options={
+                'ordering': ['-timestamp'],
+            },
+        ),
+    ]
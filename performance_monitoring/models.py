@@ -69,6 +69,38 @@ class PerformanceMetric(models.Model):
         return None
 
 
+class PerformanceMetricRollup(models.Model):
+    """
+    PerformanceMetric values downsampled per time bucket and metric
+    """
+    GRANULARITY_CHOICES = [
+        ('minute', 'Minute'),
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+    ]
+    
+    granularity = models.CharField(max_length=10, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField()
+    metric_type = models.CharField(max_length=50)
+    metric_name = models.CharField(max_length=200)
+    
+    count = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    value_sum = models.FloatField(default=0)
+    value_min = models.FloatField(null=True, blank=True)
+    value_max = models.FloatField(null=True, blank=True)
+    histogram = models.JSONField(default=dict)  # LogHistogram bins, merged across buckets for percentiles
+    
+    class Meta:
+        unique_together = ['granularity', 'bucket_start', 'metric_type', 'metric_name']
+        indexes = [
+            models.Index(fields=['granularity', 'metric_type', 'bucket_start']),
+        ]
+    
+    def __str__(self):
+        return f"{self.granularity} rollup {self.bucket_start} {self.metric_type}.{self.metric_name}"
+
+
 class CallBotPerformance(models.Model):
     """
     Specific performance tracking for call bot sessions
@@ -349,4 +381,33 @@ class ConcurrentCallMetrics(models.Model):
         ordering = ['-timestamp']
     
     def __str__(self):
-        return f"Concurrent calls: {self.active_calls} at {self.timestamp}"
\ No newline at end of file
+        return f"Concurrent calls: {self.active_calls} at {self.timestamp}"
+
+class SystemMetricsSnapshot(models.Model):
+    """
+    Host and worker process resource usage sampled over one collection interval
+    """
+    timestamp = models.DateTimeField(default=timezone.now, db_index=True)
+    interval_seconds = models.FloatField()
+    sample_count = models.IntegerField(default=0)
+    
+    # Host metrics
+    cpu_percent_avg = models.FloatField()
+    cpu_percent_max = models.FloatField()
+    memory_percent_avg = models.FloatField()
+    memory_percent_max = models.FloatField()
+    memory_available_mb = models.FloatField()
+    disk_percent = models.FloatField()
+    disk_free_mb = models.FloatField()
+    network_bytes_sent = models.BigIntegerField(default=0, help_text="Bytes sent during the interval")
+    network_bytes_recv = models.BigIntegerField(default=0, help_text="Bytes received during the interval")
+    load_average = models.FloatField(null=True, blank=True)
+    
+    # Per worker group (gunicorn, daphne, celery): process count, CPU and RSS averages and peaks
+    processes = models.JSONField(default=dict)
+    
+    class Meta:
+        ordering = ['-timestamp']
+    
+    def __str__(self):
+        return f"System metrics at {self.timestamp}: CPU {self.cpu_percent_avg:.1f}%"
@@ -0,0 +1,95 @@
+"""
+In-process Prometheus metrics for high-frequency signals
+
+API, CRM and AI call latencies, WebSocket message counts, transcription
+queue depths and skipped silence are kept in memory by prometheus_client instead of being
+written to PerformanceMetric rows, and exposed in the Prometheus text or
+OpenMetrics format by metrics_view.
+
+Under gunicorn, set PROMETHEUS_MULTIPROC_DIR to an empty directory before
+the workers start: every process then writes its samples to files there
+and a scrape of any worker aggregates all of them (see gunicorn.conf.py).
+"""
+import os
+from typing import Tuple
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+from prometheus_client.exposition import choose_encoder
+
+# Outbound calls are slower than our own views, so their buckets reach further
+CALL_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+API_REQUEST_DURATION = Histogram(
+    'api_request_duration_seconds',
+    'Time to handle an HTTP request, per view',
+    ['view', 'method', 'status']
+)
+
+CRM_REQUEST_DURATION = Histogram(
+    'crm_request_duration_seconds',
+    'Time for one HTTP request to a CRM API, per CRM system',
+    ['crm_system', 'method', 'status'],
+    buckets=CALL_BUCKETS
+)
+
+AI_REQUEST_DURATION = Histogram(
+    'ai_request_duration_seconds',
+    'Time for one generation call to the AI model',
+    ['operation', 'outcome'],
+    buckets=CALL_BUCKETS
+)
+
+WEBSOCKET_MESSAGES = Counter(
+    'websocket_messages',
+    'WebSocket messages received from and sent to clients',
+    ['consumer', 'direction']
+)
+
+TRANSCRIPTION_QUEUE_DEPTH = Gauge(
+    'transcription_audio_queue_depth',
+    'Audio chunks waiting to be transcribed, across all sessions',
+    multiprocess_mode='livesum'
+)
+
+TRANSCRIPTION_ACTIVE_SESSIONS = Gauge(
+    'transcription_active_sessions',
+    'Transcription sessions with an audio queue',
+    multiprocess_mode='livesum'
+)
+
+TRANSCRIPTION_DROPPED_CHUNKS = Counter(
+    'transcription_audio_chunks_dropped',
+    'Audio chunks dropped because their session queue was full'
+)
+
+TRANSCRIPTION_SKIPPED_AUDIO = Counter(
+    'transcription_skipped_audio_seconds',
+    'Audio without speech that was not sent to the transcription engine'
+)
+
+
+def is_multiprocess() -> bool:
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+def render_metrics(accept: str = '') -> Tuple[bytes, str]:
+    """
+    Current metrics as (body, content type)
+
+    OpenMetrics is returned when the Accept header asks for it, the
+    Prometheus text format otherwise.
+    """
+    registry = REGISTRY
+    if is_multiprocess():
+        # Samples from every worker, read from the shared directory
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+
+    encoder, content_type = choose_encoder(accept)
+    return encoder(registry), content_type
+
+
+def mark_process_dead(pid: int):
+    """Drop the live gauges of a worker that has exited"""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(pid)
@@ -7,16 +7,20 @@ import psutil
 import threading
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
+from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
 from django.core.cache import cache
-from django.db.models import Avg, Count, Max, Min
+from django.db.models import Avg, Count, Max, Q
 from contextlib import contextmanager
 
+from .downsampling import MetricRollupService, MetricStats
+from .metric_buffer import MetricBuffer, ThresholdCache
 from .models import (
     PerformanceMetric, CallBotPerformance, AIProcessingPerformance,
-    SystemAlert, PerformanceThreshold, ConcurrentCallMetrics
+    SystemAlert, PerformanceThreshold, ConcurrentCallMetrics, SystemMetricsSnapshot
 )
+from .system_sampler import SystemSampler
 from meetings.models import CallBotSession, DraftSummary
 
 logger = logging.getLogger(__name__)
@@ -27,10 +31,21 @@ class PerformanceMonitoringService:
     Main service for collecting and analyzing performance metrics
     """
     
-    def __init__(self):
+    def __init__(self, buffered: bool = None):
         self.cache = cache
         self._active_sessions = {}
         self._lock = threading.Lock()
+        
+        self.buffered = getattr(settings, 'PERFORMANCE_METRICS_BUFFERED', True) if buffered is None else buffered
+        self.rollups = MetricRollupService()
+        self._system_sampler = None
+        self.thresholds = ThresholdCache(ttl=getattr(settings, 'PERFORMANCE_THRESHOLD_CACHE_TTL', 60))
+        self.metric_buffer = MetricBuffer(
+            self._write_metrics,
+            capacity=getattr(settings, 'PERFORMANCE_METRICS_BUFFER_CAPACITY', 10000),
+            flush_size=getattr(settings, 'PERFORMANCE_METRICS_FLUSH_SIZE', 500),
+            flush_interval=getattr(settings, 'PERFORMANCE_METRICS_FLUSH_INTERVAL', 5.0)
+        )
     
     @contextmanager
     def track_performance(self, metric_type: str, metric_name: str, 
@@ -74,9 +89,14 @@ class PerformanceMonitoringService:
                      error_message: str = "", start_time=None, end_time=None):
         """
         Record a performance metric
+        
+        When buffered, the metric is queued and written in a batch by a
+        background thread, and the returned metric is not yet saved.
+        Thresholds are checked in memory either way; alerts for violations
+        are created when the metric is written.
         """
         try:
-            metric = PerformanceMetric.objects.create(
+            metric = PerformanceMetric(
                 metric_type=metric_type,
                 metric_name=metric_name,
                 value=value,
@@ -88,9 +108,12 @@ class PerformanceMonitoringService:
                 start_time=start_time,
                 end_time=end_time
             )
+            violations = self._check_thresholds(metric)
             
-            # Check thresholds and create alerts if needed
-            self._check_thresholds(metric)
+            if self.buffered:
+                self.metric_buffer.add((metric, violations))
+            else:
+                self._write_metrics([(metric, violations)])
             
             logger.debug(f"Recorded metric: {metric_name} = {value} {unit}")
             return metric
@@ -99,6 +122,25 @@ class PerformanceMonitoringService:
             logger.error(f"Error recording metric {metric_name}: {str(e)}")
             return None
     
+    def flush_metrics(self) -> int:
+        """
+        Write buffered metrics now; returns the number written
+        """
+        return self.metric_buffer.flush()
+    
+    def _write_metrics(self, entries: List[tuple]):
+        """
+        Save (metric, violations) entries with one bulk insert, then raise their alerts
+        """
+        PerformanceMetric.objects.bulk_create(
+            [metric for metric, _ in entries],
+            batch_size=self.metric_buffer.flush_size
+        )
+        
+        for metric, violations in entries:
+            for threshold, severity in violations:
+                self._create_alert(metric, threshold, severity)
+    
     def track_call_bot_performance(self, call_bot_session: CallBotSession,
                                   connection_time: float, connection_attempts: int = 1,
                                   connection_success: bool = True):
@@ -223,65 +265,29 @@ class PerformanceMonitoringService:
             logger.error(f"Error tracking AI processing: {str(e)}")
             return None
     
-    def collect_system_metrics(self):
+    @property
+    def system_sampler(self) -> SystemSampler:
+        """Sampler shared by every collection from this service"""
+        if self._system_sampler is None:
+            self._system_sampler = SystemSampler()
+        return self._system_sampler
+    
+    def collect_system_metrics(self) -> Optional[SystemMetricsSnapshot]:
         """
-        Collect current system resource metrics
+        Save system resource usage since the last collection as one snapshot row
+        
+        Does not block: CPU usage is measured between samples rather than
+        by sleeping. A sampling daemon calls system_sampler.sample() between
+        collections; otherwise one sample is taken now.
         """
         try:
-            # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
-            self.record_metric(
-                metric_type='system_resource',
-                metric_name='cpu_usage',
-                value=cpu_percent,
-                unit='percent'
-            )
-            
-            # Memory usage
-            memory = psutil.virtual_memory()
-            self.record_metric(
-                metric_type='system_resource',
-                metric_name='memory_usage',
-                value=memory.percent,
-                unit='percent'
-            )
-            
-            self.record_metric(
-                metric_type='system_resource',
-                metric_name='memory_available',
-                value=memory.available / (1024 * 1024),  # MB
-                unit='MB'
-            )
-            
-            # Disk usage
-            disk = psutil.disk_usage('/')
-            self.record_metric(
-                metric_type='system_resource',
-                metric_name='disk_usage',
-                value=disk.percent,
-                unit='percent'
-            )
-            
-            # Network I/O
-            network = psutil.net_io_counters()
-            self.record_metric(
-                metric_type='system_resource',
-                metric_name='network_bytes_sent',
-                value=network.bytes_sent,
-                unit='bytes'
-            )
-            
-            self.record_metric(
-                metric_type='system_resource',
-                metric_name='network_bytes_recv',
-                value=network.bytes_recv,
-                unit='bytes'
-            )
-            
+            snapshot = SystemMetricsSnapshot.objects.create(**self.system_sampler.snapshot())
             logger.debug("Collected system metrics")
+            return snapshot
             
         except Exception as e:
             logger.error(f"Error collecting system metrics: {str(e)}")
+            return None
     
     def track_concurrent_calls(self):
         """
@@ -289,28 +295,19 @@ class PerformanceMonitoringService:
         """
         try:
             # Get active call bot sessions
-            active_sessions = CallBotSession.objects.filter(
+            # Session count and performance averages in one query
+            aggregates = CallBotSession.objects.filter(
                 connection_status__in=['connecting', 'connected', 'transcribing']
+            ).aggregate(
+                active_count=Count('id'),
+                avg_connection_time=Avg('performance_metrics__connection_time'),
+                avg_cpu=Avg('performance_metrics__cpu_usage_avg'),
+                avg_memory=Avg('performance_metrics__memory_usage_avg')
             )
-            
-            active_count = active_sessions.count()
-            
-            # Get performance metrics for active sessions
-            performances = CallBotPerformance.objects.filter(
-                call_bot_session__in=active_sessions
-            )
-            
-            avg_connection_time = performances.aggregate(
-                avg=Avg('connection_time')
-            )['avg']
-            
-            avg_cpu = performances.aggregate(
-                avg=Avg('cpu_usage_avg')
-            )['avg']
-            
-            avg_memory = performances.aggregate(
-                avg=Avg('memory_usage_avg')
-            )['avg']
+            active_count = aggregates['active_count']
+            avg_connection_time = aggregates['avg_connection_time']
+            avg_cpu = aggregates['avg_cpu']
+            avg_memory = aggregates['avg_memory']
             
             # System metrics
             system_load = psutil.getloadavg()[0] if hasattr(psutil, 'getloadavg') else None
@@ -343,24 +340,21 @@ class PerformanceMonitoringService:
             logger.error(f"Error tracking concurrent calls: {str(e)}")
             return None
     
-    def _check_thresholds(self, metric: PerformanceMetric):
+    def _check_thresholds(self, metric: PerformanceMetric) -> List[tuple]:
         """
-        Check if metric exceeds configured thresholds and create alerts
+        Check a metric against the cached thresholds, returning (threshold, severity) violations
         """
         try:
-            thresholds = PerformanceThreshold.objects.filter(
-                metric_type=metric.metric_type,
-                metric_name=metric.metric_name,
-                is_active=True
-            )
-            
-            for threshold in thresholds:
+            violations = []
+            for threshold in self.thresholds.get(metric.metric_type, metric.metric_name):
                 severity = self._evaluate_threshold(metric.value, threshold)
                 if severity:
-                    self._create_alert(metric, threshold, severity)
+                    violations.append((threshold, severity))
+            return violations
                     
         except Exception as e:
             logger.error(f"Error checking thresholds: {str(e)}")
+            return []
     
     def _evaluate_threshold(self, value: float, threshold: PerformanceThreshold) -> Optional[str]:
         """
@@ -420,44 +414,44 @@ class PerformanceMonitoringService:
     def get_performance_summary(self, hours: int = 24) -> Dict[str, Any]:
         """
         Get performance summary for the last N hours
+        
+        Metric statistics come from the rollup tiers covering the window
+        plus the raw metrics not yet downsampled.
         """
         try:
-            since = timezone.now() - timedelta(hours=hours)
+            now = timezone.now()
+            since = now - timedelta(hours=hours)
             
-            # Overall metrics
-            total_metrics = PerformanceMetric.objects.filter(timestamp__gte=since).count()
-            error_metrics = PerformanceMetric.objects.filter(
-                timestamp__gte=since, status='error'
-            ).count()
+            stats = self.rollups.get_stats(since, now, group_by='metric_type')
+            total_metrics = sum(type_stats['count'] for type_stats in stats.values())
+            error_metrics = sum(type_stats['error_count'] for type_stats in stats.values())
             
             error_rate = (error_metrics / total_metrics * 100) if total_metrics > 0 else 0
             
             # Call bot performance
-            call_bot_metrics = PerformanceMetric.objects.filter(
-                timestamp__gte=since,
-                metric_type='call_bot_session'
-            ).aggregate(
-                avg_connection_time=Avg('value'),
-                max_connection_time=Max('value'),
-                min_connection_time=Min('value'),
-                total_sessions=Count('id')
-            )
+            call_bot_stats = stats.get('call_bot_session') or MetricStats().summary()
+            call_bot_metrics = {
+                'avg_connection_time': call_bot_stats['avg'],
+                'max_connection_time': call_bot_stats['max'],
+                'min_connection_time': call_bot_stats['min'],
+                'p95_connection_time': call_bot_stats['p95'],
+                'total_sessions': call_bot_stats['count']
+            }
             
             # AI processing performance
-            ai_metrics = PerformanceMetric.objects.filter(
-                timestamp__gte=since,
-                metric_type='ai_processing'
-            ).aggregate(
-                avg_processing_time=Avg('value'),
-                max_processing_time=Max('value'),
-                total_operations=Count('id')
-            )
+            ai_stats = stats.get('ai_processing') or MetricStats().summary()
+            ai_metrics = {
+                'avg_processing_time': ai_stats['avg'],
+                'max_processing_time': ai_stats['max'],
+                'p95_processing_time': ai_stats['p95'],
+                'total_operations': ai_stats['count']
+            }
             
             # Active alerts
-            active_alerts = SystemAlert.objects.filter(is_active=True).count()
-            critical_alerts = SystemAlert.objects.filter(
-                is_active=True, severity='critical'
-            ).count()
+            alerts = SystemAlert.objects.filter(is_active=True).aggregate(
+                active=Count('id'),
+                critical=Count('id', filter=Q(severity='critical'))
+            )
             
             # Concurrent calls
             max_concurrent = ConcurrentCallMetrics.objects.filter(
@@ -470,10 +464,10 @@ class PerformanceMonitoringService:
                 'error_rate': round(error_rate, 2),
                 'call_bot_performance': call_bot_metrics,
                 'ai_performance': ai_metrics,
-                'active_alerts': active_alerts,
-                'critical_alerts': critical_alerts,
+                'active_alerts': alerts['active'],
+                'critical_alerts': alerts['critical'],
                 'max_concurrent_calls': max_concurrent,
-                'generated_at': timezone.now().isoformat()
+                'generated_at': now.isoformat()
             }
             
         except Exception as e:
@@ -513,16 +507,19 @@ class AlertingService:
             logger.error(f"Error creating alert: {str(e)}")
             return None
     
-    def check_system_health(self):
+    def check_system_health(self, snapshot: SystemMetricsSnapshot = None):
         """
         Perform system health checks and create alerts if needed
+        
+        Resource usage is judged from the snapshot's interval averages when
+        one is given, otherwise from a reading taken now.
         """
         try:
             # Check high error rates
             self._check_error_rates()
             
             # Check resource usage
-            self._check_resource_usage()
+            self._check_resource_usage(snapshot)
             
             # Check concurrent call capacity
             self._check_concurrent_capacity()
@@ -537,12 +534,10 @@ class AlertingService:
         """
         Check for high error rates in the last hour
         """
-        since = timezone.now() - timedelta(hours=1)
-        
-        total_metrics = PerformanceMetric.objects.filter(timestamp__gte=since).count()
-        error_metrics = PerformanceMetric.objects.filter(
-            timestamp__gte=since, status='error'
-        ).count()
+        now = timezone.now()
+        stats = self.monitoring_service.rollups.get_stats(now - timedelta(hours=1), now)[None]
+        total_metrics = stats['count']
+        error_metrics = stats['error_count']
         
         if total_metrics > 0:
             error_rate = (error_metrics / total_metrics) * 100
@@ -559,14 +554,26 @@ class AlertingService:
                     current_value=error_rate
                 )
     
-    def _check_resource_usage(self):
+    def _check_resource_usage(self, snapshot: SystemMetricsSnapshot = None):
         """
         Check system resource usage
         """
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
+            if snapshot:
+                cpu_percent = snapshot.cpu_percent_avg
+                memory_percent = snapshot.memory_percent_avg
+                memory_available_gb = snapshot.memory_available_mb / 1024
+                disk_percent = snapshot.disk_percent
+                disk_free_gb = snapshot.disk_free_mb / 1024
+            else:
+                # Usage since the previous reading in this process; never sleeps
+                cpu_percent = psutil.cpu_percent(interval=None)
+                memory = psutil.virtual_memory()
+                disk = psutil.disk_usage('/')
+                memory_percent = memory.percent
+                memory_available_gb = memory.available / (1024**3)
+                disk_percent = disk.percent
+                disk_free_gb = disk.free / (1024**3)
             
             # CPU usage alert
             if cpu_percent > 90:
@@ -581,27 +588,27 @@ class AlertingService:
                 )
             
             # Memory usage alert
-            if memory.percent > 85:
+            if memory_percent > 85:
                 self.create_alert(
                     alert_type='resource_exhaustion',
-                    severity='error' if memory.percent > 95 else 'warning',
-                    title=f"High memory usage: {memory.percent}%",
-                    description=f"Memory usage is at {memory.percent}%, available: {memory.available / (1024**3):.1f}GB",
+                    severity='error' if memory_percent > 95 else 'warning',
+                    title=f"High memory usage: {memory_percent}%",
+                    description=f"Memory usage is at {memory_percent}%, available: {memory_available_gb:.1f}GB",
                     component='memory',
                     metric_threshold=85.0,
-                    current_value=memory.percent
+                    current_value=memory_percent
                 )
             
             # Disk usage alert
-            if disk.percent > 90:
+            if disk_percent > 90:
                 self.create_alert(
                     alert_type='resource_exhaustion',
-                    severity='critical' if disk.percent > 95 else 'error',
-                    title=f"High disk usage: {disk.percent}%",
-                    description=f"Disk usage is at {disk.percent}%, free space: {disk.free / (1024**3):.1f}GB",
+                    severity='critical' if disk_percent > 95 else 'error',
+                    title=f"High disk usage: {disk_percent}%",
+                    description=f"Disk usage is at {disk_percent}%, free space: {disk_free_gb:.1f}GB",
                     component='disk',
                     metric_threshold=90.0,
-                    current_value=disk.percent
+                    current_value=disk_percent
                 )
                 
         except Exception as e:
@@ -7,6 +7,8 @@ from django.dispatch import receiver
 from django.utils import timezone
 
 from meetings.models import CallBotSession, DraftSummary
+from .metric_buffer import ThresholdCache
+from .models import PerformanceThreshold
 from .services import performance_monitor
 
 logger = logging.getLogger(__name__)
@@ -87,4 +89,11 @@ def update_call_bot_performance_on_status_change(sender, instance, created, **kw
                     logger.warning(f"No performance record found for call bot session {instance.id}")
                     
         except Exception as e:
-            logger.error(f"Error updating call bot performance: {str(e)}")
\ No newline at end of file
+            logger.error(f"Error updating call bot performance: {str(e)}")
+
+
+@receiver(post_save, sender=PerformanceThreshold)
+@receiver(post_delete, sender=PerformanceThreshold)
+def invalidate_threshold_cache(sender, instance, **kwargs):
+    """Reload cached thresholds so a change applies to the next metric recorded"""
+    ThresholdCache.invalidate()
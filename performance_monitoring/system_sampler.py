@@ -0,0 +1,147 @@
+"""
+Non-blocking sampling of system and worker process resource usage
+
+psutil.cpu_percent(interval=1) sleeps for a second to measure CPU. Called
+with interval=None it returns the usage since the previous call instead,
+so sampling every fraction of a second costs no waiting. Samples build up
+over a collection interval and are reduced to one SystemMetricsSnapshot
+row: averages and peaks for the host, and per worker group (gunicorn,
+daphne, celery) process counts, CPU and resident memory.
+"""
+import os
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import psutil
+
+WORKER_GROUPS = ('gunicorn', 'daphne', 'celery')
+
+
+def classify_process(cmdline: List[str]) -> Optional[str]:
+    """The worker group a command line belongs to, or None"""
+    # The program, or the module run by python -m, is within the first few arguments
+    for part in cmdline[:4]:
+        name = os.path.basename(part)
+        for group in WORKER_GROUPS:
+            if name.startswith(group):
+                return group
+    return None
+
+
+class SystemSampler:
+    """
+    Accumulate resource samples over a collection interval
+
+    sample() never blocks; snapshot() reduces the samples taken since the
+    previous snapshot to the fields of a SystemMetricsSnapshot row.
+    """
+
+    def __init__(self):
+        self._groups: Dict[int, Optional[str]] = {}  # Worker group per pid, classified once
+        self._network = psutil.net_io_counters()
+        # Prime the counters: the first non-blocking reading is measured from here
+        psutil.cpu_percent(interval=None)
+        self._reset_window()
+
+    def prime(self):
+        """
+        Start a new window from now
+
+        Resets the host and worker process CPU counters, so the next sample
+        measures usage since this call rather than since an earlier reading.
+        """
+        psutil.cpu_percent(interval=None)
+        for _ in self._sample_processes():
+            pass
+        self._reset_window()
+
+    def _reset_window(self):
+        self._window_start = time.monotonic()
+        self._cpu = []
+        self._memory = []
+        self._memory_available = None
+        self._process_samples = defaultdict(list)  # group -> [(processes, cpu percent, rss bytes)]
+
+    @property
+    def sample_count(self) -> int:
+        return len(self._cpu)
+
+    def sample(self):
+        """Take one sample of host and worker process usage"""
+        self._cpu.append(psutil.cpu_percent(interval=None))
+        memory = psutil.virtual_memory()
+        self._memory.append(memory.percent)
+        self._memory_available = memory.available
+
+        totals = defaultdict(lambda: [0, 0.0, 0])
+        for group, cpu_percent, rss in self._sample_processes():
+            group_totals = totals[group]
+            group_totals[0] += 1
+            group_totals[1] += cpu_percent
+            group_totals[2] += rss
+        for group, (processes, cpu_percent, rss) in totals.items():
+            self._process_samples[group].append((processes, cpu_percent, rss))
+
+    def snapshot(self) -> Dict:
+        """
+        Reduce the samples since the last snapshot to SystemMetricsSnapshot fields
+
+        Takes a sample first if none has been taken, and starts a new window.
+        """
+        if not self.sample_count:
+            self.sample()
+
+        disk = psutil.disk_usage('/')
+        network = psutil.net_io_counters()
+        snapshot = {
+            'interval_seconds': round(time.monotonic() - self._window_start, 3),
+            'sample_count': self.sample_count,
+            'cpu_percent_avg': sum(self._cpu) / len(self._cpu),
+            'cpu_percent_max': max(self._cpu),
+            'memory_percent_avg': sum(self._memory) / len(self._memory),
+            'memory_percent_max': max(self._memory),
+            'memory_available_mb': self._memory_available / (1024 * 1024),
+            'disk_percent': disk.percent,
+            'disk_free_mb': disk.free / (1024 * 1024),
+            # Counters are cumulative; the interval's traffic is the difference
+            'network_bytes_sent': max(0, network.bytes_sent - self._network.bytes_sent),
+            'network_bytes_recv': max(0, network.bytes_recv - self._network.bytes_recv),
+            'load_average': psutil.getloadavg()[0] if hasattr(psutil, 'getloadavg') else None,
+            'processes': {
+                group: self._summarize_group(samples)
+                for group, samples in self._process_samples.items()
+            },
+        }
+        self._network = network
+        self._reset_window()
+        return snapshot
+
+    def _sample_processes(self):
+        """Yield (group, cpu percent, rss bytes) for every worker process"""
+        live = set()
+        # process_iter reuses its Process objects, so cpu_percent(None) measures since this pid's last sample
+        for process in psutil.process_iter():
+            pid = process.pid
+            live.add(pid)
+            try:
+                if pid not in self._groups:
+                    self._groups[pid] = classify_process(process.cmdline())
+                group = self._groups[pid]
+                if group is None:
+                    continue
+                yield group, process.cpu_percent(interval=None), process.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+
+        for pid in set(self._groups) - live:
+            del self._groups[pid]
+
+    def _summarize_group(self, samples) -> Dict:
+        return {
+            'processes': max(processes for processes, _, _ in samples),
+            'cpu_percent_avg': round(sum(cpu for _, cpu, _ in samples) / len(samples), 2),
+            'cpu_percent_max': round(max(cpu for _, cpu, _ in samples), 2),
+            'rss_mb_avg': round(sum(rss for _, _, rss in samples) / len(samples) / (1024 * 1024), 2),
+            'rss_mb_max': round(max(rss for _, _, rss in samples) / (1024 * 1024), 2),
+        }
@@ -1,20 +1,29 @@
 """
 Performance monitoring tests
 """
+import asyncio
 import time
 import threading
+from io import StringIO
 from unittest.mock import patch, MagicMock
+from prometheus_client import REGISTRY
+from django.core.management import call_command
 from django.test import TestCase, override_settings
 from django.test.utils import override_settings
+from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
 
 from .models import (
-    PerformanceMetric, CallBotPerformance, AIProcessingPerformance,
-    SystemAlert, PerformanceThreshold, ConcurrentCallMetrics
+    PerformanceMetric, PerformanceMetricRollup, CallBotPerformance, AIProcessingPerformance,
+    SystemAlert, PerformanceThreshold, ConcurrentCallMetrics, SystemMetricsSnapshot
 )
+from .downsampling import LogHistogram, MetricRollupService
+from .metric_buffer import MetricBuffer
 from .services import PerformanceMonitoringService, AlertingService
+from .system_sampler import SystemSampler, classify_process
 from meetings.models import Meeting, CallBotSession
+from meetings.transcription_service import TranscriptionService
 
 
 # Disable signal handlers during tests
@@ -241,7 +250,7 @@ class PerformanceMonitoringServiceTest(BasePerformanceTestCase):
         expected_rate = 1000 / 4.2  # input_size / processing_time
         self.assertAlmostEqual(ai_performance.processing_rate, expected_rate, places=2)
     
-    @patch('performance_monitoring.services.psutil')
+    @patch('performance_monitoring.system_sampler.psutil')
     def test_collect_system_metrics(self, mock_psutil):
         """Test collecting system metrics"""
         # Mock psutil responses
@@ -250,28 +259,25 @@ class PerformanceMonitoringServiceTest(BasePerformanceTestCase):
             percent=62.1,
             available=2048 * 1024 * 1024  # 2GB in bytes
         )
-        mock_psutil.disk_usage.return_value = MagicMock(percent=78.5)
+        mock_psutil.disk_usage.return_value = MagicMock(percent=78.5, free=10240 * 1024 * 1024)
         mock_psutil.net_io_counters.return_value = MagicMock(
             bytes_sent=1024000,
             bytes_recv=2048000
         )
+        mock_psutil.getloadavg.return_value = (1.5, 1.2, 1.0)
+        mock_psutil.process_iter.return_value = []
         
         self.service.collect_system_metrics()
         
-        # Check that metrics were recorded
-        cpu_metrics = PerformanceMetric.objects.filter(
-            metric_type='system_resource',
-            metric_name='cpu_usage'
-        )
-        self.assertEqual(cpu_metrics.count(), 1)
-        self.assertEqual(cpu_metrics.first().value, 45.2)
-        
-        memory_metrics = PerformanceMetric.objects.filter(
-            metric_type='system_resource',
-            metric_name='memory_usage'
-        )
-        self.assertEqual(memory_metrics.count(), 1)
-        self.assertEqual(memory_metrics.first().value, 62.1)
+        # One snapshot row per collection instead of a metric row per value
+        self.assertEqual(SystemMetricsSnapshot.objects.count(), 1)
+        snapshot = SystemMetricsSnapshot.objects.get()
+        self.assertEqual(snapshot.cpu_percent_avg, 45.2)
+        self.assertEqual(snapshot.memory_percent_avg, 62.1)
+        self.assertEqual(snapshot.memory_available_mb, 2048)
+        self.assertEqual(snapshot.disk_free_mb, 10240)
+        self.assertEqual(snapshot.load_average, 1.5)
+        self.assertFalse(PerformanceMetric.objects.filter(metric_type='system_resource').exists())
     
     def test_get_performance_summary(self):
         """Test getting performance summary"""
@@ -412,6 +418,20 @@ class ConcurrentCallLoadTest(BasePerformanceTestCase):
         self.assertIsNotNone(metrics)
         self.assertEqual(metrics.active_calls, 5)
     
+    def test_track_concurrent_calls_single_session_query(self):
+        """Active sessions and their averages come from one aggregate query"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        with CaptureQueriesContext(connection) as queries:
+            self.service.track_concurrent_calls()
+        
+        session_queries = [
+            query for query in queries.captured_queries
+            if 'meetings_callbotsession' in query['sql']
+        ]
+        self.assertEqual(len(session_queries), 1)
+    
     def test_concurrent_performance_simulation(self):
         """Test performance under concurrent load simulation"""
         def simulate_call_session(session_id):
@@ -539,4 +559,373 @@ class PerformanceThresholdTest(BasePerformanceTestCase):
         alerts = SystemAlert.objects.filter(
             alert_type='performance_degradation'
         )
-        self.assertEqual(alerts.count(), 0)
\ No newline at end of file
+        self.assertEqual(alerts.count(), 0)
+
+
+class MetricBufferTest(BasePerformanceTestCase):
+    """Test buffered metric ingestion and in-memory threshold checks"""
+    
+    def setUp(self):
+        super().setUp()
+        self.service = PerformanceMonitoringService(buffered=True)
+        
+        PerformanceThreshold.objects.create(
+            metric_type='api_request',
+            metric_name='latency',
+            warning_threshold=1.0,
+            comparison_operator='>',
+            is_active=True
+        )
+    
+    @patch.object(MetricBuffer, '_ensure_thread')
+    def test_metrics_written_on_flush(self, mock_ensure_thread):
+        """Test buffered metrics are saved together with one insert"""
+        for value in (0.1, 0.2, 0.3):
+            self.service.record_metric('api_request', 'latency', value)
+        
+        self.assertEqual(PerformanceMetric.objects.count(), 0)
+        
+        with self.assertNumQueries(1):
+            self.assertEqual(self.service.flush_metrics(), 3)
+        
+        self.assertEqual(PerformanceMetric.objects.count(), 3)
+        self.assertEqual(self.service.flush_metrics(), 0)
+    
+    @patch.object(MetricBuffer, '_ensure_thread')
+    def test_threshold_checked_in_memory(self, mock_ensure_thread):
+        """Test thresholds are cached and violations alert when the metric is written"""
+        self.service.record_metric('api_request', 'latency', 0.5)
+        
+        with self.assertNumQueries(0):
+            self.service.record_metric('api_request', 'latency', 2.0)
+        
+        self.assertEqual(SystemAlert.objects.count(), 0)
+        self.service.flush_metrics()
+        
+        alert = SystemAlert.objects.get()
+        self.assertEqual(alert.severity, 'warning')
+        self.assertEqual(alert.current_value, 2.0)
+    
+    @patch.object(MetricBuffer, '_ensure_thread')
+    def test_threshold_change_invalidates_cache(self, mock_ensure_thread):
+        """Test a saved threshold applies to the next metric"""
+        self.service.record_metric('api_request', 'latency', 0.5)
+        PerformanceThreshold.objects.filter(metric_name='latency').get().delete()
+        
+        self.service.record_metric('api_request', 'latency', 2.0)
+        self.service.flush_metrics()
+        
+        self.assertEqual(SystemAlert.objects.count(), 0)
+    
+    @patch.object(MetricBuffer, '_ensure_thread')
+    def test_full_batch_wakes_flush_thread(self, mock_ensure_thread):
+        """Test reaching the flush size signals the background thread"""
+        buffer = MetricBuffer(MagicMock(), flush_size=2)
+        
+        buffer.add('first')
+        self.assertFalse(buffer._wake.is_set())
+        buffer.add('second')
+        self.assertTrue(buffer._wake.is_set())
+    
+    @patch.object(MetricBuffer, '_ensure_thread')
+    def test_full_buffer_drops_oldest(self, mock_ensure_thread):
+        """Test a full buffer keeps the newest items"""
+        writer = MagicMock()
+        buffer = MetricBuffer(writer, capacity=3)
+        
+        for item in range(5):
+            buffer.add(item)
+        buffer.flush()
+        
+        self.assertEqual(buffer.dropped, 2)
+        writer.assert_called_once_with([2, 3, 4])
+    
+    def test_flush_thread_writes_after_interval(self):
+        """Test the background thread flushes without being woken"""
+        written = threading.Event()
+        buffer = MetricBuffer(lambda items: written.set(), flush_interval=0.05)
+        
+        buffer.add('metric')
+        
+        self.assertTrue(written.wait(2))
+        self.assertEqual(len(buffer), 0)
+
+
+class MetricDownsamplingTest(BasePerformanceTestCase):
+    """Test rolling raw metrics into rollup tiers and reading them back"""
+    
+    def setUp(self):
+        super().setUp()
+        self.rollups = MetricRollupService()
+        self.now = timezone.now()
+    
+    def _create_metrics(self, timestamp, values, metric_type='api_request', status='success'):
+        PerformanceMetric.objects.bulk_create([
+            PerformanceMetric(
+                metric_type=metric_type, metric_name='latency', value=value,
+                status=status, timestamp=timestamp
+            )
+            for value in values
+        ])
+    
+    def test_histogram_quantiles_within_accuracy(self):
+        """Test percentile estimates stay within the histogram's relative accuracy"""
+        histogram = LogHistogram()
+        for value in range(1, 1001):
+            histogram.add(value)
+        
+        self.assertAlmostEqual(histogram.quantile(0.5), 500, delta=500 * 0.02)
+        self.assertAlmostEqual(histogram.quantile(0.99), 990, delta=990 * 0.02)
+        self.assertIsNone(LogHistogram().quantile(0.5))
+    
+    def test_histograms_merge_exactly(self):
+        """Test merged histograms estimate the same as one histogram of all values"""
+        whole, low, high = LogHistogram(), LogHistogram(), LogHistogram()
+        for value in range(1, 201):
+            whole.add(value / 10)
+            (low if value <= 100 else high).add(value / 10)
+        
+        low.merge(LogHistogram(high.to_dict()))
+        
+        self.assertEqual(low.quantile(0.95), whole.quantile(0.95))
+    
+    def test_downsample_builds_every_tier(self):
+        """Test settled raw metrics are counted in minute, hour and day buckets"""
+        self._create_metrics(self.now - timedelta(hours=3), [1.0, 2.0, 3.0])
+        self._create_metrics(self.now - timedelta(hours=3, minutes=10), [4.0], status='error')
+        self._create_metrics(self.now, [9.0])  # Not settled yet
+        
+        self.assertEqual(self.rollups.downsample(self.now), 4)
+        self.assertEqual(self.rollups.downsample(self.now), 0)
+        
+        minutes = PerformanceMetricRollup.objects.filter(granularity='minute')
+        self.assertEqual(sorted(minutes.values_list('count', flat=True)), [1, 3])
+        for granularity in ('hour', 'day'):
+            totals = PerformanceMetricRollup.objects.filter(granularity=granularity)
+            self.assertEqual(sum(totals.values_list('count', flat=True)), 4)
+            self.assertEqual(sum(totals.values_list('error_count', flat=True)), 1)
+            self.assertEqual(max(totals.values_list('value_max', flat=True)), 4.0)
+    
+    def test_stats_combine_rollups_and_raw(self):
+        """Test a window is answered from rollups plus raw metrics after the watermark"""
+        self._create_metrics(self.now - timedelta(days=3), [1.0, 2.0])
+        self._create_metrics(self.now - timedelta(hours=5), [3.0], status='error')
+        self.rollups.downsample(self.now)
+        self._create_metrics(self.now - timedelta(seconds=30), [10.0])
+        
+        with self.assertNumQueries(3):
+            stats = self.rollups.get_stats(self.now - timedelta(days=7), self.now)[None]
+        
+        self.assertEqual(stats['count'], 4)
+        self.assertEqual(stats['error_count'], 1)
+        self.assertEqual(stats['avg'], 4.0)
+        self.assertEqual(stats['max'], 10.0)
+        self.assertEqual(stats['p99'], 10.0)
+        
+        recent = self.rollups.get_stats(self.now - timedelta(hours=6), self.now, group_by='metric_type')
+        self.assertEqual(recent['api_request']['count'], 2)
+    
+    def test_prune_keeps_metrics_not_downsampled(self):
+        """Test raw retention only deletes metrics already rolled up"""
+        self._create_metrics(self.now - timedelta(days=10), [1.0])
+        self._create_metrics(self.now - timedelta(hours=1), [2.0])
+        
+        self.assertEqual(self.rollups.prune(self.now), (0, 0))
+        
+        self.rollups.downsample(self.now)
+        
+        self.assertEqual(self.rollups.prune(self.now), (1, 1))
+        self.assertEqual(PerformanceMetric.objects.get().value, 2.0)
+        self.assertEqual(
+            sorted(PerformanceMetricRollup.objects.filter(
+                bucket_start__lt=self.now - timedelta(days=5)
+            ).values_list('granularity', flat=True)),
+            ['day', 'hour']
+        )
+        self.assertIsNotNone(self.rollups.get_watermark())
+    
+    def test_summary_reads_rollups(self):
+        """Test the performance summary includes downsampled metrics and percentiles"""
+        self._create_metrics(self.now - timedelta(hours=2), [2.0, 4.0], metric_type='call_bot_session')
+        self.rollups.downsample(self.now)
+        
+        summary = PerformanceMonitoringService().get_performance_summary(hours=24)
+        
+        self.assertEqual(summary['total_metrics'], 2)
+        self.assertEqual(summary['call_bot_performance']['total_sessions'], 2)
+        self.assertEqual(summary['call_bot_performance']['avg_connection_time'], 3.0)
+        self.assertAlmostEqual(summary['call_bot_performance']['p95_connection_time'], 4.0, delta=0.08)
+
+
+class PrometheusMetricsTest(BasePerformanceTestCase):
+    """Test the in-process Prometheus metrics and their exposition endpoint"""
+    
+    def _sample(self, name, labels=None):
+        return REGISTRY.get_sample_value(name, labels or {}) or 0
+    
+    def test_request_latency_observed_per_view(self):
+        """Test each request is observed under its view name"""
+        labels = {'view': 'meeting-list-create', 'method': 'GET', 'status': '401'}
+        before = self._sample('api_request_duration_seconds_count', labels)
+        
+        self.client.get(reverse('meeting-list-create'))
+        
+        self.assertEqual(self._sample('api_request_duration_seconds_count', labels), before + 1)
+        response = self.client.get(reverse('prometheus-metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'api_request_duration_seconds_bucket{', response.content)
+    
+    def test_openmetrics_negotiated(self):
+        """Test OpenMetrics is returned when the scraper asks for it"""
+        response = self.client.get(reverse('prometheus-metrics'), HTTP_ACCEPT='application/openmetrics-text')
+        
+        self.assertTrue(response['Content-Type'].startswith('application/openmetrics-text'))
+        self.assertTrue(response.content.endswith(b'# EOF\n'))
+    
+    @override_settings(PROMETHEUS_METRICS_TOKEN='scrape-secret')
+    def test_token_required_when_configured(self):
+        """Test the endpoint rejects scrapers without the configured token"""
+        url = reverse('prometheus-metrics')
+        
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer scrape-secret').status_code, 200)
+    
+    def test_transcription_queue_depth(self):
+        """Test queued, rejected and released audio chunks move the queue gauges"""
+        depth = self._sample('transcription_audio_queue_depth')
+        dropped = self._sample('transcription_audio_chunks_dropped_total')
+        
+        async def stalled_pipeline(session_id):
+            await asyncio.sleep(60)
+        
+        async def run():
+            service = TranscriptionService()
+            service.MAX_CHUNK_QUEUE_SIZE = 2
+            service.ENQUEUE_TIMEOUT = 0.01
+            service._process_audio_stream = stalled_pipeline
+            await service.start_transcription('session-1', 'stream-1')
+            accepted = [
+                await service.process_audio_chunk('session-1', b'audio', float(index), 1.0)
+                for index in range(3)
+            ]
+            queued = self._sample('transcription_audio_queue_depth')
+            await service.stop_transcription('session-1')
+            return accepted, queued
+        
+        accepted, queued = asyncio.run(run())
+        self.assertEqual(accepted, [True, True, False])
+        self.assertEqual(queued, depth + 2)
+        self.assertEqual(self._sample('transcription_audio_queue_depth'), depth)
+        self.assertEqual(self._sample('transcription_audio_chunks_dropped_total'), dropped + 1)
+
+
+class SystemSamplerTest(BasePerformanceTestCase):
+    """Test non-blocking system sampling and snapshot reduction"""
+    
+    def _process(self, pid, cmdline, cpu, rss_mb):
+        process = MagicMock(pid=pid)
+        process.cmdline.return_value = cmdline
+        process.cpu_percent.return_value = cpu
+        process.memory_info.return_value = MagicMock(rss=rss_mb * 1024 * 1024)
+        return process
+    
+    def test_classify_process(self):
+        """Test worker processes are grouped by command line"""
+        self.assertEqual(classify_process(['/usr/bin/gunicorn', 'nia.wsgi']), 'gunicorn')
+        self.assertEqual(classify_process(['python', '-m', 'celery', '-A', 'nia', 'worker']), 'celery')
+        self.assertEqual(classify_process(['daphne', 'nia.asgi:application']), 'daphne')
+        self.assertIsNone(classify_process(['postgres', '-D', '/var/lib/postgresql']))
+        self.assertIsNone(classify_process([]))
+    
+    @patch('performance_monitoring.system_sampler.psutil')
+    def test_samples_aggregated_per_window(self, mock_psutil):
+        """Test several samples reduce to averages, peaks and per-group usage"""
+        mock_psutil.cpu_percent.side_effect = [0.0, 20.0, 60.0, 40.0]
+        mock_psutil.virtual_memory.side_effect = [
+            MagicMock(percent=50.0, available=4096 * 1024 * 1024),
+            MagicMock(percent=70.0, available=2048 * 1024 * 1024),
+            MagicMock(percent=60.0, available=3072 * 1024 * 1024),
+        ]
+        mock_psutil.disk_usage.return_value = MagicMock(percent=40.0, free=1024 * 1024 * 1024)
+        mock_psutil.net_io_counters.side_effect = [
+            MagicMock(bytes_sent=1000, bytes_recv=5000),
+            MagicMock(bytes_sent=4000, bytes_recv=9000),
+        ]
+        mock_psutil.getloadavg.return_value = (0.5, 0.4, 0.3)
+        gunicorn = self._process(10, ['gunicorn', 'nia.wsgi'], 30.0, 200)
+        celery = self._process(11, ['celery', '-A', 'nia', 'worker'], 10.0, 100)
+        other = self._process(12, ['postgres'], 90.0, 500)
+        mock_psutil.process_iter.return_value = [gunicorn, celery, other]
+        
+        sampler = SystemSampler()
+        for _ in range(3):
+            sampler.sample()
+        snapshot = sampler.snapshot()
+        
+        self.assertEqual(snapshot['sample_count'], 3)
+        self.assertAlmostEqual(snapshot['cpu_percent_avg'], 40.0)
+        self.assertEqual(snapshot['cpu_percent_max'], 60.0)
+        self.assertAlmostEqual(snapshot['memory_percent_avg'], 60.0)
+        self.assertEqual(snapshot['memory_percent_max'], 70.0)
+        self.assertEqual(snapshot['memory_available_mb'], 3072)
+        self.assertEqual(snapshot['network_bytes_sent'], 3000)
+        self.assertEqual(snapshot['network_bytes_recv'], 4000)
+        self.assertEqual(set(snapshot['processes']), {'gunicorn', 'celery'})
+        self.assertEqual(snapshot['processes']['gunicorn']['processes'], 1)
+        self.assertEqual(snapshot['processes']['gunicorn']['cpu_percent_avg'], 30.0)
+        self.assertEqual(snapshot['processes']['celery']['rss_mb_max'], 100.0)
+        # Command lines are read once per pid, not on every sample
+        self.assertEqual(gunicorn.cmdline.call_count, 1)
+        self.assertEqual(other.cpu_percent.call_count, 0)
+        # The window starts over after a snapshot
+        self.assertEqual(sampler.sample_count, 0)
+    
+    @patch('performance_monitoring.system_sampler.psutil')
+    def test_sampling_never_blocks(self, mock_psutil):
+        """Test CPU is always read without an interval"""
+        mock_psutil.cpu_percent.return_value = 10.0
+        mock_psutil.virtual_memory.return_value = MagicMock(percent=50.0, available=1024 * 1024 * 1024)
+        mock_psutil.process_iter.return_value = []
+        
+        sampler = SystemSampler()
+        sampler.sample()
+        
+        for call in mock_psutil.cpu_percent.call_args_list:
+            self.assertIsNone(call.kwargs.get('interval'))
+    
+    @patch('performance_monitoring.system_sampler.psutil')
+    def test_prime_starts_a_new_window(self, mock_psutil):
+        """Test priming resets host and process CPU counters and drops earlier samples"""
+        mock_psutil.cpu_percent.return_value = 10.0
+        mock_psutil.virtual_memory.return_value = MagicMock(percent=50.0, available=1024 * 1024 * 1024)
+        gunicorn = self._process(10, ['gunicorn', 'nia.wsgi'], 30.0, 200)
+        mock_psutil.process_iter.return_value = [gunicorn]
+        
+        sampler = SystemSampler()
+        sampler.sample()
+        sampler.prime()
+        
+        self.assertEqual(sampler.sample_count, 0)
+        self.assertEqual(mock_psutil.cpu_percent.call_count, 3)
+        self.assertEqual(gunicorn.cpu_percent.call_count, 2)
+
+
+class CollectSystemMetricsCommandTest(BasePerformanceTestCase):
+    """Test the collection command judges alerts from the snapshot it stored"""
+    
+    @patch('performance_monitoring.management.commands.collect_system_metrics.time.sleep')
+    @patch('performance_monitoring.management.commands.collect_system_metrics.alerting_service')
+    @patch('performance_monitoring.management.commands.collect_system_metrics.performance_monitor')
+    def test_once_measures_an_interval_and_checks_its_snapshot(self, mock_monitor, mock_alerting, mock_sleep):
+        """Test the first snapshot follows a primed wait and is passed to the health check"""
+        order = []
+        snapshot = MagicMock(spec=SystemMetricsSnapshot)
+        mock_monitor.system_sampler.prime.side_effect = lambda: order.append('prime')
+        mock_sleep.side_effect = lambda seconds: order.append('sleep')
+        mock_monitor.collect_system_metrics.side_effect = lambda: order.append('collect') or snapshot
+        
+        call_command('collect_system_metrics', '--once', '--sample-interval', '2', stdout=StringIO())
+        
+        self.assertEqual(order, ['prime', 'sleep', 'collect'])
+        mock_sleep.assert_called_once_with(2.0)
+        mock_alerting.check_system_health.assert_called_once_with(snapshot)
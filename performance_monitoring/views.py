@@ -1,3 +1,28 @@
-from django.shortcuts import render
+"""
+Prometheus metrics exposition view
+"""
+import hmac
 
-# Create your views here.
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+
+from .prometheus_metrics import render_metrics
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Expose in-process metrics for Prometheus to scrape
+
+    When PROMETHEUS_METRICS_TOKEN is set, scrapers must send it as a bearer
+    token; otherwise access should be limited at the network level.
+    """
+    token = getattr(settings, 'PROMETHEUS_METRICS_TOKEN', '')
+    if token:
+        expected = f'Bearer {token}'
+        if not hmac.compare_digest(request.META.get('HTTP_AUTHORIZATION', '').encode(), expected.encode()):
+            return HttpResponseForbidden()
+
+    body, content_type = render_metrics(request.META.get('HTTP_ACCEPT', ''))
+    return HttpResponse(body, content_type=content_type)